@@ -7,310 +7,240 @@ from django.utils.html import format_html
 from django.contrib import messages
 from datetime import datetime
 from decimal import Decimal
+from django.db.models import Count, Max, Min, Sum
 import io
 from django.http import HttpResponse
+from django.urls import reverse
 from reportlab.lib.pagesizes import letter, landscape, A4
 from reportlab.pdfgen import canvas
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from .models.users import CustomUser
 from .models.base import Equipe, ZoneExtrusion
 from .models.machines import Machine, HistoriqueMachine
-from .models.production import ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage
+from .models.production import (
+    ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage,
+    ResumeProductionJour,
+)
 from .models.alerts import Alerte, AlerteIA
+from .models.taches import TacheFond
+from .models.rapports import RapportGenere
+from .models.direction import IndicateursDirectionMois
+from .models.objectifs import ObjectifProduction
+from .utils.excel_utils import (
+    ColonneExcel, export_excel_queryset, statut_validation, heure_courte, pourcentage,
+    FORMAT_DATE, FORMAT_ENTIER, FORMAT_DECIMAL, FORMAT_POURCENTAGE,
+)
+from .utils.direction_utils import indicateurs_direction
+from .utils.pdf_utils import (
+    TableauPagine, parcourir_lignes_pdf, texte_resume_pdf, PDF_MAX_LIGNES_DETAIL,
+)
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-    
+
 
 # ==========================================
-# FONCTION D'EXPORT PDF ULTRA PROFESSIONNELLE
+# COLONNES DES EXPORTS EXCEL (largeurs et formats fixés d'avance)
 # ==========================================
 
-def create_ultra_professional_pdf(title, queryset, filename):
-    """Crée une fiche de production ULTRA professionnelle OPTIMISÉE NOIR ET BLANC"""
-    from reportlab.lib import colors
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-    
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=landscape(A4),
-        rightMargin=1.5*cm,
-        leftMargin=1.5*cm,
-        topMargin=2.5*cm, 
-        bottomMargin=2*cm
-    )
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # 1. EN-TÊTE CORPORATE - NOIR ET BLANC
-    header_style = ParagraphStyle(
-        'CorporateHeader',
-        parent=styles['Heading1'],
-        fontSize=22,
-        textColor=colors.black,
-        spaceAfter=0.3*cm,
-        alignment=0,
-        fontName='Helvetica-Bold'
-    )
-    
-    header_table = Table([[Paragraph(f"<b>{title}</b>", header_style)]], colWidths=[doc.width])
-    header_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#F0F0F0')),  # Gris clair
-        ('TEXTCOLOR', (0, 0), (0, 0), colors.black),
-        ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (0, 0), 20),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 15),
-        ('TOPPADDING', (0, 0), (0, 0), 10),
-        ('BOX', (0, 0), (0, 0), 1.5, colors.black),  # Bordure noire
-    ]))
-    elements.append(header_table)
-    
-    # 2. INFORMATIONS DE PÉRIODE
-    dates = [obj.date_production for obj in queryset]
-    if dates:
-        min_date = min(dates).strftime('%d/%m/%Y')
-        max_date = max(dates).strftime('%d/%m/%Y')
-        period_text = f"<b>Période analysée :</b> Du {min_date} au {max_date}" if min_date != max_date else f"<b>Date :</b> {min_date}"
-    else:
-        period_text = f"<b>Date :</b> {datetime.now().strftime('%d/%m/%Y')}"
-    
-    info_text = f"""
-    {period_text} | <b>Nombre d'enregistrements :</b> {len(queryset)} | <b>Généré le :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
+LIBELLES_EQUIPES = dict(Equipe.EQUIPES_CHOICES)
+
+
+def libelle_equipe(nom):
+    return LIBELLES_EQUIPES.get(nom, nom)
+
+
+def libelle_zone(numero):
+    return f"Zone {numero}"
+
+
+COLONNES_EXCEL_EXTRUSION = [
+    ColonneExcel('date_production', 'Date', 12, FORMAT_DATE),
+    ColonneExcel('zone__numero', 'Zone', 15, conversion=libelle_zone),
+    ColonneExcel('equipe__nom', 'Équipe', 24, conversion=libelle_equipe),
+    ColonneExcel('matiere_premiere_kg', 'Matière (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('nombre_machines_actives', 'Machines Actives', 10),
+    ColonneExcel('nombre_machinistes', 'Machinistes', 10),
+    ColonneExcel('nombre_bobines_kg', 'Bobines (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('production_finis_kg', 'Finis (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('production_semi_finis_kg', 'Semi-Finis (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('dechets_kg', 'Déchets (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('total_production_kg', 'Total Production (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('rendement_pourcentage', 'Rendement (%)', 12, FORMAT_DECIMAL),
+]
+
+COLONNES_EXCEL_IMPRIMERIE = [
+    ColonneExcel('date_production', 'Date', 12, FORMAT_DATE),
+    ColonneExcel('heure_debut', 'Heure Début', 10, conversion=heure_courte),
+    ColonneExcel('heure_fin', 'Heure Fin', 10, conversion=heure_courte),
+    ColonneExcel('nombre_machines_actives', 'Machines Actives', 12),
+    ColonneExcel('production_bobines_finies_kg', 'Bobines Finies (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('production_bobines_semi_finies_kg', 'Bobines Semi-Finies (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('dechets_kg', 'Déchets (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('total_production_kg', 'Total Production (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('taux_dechet_pourcentage', 'Taux Déchet (%)', 12, FORMAT_POURCENTAGE, pourcentage),
+    ColonneExcel('valide', 'Statut', 12, conversion=statut_validation),
+]
+
+COLONNES_EXCEL_SOUDURE = [
+    ColonneExcel('date_production', 'Date', 12, FORMAT_DATE),
+    ColonneExcel('heure_debut', 'Heure Début', 10, conversion=heure_courte),
+    ColonneExcel('heure_fin', 'Heure Fin', 10, conversion=heure_courte),
+    ColonneExcel('nombre_machines_actives', 'Machines Actives', 12),
+    ColonneExcel('production_bobines_finies_kg', 'Bobines Finies (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('production_bretelles_kg', 'Bretelles (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('production_rema_kg', 'Rema (kg)', 10, FORMAT_ENTIER),
+    ColonneExcel('production_batta_kg', 'Batta (kg)', 10, FORMAT_ENTIER),
+    ColonneExcel('production_sac_emballage_kg', 'Sac Emballage (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('dechets_kg', 'Déchets (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('total_production_specifique_kg', 'Total Spécifique (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('total_production_kg', 'Total Production (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('taux_dechet_pourcentage', 'Taux Déchet (%)', 12, FORMAT_POURCENTAGE, pourcentage),
+    ColonneExcel('valide', 'Statut', 12, conversion=statut_validation),
+]
+
+COLONNES_EXCEL_RECYCLAGE = [
+    ColonneExcel('date_production', 'Date', 12, FORMAT_DATE),
+    ColonneExcel('equipe__nom', 'Équipe', 24, conversion=libelle_equipe),
+    ColonneExcel('nombre_moulinex', 'Nombre Moulinex', 12),
+    ColonneExcel('production_broyage_kg', 'Broyage (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('production_bache_noir_kg', 'Bâche Noire (kg)', 12, FORMAT_ENTIER),
+    ColonneExcel('total_production_kg', 'Total Production (kg)', 15, FORMAT_ENTIER),
+    ColonneExcel('production_par_moulinex', 'Production/Moulinex', 15, FORMAT_ENTIER),
+    ColonneExcel('taux_transformation_pourcentage', 'Taux Transformation (%)', 15, FORMAT_POURCENTAGE, pourcentage),
+    ColonneExcel('valide', 'Statut', 12, conversion=statut_validation),
+]
+
+
+# ==========================================
+# DONNÉES DES FICHES PDF (une requête d'agrégats + une liste de valeurs)
+# ==========================================
+
+CHAMPS_PDF_EXTRUSION = [
+    'date_production', 'zone__numero', 'zone__nom', 'equipe__nom', 'matiere_premiere_kg',
+    'nombre_machines_actives', 'nombre_machinistes', 'nombre_bobines_kg', 'production_finis_kg',
+    'production_semi_finis_kg', 'dechets_kg', 'total_production_kg', 'rendement_pourcentage',
+]
+CHAMPS_PDF_IMPRIMERIE = [
+    'date_production', 'heure_debut', 'heure_fin', 'nombre_machines_actives',
+    'production_bobines_finies_kg', 'production_bobines_semi_finies_kg', 'dechets_kg',
+    'total_production_kg', 'taux_dechet_pourcentage',
+]
+CHAMPS_PDF_SOUDURE = [
+    'date_production', 'heure_debut', 'nombre_machines_actives', 'production_bobines_finies_kg',
+    'production_bretelles_kg', 'production_rema_kg', 'production_batta_kg',
+    'production_sac_emballage_kg', 'dechets_kg', 'total_production_kg',
+]
+CHAMPS_PDF_RECYCLAGE = [
+    'date_production', 'equipe__nom', 'nombre_moulinex', 'production_broyage_kg',
+    'production_bache_noir_kg', 'total_production_kg', 'production_par_moulinex',
+    'taux_transformation_pourcentage',
+]
+
+
+def statistiques_rapport(queryset, sommes=(), **agregats):
     """
-    
-    elements.append(Paragraph(info_text, ParagraphStyle('InfoStyle', fontSize=10, 
-                                                      textColor=colors.HexColor('#333333'),
-                                                      spaceAfter=0.5*cm)))
-    
-    # 3. SÉPARATEUR DÉCORATIF - LIGNE NOIRE
-    separator = Table([['']], colWidths=[doc.width])
-    separator.setStyle(TableStyle([
-        ('LINEBELOW', (0, 0), (0, 0), 2, colors.black),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 10),
-    ]))
-    elements.append(separator)
-    
-    # 4. TABLEAU PRINCIPAL - DESIGN NOIR ET BLANC
-    # MODIFICATION ICI : En-têtes mieux répartis et colonne Équipe élargie
-    headers_row1 = [
-        'INFORMATIONS DE BASE', '', '', '', '', '',
-        'PRODUCTION (kg)', '', '', '', '', ''
-    ]
-    
-    headers_row2 = [
-        'Date', 'Zone', 'Équipe', 'Matière\nPremière', 'Machines\nActives', 'Personnel',
-        'Bobines', 'Finis', 'Semi-Finis', 'Déchets', 'Total', 'Rendement\n(%)'
-    ]
-    
-    # Préparer les données
-    table_data = [headers_row1, headers_row2]
-    
-    for idx, obj in enumerate(queryset.order_by('date_production', 'zone')):
-        rendement = float(obj.rendement_pourcentage) if obj.rendement_pourcentage else 0
-        
-        # MODIFICATION ICI : Équipe formatée pour éviter débordement
-        equipe_nom = str(obj.equipe)
-        # Limiter la longueur si nécessaire
-        if len(equipe_nom) > 15:
-            equipe_nom = equipe_nom[:12] + "..."
-        
-        row_data = [
-            obj.date_production.strftime('%d/%m/%Y'),
-            str(obj.zone),
-            equipe_nom,  # <-- Utiliser le nom formaté
-            f"{float(obj.matiere_premiere_kg):,.0f}",
-            str(obj.nombre_machines_actives),
-            str(obj.nombre_machinistes),
-            f"{float(obj.nombre_bobines_kg):,.0f}",
-            f"{float(obj.production_finis_kg):,.0f}",
-            f"{float(obj.production_semi_finis_kg):,.0f}",
-            f"{float(obj.dechets_kg):,.0f}",
-            f"{float(obj.total_production_kg):,.0f}" if obj.total_production_kg else "0",
-            f"{rendement:.1f}%"
-        ]
-        table_data.append(row_data)
-    
-    # MODIFICATION IMPORTANTE ICI : Colonne Équipe élargie (4.0cm au lieu de 3.5cm)
-    col_widths = [2.5*cm, 3.0*cm, 4.0*cm, 2.2*cm, 1.8*cm, 1.8*cm, 
-                  2.0*cm, 2.0*cm, 2.0*cm, 2.0*cm, 2.0*cm, 2.0*cm]
-    
-    table = Table(table_data, colWidths=col_widths, repeatRows=2)
-    
-    # STYLE NOIR ET BLANC PROFESSIONNEL
-    table.setStyle(TableStyle([
-        # Fusion des en-têtes principaux
-        ('SPAN', (0, 0), (5, 0)),   # Informations de base
-        ('SPAN', (6, 0), (11, 0)),  # Production
-        
-        # En-tête 1 - Gris foncé
-        ('BACKGROUND', (0, 0), (5, 1), colors.HexColor('#404040')),
-        ('TEXTCOLOR', (0, 0), (5, 1), colors.white),
-        ('FONTNAME', (0, 0), (5, 1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (5, 0), 12),
-        ('FONTSIZE', (0, 1), (5, 1), 9),
-        ('ALIGN', (0, 1), (5, 1), 'CENTER'),
-        
-        # En-tête 2 - Gris moyen
-        ('BACKGROUND', (6, 0), (11, 1), colors.HexColor('#606060')),
-        ('TEXTCOLOR', (6, 0), (11, 1), colors.white),
-        ('FONTNAME', (6, 0), (11, 1), 'Helvetica-Bold'),
-        ('FONTSIZE', (6, 0), (11, 0), 12),
-        ('FONTSIZE', (6, 1), (11, 1), 9),
-        ('ALIGN', (6, 1), (11, 1), 'CENTER'),
-        
-        # Alignement et padding
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 2), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 2), (-1, -1), 8),
-        
-        # Bordures professionnelles NOIRES
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('BOX', (0, 0), (-1, 1), 1.5, colors.black),
-        
-        # Ligne de séparation
-        ('LINEBELOW', (0, 1), (-1, 1), 1, colors.white),
-        
-        # Alternance des couleurs des lignes - Gris très clair
-        ('ROWBACKGROUNDS', (2, 2), (-1, -1), 
-         [colors.white, colors.HexColor('#F8F8F8')]),
-        
-        # Mise en valeur spéciale - Police plus épaisse
-        ('FONTNAME', (10, 2), (10, -1), 'Helvetica-Bold'),  # Total Production
-        ('FONTNAME', (11, 2), (11, -1), 'Helvetica-Bold'),  # Rendement
-    ]))
-    
-    elements.append(table)
-    elements.append(Spacer(1, 0.8*cm))
-    
-    # 5. DASHBOARD DES INDICATEURS CLÉS - NOIR ET BLANC
-    if queryset:
-        # Calcul des indicateurs
-        total_matiere = sum(float(obj.matiere_premiere_kg) for obj in queryset)
-        total_production = sum(float(obj.total_production_kg) for obj in queryset if obj.total_production_kg)
-        total_dechets = sum(float(obj.dechets_kg) for obj in queryset)
-        rendements = [float(obj.rendement_pourcentage) for obj in queryset if obj.rendement_pourcentage]
-        avg_rendement = sum(rendements) / len(rendements) if rendements else 0
-        
-        # Titre section KPI
-        elements.append(Paragraph("📊 DASHBOARD DES INDICATEURS CLÉS", 
-                                ParagraphStyle('KPITitle', fontSize=14, 
-                                             textColor=colors.black,
-                                             spaceAfter=0.5*cm,
-                                             fontName='Helvetica-Bold')))
-        
-        # Cartes KPI en 2x2 avec motifs noir et blanc
-        kpi_data = [
-            ["PRODUCTION TOTALE", f"{total_production:,.0f} kg", "🏭", '#000000'],
-            ["MATIÈRE PREMIÈRE", f"{total_matiere:,.0f} kg", "⚙️", '#404040'],
-            ["RENDEMENT MOYEN", f"{avg_rendement:.1f}%", "📈", '#606060'],
-            ["DÉCHETS TOTAUX", f"{total_dechets:,.0f} kg", "🗑️", '#808080']
-        ]
-        
-        kpi_table_data = []
-        for i in range(0, 4, 2):
-            row = []
-            for j in range(2):
-                if i + j < 4:
-                    kpi = kpi_data[i + j]
-                    cell_content = f"""
-                    <para alignment='center'>
-                    <font name='Helvetica' size=9>{kpi[0]}</font><br/>
-                    <font name='Helvetica-Bold' size=14>{kpi[2]} {kpi[1]}</font>
-                    </para>
-                    """
-                    cell = Paragraph(cell_content, ParagraphStyle(
-                        'KPICell', 
-                        alignment=1,
-                        fontSize=9,
-                        spaceBefore=6,
-                        spaceAfter=6
-                    ))
-                    row.append(cell)
-                else:
-                    row.append('')
-            kpi_table_data.append(row)
-        
-        kpi_table = Table(kpi_table_data, colWidths=[doc.width/2 - 1*cm, doc.width/2 - 1*cm])
-        kpi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F0F0F0')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 12),
-        ]))
-        
-        elements.append(kpi_table)
-        elements.append(Spacer(1, 0.8*cm))
-        
-        # 6. ANALYSE AUTOMATIQUE - CADRE GRIS
-        analysis_text = "<b>🔍 ANALYSE AUTOMATIQUE :</b><br/>"
-        
-        if avg_rendement >= 85:
-            analysis_text += "✓ <b>Rendement excellent</b> - Performance optimale de production<br/>"
-        elif avg_rendement >= 70:
-            analysis_text += "⚠ <b>Rendement acceptable</b> - Possibilité d'amélioration<br/>"
-        else:
-            analysis_text += "✗ <b>Rendement faible</b> - Nécessite une investigation approfondie<br/>"
-            
-        if total_dechets / (total_production + 0.001) * 100 > 15:
-            analysis_text += "✗ <b>Taux de déchet élevé</b> - Optimisation nécessaire des processus"
-        else:
-            analysis_text += "✓ <b>Gestion des déchets optimale</b> - Processus bien maîtrisé"
-        
-        analysis_para = Paragraph(analysis_text, ParagraphStyle(
-            'Analysis', 
-            fontSize=9,
-            textColor=colors.black,
-            backColor=colors.HexColor('#F0F0F0'),
-            borderPadding=10,
-            borderColor=colors.black,
-            borderWidth=1
-        ))
-        elements.append(analysis_para)
-    
-    # 7. PIED DE PAGE CORPORATE - NOIR ET BLANC
-    elements.append(Spacer(1, 1.2*cm))
-    
-    # Ligne de séparation
-    footer_separator = Table([['']], colWidths=[doc.width])
-    footer_separator.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (0, 0), 1, colors.black),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 5),
-    ]))
-    elements.append(footer_separator)
-    
-    # Informations footer
-    footer_text = f"""
-    <b>SOFEM-CI</b> | Usine de Production d'Emballage | Abidjan, Côte d'Ivoire<br/>
-    <i>Document confidentiel - Réf: PROD-{datetime.now().strftime('%Y%m%d')}-001 | Page 1/1</i>
+    Effectif, dates extrêmes, totaux (clés total_<champ>) et agrégats
+    supplémentaires d'une sélection, en une seule requête.
+    Les valeurs numériques sont des float (0 si la sélection est vide).
     """
+    expressions = {
+        'nombre': Count('id'),
+        'date_min': Min('date_production'),
+        'date_max': Max('date_production'),
+    }
+    expressions.update({f'total_{champ}': Sum(champ) for champ in sommes})
+    expressions.update(agregats)
+
+    stats = queryset.order_by().aggregate(**expressions)
+    for cle, valeur in stats.items():
+        if cle not in ('nombre', 'date_min', 'date_max'):
+            stats[cle] = float(valeur or 0)
+    return stats
+
+
+def libelle_zone_complet(ligne):
+    return f"Zone {ligne['zone__numero']} - {ligne['zone__nom']}"
+
+
+# ==========================================
+# RAPPORTS MIS EN CACHE (générés en tâche de fond au-delà d'un seuil)
+# ==========================================
+
+# type_rapport -> modèle, format, nom du fichier et rendu(queryset) ; utilisé par rapports.py
+RAPPORTS_ADMIN = {
+    'fiche_pdf_extrusion': {
+        'modele': ProductionExtrusion, 'format': 'pdf', 'nom': 'Fiche_Production_Extrusion_UltraPro',
+        'rendu': lambda qs: create_ultra_professional_pdf("FICHE DE PRODUCTION EXTRUSION", qs, ''),
+    },
+    'fiche_pdf_imprimerie': {
+        'modele': ProductionImprimerie, 'format': 'pdf', 'nom': 'Fiche_Production_Imprimerie_UltraPro',
+        'rendu': lambda qs: create_ultra_professional_pdf_imprimerie("FICHE DE PRODUCTION IMPRIMERIE", qs, ''),
+    },
+    'fiche_pdf_soudure': {
+        'modele': ProductionSoudure, 'format': 'pdf', 'nom': 'Fiche_Production_Soudure_UltraPro',
+        'rendu': lambda qs: create_ultra_professional_pdf_soudure("FICHE DE PRODUCTION SOUDURE", qs, ''),
+    },
+    'fiche_pdf_recyclage': {
+        'modele': ProductionRecyclage, 'format': 'pdf', 'nom': 'Fiche_Production_Recyclage_UltraPro',
+        'rendu': lambda qs: create_ultra_professional_pdf_recyclage("FICHE DE PRODUCTION RECYCLAGE", qs, ''),
+    },
+    'fiche_excel_extrusion': {
+        'modele': ProductionExtrusion, 'format': 'xlsx', 'nom': 'Fiche_Production_Extrusion',
+        'rendu': lambda qs: export_excel_queryset(
+            qs, COLONNES_EXCEL_EXTRUSION, "FICHE DE PRODUCTION EXTRUSION",
+            nom_feuille="Production Extrusion", couleur="1A4B8C",
+            ordre=('date_production', 'zone__numero', 'id')
+        ),
+    },
+    'fiche_excel_imprimerie': {
+        'modele': ProductionImprimerie, 'format': 'xlsx', 'nom': 'Fiche_Production_Imprimerie',
+        'rendu': lambda qs: export_excel_queryset(
+            qs, COLONNES_EXCEL_IMPRIMERIE, "FICHE DE PRODUCTION IMPRIMERIE",
+            nom_feuille="Production Imprimerie", couleur="6A0DAD"
+        ),
+    },
+    'fiche_excel_soudure': {
+        'modele': ProductionSoudure, 'format': 'xlsx', 'nom': 'Fiche_Production_Soudure',
+        'rendu': lambda qs: export_excel_queryset(
+            qs, COLONNES_EXCEL_SOUDURE, "FICHE DE PRODUCTION SOUDURE",
+            nom_feuille="Production Soudure", couleur="E65100"
+        ),
+    },
+    'fiche_excel_recyclage': {
+        'modele': ProductionRecyclage, 'format': 'xlsx', 'nom': 'Fiche_Production_Recyclage',
+        'rendu': lambda qs: export_excel_queryset(
+            qs, COLONNES_EXCEL_RECYCLAGE, "FICHE DE PRODUCTION RECYCLAGE",
+            nom_feuille="Production Recyclage", couleur="2E7D32",
+            ordre=('date_production', 'equipe__nom', 'id')
+        ),
+    },
+}
+
+
+def servir_rapport(modeladmin, request, type_rapport, queryset):
+    """
+    Action d'export : fichier en cache ou petite sélection -> téléchargement
+    immédiat ; sinon génération en tâche de fond et lien de téléchargement.
+    """
+    from .rapports import demander_rapport, filtres_selection, reponse_rapport
+
+    rapport, tache = demander_rapport(type_rapport, queryset, filtres_selection(request), request.user)
+    if rapport:
+        return reponse_rapport(rapport)
+
+    modeladmin.message_user(
+        request,
+        format_html(
+            'Rapport en cours de génération en arrière-plan. '
+            '<a href="{}">Télécharger dès qu\'il est prêt</a>',
+            reverse('rapport_tache', args=[tache.pk])
+        ),
+        messages.INFO
+    )
+    return None
     
-    footer_para = Paragraph(footer_text, ParagraphStyle(
-        'ProfessionalFooter',
-        fontSize=8,
-        textColor=colors.HexColor('#666666'),
-        alignment=1,
-        fontName='Helvetica'
-    ))
-    elements.append(footer_para)
-    
-    # 8. GÉNÉRER LE PDF
-    doc.build(elements)
-    buffer.seek(0)
-    
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
-    return response
+
 # ==========================================
 # FONCTIONS PDF PROFESSIONNELLES POUR TOUTES LES SECTIONS
 # ==========================================
@@ -349,16 +279,16 @@ def create_ultra_professional_pdf(title, queryset, filename):
     elements.append(Paragraph(header_content, header_style))
     
     # 2. INFORMATIONS DE PÉRIODE
-    dates = [obj.date_production for obj in queryset]
-    if dates:
-        min_date = min(dates).strftime('%d/%m/%Y')
-        max_date = max(dates).strftime('%d/%m/%Y')
+    stats = statistiques_rapport(queryset)
+    if stats['nombre']:
+        min_date = stats['date_min'].strftime('%d/%m/%Y')
+        max_date = stats['date_max'].strftime('%d/%m/%Y')
         period_text = f"<b>Période analysée :</b> Du {min_date} au {max_date}" if min_date != max_date else f"<b>Date :</b> {min_date}"
     else:
         period_text = f"<b>Date :</b> {datetime.now().strftime('%d/%m/%Y')}"
     
     info_text = f"""
-    {period_text} | <b>Nombre d'enregistrements :</b> {len(queryset)} | <b>Généré le :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
+    {period_text} | <b>Nombre d'enregistrements :</b> {stats['nombre']} | <b>Généré le :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
     """
     
     elements.append(Paragraph(info_text, ParagraphStyle('InfoStyle', fontSize=10, 
@@ -373,45 +303,27 @@ def create_ultra_professional_pdf(title, queryset, filename):
         'Bobines', 'Finis', 'Semi-Finis', 'Déchets', 'Total', 'yield (%)'
     ]
     
-    # Préparer les données
-    table_data = [headers]
-    
-    for obj in queryset.order_by('date_production', 'zone'):
-        rendement = float(obj.rendement_pourcentage) if obj.rendement_pourcentage else 0
-        
-        # Formatage
-        matiere_premiere = float(obj.matiere_premiere_kg)
-        bobines = float(obj.nombre_bobines_kg)
-        finis = float(obj.production_finis_kg)
-        semi_finis = float(obj.production_semi_finis_kg)
-        dechets = float(obj.dechets_kg)
-        total = float(obj.total_production_kg) if obj.total_production_kg else 0
-        
-        # Formatage des nombres avec espace comme séparateur
-        def format_number(num):
-            return f"{num:,.0f}".replace(",", " ")
-        
-        # Date formatée correctement (pas de troncature)
-        date_str = obj.date_production.strftime('%d/%m/%Y')
-        
-        # Formater l'équipe
-        equipe_str = str(obj.equipe)
-        
-        row_data = [
-            date_str,  # Date complète
-            str(obj.zone),
-            equipe_str,
-            format_number(matiere_premiere),
-            str(obj.nombre_machines_actives),
-            str(obj.nombre_machinistes),
-            format_number(bobines),
-            format_number(finis),
-            format_number(semi_finis),
-            format_number(dechets),
+    def format_number(num):
+        """Nombres avec espace comme séparateur de milliers"""
+        return f"{num:,.0f}".replace(",", " ")
+    
+    def formater(ligne):
+        rendement = float(ligne['rendement_pourcentage']) if ligne['rendement_pourcentage'] else 0
+        total = float(ligne['total_production_kg']) if ligne['total_production_kg'] else 0
+        return [
+            ligne['date_production'].strftime('%d/%m/%Y'),  # Date complète
+            libelle_zone_complet(ligne),
+            libelle_equipe(ligne['equipe__nom']),
+            format_number(float(ligne['matiere_premiere_kg'])),
+            str(ligne['nombre_machines_actives']),
+            str(ligne['nombre_machinistes']),
+            format_number(float(ligne['nombre_bobines_kg'])),
+            format_number(float(ligne['production_finis_kg'])),
+            format_number(float(ligne['production_semi_finis_kg'])),
+            format_number(float(ligne['dechets_kg'])),
             format_number(total) if total else "0",
             f"{rendement:.1f}"  # Rendement sans "%" dans la cellule
         ]
-        table_data.append(row_data)
     
     # Largeurs de colonnes ajustées POUR LES BONNES BORDURES
     col_widths = [
@@ -429,10 +341,8 @@ def create_ultra_professional_pdf(title, queryset, filename):
         2.0*cm   # Rendement (%)
     ]
     
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    
-    # STYLE AVEC BORDURES PARFAITES
-    table.setStyle(TableStyle([
+    # STYLE AVEC BORDURES PARFAITES (appliqué à chaque bloc du tableau)
+    style = [
         # === EN-TÊTE ===
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#404040')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -478,9 +388,22 @@ def create_ultra_professional_pdf(title, queryset, filename):
         # === ALTERNANCE DES COULEURS ===
         ('ROWBACKGROUNDS', (1, 1), (-1, -1), 
          [colors.white, colors.HexColor('#F9F9F9')]),
-    ]))
+    ]
     
-    elements.append(table)
+    # Tableau émis par blocs, sous-totaux journaliers si plusieurs jours
+    resume = stats['nombre'] > PDF_MAX_LIGNES_DETAIL
+    if resume:
+        elements.append(Paragraph(texte_resume_pdf(stats['nombre']), styles['Normal']))
+    tableau = TableauPagine(
+        [headers], col_widths, style, formater,
+        sommes={3: 'matiere_premiere_kg', 6: 'nombre_bobines_kg', 7: 'production_finis_kg',
+                8: 'production_semi_finis_kg', 9: 'dechets_kg', 10: 'total_production_kg'},
+        par_jour=stats['date_min'] != stats['date_max'],
+        resume=resume,
+    )
+    elements.extend(tableau.flowables(parcourir_lignes_pdf(
+        queryset, CHAMPS_PDF_EXTRUSION, ('date_production', 'zone__numero', 'id')
+    )))
     elements.append(Spacer(1, 1.5*cm))
     
     # 4. PIED DE PAGE DIRECTEMENT APRÈS LE TABLEAU
@@ -541,16 +464,19 @@ def create_ultra_professional_pdf_soudure(title, queryset, filename):
     elements.append(Paragraph(header_content, header_style))
     
     # 2. INFORMATIONS
-    dates = [obj.date_production for obj in queryset]
-    if dates:
-        min_date = min(dates).strftime('%d/%m/%Y')
-        max_date = max(dates).strftime('%d/%m/%Y')
+    stats = statistiques_rapport(queryset, [
+        'production_bobines_finies_kg', 'production_bretelles_kg', 'production_rema_kg',
+        'production_batta_kg', 'production_sac_emballage_kg', 'dechets_kg', 'total_production_kg',
+    ])
+    if stats['nombre']:
+        min_date = stats['date_min'].strftime('%d/%m/%Y')
+        max_date = stats['date_max'].strftime('%d/%m/%Y')
         period_text = f"<b>PÉRIODE ANALYSÉE :</b> Du {min_date} au {max_date}" if min_date != max_date else f"<b>DATE :</b> {min_date}"
     else:
         period_text = f"<b>DATE :</b> {datetime.now().strftime('%d/%m/%Y')}"
     
     info_text = f"""
-    {period_text} | <b>ENREGISTREMENTS :</b> {len(queryset)} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
+    {period_text} | <b>ENREGISTREMENTS :</b> {stats['nombre']} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
     """
     
     elements.append(Paragraph(info_text, ParagraphStyle('InfoStyle', fontSize=9,
@@ -565,24 +491,22 @@ def create_ultra_professional_pdf_soudure(title, queryset, filename):
         'BATTA (kg)', 'SAC (kg)', 'DÉCHETS (kg)', 'TOTAL (kg)'
     ]
     
-    table_data = [headers]
-    
-    for obj in queryset.order_by('date_production'):
-        heure_debut = obj.heure_debut.strftime('%Hh') if obj.heure_debut else '--'
+    def formater(ligne):
+        heure_debut = ligne['heure_debut'].strftime('%Hh') if ligne['heure_debut'] else '--'
         
         row_data = [
-            obj.date_production.strftime('%d/%m/%Y'),
+            ligne['date_production'].strftime('%d/%m/%Y'),
             heure_debut,
-            str(obj.nombre_machines_actives),
-            f"{float(obj.production_bobines_finies_kg):,.0f}",
-            f"{float(obj.production_bretelles_kg):,.0f}",
-            f"{float(obj.production_rema_kg):,.0f}",
-            f"{float(obj.production_batta_kg):,.0f}",
-            f"{float(obj.production_sac_emballage_kg):,.0f}",
-            f"{float(obj.dechets_kg):,.0f}",
-            f"{float(obj.total_production_kg):,.0f}" if obj.total_production_kg else "0"
+            str(ligne['nombre_machines_actives']),
+            f"{float(ligne['production_bobines_finies_kg']):,.0f}",
+            f"{float(ligne['production_bretelles_kg']):,.0f}",
+            f"{float(ligne['production_rema_kg']):,.0f}",
+            f"{float(ligne['production_batta_kg']):,.0f}",
+            f"{float(ligne['production_sac_emballage_kg']):,.0f}",
+            f"{float(ligne['dechets_kg']):,.0f}",
+            f"{float(ligne['total_production_kg']):,.0f}" if ligne['total_production_kg'] else "0"
         ]
-        table_data.append(row_data)
+        return row_data
     
     # COLONNES AGRANDIES
     total_width = doc.width
@@ -599,10 +523,8 @@ def create_ultra_professional_pdf_soudure(title, queryset, filename):
         total_width * 0.15   # TOTAL
     ]
     
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    
-    # STYLE AGRANDI
-    table.setStyle(TableStyle([
+    # STYLE AGRANDI (appliqué à chaque bloc du tableau)
+    style = [
         # En-tête
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#404040')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -631,20 +553,34 @@ def create_ultra_professional_pdf_soudure(title, queryset, filename):
         
         # Mise en valeur
         ('FONTNAME', (9, 1), (9, -1), 'Helvetica-Bold'),
-    ]))
+    ]
     
-    elements.append(table)
+    # Tableau émis par blocs, sous-totaux journaliers si plusieurs jours
+    resume = stats['nombre'] > PDF_MAX_LIGNES_DETAIL
+    if resume:
+        elements.append(Paragraph(texte_resume_pdf(stats['nombre']), styles['Normal']))
+    tableau = TableauPagine(
+        [headers], col_widths, style, formater,
+        sommes={3: 'production_bobines_finies_kg', 4: 'production_bretelles_kg', 5: 'production_rema_kg',
+                6: 'production_batta_kg', 7: 'production_sac_emballage_kg', 8: 'dechets_kg',
+                9: 'total_production_kg'},
+        par_jour=stats['date_min'] != stats['date_max'],
+        resume=resume,
+    )
+    elements.extend(tableau.flowables(parcourir_lignes_pdf(
+        queryset, CHAMPS_PDF_SOUDURE, ('date_production', 'id')
+    )))
     elements.append(Spacer(1, 0.8*cm))
     
     # 4. TABLEAU DES TOTAUX AGRANDI
-    if queryset:
-        total_bobines = sum(float(obj.production_bobines_finies_kg) for obj in queryset)
-        total_bretelles = sum(float(obj.production_bretelles_kg) for obj in queryset)
-        total_rema = sum(float(obj.production_rema_kg) for obj in queryset)
-        total_batta = sum(float(obj.production_batta_kg) for obj in queryset)
-        total_sac = sum(float(obj.production_sac_emballage_kg) for obj in queryset)
-        total_dechets = sum(float(obj.dechets_kg) for obj in queryset)
-        total_production = sum(float(obj.total_production_kg) for obj in queryset if obj.total_production_kg)
+    if stats['nombre']:
+        total_bobines = stats['total_production_bobines_finies_kg']
+        total_bretelles = stats['total_production_bretelles_kg']
+        total_rema = stats['total_production_rema_kg']
+        total_batta = stats['total_production_batta_kg']
+        total_sac = stats['total_production_sac_emballage_kg']
+        total_dechets = stats['total_dechets_kg']
+        total_production = stats['total_total_production_kg']
         
         # Tableau des totaux LARGE
         totals_headers = ['TYPE DE PRODUCTION', 'QUANTITÉ (kg)', '% DU TOTAL', 'CONTRIBUTION']
@@ -775,16 +711,18 @@ def create_ultra_professional_pdf_recyclage(title, queryset, filename):
     elements.append(Paragraph(header_content, header_style))
     
     # 2. INFORMATIONS
-    dates = [obj.date_production for obj in queryset]
-    if dates:
-        min_date = min(dates).strftime('%d/%m/%Y')
-        max_date = max(dates).strftime('%d/%m/%Y')
+    stats = statistiques_rapport(queryset, [
+        'production_broyage_kg', 'production_bache_noir_kg', 'total_production_kg', 'nombre_moulinex',
+    ])
+    if stats['nombre']:
+        min_date = stats['date_min'].strftime('%d/%m/%Y')
+        max_date = stats['date_max'].strftime('%d/%m/%Y')
         period_text = f"<b>PÉRIODE ANALYSÉE :</b> Du {min_date} au {max_date}" if min_date != max_date else f"<b>DATE :</b> {min_date}"
     else:
         period_text = f"<b>DATE :</b> {datetime.now().strftime('%d/%m/%Y')}"
     
     info_text = f"""
-    {period_text} | <b>ENREGISTREMENTS :</b> {len(queryset)} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
+    {period_text} | <b>ENREGISTREMENTS :</b> {stats['nombre']} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
     """
     
     elements.append(Paragraph(info_text, ParagraphStyle('InfoStyle', fontSize=9,
@@ -799,26 +737,24 @@ def create_ultra_professional_pdf_recyclage(title, queryset, filename):
         'TOTAL (kg)', 'PROD/MOULINEX', 'TAUX TRANSFO (%)'
     ]
     
-    table_data = [headers]
-    
-    for obj in queryset.order_by('date_production', 'equipe'):
-        taux_transfo = obj.taux_transformation_pourcentage or 0
-        prod_par_moulinex = obj.production_par_moulinex or 0
+    def formater(ligne):
+        taux_transfo = ligne['taux_transformation_pourcentage'] or 0
+        prod_par_moulinex = ligne['production_par_moulinex'] or 0
         
         # Abréviation équipe
-        equipe_abbr = str(obj.equipe)[:12] if obj.equipe else "-"
+        equipe_abbr = libelle_equipe(ligne['equipe__nom'])[:12]
         
         row_data = [
-            obj.date_production.strftime('%d/%m/%Y'),
+            ligne['date_production'].strftime('%d/%m/%Y'),
             equipe_abbr,
-            str(obj.nombre_moulinex),
-            f"{float(obj.production_broyage_kg):,.0f}",
-            f"{float(obj.production_bache_noir_kg):,.0f}",
-            f"{float(obj.total_production_kg):,.0f}" if obj.total_production_kg else "0",
+            str(ligne['nombre_moulinex']),
+            f"{float(ligne['production_broyage_kg']):,.0f}",
+            f"{float(ligne['production_bache_noir_kg']):,.0f}",
+            f"{float(ligne['total_production_kg']):,.0f}" if ligne['total_production_kg'] else "0",
             f"{prod_par_moulinex:,.0f}",
             f"{taux_transfo:.1f}%"
         ]
-        table_data.append(row_data)
+        return row_data
     
     # COLONNES AGRANDIES
     total_width = doc.width
@@ -833,10 +769,8 @@ def create_ultra_professional_pdf_recyclage(title, queryset, filename):
         total_width * 0.13   # TAUX TRANSFO
     ]
     
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    
-    # STYLE AGRANDI
-    table.setStyle(TableStyle([
+    # STYLE AGRANDI (appliqué à chaque bloc du tableau)
+    style = [
         # En-tête
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#404040')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -866,17 +800,29 @@ def create_ultra_professional_pdf_recyclage(title, queryset, filename):
         # Mise en valeur
         ('FONTNAME', (5, 1), (5, -1), 'Helvetica-Bold'),  # Total
         ('FONTNAME', (7, 1), (7, -1), 'Helvetica-Bold'),  # Taux Transfo
-    ]))
+    ]
     
-    elements.append(table)
+    # Tableau émis par blocs, sous-totaux journaliers si plusieurs jours
+    resume = stats['nombre'] > PDF_MAX_LIGNES_DETAIL
+    if resume:
+        elements.append(Paragraph(texte_resume_pdf(stats['nombre']), styles['Normal']))
+    tableau = TableauPagine(
+        [headers], col_widths, style, formater,
+        sommes={3: 'production_broyage_kg', 4: 'production_bache_noir_kg', 5: 'total_production_kg'},
+        par_jour=stats['date_min'] != stats['date_max'],
+        resume=resume,
+    )
+    elements.extend(tableau.flowables(parcourir_lignes_pdf(
+        queryset, CHAMPS_PDF_RECYCLAGE, ('date_production', 'equipe__nom', 'id')
+    )))
     elements.append(Spacer(1, 0.8*cm))
     
     # 4. TABLEAU DES INDICATEURS AGRANDI
-    if queryset:
-        total_broyage = sum(float(obj.production_broyage_kg) for obj in queryset)
-        total_bache = sum(float(obj.production_bache_noir_kg) for obj in queryset)
-        total_production = sum(float(obj.total_production_kg) for obj in queryset if obj.total_production_kg)
-        total_moulinex = sum(obj.nombre_moulinex for obj in queryset)
+    if stats['nombre']:
+        total_broyage = stats['total_production_broyage_kg']
+        total_bache = stats['total_production_bache_noir_kg']
+        total_production = stats['total_total_production_kg']
+        total_moulinex = stats['total_nombre_moulinex']
         
         # Calculs
         taux_transfo_global = (total_bache / (total_broyage + 0.001)) * 100
@@ -985,16 +931,19 @@ def create_ultra_professional_pdf_imprimerie(title, queryset, filename):
     elements.append(Paragraph(header_content, header_style))
     
     # 2. INFORMATIONS DE PÉRIODE
-    dates = [obj.date_production for obj in queryset]
-    if dates:
-        min_date = min(dates).strftime('%d/%m/%Y')
-        max_date = max(dates).strftime('%d/%m/%Y')
+    stats = statistiques_rapport(queryset, [
+        'production_bobines_finies_kg', 'production_bobines_semi_finies_kg', 'dechets_kg',
+        'total_production_kg', 'nombre_machines_actives',
+    ])
+    if stats['nombre']:
+        min_date = stats['date_min'].strftime('%d/%m/%Y')
+        max_date = stats['date_max'].strftime('%d/%m/%Y')
         period_text = f"<b>PÉRIODE ANALYSÉE :</b> Du {min_date} au {max_date}" if min_date != max_date else f"<b>DATE :</b> {min_date}"
     else:
         period_text = f"<b>DATE :</b> {datetime.now().strftime('%d/%m/%Y')}"
     
     info_text = f"""
-    {period_text} | <b>ENREGISTREMENTS :</b> {len(queryset)} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
+    {period_text} | <b>ENREGISTREMENTS :</b> {stats['nombre']} | <b>GÉNÉRÉ LE :</b> {datetime.now().strftime('%d/%m/%Y à %H:%M')}
     """
     
     elements.append(Paragraph(info_text, ParagraphStyle('InfoStyle', fontSize=9,
@@ -1010,26 +959,24 @@ def create_ultra_professional_pdf_imprimerie(title, queryset, filename):
     ]
     
     # Préparer les données
-    table_data = [headers]
-    
-    for idx, obj in enumerate(queryset.order_by('date_production', 'heure_debut')):
-        heure_debut = obj.heure_debut.strftime('%Hh%M') if obj.heure_debut else '--:--'
-        heure_fin = obj.heure_fin.strftime('%Hh%M') if obj.heure_fin else '--:--'
+    def formater(ligne):
+        heure_debut = ligne['heure_debut'].strftime('%Hh%M') if ligne['heure_debut'] else '--:--'
+        heure_fin = ligne['heure_fin'].strftime('%Hh%M') if ligne['heure_fin'] else '--:--'
         heures = f"{heure_debut} - {heure_fin}"
         
-        taux_dechet = obj.taux_dechet_pourcentage or 0
+        taux_dechet = ligne['taux_dechet_pourcentage'] or 0
         
         row_data = [
-            obj.date_production.strftime('%d/%m/%Y'),
+            ligne['date_production'].strftime('%d/%m/%Y'),
             heures,
-            str(obj.nombre_machines_actives),
-            f"{float(obj.production_bobines_finies_kg):,.0f}",
-            f"{float(obj.production_bobines_semi_finies_kg):,.0f}",
-            f"{float(obj.dechets_kg):,.0f}",
-            f"{float(obj.total_production_kg):,.0f}" if obj.total_production_kg else "0",
+            str(ligne['nombre_machines_actives']),
+            f"{float(ligne['production_bobines_finies_kg']):,.0f}",
+            f"{float(ligne['production_bobines_semi_finies_kg']):,.0f}",
+            f"{float(ligne['dechets_kg']):,.0f}",
+            f"{float(ligne['total_production_kg']):,.0f}" if ligne['total_production_kg'] else "0",
             f"{taux_dechet:.1f}%"
         ]
-        table_data.append(row_data)
+        return row_data
     
     # COLONNES AGRANDIES POUR OCCUPER TOUTE LA PAGE
     total_width = doc.width
@@ -1044,10 +991,8 @@ def create_ultra_professional_pdf_imprimerie(title, queryset, filename):
         total_width * 0.15   # TAUX DÉCHET
     ]
     
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    
-    # STYLE AVEC COLONNES PLUS LARGES
-    table.setStyle(TableStyle([
+    # STYLE AVEC COLONNES PLUS LARGES (appliqué à chaque bloc du tableau)
+    style = [
         # En-tête
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#404040')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -1074,17 +1019,31 @@ def create_ultra_professional_pdf_imprimerie(title, queryset, filename):
         # Alternance
         ('ROWBACKGROUNDS', (1, 1), (-1, -1), 
          [colors.white, colors.HexColor('#F5F5F5')]),
-    ]))
+    ]
     
-    elements.append(table)
+    # Tableau émis par blocs, sous-totaux journaliers si plusieurs jours
+    resume = stats['nombre'] > PDF_MAX_LIGNES_DETAIL
+    if resume:
+        elements.append(Paragraph(texte_resume_pdf(stats['nombre']), styles['Normal']))
+    tableau = TableauPagine(
+        [headers], col_widths, style, formater,
+        sommes={3: 'production_bobines_finies_kg', 4: 'production_bobines_semi_finies_kg', 5: 'dechets_kg',
+                6: 'total_production_kg'},
+        par_jour=stats['date_min'] != stats['date_max'],
+        resume=resume,
+    )
+    elements.extend(tableau.flowables(parcourir_lignes_pdf(
+        queryset, CHAMPS_PDF_IMPRIMERIE, ('date_production', 'heure_debut', 'id')
+    )))
     elements.append(Spacer(1, 0.8*cm))
     
     # 4. SECTION STATISTIQUES AGRANDIE
-    if queryset:
-        total_bobines_finies = sum(float(obj.production_bobines_finies_kg) for obj in queryset)
-        total_bobines_semi = sum(float(obj.production_bobines_semi_finies_kg) for obj in queryset)
-        total_dechets = sum(float(obj.dechets_kg) for obj in queryset)
-        total_production = sum(float(obj.total_production_kg) for obj in queryset if obj.total_production_kg)
+    if stats['nombre']:
+        total_bobines_finies = stats['total_production_bobines_finies_kg']
+        total_bobines_semi = stats['total_production_bobines_semi_finies_kg']
+        total_dechets = stats['total_dechets_kg']
+        total_production = stats['total_total_production_kg']
+        total_machines = stats['total_nombre_machines_actives']
         
         # Tableau de statistiques LARGE
         stats_headers = ['INDICATEUR', 'VALEUR', 'OBJECTIF', 'STATUT']
@@ -1098,8 +1057,8 @@ def create_ultra_professional_pdf_imprimerie(title, queryset, filename):
              '✅ Bon' if (total_bobines_finies/(total_production+0.001)) > 0.6 else '⚠️ Moyen'),
             ('Taux Déchet', f"{(total_dechets/(total_production+0.001)*100):.1f}%", "< 5%", 
              '✅ Bon' if (total_dechets/(total_production+0.001)) < 0.05 else '❌ Élevé'),
-            ('Productivité/Machine', f"{(total_production/sum(obj.nombre_machines_actives for obj in queryset)):,.0f} kg", "> 500 kg", 
-             '✅ Bonne' if (total_production/(sum(obj.nombre_machines_actives for obj in queryset)+0.001)) > 500 else '⚠️ Faible'),
+            ('Productivité/Machine', f"{(total_production/total_machines):,.0f} kg", "> 500 kg", 
+             '✅ Bonne' if (total_production/(total_machines+0.001)) > 500 else '⚠️ Faible'),
         ]
         
         for name, value, target, status in stats:
@@ -1506,12 +1465,12 @@ class ProductionExtrusionAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
     
     def valider_production(self, request, queryset):
-        updated = queryset.update(valide=True)
+        updated = self.model.changer_validation(queryset, True)
         self.message_user(request, f'{updated} productions validées avec succès.', messages.SUCCESS)
     valider_production.short_description = "✅ Valider la production"
     
     def invalider_production(self, request, queryset):
-        updated = queryset.update(valide=False)
+        updated = self.model.changer_validation(queryset, False)
         self.message_user(request, f'{updated} productions invalidées.', messages.WARNING)
     invalider_production.short_description = "❌ Invalider la production"
     
@@ -1528,7 +1487,7 @@ class ProductionExtrusionAdmin(admin.ModelAdmin):
         
         try:
             # APPEL DE LA FONCTION ULTRA PROFESSIONNELLE
-            return create_ultra_professional_pdf(title, queryset, filename)
+            return servir_rapport(self, request, 'fiche_pdf_extrusion', queryset)
         except Exception as e:
             self.message_user(request, f"Erreur lors de la génération du PDF: {str(e)}", messages.ERROR)
             # Fallback vers un PDF simple
@@ -1561,104 +1520,12 @@ class ProductionExtrusionAdmin(admin.ModelAdmin):
         return response
     
     def export_excel_fiche_production(self, request, queryset):
-        """Export Excel professionnel"""
-        title = "FICHE DE PRODUCTION EXTRUSION"
-        filename = f"Fiche_Production_Extrusion_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        
+        """Export Excel professionnel (fichier en cache ou généré en tâche de fond)"""
         if not queryset.exists():
             self.message_user(request, "Aucune donnée à exporter.", messages.WARNING)
             return None
         
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Production Extrusion"
-        
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        blue_header = PatternFill(start_color="1A4B8C", end_color="1A4B8C", fill_type="solid")
-        center_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # En-tête
-        ws.merge_cells('A1:L1')
-        ws['A1'] = "SOFEM-CI - FICHE DE PRODUCTION EXTRUSION"
-        ws['A1'].font = Font(bold=True, size=16, color="1A4B8C")
-        ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Date
-        ws.merge_cells('A2:L2')
-        ws['A2'] = f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        ws['A2'].font = Font(size=11, color="666666")
-        ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        ws.append([])
-        
-        # En-têtes tableau
-        headers = [
-            'Date', 'Zone', 'Équipe', 'Matière (kg)', 'Machines Actives', 'Machinistes',
-            'Bobines (kg)', 'Finis (kg)', 'Semi-Finis (kg)', 'Déchets (kg)', 
-            'Total Production (kg)', 'Rendement (%)'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num, value=header)
-            cell.font = header_font
-            cell.fill = blue_header
-            cell.alignment = center_alignment
-        
-        # Données
-        row_num = 5
-        for obj in queryset.order_by('date_production', 'zone'):
-            ws.cell(row=row_num, column=1, value=obj.date_production).number_format = 'DD/MM/YYYY'
-            ws.cell(row=row_num, column=2, value=str(obj.zone))
-            ws.cell(row=row_num, column=3, value=str(obj.equipe))
-            ws.cell(row=row_num, column=4, value=float(obj.matiere_premiere_kg))
-            ws.cell(row=row_num, column=5, value=int(obj.nombre_machines_actives))
-            ws.cell(row=row_num, column=6, value=int(obj.nombre_machinistes))
-            ws.cell(row=row_num, column=7, value=float(obj.nombre_bobines_kg))
-            ws.cell(row=row_num, column=8, value=float(obj.production_finis_kg))
-            ws.cell(row=row_num, column=9, value=float(obj.production_semi_finis_kg))
-            ws.cell(row=row_num, column=10, value=float(obj.dechets_kg))
-            ws.cell(row=row_num, column=11, value=float(obj.total_production_kg) if obj.total_production_kg else 0)
-            ws.cell(row=row_num, column=12, value=float(obj.rendement_pourcentage) if obj.rendement_pourcentage else 0)
-            
-            row_num += 1
-        
-        # Formater les colonnes
-        for col in ['D', 'G', 'H', 'I', 'J', 'K']:
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '#,##0'
-        
-        # Ajuster largeur
-        column_widths = {
-            'A': 12,  # Date
-            'B': 15,  # Zone
-            'C': 12,  # Équipe
-            'D': 12,  # Matière
-            'E': 10,  # Machines
-            'F': 10,  # Machinistes
-            'G': 12,  # Bobines
-            'H': 12,  # Finis
-            'I': 12,  # Semi-finis
-            'J': 12,  # Déchets
-            'K': 15,  # Total
-            'L': 12   # Rendement
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
-        # Sauvegarder
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        return response
+        return servir_rapport(self, request, 'fiche_excel_extrusion', queryset)
     
     export_excel_fiche_production.short_description = "📊 Exporter en Excel"
 # ==========================================
@@ -1833,12 +1700,12 @@ class ProductionImprimerieAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
     
     def valider_production(self, request, queryset):
-        updated = queryset.update(valide=True)
+        updated = self.model.changer_validation(queryset, True)
         self.message_user(request, f'{updated} productions imprimerie validées avec succès.', messages.SUCCESS)
     valider_production.short_description = "✅ Valider la production"
     
     def invalider_production(self, request, queryset):
-        updated = queryset.update(valide=False)
+        updated = self.model.changer_validation(queryset, False)
         self.message_user(request, f'{updated} productions imprimerie invalidées.', messages.WARNING)
     invalider_production.short_description = "❌ Invalider la production"
     
@@ -1853,7 +1720,7 @@ class ProductionImprimerieAdmin(admin.ModelAdmin):
             return None
         
         try:
-            return create_ultra_professional_pdf_imprimerie(title, queryset, filename)
+            return servir_rapport(self, request, 'fiche_pdf_imprimerie', queryset)
         except Exception as e:
             self.message_user(request, f"Erreur lors de la génération du PDF: {str(e)}", messages.ERROR)
             return self.create_simple_pdf_fallback(title, queryset, filename)
@@ -1885,100 +1752,12 @@ class ProductionImprimerieAdmin(admin.ModelAdmin):
         return response
     
     def export_excel_fiche_imprimerie(self, request, queryset):
-        """Export Excel professionnel pour imprimerie"""
-        title = "FICHE DE PRODUCTION IMPRIMERIE"
-        filename = f"Fiche_Production_Imprimerie_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        
+        """Export Excel professionnel pour imprimerie (fichier en cache ou généré en tâche de fond)"""
         if not queryset.exists():
             self.message_user(request, "Aucune donnée à exporter.", messages.WARNING)
             return None
         
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Production Imprimerie"
-        
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        purple_header = PatternFill(start_color="6A0DAD", end_color="6A0DAD", fill_type="solid")
-        center_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # En-tête
-        ws.merge_cells('A1:H1')
-        ws['A1'] = "SOFEM-CI - FICHE DE PRODUCTION IMPRIMERIE"
-        ws['A1'].font = Font(bold=True, size=16, color="6A0DAD")
-        ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Date
-        ws.merge_cells('A2:H2')
-        ws['A2'] = f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        ws['A2'].font = Font(size=11, color="666666")
-        ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        ws.append([])
-        
-        # En-têtes tableau
-        headers = [
-            'Date', 'Heure Début', 'Heure Fin', 'Machines Actives',
-            'Bobines Finies (kg)', 'Bobines Semi-Finies (kg)', 'Déchets (kg)', 
-            'Total Production (kg)', 'Taux Déchet (%)', 'Statut'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num, value=header)
-            cell.font = header_font
-            cell.fill = purple_header
-            cell.alignment = center_alignment
-        
-        # Données
-        row_num = 5
-        for obj in queryset.order_by('date_production'):
-            ws.cell(row=row_num, column=1, value=obj.date_production).number_format = 'DD/MM/YYYY'
-            ws.cell(row=row_num, column=2, value=obj.heure_debut.strftime('%H:%M') if obj.heure_debut else '')
-            ws.cell(row=row_num, column=3, value=obj.heure_fin.strftime('%H:%M') if obj.heure_fin else '')
-            ws.cell(row=row_num, column=4, value=int(obj.nombre_machines_actives))
-            ws.cell(row=row_num, column=5, value=float(obj.production_bobines_finies_kg))
-            ws.cell(row=row_num, column=6, value=float(obj.production_bobines_semi_finies_kg))
-            ws.cell(row=row_num, column=7, value=float(obj.dechets_kg))
-            ws.cell(row=row_num, column=8, value=float(obj.total_production_kg) if obj.total_production_kg else 0)
-            ws.cell(row=row_num, column=9, value=float(obj.taux_dechet_pourcentage) if obj.taux_dechet_pourcentage else 0)
-            ws.cell(row=row_num, column=10, value="Validé" if obj.valide else "En attente")
-            
-            row_num += 1
-        
-        # Formater les colonnes
-        for col in ['E', 'F', 'G', 'H']:
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '#,##0'
-        
-        # Ajuster largeur
-        column_widths = {
-            'A': 12,  # Date
-            'B': 10,  # Heure Début
-            'C': 10,  # Heure Fin
-            'D': 12,  # Machines
-            'E': 15,  # Bobines Finies
-            'F': 15,  # Bobines Semi
-            'G': 12,  # Déchets
-            'H': 15,  # Total
-            'I': 12,  # Taux Déchet
-            'J': 12   # Statut
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
-        # Sauvegarder
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        return response
+        return servir_rapport(self, request, 'fiche_excel_imprimerie', queryset)
     
     export_excel_fiche_imprimerie.short_description = "📊 Exporter en Excel"
 
@@ -2192,12 +1971,12 @@ class ProductionSoudureAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
     
     def valider_production(self, request, queryset):
-        updated = queryset.update(valide=True)
+        updated = self.model.changer_validation(queryset, True)
         self.message_user(request, f'{updated} productions soudure validées avec succès.', messages.SUCCESS)
     valider_production.short_description = "✅ Valider la production"
     
     def invalider_production(self, request, queryset):
-        updated = queryset.update(valide=False)
+        updated = self.model.changer_validation(queryset, False)
         self.message_user(request, f'{updated} productions soudure invalidées.', messages.WARNING)
     invalider_production.short_description = "❌ Invalider la production"
     
@@ -2214,7 +1993,7 @@ class ProductionSoudureAdmin(admin.ModelAdmin):
         
         try:
             # APPEL DE LA FONCTION ULTRA PROFESSIONNELLE SPÉCIFIQUE À LA SOUDURE
-            return create_ultra_professional_pdf_soudure(title, queryset, filename)
+            return servir_rapport(self, request, 'fiche_pdf_soudure', queryset)
         except Exception as e:
             self.message_user(request, f"Erreur lors de la génération du PDF: {str(e)}", messages.ERROR)
             # Fallback vers un PDF simple
@@ -2247,115 +2026,12 @@ class ProductionSoudureAdmin(admin.ModelAdmin):
         return response
     
     def export_excel_fiche_soudure(self, request, queryset):
-        """Export Excel professionnel pour soudure"""
-        title = "FICHE DE PRODUCTION SOUDURE"
-        filename = f"Fiche_Production_Soudure_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        
+        """Export Excel professionnel pour soudure (fichier en cache ou généré en tâche de fond)"""
         if not queryset.exists():
             self.message_user(request, "Aucune donnée à exporter.", messages.WARNING)
             return None
         
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Production Soudure"
-        
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        orange_header = PatternFill(start_color="E65100", end_color="E65100", fill_type="solid")
-        center_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # En-tête
-        ws.merge_cells('A1:N1')
-        ws['A1'] = "SOFEM-CI - FICHE DE PRODUCTION SOUDURE"
-        ws['A1'].font = Font(bold=True, size=16, color="E65100")
-        ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Date
-        ws.merge_cells('A2:N2')
-        ws['A2'] = f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        ws['A2'].font = Font(size=11, color="666666")
-        ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        ws.append([])
-        
-        # En-têtes tableau
-        headers = [
-            'Date', 'Heure Début', 'Heure Fin', 'Machines Actives',
-            'Bobines Finies (kg)', 'Bretelles (kg)', 'Rema (kg)', 
-            'Batta (kg)', 'Sac Emballage (kg)', 'Déchets (kg)',
-            'Total Spécifique (kg)', 'Total Production (kg)', 
-            'Taux Déchet (%)', 'Statut'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num, value=header)
-            cell.font = header_font
-            cell.fill = orange_header
-            cell.alignment = center_alignment
-        
-        # Données
-        row_num = 5
-        for obj in queryset.order_by('date_production'):
-            ws.cell(row=row_num, column=1, value=obj.date_production).number_format = 'DD/MM/YYYY'
-            ws.cell(row=row_num, column=2, value=obj.heure_debut.strftime('%H:%M') if obj.heure_debut else '')
-            ws.cell(row=row_num, column=3, value=obj.heure_fin.strftime('%H:%M') if obj.heure_fin else '')
-            ws.cell(row=row_num, column=4, value=int(obj.nombre_machines_actives))
-            ws.cell(row=row_num, column=5, value=float(obj.production_bobines_finies_kg))
-            ws.cell(row=row_num, column=6, value=float(obj.production_bretelles_kg))
-            ws.cell(row=row_num, column=7, value=float(obj.production_rema_kg))
-            ws.cell(row=row_num, column=8, value=float(obj.production_batta_kg))
-            ws.cell(row=row_num, column=9, value=float(obj.production_sac_emballage_kg))
-            ws.cell(row=row_num, column=10, value=float(obj.dechets_kg))
-            ws.cell(row=row_num, column=11, value=float(obj.total_production_specifique_kg) if obj.total_production_specifique_kg else 0)
-            ws.cell(row=row_num, column=12, value=float(obj.total_production_kg) if obj.total_production_kg else 0)
-            ws.cell(row=row_num, column=13, value=float(obj.taux_dechet_pourcentage) if obj.taux_dechet_pourcentage else 0)
-            ws.cell(row=row_num, column=14, value="Validé" if obj.valide else "En attente")
-            
-            row_num += 1
-        
-        # Formater les colonnes numériques
-        for col in ['E', 'F', 'G', 'H', 'I', 'J', 'K', 'L']:
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '#,##0'
-        
-        for col in ['M']:  # Pourcentages
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '0.00%'
-        
-        # Ajuster la largeur des colonnes
-        column_widths = {
-            'A': 12,  # Date
-            'B': 10,  # Heure Début
-            'C': 10,  # Heure Fin
-            'D': 12,  # Machines
-            'E': 12,  # Bobines Finies
-            'F': 12,  # Bretelles
-            'G': 10,  # Rema
-            'H': 10,  # Batta
-            'I': 15,  # Sac Emballage
-            'J': 12,  # Déchets
-            'K': 15,  # Total Spécifique
-            'L': 15,  # Total Production
-            'M': 12,  # Taux Déchet
-            'N': 12   # Statut
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
-        # Sauvegarder
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        return response
+        return servir_rapport(self, request, 'fiche_excel_soudure', queryset)
     
     export_excel_fiche_soudure.short_description = "📊 Exporter en Excel"
 # ==========================================
@@ -2554,12 +2230,12 @@ class ProductionRecyclageAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
     
     def valider_production(self, request, queryset):
-        updated = queryset.update(valide=True)
+        updated = self.model.changer_validation(queryset, True)
         self.message_user(request, f'{updated} productions recyclage validées avec succès.', messages.SUCCESS)
     valider_production.short_description = "✅ Valider la production"
     
     def invalider_production(self, request, queryset):
-        updated = queryset.update(valide=False)
+        updated = self.model.changer_validation(queryset, False)
         self.message_user(request, f'{updated} productions recyclage invalidées.', messages.WARNING)
     invalider_production.short_description = "❌ Invalider la production"
     
@@ -2576,7 +2252,7 @@ class ProductionRecyclageAdmin(admin.ModelAdmin):
         
         try:
             # APPEL DE LA FONCTION ULTRA PROFESSIONNELLE SPÉCIFIQUE AU RECYCLAGE
-            return create_ultra_professional_pdf_recyclage(title, queryset, filename)
+            return servir_rapport(self, request, 'fiche_pdf_recyclage', queryset)
         except Exception as e:
             self.message_user(request, f"Erreur lors de la génération du PDF: {str(e)}", messages.ERROR)
             # Fallback vers un PDF simple
@@ -2609,103 +2285,12 @@ class ProductionRecyclageAdmin(admin.ModelAdmin):
         return response
     
     def export_excel_fiche_recyclage(self, request, queryset):
-        """Export Excel professionnel pour recyclage"""
-        title = "FICHE DE PRODUCTION RECYCLAGE"
-        filename = f"Fiche_Production_Recyclage_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        
+        """Export Excel professionnel pour recyclage (fichier en cache ou généré en tâche de fond)"""
         if not queryset.exists():
             self.message_user(request, "Aucune donnée à exporter.", messages.WARNING)
             return None
         
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Production Recyclage"
-        
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        green_header = PatternFill(start_color="2E7D32", end_color="2E7D32", fill_type="solid")
-        center_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # En-tête
-        ws.merge_cells('A1:I1')
-        ws['A1'] = "SOFEM-CI - FICHE DE PRODUCTION RECYCLAGE"
-        ws['A1'].font = Font(bold=True, size=16, color="2E7D32")
-        ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Date
-        ws.merge_cells('A2:I2')
-        ws['A2'] = f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        ws['A2'].font = Font(size=11, color="666666")
-        ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
-        
-        ws.append([])
-        
-        # En-têtes tableau
-        headers = [
-            'Date', 'Équipe', 'Nombre Moulinex',
-            'Broyage (kg)', 'Bâche Noire (kg)', 'Total Production (kg)',
-            'Production/Moulinex', 'Taux Transformation (%)', 'Statut'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num, value=header)
-            cell.font = header_font
-            cell.fill = green_header
-            cell.alignment = center_alignment
-        
-        # Données
-        row_num = 5
-        for obj in queryset.order_by('date_production', 'equipe'):
-            ws.cell(row=row_num, column=1, value=obj.date_production).number_format = 'DD/MM/YYYY'
-            ws.cell(row=row_num, column=2, value=str(obj.equipe))
-            ws.cell(row=row_num, column=3, value=int(obj.nombre_moulinex))
-            ws.cell(row=row_num, column=4, value=float(obj.production_broyage_kg))
-            ws.cell(row=row_num, column=5, value=float(obj.production_bache_noir_kg))
-            ws.cell(row=row_num, column=6, value=float(obj.total_production_kg) if obj.total_production_kg else 0)
-            ws.cell(row=row_num, column=7, value=float(obj.production_par_moulinex) if obj.production_par_moulinex else 0)
-            ws.cell(row=row_num, column=8, value=float(obj.taux_transformation_pourcentage) if obj.taux_transformation_pourcentage else 0)
-            ws.cell(row=row_num, column=9, value="Validé" if obj.valide else "En attente")
-            
-            row_num += 1
-        
-        # Formater les colonnes numériques
-        for col in ['D', 'E', 'F', 'G']:
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '#,##0'
-        
-        for col in ['H']:  # Pourcentages
-            for row in range(5, row_num):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '0.00%'
-        
-        # Ajuster la largeur des colonnes
-        column_widths = {
-            'A': 12,  # Date
-            'B': 15,  # Équipe
-            'C': 12,  # Moulinex
-            'D': 12,  # Broyage
-            'E': 12,  # Bâche Noire
-            'F': 15,  # Total Production
-            'G': 15,  # Prod/Moulinex
-            'H': 15,  # Taux Transformation
-            'I': 12   # Statut
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
-        # Sauvegarder
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        
-        response = HttpResponse(
-            buffer,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        return response
+        return servir_rapport(self, request, 'fiche_excel_recyclage', queryset)
     
     export_excel_fiche_recyclage.short_description = "📊 Exporter en Excel"
 # ==========================================
@@ -2731,4 +2316,98 @@ class AlerteIAAdmin(admin.ModelAdmin):
 class HistoriqueMachineAdmin(admin.ModelAdmin):
     list_display = ['machine', 'type_evenement', 'date_evenement', 'technicien']
     list_filter = ['type_evenement', 'date_evenement']
-    search_fields = ['machine__numero', 'description']
\ No newline at end of file
+    search_fields = ['machine__numero', 'description']
+
+@admin.register(ResumeProductionJour)
+class ResumeProductionJourAdmin(admin.ModelAdmin):
+    """Résumés maintenus automatiquement : consultation seule"""
+    list_display = ['date_production', 'section', 'zone', 'equipe', 'nombre_productions',
+                    'nombre_validees', 'total_production_kg', 'dechets_kg', 'date_mise_a_jour']
+    list_filter = ['section', 'zone', 'equipe']
+    date_hierarchy = 'date_production'
+    ordering = ['-date_production', 'section']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(TacheFond)
+class TacheFondAdmin(admin.ModelAdmin):
+    """Suivi de la file des tâches de fond : consultation seule"""
+    list_display = ['id', 'type_tache', 'statut', 'progression', 'message',
+                    'demandee_par', 'date_creation', 'duree_secondes', 'worker']
+    list_filter = ['type_tache', 'statut']
+    date_hierarchy = 'date_creation'
+    readonly_fields = ['resultat', 'erreur']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RapportGenere)
+class RapportGenereAdmin(admin.ModelAdmin):
+    """Rapports conservés sur disque : consultation et suppression (fichier compris)"""
+    list_display = ['nom_fichier', 'type_rapport', 'date_debut', 'date_fin', 'nombre_lignes',
+                    'taille_octets', 'nombre_telechargements', 'date_creation', 'dernier_acces']
+    list_filter = ['type_rapport', 'format']
+    date_hierarchy = 'date_creation'
+    actions = ['supprimer_rapports']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # La suppression standard laisserait les fichiers sur disque
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_model(self, request, obj):
+        RapportGenere.supprimer(RapportGenere.objects.filter(pk=obj.pk))
+
+    def supprimer_rapports(self, request, queryset):
+        nombre = RapportGenere.supprimer(queryset)
+        self.message_user(request, f"{nombre} rapport(s) supprimé(s).", messages.SUCCESS)
+
+    supprimer_rapports.short_description = "🗑️ Supprimer les rapports et leurs fichiers"
+
+
+@admin.register(IndicateursDirectionMois)
+class IndicateursDirectionMoisAdmin(admin.ModelAdmin):
+    """Instantanés mensuels du dashboard direction : consultation et recalcul"""
+    list_display = ['mois', 'chiffre_affaires', 'production_totale_kg', 'cout_production_kg',
+                    'rendement_global', 'taux_dechet', 'jours_production', 'date_calcul']
+    date_hierarchy = 'mois'
+    actions = ['recalculer_indicateurs']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def recalculer_indicateurs(self, request, queryset):
+        mois = list(queryset.values_list('mois', flat=True))
+        for premier_jour in mois:
+            indicateurs_direction(premier_jour, recalculer=True)
+        self.message_user(request, f"{len(mois)} mois recalculé(s) avec les prix actuels.", messages.SUCCESS)
+
+    recalculer_indicateurs.short_description = "🔄 Recalculer avec les prix et coûts actuels"
+
+
+@admin.register(ObjectifProduction)
+class ObjectifProductionAdmin(admin.ModelAdmin):
+    """Objectifs journaliers par section, zone ou équipe, datés"""
+    list_display = ['section', 'zone', 'equipe', 'objectif_kg', 'date_debut', 'date_fin', 'date_modification']
+    list_filter = ['section', 'zone', 'equipe']
+    list_editable = ['objectif_kg', 'date_fin']
+    list_select_related = ['zone', 'equipe']
+    date_hierarchy = 'date_debut'
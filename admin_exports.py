@@ -8,6 +8,10 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 import datetime
 from decimal import Decimal
 from .admin_mixins import ExportPDFExcelMixin
+from .utils.excel_utils import (
+    ColonneExcel, export_excel_queryset, reponse_excel, statut_validation, heure_courte, pourcentage,
+    FORMAT_DATE, FORMAT_DECIMAL, FORMAT_POURCENTAGE,
+)
 
 
 class ProductionExportMixin(ExportPDFExcelMixin):
@@ -87,17 +91,12 @@ class ProductionExportMixin(ExportPDFExcelMixin):
         start_date, end_date = self.get_period_dates(period)
         queryset = self.get_export_queryset(start_date, end_date)
         
-        # Créer le workbook Excel
-        wb, ws = self.create_excel_workbook(queryset, period)
-        
-        # Sauvegarder dans le buffer
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        # Classeur écrit en flux dans un fichier temporaire
+        fichier = self.create_excel_workbook(queryset, period)
         
         # Retourner le fichier Excel
-        filename = f'{self.model._meta.model_name}_{period}_{datetime.date.today()}.xlsx'
-        return self.create_excel_response(buffer, filename)
+        filename = f'{self.model._meta.model_name}_{period}_{datetime.date.today()}'
+        return reponse_excel(fichier, filename)
     
     # Méthodes abstraites à implémenter dans chaque classe
     def get_export_queryset(self, start_date, end_date):
@@ -113,7 +112,7 @@ class ProductionExportMixin(ExportPDFExcelMixin):
         raise NotImplementedError
     
     def create_excel_workbook(self, queryset, period):
-        """Crée le workbook Excel"""
+        """Écrit le classeur Excel et retourne le fichier temporaire rembobiné"""
         raise NotImplementedError
     
     def format_stats_html(self, stats):
@@ -181,81 +180,36 @@ class ProductionExtrusionExportMixin(ProductionExportMixin):
         
         return data
     
+    # Colonnes de l'export Excel : largeurs et formats fixés d'avance
+    COLONNES_EXCEL = [
+        ColonneExcel('date_production', 'Date', 12, FORMAT_DATE),
+        ColonneExcel('zone__numero', 'Zone', 10),
+        ColonneExcel('equipe__nom', 'Équipe', 10),
+        ColonneExcel('heure_debut', 'Heure Début', 10, conversion=heure_courte),
+        ColonneExcel('heure_fin', 'Heure Fin', 10, conversion=heure_courte),
+        ColonneExcel('chef_zone', 'Chef Zone', 20),
+        ColonneExcel('matiere_premiere_kg', 'Matière (kg)', 12, FORMAT_DECIMAL),
+        ColonneExcel('nombre_machines_actives', 'Machines Actives', 10),
+        ColonneExcel('nombre_machinistes', 'Machinistes', 10),
+        ColonneExcel('nombre_bobines_kg', 'Bobines (kg)', 12, FORMAT_DECIMAL),
+        ColonneExcel('production_finis_kg', 'Finis (kg)', 12, FORMAT_DECIMAL),
+        ColonneExcel('production_semi_finis_kg', 'Semi-Finis (kg)', 12, FORMAT_DECIMAL),
+        ColonneExcel('dechets_kg', 'Déchets (kg)', 12, FORMAT_DECIMAL),
+        ColonneExcel('total_production_kg', 'Total Production (kg)', 15, FORMAT_DECIMAL),
+        ColonneExcel('rendement_pourcentage', 'Rendement %', 12, FORMAT_POURCENTAGE, pourcentage),
+        ColonneExcel('taux_dechet_pourcentage', 'Taux Déchet %', 12, FORMAT_POURCENTAGE, pourcentage),
+        ColonneExcel('production_par_machine', 'Production/Machine', 15, FORMAT_DECIMAL),
+        ColonneExcel('observations', 'Observations', 50, conversion=lambda texte: (texte or '')[:100]),
+        ColonneExcel('valide', 'Statut', 12, conversion=statut_validation),
+    ]
+    
     def create_excel_workbook(self, queryset, period):
-        import openpyxl
-        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = f"Extrusion {period}"
-        
-        # Styles
-        styles = self.get_excel_styles()
-        
-        # En-têtes
-        headers = [
-            'Date', 'Zone', 'Équipe', 'Heure Début', 'Heure Fin', 
-            'Chef Zone', 'Matière (kg)', 'Machines Actives', 'Machinistes',
-            'Bobines (kg)', 'Finis (kg)', 'Semi-Finis (kg)', 'Déchets (kg)',
-            'Total Production (kg)', 'Rendement %', 'Taux Déchet %', 
-            'Production/Machine', 'Observations', 'Statut'
-        ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.font = styles['header_font']
-            cell.fill = styles['header_fill']
-            cell.alignment = styles['center_alignment']
-            cell.border = styles['thin_border']
-        
-        # Données
-        for row_num, prod in enumerate(queryset, 2):
-            ws.cell(row=row_num, column=1, value=prod.date_production)
-            ws.cell(row=row_num, column=2, value=str(prod.zone))
-            ws.cell(row=row_num, column=3, value=str(prod.equipe))
-            ws.cell(row=row_num, column=4, value=prod.heure_debut.strftime('%H:%M') if prod.heure_debut else '')
-            ws.cell(row=row_num, column=5, value=prod.heure_fin.strftime('%H:%M') if prod.heure_fin else '')
-            ws.cell(row=row_num, column=6, value=prod.chef_zone)
-            ws.cell(row=row_num, column=7, value=float(prod.matiere_premiere_kg))
-            ws.cell(row=row_num, column=8, value=prod.nombre_machines_actives)
-            ws.cell(row=row_num, column=9, value=prod.nombre_machinistes)
-            ws.cell(row=row_num, column=10, value=float(prod.nombre_bobines_kg))
-            ws.cell(row=row_num, column=11, value=float(prod.production_finis_kg))
-            ws.cell(row=row_num, column=12, value=float(prod.production_semi_finis_kg))
-            ws.cell(row=row_num, column=13, value=float(prod.dechets_kg))
-            ws.cell(row=row_num, column=14, value=float(prod.total_production_kg) if prod.total_production_kg else 0)
-            ws.cell(row=row_num, column=15, value=float(prod.rendement_pourcentage) if prod.rendement_pourcentage else 0)
-            ws.cell(row=row_num, column=16, value=float(prod.taux_dechet_pourcentage) if prod.taux_dechet_pourcentage else 0)
-            ws.cell(row=row_num, column=17, value=float(prod.production_par_machine) if prod.production_par_machine else 0)
-            ws.cell(row=row_num, column=18, value=prod.observations[:100] if prod.observations else '')
-            ws.cell(row=row_num, column=19, value="Validé" if prod.valide else "En attente")
-        
-        # Formater les colonnes numériques
-        for col in ['G', 'J', 'K', 'L', 'M', 'N']:  # Colonnes avec valeurs numériques
-            for row in range(2, len(queryset) + 2):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '#,##0.00'
-        
-        for col in ['O', 'P', 'Q']:  # Pourcentages
-            for row in range(2, len(queryset) + 2):
-                cell = ws[f'{col}{row}']
-                cell.number_format = '0.00%'
-        
-        # Ajuster la largeur des colonnes
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    cell_value = str(cell.value) if cell.value else ''
-                    if len(cell_value) > max_length:
-                        max_length = len(cell_value)
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        return wb, ws
+        return export_excel_queryset(
+            queryset,
+            self.COLONNES_EXCEL,
+            f"PRODUCTION EXTRUSION {period}",
+            nom_feuille=f"Extrusion {period}"
+        )
     
     def export_pdf_custom(self, request, start_date, end_date):
         # Utiliser la même logique que export_pdf_view mais avec des dates spécifiques
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class SofemciConfig(AppConfig):
+    name = 'sofemci'
+    verbose_name = 'SOFEM-CI'
+
+    def ready(self):
+        # Connexion des signaux (résumés de production, caches...)
+        from . import signals  # noqa: F401
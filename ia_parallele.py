@@ -0,0 +1,173 @@
+# sofemci/ia_parallele.py
+# Exécution parallèle de l'analyse IA du parc : un lot par zone, un pool de processus
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import connections
+
+from .models import Machine
+from .ia_predictive import CollecteurAlertesIA, analyser_lot_machines, machines_a_analyser
+
+logger = logging.getLogger('sofemci')
+
+
+def cle_lot(section, zone_id):
+    """
+    Lot d'analyse d'une machine : sa zone en extrusion (le score de zone dépend
+    des machines voisines, qui doivent rester dans le même processus), sinon sa section.
+    """
+    if section == 'extrusion' and zone_id:
+        return ('zone', zone_id)
+    return ('section', section)
+
+
+def repartir_machines(lignes):
+    """
+    Répartit les machines (id, section, zone_id) en lots, dans l'ordre de
+    première apparition. L'ordre d'analyse est conservé à l'intérieur d'un lot.
+    """
+    lots = {}
+    for machine_id, section, zone_id in lignes:
+        lots.setdefault(cle_lot(section, zone_id), []).append(machine_id)
+    return list(lots.items())
+
+
+def analyser_lot(cle, machine_ids, mode_batch=False):
+    """
+    Analyse un lot dans le processus courant (worker du pool ou repli).
+
+    Les machines sont enregistrées ici, les alertes sont seulement collectées
+    et renvoyées sous forme sérialisable pour être fusionnées par le parent.
+    """
+    debut = time.perf_counter()
+    collecteur = CollecteurAlertesIA()
+    machines = Machine.objects.filter(id__in=machine_ids)
+
+    if mode_batch:
+        from .ia_vectorise import analyser_parc_vectorise
+        resultats = analyser_parc_vectorise(machines, collecteur=collecteur)
+    else:
+        resultats = analyser_lot_machines(machines.select_related('zone_extrusion'), collecteur)
+
+    return {
+        'cle': cle,
+        'nombre': len(resultats),
+        'resultats': resultats,
+        'alertes': collecteur.exporter(),
+        'duree': round(time.perf_counter() - debut, 3),
+        'pid': os.getpid(),
+    }
+
+
+def _initialiser_worker():
+    """Prépare Django dans un processus fils (y compris en démarrage « spawn »)"""
+    import django
+    django.setup()
+
+
+def _parallele_possible(nombre_machines, nombre_lots, workers):
+    """Le pool n'est utilisé que s'il peut réellement répartir du travail"""
+    if workers <= 1 or nombre_lots <= 1:
+        return False
+    if nombre_machines < settings.SOFEMCI_CONFIG.get('IA_ANALYSE_SEUIL_PARALLELE', 0):
+        return False
+    # SQLite n'accepte qu'un écrivain à la fois : aucun gain à paralléliser
+    return connections['default'].vendor != 'sqlite'
+
+
+def _executer_pool(lots, mode_batch, workers, progression=None):
+    """Exécute les lots sur le pool ; les rapports sont rendus dans l'ordre des lots"""
+    # Chaque processus fils doit ouvrir sa propre connexion : aucune connexion
+    # ouverte ne doit être héritée du parent au moment du fork
+    connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(lots)),
+        initializer=_initialiser_worker
+    ) as pool:
+        # Les plus gros lots partent en premier pour équilibrer la charge
+        ordre_soumission = sorted(range(len(lots)), key=lambda i: -len(lots[i][1]))
+        futures = {
+            i: pool.submit(analyser_lot, lots[i][0], lots[i][1], mode_batch)
+            for i in ordre_soumission
+        }
+        if progression:
+            for termines, future in enumerate(as_completed(futures.values()), start=1):
+                progression(termines, len(lots), future.result()['cle'])
+        return [futures[i].result() for i in range(len(lots))]
+
+
+def analyser_parc_parallele(machines=None, mode_batch=False, workers=None, progression=None,
+                            incremental=False):
+    """
+    Analyse IA du parc répartie par zone sur un pool de processus.
+
+    Chaque lot (une zone d'extrusion, ou une section) est analysé par un
+    processus avec sa propre connexion base de données. Les résultats sont
+    remis dans l'ordre du parc et les alertes fusionnées dans l'ordre des lots,
+    puis écrites en une transaction : le résultat ne dépend pas de l'ordre de fin
+    des processus. Sans gain possible (un seul worker, un seul lot, petit parc,
+    SQLite) ou si le pool ne démarre pas, les lots sont analysés dans le
+    processus courant.
+
+    progression(lots_termines, total_lots, cle_lot) est appelé dans le processus
+    parent à la fin de chaque lot (suivi des tâches de fond).
+    Sans machines fournies, incremental=True limite l'analyse aux machines
+    modifiées et à leurs voisines (voir machines_a_analyser).
+    """
+    if workers is None:
+        workers = settings.SOFEMCI_CONFIG.get('IA_ANALYSE_WORKERS', 1)
+    if machines is None:
+        machines = machines_a_analyser(incremental)
+
+    lignes = list(machines.values_list('id', 'section', 'numero', 'zone_extrusion_id'))
+    positions = {(section, numero): i for i, (_, section, numero, _) in enumerate(lignes)}
+    lots = repartir_machines((m_id, section, zone_id) for m_id, section, _, zone_id in lignes)
+
+    debut = time.perf_counter()
+    mode = 'parallele' if _parallele_possible(len(lignes), len(lots), workers) else 'sequentiel'
+    rapports = None
+
+    if mode == 'parallele':
+        try:
+            rapports = _executer_pool(lots, mode_batch, workers, progression)
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Pool d'analyse IA indisponible ({e}), repli en mono-processus")
+            mode = 'sequentiel'
+
+    if rapports is None:
+        rapports = []
+        for cle, ids in lots:
+            rapports.append(analyser_lot(cle, ids, mode_batch))
+            if progression:
+                progression(len(rapports), len(lots), cle)
+
+    collecteur = CollecteurAlertesIA()
+    resultats = []
+    for rapport in rapports:
+        collecteur.importer(rapport['alertes'])
+        resultats.extend(rapport['resultats'])
+        logger.info(
+            f"Analyse IA lot {rapport['cle'][0]}={rapport['cle'][1]} : "
+            f"{rapport['nombre']} machine(s) en {rapport['duree']}s (pid {rapport['pid']})"
+        )
+    resultats.sort(key=lambda r: positions.get((r['section'], r['machine']), len(positions)))
+
+    alertes_creees, alertes_mises_a_jour = collecteur.appliquer()
+
+    return {
+        'mode': mode,
+        'workers': workers if mode == 'parallele' else 1,
+        'duree': round(time.perf_counter() - debut, 3),
+        'resultats': resultats,
+        'lots': [
+            {key: rapport[key] for key in ('cle', 'nombre', 'duree', 'pid')}
+            for rapport in rapports
+        ],
+        'alertes_creees': alertes_creees,
+        'alertes_mises_a_jour': alertes_mises_a_jour,
+    }
@@ -1,6 +1,8 @@
 # sofemci/ia_predictive.py
 # Module d'Intelligence Artificielle pour Prédiction de Pannes
-from django.db.models import F, Avg, Sum, Count, Max, Min
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q, Avg, Sum, Count, Max, Min
 import numpy as np
 from datetime import timedelta
 from django.utils import timezone
@@ -11,14 +13,539 @@ from .models import (
     ProductionSoudure, ProductionRecyclage,
     ZoneExtrusion
 )
-from ..utils import (
-    get_production_totale_jour, get_production_section_jour, get_dechets_totaux_jour,
-    get_efficacite_moyenne_jour, get_machines_stats, get_zones_performance,
-    get_extrusion_details_jour, get_imprimerie_details_jour, get_soudure_details_jour,
-    get_recyclage_details_jour, get_chart_data_for_dashboard, get_analytics_kpis,
-    get_analytics_table_data, calculer_pourcentage_production, calculer_pourcentage_section,
-    get_objectif_section, get_productions_filtrees
-)
+from .utils.telemetrie_utils import enregistrer_mesure_machine
+from .utils.cache_utils import invalider_alertes
+from .utils.machine_utils import get_stats_parc
+
+# Seuil à partir duquel une machine voisine est considérée « à risque »
+SEUIL_MACHINE_A_RISQUE = 40
+
+# États des machines prises en compte par l'analyse du parc
+ETATS_ANALYSES = ['actif', 'maintenance']
+
+
+# ========================================
+# Agrégats de production et évaluations partagées
+# (utilisés par le moteur machine par machine et par le mode batch)
+# ========================================
+
+def agregats_production_zones(zone_ids, date_debut, avec_dernieres=False):
+    """
+    Agrégats extrusion par zone depuis date_debut, en une requête groupée.
+    Retourne {zone_id: agrégats} pour toutes les zones demandées.
+    """
+    agregats = {
+        zone_id: {
+            'nombre': 0, 'rendement_moyen': None, 'machines_moyen': None,
+            'total_prod': None, 'total_dechets': None, 'dernieres_productions': [],
+        }
+        for zone_id in zone_ids
+    }
+    if not agregats:
+        return agregats
+    
+    lignes = ProductionExtrusion.objects.filter(
+        zone_id__in=agregats.keys(),
+        date_production__gte=date_debut
+    ).values('zone').order_by().annotate(
+        nombre=Count('id'),
+        rendement_moyen=Avg('rendement_pourcentage'),
+        machines_moyen=Avg('nombre_machines_actives'),
+        total_prod=Sum('total_production_kg'),
+        total_dechets=Sum('dechets_kg'),
+    )
+    for ligne in lignes:
+        agregats[ligne.pop('zone')].update(ligne)
+    
+    if avec_dernieres:
+        # Les deux saisies les plus récentes de chaque zone (détection de chute)
+        recentes = ProductionExtrusion.objects.filter(
+            zone_id__in=agregats.keys(),
+            date_production__gte=date_debut
+        ).order_by('zone', '-date_production').values_list('zone', 'total_production_kg')
+        for zone_id, total in recentes:
+            dernieres = agregats[zone_id]['dernieres_productions']
+            if len(dernieres) < 2:
+                dernieres.append(total)
+    
+    return agregats
+
+
+def agregats_production_section(section, date_debut):
+    """Agrégats d'une section hors extrusion depuis date_debut (une requête)"""
+    if section == 'imprimerie':
+        return ProductionImprimerie.objects.filter(date_production__gte=date_debut).aggregate(
+            nombre=Count('id'),
+            total_prod=Sum('total_production_kg'),
+            total_dechets=Sum('dechets_kg'),
+            prod_moyenne=Avg('total_production_kg'),
+        )
+    if section == 'soudure':
+        return ProductionSoudure.objects.filter(date_production__gte=date_debut).aggregate(
+            nombre=Count('id'),
+            total_prod=Sum('total_production_kg'),
+            total_dechets=Sum('dechets_kg'),
+        )
+    if section == 'recyclage':
+        return ProductionRecyclage.objects.filter(date_production__gte=date_debut).aggregate(
+            nombre=Count('id'),
+            broyage=Sum('production_broyage_kg'),
+            bache=Sum('production_bache_noir_kg'),
+        )
+    return None
+
+
+def charger_voisins_zones(zone_ids):
+    """
+    Machines actives des zones demandées : {zone_id: {machine_id: [proba 7j,
+    date dernière panne, température]}} (une requête)
+    """
+    voisins = {zone_id: {} for zone_id in zone_ids}
+    if not voisins:
+        return voisins
+    
+    lignes = Machine.objects.filter(
+        zone_extrusion_id__in=voisins.keys(),
+        etat='actif'
+    ).order_by().values_list(
+        'id', 'zone_extrusion_id', 'probabilite_panne_7_jours',
+        'date_derniere_panne', 'temperature_actuelle'
+    )
+    for machine_id, zone_id, probabilite, date_panne, temperature in lignes:
+        voisins[zone_id][machine_id] = [probabilite, date_panne, temperature]
+    return voisins
+
+
+def statistiques_voisins(voisins_zone, machine_id, maintenant=None):
+    """Statistiques des autres machines actives de la zone (machine exclue)"""
+    maintenant = maintenant or timezone.now()
+    limite_panne = maintenant - timedelta(days=7)
+    
+    autres = [valeurs for autre_id, valeurs in voisins_zone.items() if autre_id != machine_id]
+    temperatures = [temperature for _, _, temperature in autres if temperature is not None]
+    
+    return {
+        'nombre': len(autres),
+        'a_risque': sum(
+            1 for probabilite, _, _ in autres
+            if probabilite is not None and probabilite >= SEUIL_MACHINE_A_RISQUE
+        ),
+        'pannes_recentes': sum(
+            1 for _, date_panne, _ in autres
+            if date_panne is not None and date_panne >= limite_panne
+        ),
+        'temperature_moyenne': (
+            sum(temperatures) / len(temperatures) if temperatures else None
+        ),
+    }
+
+
+def evaluer_performance_production(section, agregats):
+    """
+    Score de performance de production (0-100) à partir des agrégats 7 jours
+    de la zone (extrusion) ou de la section. Retourne (score, facteurs, anomalies).
+    """
+    score = 100
+    facteurs = []
+    anomalies = []
+    
+    if not agregats or not agregats['nombre']:
+        return score, facteurs, anomalies
+    
+    if section == 'extrusion':
+        # 1. Analyser le rendement moyen
+        rendement_moyen = agregats['rendement_moyen'] or 100
+        
+        if rendement_moyen < 70:
+            score -= 30
+            facteurs.append(f'Rendement faible: {rendement_moyen:.1f}%')
+            anomalies.append(f'Baisse significative de rendement ({rendement_moyen:.1f}%)')
+        elif rendement_moyen < 80:
+            score -= 15
+            facteurs.append(f'Rendement en baisse: {rendement_moyen:.1f}%')
+        
+        # 2. Analyser l'évolution du taux de déchets
+        if agregats['total_prod'] and agregats['total_prod'] > 0:
+            pourcentage_dechets = (
+                float(agregats['total_dechets'] or 0) / 
+                float(agregats['total_prod']) * 100
+            )
+            
+            if pourcentage_dechets > 5:
+                score -= 20
+                facteurs.append(f'Taux de déchets élevé: {pourcentage_dechets:.1f}%')
+                anomalies.append(f'Déchets anormalement élevés ({pourcentage_dechets:.1f}%)')
+            elif pourcentage_dechets > 3:
+                score -= 10
+                facteurs.append(f'Déchets en hausse: {pourcentage_dechets:.1f}%')
+        
+        # 3. Détecter une chute brutale de production
+        dernieres = agregats['dernieres_productions']
+        if len(dernieres) >= 2:
+            prod_recente = float(dernieres[0])
+            prod_anterieure = float(dernieres[1])
+            
+            if prod_anterieure > 0:
+                variation = ((prod_recente - prod_anterieure) / prod_anterieure) * 100
+                
+                if variation < -20:
+                    score -= 25
+                    facteurs.append(f'Chute de production: {abs(variation):.1f}%')
+                    anomalies.append(f'Production en chute libre ({variation:.1f}%)')
+    
+    elif section == 'imprimerie':
+        # Analyser le taux de déchets
+        if agregats['total_prod'] and agregats['total_prod'] > 0:
+            pourcentage_dechets = (
+                float(agregats['total_dechets'] or 0) / 
+                float(agregats['total_prod']) * 100
+            )
+            
+            if pourcentage_dechets > 4:
+                score -= 20
+                facteurs.append(f'Déchets imprimerie élevés: {pourcentage_dechets:.1f}%')
+        
+        # Détecter baisse de production totale
+        prod_moyenne = agregats['prod_moyenne'] or 0
+        
+        if prod_moyenne < 500:
+            score -= 15
+            facteurs.append('Production imprimerie faible')
+    
+    elif section == 'soudure':
+        # Analyser déchets soudure
+        if agregats['total_prod'] and agregats['total_prod'] > 0:
+            pourcentage_dechets = (
+                float(agregats['total_dechets'] or 0) / 
+                float(agregats['total_prod']) * 100
+            )
+            
+            if pourcentage_dechets > 5:
+                score -= 20
+                facteurs.append(f'Déchets soudure élevés: {pourcentage_dechets:.1f}%')
+    
+    elif section == 'recyclage':
+        # Analyser le taux de transformation
+        if agregats['broyage'] and agregats['broyage'] > 0:
+            taux_transformation = (
+                float(agregats['bache'] or 0) / 
+                float(agregats['broyage']) * 100
+            )
+            
+            if taux_transformation < 60:
+                score -= 25
+                facteurs.append(f'Taux transformation faible: {taux_transformation:.1f}%')
+                anomalies.append(f'Recyclage inefficace ({taux_transformation:.1f}%)')
+            elif taux_transformation < 70:
+                score -= 10
+                facteurs.append(f'Transformation en baisse: {taux_transformation:.1f}%')
+    
+    return max(score, 0), facteurs, anomalies
+
+
+def evaluer_risques_zone(zone, voisins, agregats_zone):
+    """
+    Score de risque de zone (0-100) à partir des statistiques des machines
+    voisines et des agrégats 7 jours de la zone. Retourne (score, facteurs, anomalies).
+    """
+    score_zone = 100
+    facteurs = []
+    anomalies = []
+    
+    # 1. Analyser l'état des autres machines de la zone
+    if voisins['nombre']:
+        machines_risque = voisins['a_risque']
+        
+        if machines_risque >= 2:
+            score_zone -= 20
+            facteurs.append(f'Zone {zone.numero}: {machines_risque} autres machines à risque')
+            anomalies.append(f'Problème généralisé dans la zone {zone.nom}')
+        elif machines_risque >= 1:
+            score_zone -= 10
+            facteurs.append(f'Zone {zone.numero}: 1 autre machine à risque')
+        
+        # Analyser les pannes récentes dans la zone
+        pannes_zone_recentes = voisins['pannes_recentes']
+        
+        if pannes_zone_recentes >= 2:
+            score_zone -= 15
+            facteurs.append(f'Zone {zone.numero}: {pannes_zone_recentes} pannes récentes')
+        
+        # Température moyenne de la zone
+        temp_moyenne_zone = voisins['temperature_moyenne']
+        
+        if temp_moyenne_zone and temp_moyenne_zone > 85:
+            score_zone -= 10
+            facteurs.append(f'Zone {zone.numero}: température ambiante élevée')
+    
+    # 2. Analyser la production globale de la zone
+    if agregats_zone and agregats_zone['nombre']:
+        # Rendement moyen de la zone
+        rendement_zone = agregats_zone['rendement_moyen'] or 100
+        
+        if rendement_zone < 75:
+            score_zone -= 15
+            facteurs.append(f'Zone {zone.numero}: rendement global faible ({rendement_zone:.1f}%)')
+        
+        # Nombre de machines actives vs production
+        machines_actives_prod = agregats_zone['machines_moyen'] or 0
+        
+        machines_disponibles = zone.nombre_machines_max
+        taux_utilisation_zone = (machines_actives_prod / machines_disponibles * 100) if machines_disponibles > 0 else 0
+        
+        if taux_utilisation_zone < 50:
+            score_zone -= 10
+            facteurs.append(f'Zone {zone.numero}: sous-utilisée ({taux_utilisation_zone:.0f}%)')
+    
+    return max(score_zone, 0), facteurs, anomalies
+
+
+def evaluer_correlations(surchauffe, surconsommation, agregats_3j):
+    """
+    Anomalies corrélées (capteurs + production extrusion des 3 derniers jours).
+    agregats_3j vaut None hors extrusion. Retourne (facteurs, anomalies).
+    """
+    facteurs = []
+    anomalies = []
+    
+    # Anomalie existante
+    if surchauffe and surconsommation:
+        anomalies.append('ALERTE: Surchauffe ET surconsommation simultanées')
+        facteurs.append('Anomalie critique détectée')
+    
+    if agregats_3j is None:
+        return facteurs, anomalies
+    
+    # Anomalie température + baisse de production
+    if surchauffe and agregats_3j['nombre']:
+        rendement = agregats_3j['rendement_moyen'] or 100
+        
+        if rendement < 75:
+            anomalies.append('CORRÉLATION: Surchauffe + Baisse rendement')
+            facteurs.append('Défaillance thermique probable')
+    
+    # Surconsommation + excès de déchets
+    if surconsommation:
+        if agregats_3j['total_prod'] and agregats_3j['total_prod'] > 0:
+            pct_dechets = (
+                float(agregats_3j['total_dechets'] or 0) / 
+                float(agregats_3j['total_prod']) * 100
+            )
+            
+            if pct_dechets > 4:
+                anomalies.append(
+                    f'CORRÉLATION: Surconsommation + Déchets élevés ({pct_dechets:.1f}%)'
+                )
+                facteurs.append('Dysfonctionnement de transformation')
+    
+    return facteurs, anomalies
+
+
+class ContexteAnalyseParc:
+    """
+    Agrégats partagés par tous les moteurs d'une même analyse de parc.
+
+    Les agrégats de production (7 et 3 jours) et l'état des machines voisines
+    sont chargés une fois par zone ou par section, puis lus par chaque moteur :
+    le nombre de requêtes suit le nombre de zones, plus celui des machines.
+    L'état des voisines est tenu à jour au fil de l'analyse pour que chaque
+    machine voie les probabilités déjà recalculées, comme avec machine.save().
+    """
+
+    def __init__(self, maintenant=None):
+        self.maintenant = maintenant or timezone.now()
+        aujourd_hui = self.maintenant.date()
+        self.periode_7j = aujourd_hui - timedelta(days=7)
+        self.periode_3j = aujourd_hui - timedelta(days=3)
+        self._zones_7j = {}
+        self._zones_3j = {}
+        self._voisins = {}
+        self._sections = {}
+
+    @classmethod
+    def pour_machines(cls, machines, maintenant=None):
+        """Contexte préchargé pour toutes les zones des machines données"""
+        contexte = cls(maintenant)
+        contexte.precharger_zones(
+            m.zone_extrusion_id for m in machines
+            if m.section == 'extrusion' and m.zone_extrusion_id
+        )
+        return contexte
+
+    def precharger_zones(self, zone_ids):
+        """Charge en une requête groupée chaque agrégat des zones pas encore connues"""
+        manquantes = sorted(set(zone_ids) - self._zones_7j.keys())
+        if not manquantes:
+            return
+        self._zones_7j.update(
+            agregats_production_zones(manquantes, self.periode_7j, avec_dernieres=True)
+        )
+        self._zones_3j.update(agregats_production_zones(manquantes, self.periode_3j))
+        self._voisins.update(charger_voisins_zones(manquantes))
+
+    def agregats_zone(self, zone_id):
+        """Agrégats extrusion 7 jours d'une zone"""
+        self.precharger_zones([zone_id])
+        return self._zones_7j[zone_id]
+
+    def agregats_zone_3j(self, zone_id):
+        """Agrégats extrusion 3 jours d'une zone (corrélations)"""
+        self.precharger_zones([zone_id])
+        return self._zones_3j[zone_id]
+
+    def agregats_section(self, section):
+        """Agrégats 7 jours d'une section hors extrusion"""
+        if section not in self._sections:
+            self._sections[section] = agregats_production_section(section, self.periode_7j)
+        return self._sections[section]
+
+    def voisins(self, machine):
+        """Statistiques des autres machines actives de la zone de la machine"""
+        self.precharger_zones([machine.zone_extrusion_id])
+        return statistiques_voisins(
+            self._voisins[machine.zone_extrusion_id], machine.id, self.maintenant
+        )
+
+    def enregistrer_probabilite(self, machine):
+        """Reporte la nouvelle probabilité 7 jours dans l'état des voisines"""
+        voisins_zone = self._voisins.get(machine.zone_extrusion_id)
+        if voisins_zone is not None and machine.id in voisins_zone:
+            voisins_zone[machine.id][0] = machine.probabilite_panne_7_jours
+
+
+# Statuts d'une alerte IA encore ouverte (mise à jour plutôt que doublon)
+STATUTS_ALERTE_OUVERTE = ['nouvelle', 'vue', 'en_traitement']
+
+# Champs réécrits sur une alerte ouverte existante
+CHAMPS_ALERTE_MISE_A_JOUR = [
+    'titre', 'message', 'probabilite_panne', 'delai_estime_jours',
+    'confiance_prediction', 'action_recommandee', 'priorite',
+    'date_creation', 'donnees_analyse',
+]
+
+
+def mettre_a_jour_par_ligne(objets, champs):
+    """
+    Écrit les champs donnés d'objets d'un même modèle par un UPDATE paramétré
+    exécuté pour chaque ligne (executemany). Remplace bulk_update, dont le
+    CASE WHEN par champ et par ligne coûte plus à compiler qu'à exécuter.
+    """
+    if not objets:
+        return 0
+    meta = type(objets[0])._meta
+    champs = [meta.get_field(champ) for champ in champs]
+    quote = connection.ops.quote_name
+    requete = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(meta.db_table),
+        ', '.join(f'{quote(champ.column)} = %s' for champ in champs),
+        quote(meta.pk.column),
+    )
+    with connection.cursor() as curseur:
+        curseur.executemany(requete, [
+            [champ.get_db_prep_save(getattr(objet, champ.attname), connection) for champ in champs]
+            + [objet.pk]
+            for objet in objets
+        ])
+    return len(objets)
+
+
+class CollecteurAlertesIA:
+    """
+    Alertes candidates d'une analyse, appliquées en une fois.
+
+    Les candidates sont fusionnées par (machine, niveau) : la dernière ajoutée
+    l'emporte, et ses données d'analyse ne remplacent les précédentes que si
+    elles sont renseignées. appliquer() charge toutes les alertes ouvertes des
+    machines concernées en une requête puis écrit les mises à jour
+    (mettre_a_jour_par_ligne) et un bulk_create dans une seule transaction.
+    """
+
+    def __init__(self):
+        self._candidates = {}
+
+    def __len__(self):
+        return len(self._candidates)
+
+    def ajouter(self, machine, niveau, donnees_analyse=None, **champs):
+        """Ajoute (ou fusionne) une alerte candidate pour la machine"""
+        self._fusionner(machine.id, niveau, champs, donnees_analyse)
+
+    def _fusionner(self, machine_id, niveau, champs, donnees_analyse):
+        candidate = self._candidates.setdefault((machine_id, niveau), {
+            'champs': {},
+            'donnees_analyse': None,
+        })
+        candidate['champs'].update(champs)
+        if donnees_analyse:
+            candidate['donnees_analyse'] = donnees_analyse
+
+    def exporter(self):
+        """Candidates sous forme sérialisable (transfert entre processus)"""
+        return [
+            (machine_id, niveau, candidate['champs'], candidate['donnees_analyse'])
+            for (machine_id, niveau), candidate in self._candidates.items()
+        ]
+
+    def importer(self, candidates):
+        """Fusionne des candidates exportées, dans l'ordre reçu"""
+        for machine_id, niveau, champs, donnees_analyse in candidates:
+            self._fusionner(machine_id, niveau, champs, donnees_analyse)
+
+    def _alertes_ouvertes(self):
+        """Alerte ouverte la plus récente par (machine, niveau), en une requête"""
+        machine_ids = {machine_id for machine_id, _ in self._candidates}
+        niveaux = {niveau for _, niveau in self._candidates}
+        alertes = AlerteIA.objects.filter(
+            machine_id__in=machine_ids,
+            niveau__in=niveaux,
+            statut__in=STATUTS_ALERTE_OUVERTE
+        ).order_by('machine_id', 'niveau', '-date_creation')
+
+        ouvertes = {}
+        for alerte in alertes:
+            ouvertes.setdefault((alerte.machine_id, alerte.niveau), alerte)
+        return ouvertes
+
+    def appliquer(self):
+        """
+        Crée ou met à jour les alertes collectées.
+        Retourne (nombre créées, nombre mises à jour).
+        """
+        if not self._candidates:
+            return 0, 0
+
+        ouvertes = self._alertes_ouvertes()
+        maintenant = timezone.now()
+        a_creer = []
+        a_mettre_a_jour = []
+
+        for cle, candidate in self._candidates.items():
+            alerte = ouvertes.get(cle)
+            if alerte:
+                for champ, valeur in candidate['champs'].items():
+                    setattr(alerte, champ, valeur)
+                alerte.date_creation = maintenant
+                if candidate['donnees_analyse']:
+                    alerte.donnees_analyse = candidate['donnees_analyse']
+                a_mettre_a_jour.append(alerte)
+            else:
+                a_creer.append(AlerteIA(
+                    machine_id=cle[0],
+                    niveau=cle[1],
+                    donnees_analyse=candidate['donnees_analyse'] or {},
+                    **candidate['champs']
+                ))
+
+        with transaction.atomic():
+            mettre_a_jour_par_ligne(a_mettre_a_jour, CHAMPS_ALERTE_MISE_A_JOUR)
+            AlerteIA.objects.bulk_create(a_creer, batch_size=500)
+            # Les opérations en masse n'émettent pas de signal
+            if a_creer or a_mettre_a_jour:
+                transaction.on_commit(invalider_alertes)
+
+        self._candidates = {}
+        return len(a_creer), len(a_mettre_a_jour)
+
 
 class MoteurPredictionPannes:
     """
@@ -38,8 +565,14 @@ class MoteurPredictionPannes:
         'performance_production': 0.10,   # NOUVEAU
     }
     
-    def __init__(self, machine):
+    def __init__(self, machine, contexte=None, collecteur=None):
         self.machine = machine
+        # Sans contexte partagé (analyse d'une seule machine), un contexte local
+        # charge uniquement la zone ou la section de la machine
+        self.contexte = contexte or ContexteAnalyseParc()
+        # Sans collecteur partagé, les alertes sont appliquées en fin d'analyse
+        self._collecteur_local = collecteur is None
+        self.collecteur = CollecteurAlertesIA() if collecteur is None else collecteur
         self.score_sante = 100
         self.facteurs_risque = []
         self.anomalies = []
@@ -91,7 +624,9 @@ class MoteurPredictionPannes:
         
         # Génération d'alertes si nécessaire
         self._generer_alertes(prob_7j, prob_30j)
-        
+        if self._collecteur_local:
+            self.collecteur.appliquer()
+
         return {
             'score_sante': round(self.score_sante, 2),
             'probabilite_panne_7j': round(prob_7j, 2),
@@ -283,225 +818,37 @@ class MoteurPredictionPannes:
         NOUVEAU : Analyse la performance de production de la machine
         Détecte les baisses de rendement, excès de déchets, efficacité réduite
         """
-        score = 100
-        periode_analyse = timezone.now().date() - timedelta(days=7)
-        
+        section = self.machine.section
+
         # Selon la section, analyser la production correspondante
-        if self.machine.section == 'extrusion' and self.machine.zone_extrusion:
-            productions = ProductionExtrusion.objects.filter(
-                zone=self.machine.zone_extrusion,
-                date_production__gte=periode_analyse
-            )
-            
-            if productions.exists():
-                # 1. Analyser le rendement moyen
-                rendement_moyen = productions.aggregate(
-                    avg=Avg('rendement_pourcentage')
-                )['avg'] or 100
-                
-                if rendement_moyen < 70:
-                    score -= 30
-                    self.facteurs_risque.append(f'Rendement faible: {rendement_moyen:.1f}%')
-                    self.anomalies.append(f'Baisse significative de rendement ({rendement_moyen:.1f}%)')
-                elif rendement_moyen < 80:
-                    score -= 15
-                    self.facteurs_risque.append(f'Rendement en baisse: {rendement_moyen:.1f}%')
-                
-                # 2. Analyser l'évolution du taux de déchets
-                taux_dechets = productions.aggregate(
-                    total_prod=Sum('total_production_kg'),
-                    total_dechets=Sum('dechets_kg')
-                )
-                
-                if taux_dechets['total_prod'] and taux_dechets['total_prod'] > 0:
-                    pourcentage_dechets = (
-                        float(taux_dechets['total_dechets'] or 0) / 
-                        float(taux_dechets['total_prod']) * 100
-                    )
-                    
-                    if pourcentage_dechets > 5:
-                        score -= 20
-                        self.facteurs_risque.append(f'Taux de déchets élevé: {pourcentage_dechets:.1f}%')
-                        self.anomalies.append(f'Déchets anormalement élevés ({pourcentage_dechets:.1f}%)')
-                    elif pourcentage_dechets > 3:
-                        score -= 10
-                        self.facteurs_risque.append(f'Déchets en hausse: {pourcentage_dechets:.1f}%')
-                
-                # 3. Détecter une chute brutale de production
-                productions_list = list(productions.order_by('-date_production')[:3])
-                if len(productions_list) >= 2:
-                    prod_recente = float(productions_list[0].total_production_kg)
-                    prod_anterieure = float(productions_list[1].total_production_kg)
-                    
-                    if prod_anterieure > 0:
-                        variation = ((prod_recente - prod_anterieure) / prod_anterieure) * 100
-                        
-                        if variation < -20:
-                            score -= 25
-                            self.facteurs_risque.append(f'Chute de production: {abs(variation):.1f}%')
-                            self.anomalies.append(f'Production en chute libre ({variation:.1f}%)')
-        
-        elif self.machine.section == 'imprimerie':
-            productions = ProductionImprimerie.objects.filter(
-                date_production__gte=periode_analyse
-            )
-            
-            if productions.exists():
-                # Analyser le taux de déchets
-                taux_dechets = productions.aggregate(
-                    total_prod=Sum('total_production_kg'),
-                    total_dechets=Sum('dechets_kg')
-                )
-                
-                if taux_dechets['total_prod'] and taux_dechets['total_prod'] > 0:
-                    pourcentage_dechets = (
-                        float(taux_dechets['total_dechets'] or 0) / 
-                        float(taux_dechets['total_prod']) * 100
-                    )
-                    
-                    if pourcentage_dechets > 4:
-                        score -= 20
-                        self.facteurs_risque.append(f'Déchets imprimerie élevés: {pourcentage_dechets:.1f}%')
-                
-                # Détecter baisse de production totale
-                prod_moyenne = productions.aggregate(
-                    avg=Avg('total_production_kg')
-                )['avg'] or 0
-                
-                if prod_moyenne < 500:
-                    score -= 15
-                    self.facteurs_risque.append('Production imprimerie faible')
-        
-        elif self.machine.section == 'soudure':
-            productions = ProductionSoudure.objects.filter(
-                date_production__gte=periode_analyse
-            )
-            
-            if productions.exists():
-                # Analyser déchets soudure
-                taux_dechets = productions.aggregate(
-                    total_prod=Sum('total_production_kg'),
-                    total_dechets=Sum('dechets_kg')
-                )
-                
-                if taux_dechets['total_prod'] and taux_dechets['total_prod'] > 0:
-                    pourcentage_dechets = (
-                        float(taux_dechets['total_dechets'] or 0) / 
-                        float(taux_dechets['total_prod']) * 100
-                    )
-                    
-                    if pourcentage_dechets > 5:
-                        score -= 20
-                        self.facteurs_risque.append(f'Déchets soudure élevés: {pourcentage_dechets:.1f}%')
-        
-        elif self.machine.section == 'recyclage':
-            productions = ProductionRecyclage.objects.filter(
-                date_production__gte=periode_analyse
-            )
-            
-            if productions.exists():
-                # Analyser le taux de transformation
-                totaux = productions.aggregate(
-                    broyage=Sum('production_broyage_kg'),
-                    bache=Sum('production_bache_noir_kg')
-                )
-                
-                if totaux['broyage'] and totaux['broyage'] > 0:
-                    taux_transformation = (
-                        float(totaux['bache'] or 0) / 
-                        float(totaux['broyage']) * 100
-                    )
-                    
-                    if taux_transformation < 60:
-                        score -= 25
-                        self.facteurs_risque.append(f'Taux transformation faible: {taux_transformation:.1f}%')
-                        self.anomalies.append(f'Recyclage inefficace ({taux_transformation:.1f}%)')
-                    elif taux_transformation < 70:
-                        score -= 10
-                        self.facteurs_risque.append(f'Transformation en baisse: {taux_transformation:.1f}%')
+        if section == 'extrusion':
+            if not self.machine.zone_extrusion_id:
+                return 100
+            agregats = self.contexte.agregats_zone(self.machine.zone_extrusion_id)
+        else:
+            agregats = self.contexte.agregats_section(section)
         
-        return max(score, 0)
+        score, facteurs, anomalies = evaluer_performance_production(section, agregats)
+        self.facteurs_risque.extend(facteurs)
+        self.anomalies.extend(anomalies)
+        return score
     
     def _analyser_risques_zone(self):
         """
         NOUVEAU : Analyse les risques au niveau de la zone
         Corrèle les problèmes entre machines d'une même zone
         """
-        score_zone = 100
-        
         if self.machine.section != 'extrusion' or not self.machine.zone_extrusion:
-            return score_zone
+            return 100
         
         zone = self.machine.zone_extrusion
-        
-        # 1. Analyser l'état des autres machines de la zone
-        machines_zone = Machine.objects.filter(
-            zone_extrusion=zone,
-            etat='actif'
-        ).exclude(id=self.machine.id)
-        
-        if machines_zone.exists():
-            # Compter les machines à risque dans la zone
-            machines_risque = machines_zone.filter(
-                probabilite_panne_7_jours__gte=40
-            ).count()
-            
-            if machines_risque >= 2:
-                score_zone -= 20
-                self.facteurs_risque.append(f'Zone {zone.numero}: {machines_risque} autres machines à risque')
-                self.anomalies.append(f'Problème généralisé dans la zone {zone.nom}')
-            elif machines_risque >= 1:
-                score_zone -= 10
-                self.facteurs_risque.append(f'Zone {zone.numero}: 1 autre machine à risque')
-            
-            # Analyser les pannes récentes dans la zone
-            pannes_zone_recentes = machines_zone.filter(
-                date_derniere_panne__gte=timezone.now() - timedelta(days=7)
-            ).count()
-            
-            if pannes_zone_recentes >= 2:
-                score_zone -= 15
-                self.facteurs_risque.append(f'Zone {zone.numero}: {pannes_zone_recentes} pannes récentes')
-            
-            # Température moyenne de la zone
-            temp_moyenne_zone = machines_zone.aggregate(
-                avg=Avg('temperature_actuelle')
-            )['avg']
-            
-            if temp_moyenne_zone and temp_moyenne_zone > 85:
-                score_zone -= 10
-                self.facteurs_risque.append(f'Zone {zone.numero}: température ambiante élevée')
-        
-        # 2. Analyser la production globale de la zone
-        periode_analyse = timezone.now().date() - timedelta(days=7)
-        productions_zone = ProductionExtrusion.objects.filter(
-            zone=zone,
-            date_production__gte=periode_analyse
+
+        score_zone, facteurs, anomalies = evaluer_risques_zone(
+            zone, self.contexte.voisins(self.machine), self.contexte.agregats_zone(zone.id)
         )
-        
-        if productions_zone.exists():
-            # Rendement moyen de la zone
-            rendement_zone = productions_zone.aggregate(
-                avg=Avg('rendement_pourcentage')
-            )['avg'] or 100
-            
-            if rendement_zone < 75:
-                score_zone -= 15
-                self.facteurs_risque.append(f'Zone {zone.numero}: rendement global faible ({rendement_zone:.1f}%)')
-            
-            # Nombre de machines actives vs production
-            machines_actives_prod = productions_zone.aggregate(
-                avg=Avg('nombre_machines_actives')
-            )['avg'] or 0
-            
-            machines_disponibles = zone.nombre_machines_max
-            taux_utilisation_zone = (machines_actives_prod / machines_disponibles * 100) if machines_disponibles > 0 else 0
-            
-            if taux_utilisation_zone < 50:
-                score_zone -= 10
-                self.facteurs_risque.append(f'Zone {zone.numero}: sous-utilisée ({taux_utilisation_zone:.0f}%)')
-        
-        return max(score_zone, 0)
+        self.facteurs_risque.extend(facteurs)
+        self.anomalies.extend(anomalies)
+        return score_zone
     
     def _calculer_probabilite_panne(self, jours):
         """Calcule la probabilité de panne sur N jours"""
@@ -520,54 +867,17 @@ class MoteurPredictionPannes:
     
     def _detecter_anomalies(self):
         """Détection d'anomalies améliorée avec corrélations"""
-        # Anomalie existante
-        if self.machine.est_en_surchauffe() and self.machine.est_en_surconsommation():
-            self.anomalies.append('ALERTE: Surchauffe ET surconsommation simultanées')
-            self.facteurs_risque.append('Anomalie critique détectée')
-        
-        # NOUVEAU : Anomalie température + baisse de production
-        periode = timezone.now().date() - timedelta(days=3)
-        
-        if self.machine.section == 'extrusion' and self.machine.zone_extrusion:
-            if self.machine.est_en_surchauffe():
-                productions_recentes = ProductionExtrusion.objects.filter(
-                    zone=self.machine.zone_extrusion,
-                    date_production__gte=periode
-                )
-                
-                if productions_recentes.exists():
-                    rendement = productions_recentes.aggregate(
-                        avg=Avg('rendement_pourcentage')
-                    )['avg'] or 100
-                    
-                    if rendement < 75:
-                        self.anomalies.append('CORRÉLATION: Surchauffe + Baisse rendement')
-                        self.facteurs_risque.append('Défaillance thermique probable')
-        
-        # NOUVEAU : Surconsommation + excès de déchets
-        if self.machine.est_en_surconsommation():
-            if self.machine.section == 'extrusion' and self.machine.zone_extrusion:
-                productions_recentes = ProductionExtrusion.objects.filter(
-                    zone=self.machine.zone_extrusion,
-                    date_production__gte=periode
-                )
-                
-                taux_dechets = productions_recentes.aggregate(
-                    prod=Sum('total_production_kg'),
-                    dechets=Sum('dechets_kg')
-                )
-                
-                if taux_dechets['prod'] and taux_dechets['prod'] > 0:
-                    pct_dechets = (
-                        float(taux_dechets['dechets'] or 0) / 
-                        float(taux_dechets['prod']) * 100
-                    )
-                    
-                    if pct_dechets > 4:
-                        self.anomalies.append(
-                            f'CORRÉLATION: Surconsommation + Déchets élevés ({pct_dechets:.1f}%)'
-                        )
-                        self.facteurs_risque.append('Dysfonctionnement de transformation')
+        surchauffe = self.machine.est_en_surchauffe()
+        surconsommation = self.machine.est_en_surconsommation()
+        
+        agregats_3j = None
+        if self.machine.section == 'extrusion' and self.machine.zone_extrusion_id:
+            if surchauffe or surconsommation:
+                agregats_3j = self.contexte.agregats_zone_3j(self.machine.zone_extrusion_id)
+        
+        facteurs, anomalies = evaluer_correlations(surchauffe, surconsommation, agregats_3j)
+        self.anomalies.extend(anomalies)
+        self.facteurs_risque.extend(facteurs)
     
     def _mettre_a_jour_machine(self, prob_7j, prob_30j):
         """Met à jour les données de la machine"""
@@ -577,7 +887,9 @@ class MoteurPredictionPannes:
         self.machine.anomalie_detectee = len(self.anomalies) > 0
         self.machine.type_anomalie = ', '.join(self.anomalies[:3]) if self.anomalies else ''
         self.machine.date_derniere_analyse_ia = timezone.now()
+        self.machine.analyse_ia_requise = False
         self.machine.save()
+        self.contexte.enregistrer_probabilite(self.machine)
     
     def _generer_alertes(self, prob_7j, prob_30j):
         """Génère des alertes IA si nécessaire"""
@@ -637,38 +949,22 @@ class MoteurPredictionPannes:
     def _creer_ou_mettre_a_jour_alerte(self, niveau, titre, message, probabilite_panne, 
                                          delai_estime_jours, confiance_prediction, 
                                          action_recommandee, priorite, donnees_analyse=None):
-        """Crée ou met à jour une alerte pour éviter les doublons"""
-        alerte_existante = AlerteIA.objects.filter(
-            machine=self.machine,
-            niveau=niveau,
-            statut__in=['nouvelle', 'vue', 'en_traitement']
-        ).first()
-        
-        if alerte_existante:
-            alerte_existante.titre = titre
-            alerte_existante.message = message
-            alerte_existante.probabilite_panne = probabilite_panne
-            alerte_existante.delai_estime_jours = delai_estime_jours
-            alerte_existante.confiance_prediction = confiance_prediction
-            alerte_existante.action_recommandee = action_recommandee
-            alerte_existante.priorite = priorite
-            alerte_existante.date_creation = timezone.now()
-            if donnees_analyse:
-                alerte_existante.donnees_analyse = donnees_analyse
-                alerte_existante.save()
-        else:
-            AlerteIA.objects.create(
-                machine=self.machine,
-                niveau=niveau,
-                titre=titre,
-                message=message,
-                probabilite_panne=probabilite_panne,
-                delai_estime_jours=delai_estime_jours,
-                confiance_prediction=confiance_prediction,
-                action_recommandee=action_recommandee,
-                priorite=priorite,
-                donnees_analyse=donnees_analyse or {}
-            )
+        """
+        Crée ou met à jour une alerte pour éviter les doublons
+        (collectée, puis écrite par CollecteurAlertesIA.appliquer)
+        """
+        self.collecteur.ajouter(
+            self.machine,
+            niveau,
+            donnees_analyse=donnees_analyse,
+            titre=titre,
+            message=message,
+            probabilite_panne=probabilite_panne,
+            delai_estime_jours=delai_estime_jours,
+            confiance_prediction=confiance_prediction,
+            action_recommandee=action_recommandee,
+            priorite=priorite,
+        )
     
     def _niveau_risque(self, probabilite):
         """Détermine le niveau de risque"""
@@ -686,23 +982,92 @@ class MoteurPredictionPannes:
 # Fonctions principales d'analyse
 # ========================================
 
-def analyser_toutes_machines():
+def analyser_lot_machines(machines, collecteur):
     """
-    Analyse toutes les machines actives
-    À exécuter périodiquement (ex: toutes les heures)
+    Analyse machine par machine d'un lot avec un contexte partagé.
+    Les alertes sont ajoutées au collecteur, à appliquer par l'appelant.
     """
-    machines = Machine.objects.filter(etat__in=['actif', 'maintenance'])
+    machines = list(machines)
+    contexte = ContexteAnalyseParc.pour_machines(machines)
     resultats = []
-    
+
     for machine in machines:
-        moteur = MoteurPredictionPannes(machine)
+        moteur = MoteurPredictionPannes(machine, contexte, collecteur)
         resultat = moteur.analyser_machine()
         resultats.append({
             'machine': machine.numero,
             'section': machine.section,
             'resultat': resultat
         })
+
+    return resultats
+
+
+def machines_a_analyser(incremental=False):
+    """
+    Machines à analyser. En mode incrémental, seules les machines dont les
+    données ont changé (analyse_ia_requise), celles jamais analysées ou dont
+    l'analyse dépasse IA_ANALYSE_DELAI_MAX_HEURES (âge, retard de maintenance...
+    évoluent sans saisie), plus les voisines de zone des machines modifiées,
+    dont le score en dépend.
+    """
+    machines = Machine.objects.filter(etat__in=ETATS_ANALYSES)
+    if not incremental:
+        return machines
+
+    delai = settings.SOFEMCI_CONFIG.get('IA_ANALYSE_DELAI_MAX_HEURES', 24)
+    limite = timezone.now() - timedelta(hours=delai)
+    # Une machine à l'arrêt ou en panne n'est jamais analysée : sa date
+    # d'analyse ne compte pas, sinon elle serait reprise à chaque passage
+    modifiees = list(Machine.objects.filter(
+        Q(analyse_ia_requise=True) |
+        Q(etat__in=ETATS_ANALYSES) & (
+            Q(date_derniere_analyse_ia__isnull=True) | Q(date_derniere_analyse_ia__lt=limite)
+        )
+    ).values_list('id', 'etat', 'section', 'zone_extrusion_id', 'analyse_ia_requise'))
+
+    ids = [m_id for m_id, etat, _, _, _ in modifiees if etat in ETATS_ANALYSES]
+    zones = {
+        zone_id for _, _, section, zone_id, requise in modifiees
+        if requise and section == 'extrusion' and zone_id
+    }
+
+    # Une machine passée en panne ou à l'arrêt n'est plus analysée : sa zone
+    # est reprise ci-dessus, son marqueur peut être levé
+    hors_analyse = [m_id for m_id, etat, _, _, _ in modifiees if etat not in ETATS_ANALYSES]
+    if hors_analyse:
+        Machine.objects.filter(id__in=hors_analyse).update(analyse_ia_requise=False)
+
+    return machines.filter(
+        Q(id__in=ids) | Q(section='extrusion', zone_extrusion_id__in=zones)
+    )
+
+
+def analyser_toutes_machines(mode_batch=False, parallele=False, workers=None, incremental=False):
+    """
+    Analyse toutes les machines actives
+    À exécuter périodiquement (ex: toutes les heures)
     
+    mode_batch=True calcule tout le parc sur des tableaux NumPy et écrit les
+    résultats en quelques UPDATE groupés (voir ia_vectorise), avec les mêmes résultats.
+    parallele=True répartit les zones sur un pool de processus (voir ia_parallele).
+    incremental=True ne réanalyse que les machines modifiées (voir machines_a_analyser).
+    """
+    machines = machines_a_analyser(incremental)
+
+    if parallele:
+        from .ia_parallele import analyser_parc_parallele
+        return analyser_parc_parallele(
+            machines, mode_batch=mode_batch, workers=workers
+        )['resultats']
+
+    if mode_batch:
+        from .ia_vectorise import analyser_parc_vectorise
+        return analyser_parc_vectorise(machines)
+
+    collecteur = CollecteurAlertesIA()
+    resultats = analyser_lot_machines(machines.select_related('zone_extrusion'), collecteur)
+    collecteur.appliquer()
     return resultats
 
 
@@ -736,24 +1101,22 @@ def obtenir_alertes_actives():
 
 
 def statistiques_parc_machines():
-    """Retourne des statistiques sur l'ensemble du parc machines"""
-    machines = Machine.objects.filter(etat__in=['actif', 'maintenance'])
+    """
+    Retourne des statistiques sur le parc suivi (machines actives ou en
+    maintenance), depuis les compteurs agrégés et mis en cache du parc
+    """
+    stats = get_stats_parc()
     
-    if not machines.exists():
+    if not stats['suivies_ia']:
         return None
     
     return {
-        'nombre_total': machines.count(),
-        'score_sante_moyen': machines.aggregate(avg=Avg('score_sante_global'))['avg'] or 0,
-        'machines_risque_critique': machines.filter(probabilite_panne_7_jours__gte=70).count(),
-        'machines_risque_eleve': machines.filter(
-            probabilite_panne_7_jours__gte=40,
-            probabilite_panne_7_jours__lt=70
-        ).count(),
-        'machines_maintenance_requise': machines.filter(
-            heures_depuis_derniere_maintenance__gte=F('frequence_maintenance_jours') * 24
-        ).count(),
-        'anomalies_detectees': machines.filter(anomalie_detectee=True).count(),
+        'nombre_total': stats['suivies_ia'],
+        'score_sante_moyen': stats['score_sante_moyen'] or 0,
+        'machines_risque_critique': stats['risque_critique'],
+        'machines_risque_eleve': stats['risque_eleve'],
+        'machines_maintenance_requise': stats['maintenance_requise'],
+        'anomalies_detectees': stats['anomalies'],
     }
 
 
@@ -771,60 +1134,55 @@ def analyser_zone_complete(zone_id):
     except ZoneExtrusion.DoesNotExist:
         return None
     
-    machines_zone = Machine.objects.filter(
+    machines_zone = list(Machine.objects.filter(
         zone_extrusion=zone,
         etat__in=['actif', 'maintenance']
-    )
-    
-    if not machines_zone.exists():
+    ))
+
+    if not machines_zone:
         return None
-    
-    # Analyser chaque machine
+
+    # Analyser chaque machine (agrégats de zone chargés une seule fois)
+    contexte = ContexteAnalyseParc()
+    contexte.precharger_zones([zone.id])
+    collecteur = CollecteurAlertesIA()
     analyses_machines = []
     for machine in machines_zone:
-        moteur = MoteurPredictionPannes(machine)
+        machine.zone_extrusion = zone
+        moteur = MoteurPredictionPannes(machine, contexte, collecteur)
         analyse = moteur.analyser_machine()
         analyses_machines.append({
             'machine': machine,
             'analyse': analyse
         })
-    
-    # Statistiques de zone
-    periode = timezone.now().date() - timedelta(days=7)
-    productions_zone = ProductionExtrusion.objects.filter(
-        zone=zone,
-        date_production__gte=periode
-    )
-    
+    collecteur.appliquer()
+
+    # Statistiques de zone, lues sur les machines analysées et le contexte
+    agregats_zone = contexte.agregats_zone(zone.id)
+    scores_sante = [m.score_sante_global for m in machines_zone if m.score_sante_global is not None]
+
     stats_zone = {
         'zone': zone,
-        'nombre_machines': machines_zone.count(),
-        'machines_a_risque': machines_zone.filter(
-            probabilite_panne_7_jours__gte=40
-        ).count(),
-        'score_sante_moyen': machines_zone.aggregate(
-            avg=Avg('score_sante_global')
-        )['avg'] or 0,
-        'rendement_moyen_7j': productions_zone.aggregate(
-            avg=Avg('rendement_pourcentage')
-        )['avg'] or 0,
-        'production_totale_7j': productions_zone.aggregate(
-            total=Sum('total_production_kg')
-        )['total'] or 0,
+        'nombre_machines': len(machines_zone),
+        'machines_a_risque': sum(
+            1 for m in machines_zone
+            if m.probabilite_panne_7_jours >= SEUIL_MACHINE_A_RISQUE
+        ),
+        'score_sante_moyen': (
+            sum(scores_sante) / len(scores_sante) if scores_sante else 0
+        ),
+        'rendement_moyen_7j': agregats_zone['rendement_moyen'] or 0,
+        'production_totale_7j': agregats_zone['total_prod'] or 0,
         'taux_dechets_7j': 0,
         'analyses_machines': analyses_machines,
     }
-    
+
     # Calcul taux déchets zone
-    totaux = productions_zone.aggregate(
-        prod=Sum('total_production_kg'),
-        dechets=Sum('dechets_kg')
-    )
-    if totaux['prod'] and totaux['prod'] > 0:
+    if agregats_zone['total_prod'] and agregats_zone['total_prod'] > 0:
         stats_zone['taux_dechets_7j'] = round(
-            (float(totaux['dechets'] or 0) / float(totaux['prod'])) * 100, 2
+            (float(agregats_zone['total_dechets'] or 0) / float(agregats_zone['total_prod'])) * 100, 2
         )
-    
+
     return stats_zone
 
 
@@ -950,6 +1308,7 @@ def simuler_donnees_capteurs(machine, temperature=None, consommation=None):
     machine.temperature_actuelle = Decimal(str(round(temperature, 2)))
     machine.consommation_electrique_kwh = Decimal(str(round(consommation, 2)))
     machine.save()
+    enregistrer_mesure_machine(machine)
     
     return analyser_machine_specifique(machine.id)
 
@@ -0,0 +1,449 @@
+# sofemci/ia_vectorise.py
+# Analyse IA du parc en mode batch : scores calculés sur des tableaux NumPy
+import numpy as np
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Machine
+from .utils.machine_utils import invalider_stats_parc
+from .ia_predictive import (
+    MoteurPredictionPannes, ContexteAnalyseParc, CollecteurAlertesIA,
+    evaluer_performance_production, evaluer_risques_zone, evaluer_correlations,
+    mettre_a_jour_par_ligne,
+)
+
+# Résultats propres à chaque machine, réécrits seulement s'ils ont changé
+CHAMPS_SCORES_IA = [
+    'score_sante_global', 'probabilite_panne_7_jours', 'probabilite_panne_30_jours',
+    'anomalie_detectee', 'type_anomalie',
+]
+# Taille des lots de l'UPDATE commun (dates d'analyse, marqueur)
+TAILLE_LOT_ECRITURE = 500
+
+# Libellés des facteurs par palier de score (mêmes paliers que MoteurPredictionPannes)
+FACTEURS_AGE = {
+    80: 'Machine de plus de 3 ans',
+    70: 'Machine de plus de 5 ans',
+    60: 'Machine ancienne (>7 ans)',
+}
+FACTEURS_HEURES = {
+    70: 'Maintenance bientôt nécessaire',
+    50: 'Maintenance en retard',
+    30: 'Maintenance très en retard',
+}
+FACTEURS_MAINTENANCE = {
+    50: 'Maintenance requise',
+    30: 'Maintenance urgente',
+    10: 'Maintenance critique',
+}
+FACTEURS_CONSOMMATION = {
+    70: 'Consommation anormale',
+    50: 'Consommation très anormale',
+}
+FACTEURS_UTILISATION = {
+    80: 'Taux d\'utilisation élevé',
+    70: 'Taux d\'utilisation très élevé',
+}
+
+
+def calculer_scores_facteurs(machines, aujourd_hui):
+    """
+    Scores des facteurs propres à chaque machine (âge, heures, pannes,
+    maintenance, température, consommation, utilisation) sous forme de tableaux.
+    Reproduit à l'identique les paliers de MoteurPredictionPannes.
+    """
+    ordinal = aujourd_hui.toordinal()
+
+    # Dates -> nombre de jours (âge 0 si date d'installation inconnue)
+    installation = np.array([
+        m.date_installation.toordinal() if m.date_installation else ordinal
+        for m in machines
+    ], dtype=np.int64)
+    age = ordinal - installation
+
+    a_maintenance = np.array([m.derniere_maintenance is not None for m in machines])
+    maintenance = np.array([
+        m.derniere_maintenance.toordinal() if m.derniere_maintenance else ordinal
+        for m in machines
+    ], dtype=np.int64)
+    jours_maintenance = np.where(a_maintenance, ordinal - maintenance, age)
+
+    heures_totales = np.array([float(m.heures_fonctionnement_totales) for m in machines])
+    heures_maintenance = np.array([float(m.heures_depuis_derniere_maintenance) for m in machines])
+    frequence = np.array([m.frequence_maintenance_jours for m in machines], dtype=np.int64)
+
+    pannes_totales = np.array([m.nombre_pannes_totales for m in machines], dtype=np.int64)
+    pannes_6_mois = np.array([m.nombre_pannes_6_derniers_mois for m in machines], dtype=np.int64)
+    pannes_1_mois = np.array([m.nombre_pannes_1_dernier_mois for m in machines], dtype=np.int64)
+
+    temperature_valide = np.array([bool(m.temperature_actuelle) for m in machines])
+    temperature = np.array([
+        float(m.temperature_actuelle) if m.temperature_actuelle else 0.0 for m in machines
+    ])
+    temperature_nominale = np.array([float(m.temperature_nominale) for m in machines])
+    temperature_max = np.array([float(m.temperature_max_autorisee) for m in machines])
+
+    consommation = np.array([float(m.consommation_electrique_kwh) for m in machines])
+    consommation_nominale = np.array([float(m.consommation_electrique_nominale) for m in machines])
+    consommation_valide = consommation_nominale != 0
+
+    # Âge
+    score_age = np.select(
+        [age < 365, age < 1095, age < 1825, age < 2555],
+        [100, 90, 80, 70], 60
+    )
+
+    # Heures depuis la dernière maintenance
+    limite_heures = frequence * 8
+    score_heures = np.select(
+        [
+            heures_maintenance < limite_heures * 0.5,
+            heures_maintenance < limite_heures * 0.75,
+            heures_maintenance < limite_heures,
+            heures_maintenance < limite_heures * 1.2,
+        ],
+        [100, 85, 70, 50], 30
+    )
+
+    # Historique des pannes
+    score_pannes = np.maximum(
+        100
+        - np.where(pannes_1_mois > 0, pannes_1_mois * 25, 0)
+        - np.where(pannes_6_mois > 2, (pannes_6_mois - 2) * 10, 0)
+        - np.where(pannes_totales > 10, 15, 0),
+        0
+    )
+
+    # Retard de maintenance
+    score_maintenance = np.select(
+        [
+            jours_maintenance < frequence * 0.5,
+            jours_maintenance < frequence * 0.75,
+            jours_maintenance < frequence,
+            jours_maintenance < frequence * 1.1,
+            jours_maintenance < frequence * 1.3,
+        ],
+        [100, 90, 75, 50, 30], 10
+    )
+
+    # Température
+    score_temperature = np.where(
+        temperature_valide & (temperature_nominale != 0),
+        np.select(
+            [
+                temperature < temperature_nominale * 1.05,
+                temperature < temperature_nominale * 1.10,
+                temperature < temperature_nominale * 1.15,
+                temperature < temperature_max,
+            ],
+            [100, 85, 70, 50], 20
+        ),
+        100
+    )
+
+    # Consommation électrique
+    nominale_sure = np.where(consommation_valide, consommation_nominale, 1.0)
+    variation_consommation = np.where(
+        consommation_valide,
+        (consommation - consommation_nominale) / nominale_sure * 100,
+        0.0
+    )
+    ecart_consommation = np.abs(variation_consommation)
+    score_consommation = np.where(
+        consommation_valide,
+        np.select(
+            [ecart_consommation < 10, ecart_consommation < 20, ecart_consommation < 30],
+            [100, 85, 70], 50
+        ),
+        100
+    )
+
+    # Taux d'utilisation
+    heures_potentielles = np.where(age > 0, age * 24, 1)
+    taux_utilisation = np.where(age > 0, heures_totales / heures_potentielles * 100, 0.0)
+    score_utilisation = np.select(
+        [taux_utilisation < 30, taux_utilisation < 50, taux_utilisation < 70, taux_utilisation < 85],
+        [100, 95, 90, 80], 70
+    )
+
+    return {
+        'age': score_age,
+        'heures': score_heures,
+        'pannes': score_pannes,
+        'maintenance': score_maintenance,
+        'temperature': score_temperature,
+        'consommation': score_consommation,
+        'utilisation': score_utilisation,
+        'variation_consommation': variation_consommation,
+        'pannes_totales': pannes_totales,
+        'pannes_6_mois': pannes_6_mois,
+        'pannes_1_mois': pannes_1_mois,
+    }
+
+
+def calculer_probabilites(score_sante, pannes_1_mois, pannes_6_mois, jours):
+    """Probabilités de panne sur N jours (même formule que le moteur)"""
+    risque_base = (
+        100 - score_sante
+        + np.where(pannes_1_mois > 0, 20 * pannes_1_mois, 0)
+        + np.where(pannes_6_mois > 2, 10, 0)
+    )
+    return np.clip(risque_base * (jours / 30), 0, 100)
+
+
+def _probabilite_machine(score_sante, pannes_1_mois, pannes_6_mois, jours):
+    """Version scalaire de calculer_probabilites (propagation dans une zone)"""
+    risque_base = 100 - score_sante
+    if pannes_1_mois > 0:
+        risque_base += 20 * pannes_1_mois
+    if pannes_6_mois > 2:
+        risque_base += 10
+    return min(max(risque_base * (jours / 30), 0), 100)
+
+
+def _facteurs_machine(i, machine, scores):
+    """Facteurs et anomalies propres à la machine, dans l'ordre du moteur"""
+    facteurs = []
+    anomalies = []
+
+    if FACTEURS_AGE.get(scores['age'][i]):
+        facteurs.append(FACTEURS_AGE[scores['age'][i]])
+    if FACTEURS_HEURES.get(scores['heures'][i]):
+        facteurs.append(FACTEURS_HEURES[scores['heures'][i]])
+
+    pannes_1_mois = int(scores['pannes_1_mois'][i])
+    pannes_6_mois = int(scores['pannes_6_mois'][i])
+    if pannes_1_mois > 0:
+        facteurs.append(f'{pannes_1_mois} panne(s) ce mois')
+    if pannes_6_mois > 2:
+        facteurs.append(f'{pannes_6_mois} pannes sur 6 mois')
+    if scores['pannes_totales'][i] > 10:
+        facteurs.append('Historique de pannes important')
+
+    if FACTEURS_MAINTENANCE.get(scores['maintenance'][i]):
+        facteurs.append(FACTEURS_MAINTENANCE[scores['maintenance'][i]])
+
+    score_temperature = scores['temperature'][i]
+    if score_temperature < 100:
+        temp_actuelle = float(machine.temperature_actuelle)
+        if score_temperature == 85:
+            anomalies.append(f'Température légèrement élevée ({temp_actuelle}°C)')
+        elif score_temperature == 70:
+            anomalies.append(f'Température élevée ({temp_actuelle}°C)')
+            facteurs.append('Surchauffe modérée')
+        elif score_temperature == 50:
+            anomalies.append(f'Température très élevée ({temp_actuelle}°C)')
+            facteurs.append('Risque de surchauffe')
+        else:
+            anomalies.append(f'SURCHAUFFE CRITIQUE ({temp_actuelle}°C)')
+            facteurs.append('SURCHAUFFE CRITIQUE')
+
+    score_consommation = scores['consommation'][i]
+    if score_consommation == 85:
+        variation = float(scores['variation_consommation'][i])
+        if variation > 0:
+            anomalies.append(f'Surconsommation de {variation:.1f}%')
+        else:
+            anomalies.append(f'Sous-consommation de {abs(variation):.1f}%')
+    elif FACTEURS_CONSOMMATION.get(score_consommation):
+        facteurs.append(FACTEURS_CONSOMMATION[score_consommation])
+
+    if FACTEURS_UTILISATION.get(scores['utilisation'][i]):
+        facteurs.append(FACTEURS_UTILISATION[scores['utilisation'][i]])
+
+    return facteurs, anomalies
+
+
+def analyser_parc_vectorise(machines=None, generer_alertes=True, collecteur=None):
+    """
+    Mode batch de analyser_toutes_machines().
+
+    Les attributs machines sont chargés en une requête, les facteurs, le score
+    de santé pondéré et les probabilités 7/30 jours sont calculés sur des
+    tableaux NumPy, puis écrits par ecrire_resultats_ia. Les agrégats de
+    production sont chargés une fois par zone/section.
+
+    Le score de zone dépend des probabilités des machines voisines déjà
+    analysées (comme avec machine.save() dans le mode machine par machine) :
+    ce terme est propagé dans un balayage ordonné pour des résultats identiques.
+
+    Avec un collecteur fourni, les alertes y sont ajoutées sans être écrites :
+    l'appelant les applique (fusion des lots de l'exécution parallèle).
+    """
+    if machines is None:
+        machines = Machine.objects.filter(etat__in=['actif', 'maintenance'])
+    machines = list(machines.select_related('zone_extrusion'))
+    if not machines:
+        return []
+    scores_avant = [_scores_machine(machine) for machine in machines]
+
+    maintenant = timezone.now()
+    aujourd_hui = maintenant.date()
+    n = len(machines)
+
+    scores = calculer_scores_facteurs(machines, aujourd_hui)
+
+    # Agrégats de production : une requête groupée par zone, une par section
+    contexte = ContexteAnalyseParc.pour_machines(machines, maintenant)
+    zone_ids = sorted({
+        m.zone_extrusion_id for m in machines
+        if m.section == 'extrusion' and m.zone_extrusion_id
+    })
+    production_groupes = {
+        ('zone', zone_id): evaluer_performance_production(
+            'extrusion', contexte.agregats_zone(zone_id)
+        )
+        for zone_id in zone_ids
+    }
+    for section in {m.section for m in machines if m.section != 'extrusion'}:
+        production_groupes[('section', section)] = evaluer_performance_production(
+            section, contexte.agregats_section(section)
+        )
+
+    def groupe_production(machine):
+        if machine.section == 'extrusion':
+            return ('zone', machine.zone_extrusion_id) if machine.zone_extrusion_id else None
+        return ('section', machine.section)
+
+    sans_production = (100, [], [])
+    production = [production_groupes.get(groupe_production(m), sans_production) for m in machines]
+    score_production = np.array([p[0] for p in production], dtype=np.int64)
+
+    # Score de santé pondéré (même ordre d'addition que le moteur)
+    poids = MoteurPredictionPannes.POIDS
+    score_base = (
+        scores['age'] * poids['age_machine'] +
+        scores['heures'] * poids['heures_fonctionnement'] +
+        scores['pannes'] * poids['historique_pannes'] +
+        scores['maintenance'] * poids['maintenance_retard'] +
+        scores['temperature'] * poids['temperature'] +
+        scores['consommation'] * poids['consommation'] +
+        scores['utilisation'] * poids['taux_utilisation'] +
+        score_production * poids['performance_production']
+    )
+
+    # Risques de zone : balayage ordonné propageant les nouvelles probabilités
+    score_zone = np.full(n, 100, dtype=np.int64)
+    zone_details = [None] * n
+    for i, machine in enumerate(machines):
+        if machine.section != 'extrusion' or not machine.zone_extrusion_id:
+            continue
+        zone = machine.zone_extrusion
+        score_z, facteurs_z, anomalies_z = evaluer_risques_zone(
+            zone, contexte.voisins(machine), contexte.agregats_zone(zone.id)
+        )
+        score_zone[i] = score_z
+        zone_details[i] = (facteurs_z, anomalies_z)
+
+        prob_7j = _probabilite_machine(
+            float(score_base[i]) * (score_z / 100),
+            int(scores['pannes_1_mois'][i]), int(scores['pannes_6_mois'][i]), 7
+        )
+        machine.probabilite_panne_7_jours = Decimal(str(round(prob_7j, 2)))
+        contexte.enregistrer_probabilite(machine)
+
+    score_sante = score_base * (score_zone / 100)
+    prob_7j = calculer_probabilites(score_sante, scores['pannes_1_mois'], scores['pannes_6_mois'], 7)
+    prob_30j = calculer_probabilites(score_sante, scores['pannes_1_mois'], scores['pannes_6_mois'], 30)
+
+    # Corrélations capteurs / production des 3 derniers jours
+    surchauffe = [m.est_en_surchauffe() for m in machines]
+    surconsommation = [m.est_en_surconsommation() for m in machines]
+
+    resultats = []
+    collecteur_local = collecteur is None
+    if collecteur_local:
+        collecteur = CollecteurAlertesIA()
+    for i, machine in enumerate(machines):
+        facteurs, anomalies = _facteurs_machine(i, machine, scores)
+        facteurs.extend(production[i][1])
+        anomalies.extend(production[i][2])
+        if zone_details[i]:
+            facteurs.extend(zone_details[i][0])
+            anomalies.extend(zone_details[i][1])
+
+        facteurs_c, anomalies_c = evaluer_correlations(
+            surchauffe[i], surconsommation[i],
+            contexte.agregats_zone_3j(machine.zone_extrusion_id)
+            if machine.section == 'extrusion' and machine.zone_extrusion_id else None
+        )
+        anomalies.extend(anomalies_c)
+        facteurs.extend(facteurs_c)
+
+        sante = float(score_sante[i])
+        p7 = float(prob_7j[i])
+        p30 = float(prob_30j[i])
+
+        machine.score_sante_global = Decimal(str(round(sante, 2)))
+        machine.probabilite_panne_7_jours = Decimal(str(round(p7, 2)))
+        machine.probabilite_panne_30_jours = Decimal(str(round(p30, 2)))
+        machine.anomalie_detectee = len(anomalies) > 0
+        machine.type_anomalie = ', '.join(anomalies[:3]) if anomalies else ''
+        machine.date_derniere_analyse_ia = maintenant
+        machine.derniere_mise_a_jour_donnees = maintenant
+        machine.analyse_ia_requise = False
+
+        moteur = MoteurPredictionPannes(machine, contexte, collecteur)
+        moteur.score_sante = sante
+        moteur.facteurs_risque = facteurs
+        moteur.anomalies = anomalies
+        if generer_alertes:
+            moteur._generer_alertes(p7, p30)
+
+        resultats.append({
+            'machine': machine.numero,
+            'section': machine.section,
+            'resultat': {
+                'score_sante': round(sante, 2),
+                'probabilite_panne_7j': round(p7, 2),
+                'probabilite_panne_30j': round(p30, 2),
+                'niveau_risque': moteur._niveau_risque(p7),
+                'facteurs_risque': facteurs,
+                'anomalies': anomalies,
+                'scores_detail': {
+                    'age': int(scores['age'][i]),
+                    'heures': int(scores['heures'][i]),
+                    'pannes': int(scores['pannes'][i]),
+                    'maintenance': int(scores['maintenance'][i]),
+                    'temperature': int(scores['temperature'][i]),
+                    'consommation': int(scores['consommation'][i]),
+                    'utilisation': int(scores['utilisation'][i]),
+                    'production': int(score_production[i]),
+                    'zone': int(score_zone[i]),
+                }
+            }
+        })
+
+    with transaction.atomic():
+        ecrire_resultats_ia(machines, scores_avant, maintenant)
+        if collecteur_local:
+            collecteur.appliquer()
+        # Les UPDATE directs n'émettent pas post_save
+        transaction.on_commit(invalider_stats_parc)
+
+    return resultats
+
+
+def _scores_machine(machine):
+    return tuple(getattr(machine, champ) for champ in CHAMPS_SCORES_IA)
+
+
+def ecrire_resultats_ia(machines, scores_avant, maintenant):
+    """
+    Écrit les résultats de l'analyse batch : dates d'analyse et marqueur en
+    un UPDATE commun par lot, scores des seules machines dont un résultat a
+    changé (mettre_a_jour_par_ligne)
+    """
+    ids = [machine.pk for machine in machines]
+    for debut in range(0, len(ids), TAILLE_LOT_ECRITURE):
+        Machine.objects.filter(pk__in=ids[debut:debut + TAILLE_LOT_ECRITURE]).update(
+            date_derniere_analyse_ia=maintenant,
+            derniere_mise_a_jour_donnees=maintenant,
+            analyse_ia_requise=False,
+        )
+
+    return mettre_a_jour_par_ligne([
+        machine for machine, avant in zip(machines, scores_avant)
+        if _scores_machine(machine) != avant
+    ], CHAMPS_SCORES_IA)
@@ -0,0 +1,60 @@
+# sofemci/management/commands/analyser_parc_ia.py
+"""
+Analyse IA complète du parc machines (tâche horaire)
+Usage:
+    python manage.py analyser_parc_ia                 # pool de processus (SOFEMCI_CONFIG)
+    python manage.py analyser_parc_ia --workers 8 --batch
+    python manage.py analyser_parc_ia --sequentiel    # mono-processus
+    python manage.py analyser_parc_ia --incremental   # machines modifiées seulement
+"""
+
+from django.core.management.base import BaseCommand
+
+from sofemci.ia_parallele import analyser_parc_parallele
+
+
+class Command(BaseCommand):
+    help = 'Analyse IA de toutes les machines actives, répartie par zone sur plusieurs processus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Nombre de processus (défaut : SOFEMCI_CONFIG["IA_ANALYSE_WORKERS"])',
+        )
+        parser.add_argument(
+            '--sequentiel',
+            action='store_true',
+            help='Analyse dans le processus courant, sans pool',
+        )
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Calcul vectorisé NumPy à l\'intérieur de chaque lot',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Ne réanalyser que les machines modifiées depuis leur dernière analyse et leurs voisines',
+        )
+
+    def handle(self, *args, **options):
+        workers = 1 if options['sequentiel'] else options['workers']
+        rapport = analyser_parc_parallele(
+            mode_batch=options['batch'],
+            workers=workers,
+            incremental=options['incremental']
+        )
+
+        for lot in rapport['lots']:
+            type_lot, valeur = lot['cle']
+            self.stdout.write(
+                f"  {type_lot} {valeur}: {lot['nombre']} machine(s) en {lot['duree']}s (pid {lot['pid']})"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(rapport['resultats'])} machine(s) analysée(s) en {rapport['duree']}s "
+            f"(mode {rapport['mode']}, {rapport['workers']} processus) - "
+            f"{rapport['alertes_creees']} alerte(s) créée(s), "
+            f"{rapport['alertes_mises_a_jour']} mise(s) à jour"
+        ))
@@ -0,0 +1,161 @@
+# sofemci/management/commands/benchmark_index_production.py
+"""
+Plans d'exécution et temps des requêtes courantes sur les productions et
+les machines, avec puis sans les index composites (migration 0011).
+
+À lancer sur une base de test alimentée par un jeu pluriannuel, par exemple :
+    python manage.py generer_donnees_charge --annees 3
+    python manage.py benchmark_index_production --comparer
+
+--comparer supprime temporairement les index, mesure, puis les recrée :
+ne jamais l'utiliser sur la base de production.
+"""
+
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+
+from sofemci.models import (
+    Equipe, Machine, ProductionExtrusion, ProductionImprimerie,
+    ProductionRecyclage, ProductionSoudure, ZoneExtrusion,
+)
+
+# Index évalués (déclarés dans les Meta des modèles)
+MODELES_INDEXES = [
+    ProductionExtrusion, ProductionImprimerie, ProductionSoudure,
+    ProductionRecyclage, Machine,
+]
+NOMS_INDEXES = {
+    'extrusion_date_idx', 'extrusion_zone_date_idx', 'extrusion_equipe_date_idx',
+    'extrusion_valide_date_idx', 'imprimerie_date_idx', 'imprimerie_valide_date_idx',
+    'soudure_date_idx', 'soudure_valide_date_idx', 'recyclage_date_idx',
+    'recyclage_equipe_date_idx', 'recyclage_valide_date_idx',
+    'machine_etat_proba_idx', 'machine_section_etat_idx',
+}
+
+
+def requetes_benchmark(fin):
+    """(libellé, fonction -> queryset) des requêtes les plus fréquentes des vues et formulaires"""
+    debut_mois = fin - timedelta(days=30)
+    zone = ZoneExtrusion.objects.order_by('numero').first()
+    equipe = Equipe.objects.order_by('id').first()
+
+    requetes = [
+        ('Total du mois (extrusion)', lambda: ProductionExtrusion.objects.filter(
+            date_production__range=(debut_mois, fin)
+        ).values('date_production').annotate(total=Sum('total_production_kg'))),
+        ('Saisies en attente de validation (soudure)', lambda: ProductionSoudure.objects.filter(
+            valide=False
+        ).order_by('-date_production')[:50]),
+        ('Productions validées du mois (imprimerie)', lambda: ProductionImprimerie.objects.filter(
+            valide=True, date_production__range=(debut_mois, fin)
+        ).values('valide').annotate(total=Sum('total_production_kg'))),
+        ('Machines à risque', lambda: Machine.objects.filter(
+            etat='actif', probabilite_panne_7_jours__gte=70
+        ).order_by('-probabilite_panne_7_jours')),
+        ('Machines actives par section', lambda: Machine.objects.filter(
+            section='extrusion', etat='actif'
+        ).values('section').annotate(nombre=Count('id'))),
+    ]
+    if zone and equipe:
+        requetes += [
+            ('Performance zone sur le mois', lambda: ProductionExtrusion.objects.filter(
+                zone=zone, date_production__range=(debut_mois, fin)
+            ).values('zone').annotate(total=Sum('total_production_kg'))),
+            ('Doublon formulaire extrusion', lambda: ProductionExtrusion.objects.filter(
+                date_production=fin, zone=zone, equipe=equipe
+            )),
+            ('Historique équipe (recyclage)', lambda: ProductionRecyclage.objects.filter(
+                equipe=equipe, date_production__range=(debut_mois, fin)
+            ).values('equipe').annotate(total=Sum('total_production_kg'))),
+        ]
+    return requetes
+
+
+class Command(BaseCommand):
+    help = 'Compare plans d\'exécution et temps des requêtes de production avec et sans index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--comparer',
+            action='store_true',
+            help='Mesurer aussi sans les index (supprimés puis recréés) - base de test uniquement',
+        )
+        parser.add_argument('--repetitions', type=int, default=5, help='Exécutions par requête')
+        parser.add_argument(
+            '--sans-plan',
+            action='store_true',
+            help='N\'afficher que les temps (pas les plans EXPLAIN)',
+        )
+
+    def handle(self, *args, **options):
+        derniere = ProductionExtrusion.objects.order_by('-date_production').values_list(
+            'date_production', flat=True
+        ).first()
+        if derniere is None:
+            raise CommandError(
+                'Aucune production : générez d\'abord un jeu de données '
+                '(ex. generer_donnees_charge --annees 3)'
+            )
+
+        volumes = {
+            modele._meta.model_name: modele.objects.count() for modele in MODELES_INDEXES
+        }
+        self.stdout.write(f"Base {connection.vendor} : " + ', '.join(
+            f'{nom}={nombre}' for nom, nombre in volumes.items()
+        ))
+
+        requetes = requetes_benchmark(derniere)
+        avec = self._mesurer('AVEC INDEX', requetes, options)
+
+        if not options['comparer']:
+            return
+
+        indexes = self._indexes()
+        self.stdout.write(self.style.WARNING(f'Suppression temporaire de {len(indexes)} index...'))
+        try:
+            with connection.schema_editor() as editor:
+                for modele, index in indexes:
+                    editor.remove_index(modele, index)
+            sans = self._mesurer('SANS INDEX', requetes, options)
+        finally:
+            with connection.schema_editor() as editor:
+                for modele, index in indexes:
+                    editor.add_index(modele, index)
+            self.stdout.write('Index recréés.')
+
+        self.stdout.write('\n=== COMPARAISON (médiane, ms) ===')
+        for libelle, _ in requetes:
+            gain = sans[libelle] / avec[libelle] if avec[libelle] else 0
+            self.stdout.write(
+                f'  {libelle:45} sans {sans[libelle]:8.2f}  avec {avec[libelle]:8.2f}  x{gain:.1f}'
+            )
+
+    def _indexes(self):
+        return [
+            (modele, index)
+            for modele in MODELES_INDEXES
+            for index in modele._meta.indexes
+            if index.name in NOMS_INDEXES
+        ]
+
+    def _mesurer(self, titre, requetes, options):
+        """Médiane des temps (ms) par requête ; affiche les plans EXPLAIN"""
+        self.stdout.write(self.style.SUCCESS(f'\n=== {titre} ==='))
+        resultats = {}
+        for libelle, construire in requetes:
+            durees = []
+            for _ in range(options['repetitions']):
+                debut = time.perf_counter()
+                list(construire())
+                durees.append((time.perf_counter() - debut) * 1000)
+            resultats[libelle] = statistics.median(durees)
+
+            self.stdout.write(f'\n{libelle} : {resultats[libelle]:.2f} ms')
+            if not options['sans_plan']:
+                self.stdout.write(construire().explain())
+        return resultats
@@ -0,0 +1,289 @@
+# sofemci/management/commands/benchmark_performances.py
+"""
+Banc de performance des chemins critiques : tableaux de bord, liste des
+machines, alertes IA, analyse IA du parc et exports PDF / Excel / CSV.
+Pour chaque scénario : temps (min / médiane / max), nombre de requêtes SQL
+et pic mémoire Python, enregistrés en JSON pour comparer deux versions.
+Usage:
+    python manage.py benchmark_performances --base-temporaire --jours 365 --machines 100
+    python manage.py benchmark_performances --sortie bench_v2.json --comparer bench_v1.json
+    python manage.py benchmark_performances --scenario dashboard --repetitions 10
+
+--base-temporaire crée une base de test vierge (SQLite : en mémoire), y
+génère les données (generer_donnees_charge) puis la détruit. Sans cette
+option, le banc s'exécute sur la base configurée, alimentée si --generer.
+"""
+
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from sofemci.models import (
+    AlerteIA, Machine, MesureCapteur, ProductionExtrusion, ProductionImprimerie,
+    ProductionRecyclage, ProductionSoudure,
+)
+from sofemci.utils.generation_utils import (
+    ParametresGeneration, equipes_disponibles, generer_donnees_charge, preparer_referentiel,
+)
+
+User = get_user_model()
+
+# Écart de médiane au-delà duquel --comparer signale une régression
+SEUIL_REGRESSION = 1.2
+
+
+def _consommer(reponse):
+    """Lit entièrement une réponse (les exports en flux ne sont produits qu'à la lecture)"""
+    if getattr(reponse, 'streaming', False):
+        for _ in reponse.streaming_content:
+            pass
+    elif hasattr(reponse, 'read'):
+        # Fichier Excel (SpooledTemporaryFile)
+        reponse.read()
+        reponse.close()
+    else:
+        reponse.content
+    return reponse
+
+
+class Command(BaseCommand):
+    help = 'Mesure temps, requêtes SQL et mémoire des vues, de l\'analyse IA et des exports (sortie JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-temporaire', action='store_true',
+                            help='Exécuter sur une base de test créée puis détruite (implique --generer)')
+        parser.add_argument('--generer', action='store_true', help='Générer les données avant les mesures')
+        parser.add_argument('--jours', type=int, default=365, help='Jours de production générés')
+        parser.add_argument('--zones', type=int, default=10, help='Zones d\'extrusion générées')
+        parser.add_argument('--machines', type=int, default=100, help='Machines générées')
+        parser.add_argument('--graine', type=int, default=42, help='Graine de génération')
+        parser.add_argument('--repetitions', type=int, default=3, help='Mesures par scénario')
+        parser.add_argument('--jours-export', type=int, default=31,
+                            help='Période couverte par les exports PDF / Excel (derniers jours)')
+        parser.add_argument('--scenario', action='append',
+                            help='Limiter aux scénarios dont le nom contient ce texte (option répétable)')
+        parser.add_argument('--sortie', default='benchmark_performances.json', help='Fichier JSON de résultats')
+        parser.add_argument('--etiquette', default='', help='Libellé de la version mesurée')
+        parser.add_argument('--comparer', help='Résultats JSON de référence à comparer')
+
+    def handle(self, *args, **options):
+        reference = self._charger_reference(options['comparer']) if options['comparer'] else None
+
+        ancienne_base = None
+        setup_test_environment()
+        try:
+            if options['base_temporaire']:
+                ancienne_base = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                self.stdout.write(f'Base temporaire : {connection.settings_dict["NAME"]}')
+            if options['base_temporaire'] or options['generer']:
+                self._generer(options)
+
+            resultats = self._executer(options)
+        finally:
+            if ancienne_base is not None:
+                connection.creation.destroy_test_db(ancienne_base, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+            json.dump(resultats, fichier, ensure_ascii=False, indent=2, default=str)
+        self.stdout.write(self.style.SUCCESS(f'✅ Résultats enregistrés dans {options["sortie"]}'))
+
+        if reference:
+            self._comparer(reference, resultats)
+
+    # ========================================
+    # Données
+    # ========================================
+
+    def _utilisateur(self):
+        utilisateur = User.objects.filter(is_superuser=True).order_by('id').first()
+        if utilisateur is None:
+            utilisateur = User.objects.create_superuser(
+                username='benchmark', password=None, role='admin', first_name='Banc', last_name='Performance'
+            )
+        return utilisateur
+
+    def _generer(self, options):
+        utilisateur = self._utilisateur()
+        equipes = equipes_disponibles()
+        if not equipes:
+            from django.core.management import call_command
+            call_command('init_data', verbosity=0)
+            equipes = equipes_disponibles()
+
+        zones, machines = preparer_referentiel(options['zones'], options['machines'], options['graine'])
+        fin = timezone.localdate()
+        params = ParametresGeneration(
+            graine=options['graine'],
+            debut=fin - timedelta(days=options['jours'] - 1),
+            fin=fin,
+            zones=zones,
+            equipes=equipes,
+            machines=machines,
+            utilisateur_id=utilisateur.id,
+            jours_telemetrie=min(7, options['jours']),
+        )
+        debut = time.perf_counter()
+        totaux = generer_donnees_charge(params)
+        self.stdout.write(f'Données générées en {time.perf_counter() - debut:.1f} s : {totaux}')
+
+    # ========================================
+    # Scénarios
+    # ========================================
+
+    def _scenarios(self, options):
+        """(nom, catégorie, fonction) ; les fonctions retournent ce qu'elles ont produit"""
+        from sofemci.admin import RAPPORTS_ADMIN
+        from sofemci.ia_predictive import analyser_toutes_machines
+
+        client = Client()
+        client.force_login(self._utilisateur())
+
+        def vue(nom_url, **params):
+            def appeler():
+                reponse = _consommer(client.get(reverse(nom_url), params))
+                if reponse.status_code >= 400:
+                    raise CommandError(f'{nom_url} : HTTP {reponse.status_code}')
+                return reponse
+            return appeler
+
+        scenarios = [
+            ('dashboard', 'vue', vue('dashboard')),
+            ('dashboard_ia', 'vue', vue('dashboard_ia')),
+            ('machines_list', 'vue', vue('machines_list')),
+            ('liste_alertes_ia', 'vue', vue('liste_alertes_ia')),
+            ('analyse_ia', 'ia', lambda: analyser_toutes_machines()),
+            ('analyse_ia_incrementale', 'ia', lambda: analyser_toutes_machines(incremental=True)),
+            ('analyse_ia_batch', 'ia', lambda: analyser_toutes_machines(mode_batch=True)),
+            ('export_csv_mensuel', 'export', vue('export_mensuel')),
+        ]
+
+        fin = timezone.localdate()
+        debut = fin - timedelta(days=options['jours_export'] - 1)
+        for type_rapport, spec in RAPPORTS_ADMIN.items():
+            def exporter(spec=spec):
+                queryset = spec['modele'].objects.filter(date_production__range=(debut, fin))
+                return _consommer(spec['rendu'](queryset))
+            scenarios.append((type_rapport, 'export', exporter))
+
+        filtres = options['scenario']
+        if filtres:
+            scenarios = [s for s in scenarios if any(filtre in s[0] for filtre in filtres)]
+        return scenarios
+
+    def _mesurer(self, fonction, repetitions):
+        """Temps et requêtes sur repetitions exécutions, puis une exécution sous tracemalloc"""
+        durees = []
+        requetes = []
+        for _ in range(repetitions):
+            with CaptureQueriesContext(connection) as capture:
+                debut = time.perf_counter()
+                fonction()
+                durees.append((time.perf_counter() - debut) * 1000)
+            requetes.append(len(capture.captured_queries))
+
+        # Pic mémoire mesuré à part : tracemalloc ralentit l'exécution
+        tracemalloc.start()
+        try:
+            fonction()
+            _, pic = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'temps_ms': {
+                'min': round(min(durees), 2),
+                'mediane': round(statistics.median(durees), 2),
+                'max': round(max(durees), 2),
+            },
+            'requetes': max(requetes),
+            'memoire_pic_ko': round(pic / 1024, 1),
+        }
+
+    def _executer(self, options):
+        volumes = {
+            modele._meta.model_name: modele.objects.count()
+            for modele in (ProductionExtrusion, ProductionImprimerie, ProductionSoudure,
+                           ProductionRecyclage, Machine, AlerteIA, MesureCapteur)
+        }
+        self.stdout.write('Volumes : ' + ', '.join(f'{nom}={nombre}' for nom, nombre in volumes.items()))
+
+        resultats = {
+            'etiquette': options['etiquette'],
+            'date': timezone.now().isoformat(),
+            'base': connection.vendor,
+            'python': platform.python_version(),
+            'repetitions': options['repetitions'],
+            'volumes': volumes,
+            'scenarios': {},
+        }
+
+        for nom, categorie, fonction in self._scenarios(options):
+            try:
+                mesure = self._mesurer(fonction, options['repetitions'])
+            except ImportError as e:
+                # Dépendance optionnelle absente (ex. numpy pour l'analyse batch)
+                self.stdout.write(self.style.WARNING(f'  {nom:32} ignoré : {e}'))
+                continue
+            except Exception as e:
+                # Un scénario en échec n'interrompt pas le banc : l'erreur est
+                # consignée dans le JSON et les autres scénarios sont mesurés
+                resultats['scenarios'][nom] = {'categorie': categorie, 'erreur': f'{type(e).__name__}: {e}'}
+                self.stdout.write(self.style.ERROR(f'  {nom:32} en échec : {type(e).__name__}: {e}'))
+                continue
+            mesure['categorie'] = categorie
+            resultats['scenarios'][nom] = mesure
+            self.stdout.write(
+                f"  {nom:32} {mesure['temps_ms']['mediane']:10.1f} ms "
+                f"{mesure['requetes']:6d} req {mesure['memoire_pic_ko']:10.0f} Ko"
+            )
+        return resultats
+
+    # ========================================
+    # Comparaison entre versions
+    # ========================================
+
+    def _charger_reference(self, chemin):
+        try:
+            with open(chemin, encoding='utf-8') as fichier:
+                return json.load(fichier)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Référence illisible ({chemin}) : {e}')
+
+    def _comparer(self, reference, resultats):
+        self.stdout.write(f"\n=== Comparaison avec {reference.get('etiquette') or reference.get('date')} ===")
+        regressions = 0
+        for nom, mesure in resultats['scenarios'].items():
+            avant = reference.get('scenarios', {}).get(nom)
+            if not avant or 'erreur' in mesure or 'erreur' in avant:
+                if 'erreur' in mesure:
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(f"  {nom:32} en échec : {mesure['erreur']}"))
+                continue
+            ratio = mesure['temps_ms']['mediane'] / max(avant['temps_ms']['mediane'], 0.01)
+            ecart_requetes = mesure['requetes'] - avant['requetes']
+            ligne = (
+                f"  {nom:32} x{ratio:5.2f} temps  {ecart_requetes:+5d} req  "
+                f"{mesure['memoire_pic_ko'] - avant['memoire_pic_ko']:+10.0f} Ko"
+            )
+            if ratio > SEUIL_REGRESSION or ecart_requetes > 0:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(ligne))
+            else:
+                self.stdout.write(ligne)
+
+        if regressions:
+            self.stdout.write(self.style.ERROR(f'{regressions} régression(s) détectée(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Aucune régression'))
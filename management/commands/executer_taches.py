@@ -0,0 +1,75 @@
+# sofemci/management/commands/executer_taches.py
+"""
+Worker de la file des tâches de fond (analyse IA, ...)
+Usage:
+    python manage.py executer_taches                  # boucle continue
+    python manage.py executer_taches --une-fois       # vide la file puis s'arrête
+    python manage.py executer_taches --type analyse_ia --intervalle 5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sofemci.models import TacheFond
+from sofemci.taches import executer_tache
+
+
+class Command(BaseCommand):
+    help = 'Exécute les tâches de fond en attente (à lancer dans un processus séparé du serveur web)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--une-fois',
+            action='store_true',
+            help='Traite les tâches en attente puis s\'arrête',
+        )
+        parser.add_argument(
+            '--type',
+            action='append',
+            choices=[code for code, _ in TacheFond.TYPES_TACHE],
+            help='Ne traiter que ce type de tâche (option répétable)',
+        )
+        parser.add_argument(
+            '--intervalle',
+            type=float,
+            default=2.0,
+            help='Secondes entre deux consultations de la file vide',
+        )
+        parser.add_argument(
+            '--max-taches',
+            type=int,
+            default=0,
+            help='Arrêt après ce nombre de tâches (0 = illimité)',
+        )
+
+    def handle(self, *args, **options):
+        interrompues = TacheFond.marquer_interrompues()
+        if interrompues:
+            self.stdout.write(self.style.WARNING(f'⚠️ {interrompues} tâche(s) interrompue(s) marquée(s) en échec'))
+
+        self.stdout.write(self.style.SUCCESS('✅ Worker de tâches démarré'))
+        traitees = 0
+
+        try:
+            while not options['max_taches'] or traitees < options['max_taches']:
+                close_old_connections()
+                tache = TacheFond.reserver_suivante(options['type'])
+
+                if tache is None:
+                    if options['une_fois']:
+                        break
+                    time.sleep(options['intervalle'])
+                    continue
+
+                self.stdout.write(f'▶ {tache}')
+                if executer_tache(tache):
+                    self.stdout.write(self.style.SUCCESS(f'  terminée en {tache.duree_secondes}s'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'  échec : {tache.erreur}'))
+                traitees += 1
+        except KeyboardInterrupt:
+            self.stdout.write('Arrêt demandé')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {traitees} tâche(s) traitée(s)'))
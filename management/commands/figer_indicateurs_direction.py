@@ -0,0 +1,60 @@
+# sofemci/management/commands/figer_indicateurs_direction.py
+"""
+Fige les indicateurs direction des mois écoulés (IndicateursDirectionMois)
+pour que le dashboard direction ne les recalcule plus.
+Usage:
+    python manage.py figer_indicateurs_direction                 # mois précédent
+    python manage.py figer_indicateurs_direction --depuis 2025-01
+    python manage.py figer_indicateurs_direction --mois 2026-03 --recalculer
+
+À planifier en début de mois (cron). --recalculer applique les prix et
+coûts actuels (SOFEMCI_CONFIG['DIRECTION_*']) aux mois déjà figés.
+"""
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sofemci.utils.direction_utils import indicateurs_direction
+
+
+class Command(BaseCommand):
+    help = 'Calcule et enregistre les indicateurs direction des mois écoulés'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mois', action='append', help='Mois à figer (AAAA-MM, option répétable)')
+        parser.add_argument('--depuis', help='Figer tous les mois écoulés depuis ce mois (AAAA-MM)')
+        parser.add_argument('--recalculer', action='store_true',
+                            help='Recalculer les mois déjà figés avec les paramètres actuels')
+
+    def handle(self, *args, **options):
+        mois_courant = timezone.localdate().replace(day=1)
+
+        if options['mois']:
+            liste_mois = [self._parse_mois(valeur) for valeur in options['mois']]
+        elif options['depuis']:
+            liste_mois = []
+            mois = self._parse_mois(options['depuis'])
+            while mois < mois_courant:
+                liste_mois.append(mois)
+                mois = (mois + timedelta(days=32)).replace(day=1)
+        else:
+            liste_mois = [(mois_courant - timedelta(days=1)).replace(day=1)]
+
+        for mois in liste_mois:
+            if mois >= mois_courant:
+                self.stdout.write(self.style.WARNING(f'  {mois:%Y-%m} ignoré : mois non terminé'))
+                continue
+            indicateurs = indicateurs_direction(mois, recalculer=options['recalculer'])
+            self.stdout.write(
+                f"  {mois:%Y-%m} : {indicateurs['production_totale_kg']} kg, "
+                f"CA {indicateurs['chiffre_affaires']} FCFA, coût {indicateurs['cout_production_kg']} FCFA/kg"
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Indicateurs direction figés'))
+
+    def _parse_mois(self, valeur):
+        try:
+            return datetime.strptime(valeur, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'Mois invalide : {valeur} (format attendu AAAA-MM)')
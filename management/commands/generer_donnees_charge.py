@@ -0,0 +1,100 @@
+# sofemci/management/commands/generer_donnees_charge.py
+"""
+Génère un jeu de données volumineux et reproductible pour les tests de charge
+(tableaux de bord, exports, moteur IA) : zones, machines, productions des
+quatre sections, historique machines, télémétrie récente et alertes IA.
+Usage:
+    python manage.py generer_donnees_charge --annees 3 --zones 50 --machines 200 --processus 4
+    python manage.py generer_donnees_charge --jours 90 --graine 7 --jours-telemetrie 0
+
+Insertion par bulk_create (champs calculés précalculés, save() non appelé),
+puis reconstruction des résumés de production de la période. Même graine et
+mêmes paramètres -> mêmes données, quel que soit --processus.
+À réserver à une base de test : les saisies s'ajoutent aux données existantes.
+"""
+
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sofemci.utils.generation_utils import (
+    ParametresGeneration, equipes_disponibles, generer_donnees_charge, preparer_referentiel,
+    TAILLE_LOT_GENERATION,
+)
+from sofemci.utils.telemetrie_utils import maintenir_telemetrie
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Génère en masse des données de production, machines et télémétrie pour les tests de charge'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--annees', type=int, default=1, help='Années de production à générer')
+        parser.add_argument('--jours', type=int, help='Nombre de jours (remplace --annees)')
+        parser.add_argument('--fin', help='Dernier jour généré (AAAA-MM-JJ, aujourd\'hui par défaut)')
+        parser.add_argument('--zones', type=int, default=50, help='Zones d\'extrusion')
+        parser.add_argument('--machines', type=int, default=200, help='Machines du parc généré')
+        parser.add_argument('--graine', type=int, default=42, help='Graine aléatoire (reproductibilité)')
+        parser.add_argument('--processus', type=int, default=1, help='Processus de génération en parallèle')
+        parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT_GENERATION,
+                            help='Lignes par bulk_create')
+        parser.add_argument('--jours-telemetrie', type=int, default=30,
+                            help='Jours de mesures capteurs brutes (0 : aucune)')
+        parser.add_argument('--mesures-par-jour', type=int, default=24,
+                            help='Mesures capteurs par machine et par jour')
+        parser.add_argument('--sans-agregats', action='store_true',
+                            help='Ne pas calculer les agrégats de télémétrie après génération')
+
+    def handle(self, *args, **options):
+        fin = self._parse_date(options['fin']) if options['fin'] else timezone.localdate()
+        jours = options['jours'] or options['annees'] * 365
+        if jours < 1 or options['zones'] < 1 or options['machines'] < 1 or options['processus'] < 1:
+            raise CommandError('--jours/--annees, --zones, --machines et --processus doivent être positifs')
+
+        utilisateur = User.objects.filter(role__in=['admin', 'superviseur']).order_by('id').first()
+        equipes = equipes_disponibles()
+        if not utilisateur or not equipes:
+            raise CommandError('Utilisateur admin ou équipes manquants. Exécutez: python manage.py init_data')
+
+        zones, machines = preparer_referentiel(options['zones'], options['machines'], options['graine'])
+        params = ParametresGeneration(
+            graine=options['graine'],
+            debut=fin - timedelta(days=jours - 1),
+            fin=fin,
+            zones=zones,
+            equipes=equipes,
+            machines=machines,
+            utilisateur_id=utilisateur.id,
+            jours_telemetrie=min(options['jours_telemetrie'], jours),
+            mesures_par_jour=options['mesures_par_jour'],
+            taille_lot=options['taille_lot'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Génération du {params.debut} au {params.fin} : {len(zones)} zones, '
+            f'{len(machines)} machines, {options["processus"]} processus...'
+        ))
+
+        def progression(unite, resultat):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {unite[0]} {" ".join(map(str, unite[1:]))} : {resultat}')
+
+        totaux = generer_donnees_charge(params, options['processus'], progression)
+
+        if params.jours_telemetrie and not options['sans_agregats']:
+            depuis = timezone.make_aware(datetime.combine(
+                params.fin - timedelta(days=params.jours_telemetrie - 1), datetime.min.time()
+            ))
+            maintenir_telemetrie(depuis=depuis, retention=False)
+
+        for modele, nombre in totaux.items():
+            self.stdout.write(f'  {modele}: {nombre}')
+        self.stdout.write(self.style.SUCCESS('✅ Données de charge générées'))
+
+    def _parse_date(self, valeur):
+        try:
+            return datetime.strptime(valeur, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Date invalide : {valeur} (format attendu AAAA-MM-JJ)')
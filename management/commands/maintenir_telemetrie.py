@@ -0,0 +1,45 @@
+# sofemci/management/commands/maintenir_telemetrie.py
+"""
+Agrégation et rétention de la télémétrie capteurs (à planifier chaque minute)
+Usage:
+    python manage.py maintenir_telemetrie                      # fenêtres récentes + rétention
+    python manage.py maintenir_telemetrie --depuis 2025-01-01  # recalcul d'un historique
+    python manage.py maintenir_telemetrie --sans-retention
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sofemci.utils.telemetrie_utils import maintenir_telemetrie
+
+
+class Command(BaseCommand):
+    help = 'Calcule les agrégats minute/heure/jour des mesures capteurs et purge selon la rétention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depuis', help='Recalculer les agrégats depuis cette date (AAAA-MM-JJ)')
+        parser.add_argument(
+            '--sans-retention',
+            action='store_true',
+            help='Ne pas purger les mesures et agrégats expirés',
+        )
+
+    def handle(self, *args, **options):
+        depuis = None
+        if options['depuis']:
+            try:
+                depuis = timezone.make_aware(datetime.strptime(options['depuis'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError(f"Date invalide : {options['depuis']} (format attendu AAAA-MM-JJ)")
+
+        rapport = maintenir_telemetrie(depuis=depuis, retention=not options['sans_retention'])
+
+        for resolution, nombre in rapport['agregats'].items():
+            self.stdout.write(f'  agrégats {resolution}: {nombre}')
+        for niveau, nombre in rapport['supprimes'].items():
+            if nombre:
+                self.stdout.write(f'  purgés {niveau}: {nombre}')
+
+        self.stdout.write(self.style.SUCCESS('✅ Télémétrie à jour'))
@@ -0,0 +1,73 @@
+# sofemci/management/commands/rebuild_resume_production.py
+"""
+Reconstruit ou vérifie la table des résumés de production journaliers
+Usage:
+    python manage.py rebuild_resume_production              # reconstruction complète
+    python manage.py rebuild_resume_production --check      # détection de dérive seule
+    python manage.py rebuild_resume_production --section extrusion --debut 2025-01-01
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sofemci.models import ResumeProductionJour
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit la table ResumeProductionJour depuis les saisies ou vérifie sa dérive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Vérifie la dérive sans rien modifier (code de sortie 1 si écart)',
+        )
+        parser.add_argument(
+            '--section',
+            action='append',
+            choices=[code for code, _ in ResumeProductionJour.SECTIONS_CHOICES],
+            help='Limiter à une section (option répétable)',
+        )
+        parser.add_argument('--debut', help='Date de début (AAAA-MM-JJ)')
+        parser.add_argument('--fin', help='Date de fin (AAAA-MM-JJ)')
+        parser.add_argument(
+            '--details',
+            type=int,
+            default=20,
+            help="Nombre maximum d'écarts détaillés affichés",
+        )
+
+    def handle(self, *args, **options):
+        date_debut = self._parse_date(options['debut'])
+        date_fin = self._parse_date(options['fin'])
+        sections = options['section']
+
+        if options['check']:
+            derives = ResumeProductionJour.verifier_derive(sections, date_debut, date_fin)
+            if not derives:
+                self.stdout.write(self.style.SUCCESS('✅ Aucune dérive : les résumés sont à jour'))
+                return
+
+            self.stdout.write(self.style.ERROR(f'❌ {len(derives)} écart(s) détecté(s)'))
+            for cle, type_ecart, detail in derives[:options['details']]:
+                date_production, section, zone_id, equipe_id = cle
+                ligne = f'  [{type_ecart}] {section} {date_production} zone={zone_id} equipe={equipe_id}'
+                if detail:
+                    ligne += ' ' + ', '.join(
+                        f'{champ}: {stocke} ≠ {attendu}' for champ, (stocke, attendu) in detail.items()
+                    )
+                self.stdout.write(ligne)
+            self.stdout.write('Relancez sans --check pour reconstruire la table.')
+            raise SystemExit(1)
+
+        total = ResumeProductionJour.reconstruire(sections, date_debut, date_fin)
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} résumé(s) reconstruit(s)'))
+
+    def _parse_date(self, valeur):
+        if not valeur:
+            return None
+        try:
+            return datetime.strptime(valeur, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Date invalide : {valeur} (format attendu AAAA-MM-JJ)')
@@ -0,0 +1,127 @@
+# sofemci/management/commands/test_charge_telemetrie.py
+"""
+Test de charge de l'ingestion capteurs (mesures synthétiques rejouées à débit fixe)
+Usage:
+    python manage.py test_charge_telemetrie                          # 10 000 mesures/s pendant 10 s
+    python manage.py test_charge_telemetrie --debit 20000 --duree 30
+    python manage.py test_charge_telemetrie --url http://127.0.0.1:8000/api/telemetrie/mesures/ --cle XXX
+"""
+
+import json
+import random
+import time
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sofemci.models import Machine
+from sofemci.utils.ingestion_utils import ingerer_mesures, tampon_ingestion
+
+
+class Command(BaseCommand):
+    help = 'Rejoue des mesures capteurs synthétiques à débit configurable et mesure le débit d\'ingestion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--debit', type=int, default=10000, help='Mesures par seconde visées')
+        parser.add_argument('--duree', type=float, default=10.0, help='Durée du test en secondes')
+        parser.add_argument('--taille-requete', type=int, default=500, help='Mesures par requête d\'ingestion')
+        parser.add_argument('--machines', type=int, default=0, help='Limiter à N machines (0 = toutes)')
+        parser.add_argument('--url', help='Envoyer en HTTP à cette URL au lieu d\'appeler l\'ingestion en processus')
+        parser.add_argument('--cle', default='', help='Clé X-Cle-Telemetrie pour le mode HTTP')
+        parser.add_argument('--graine', type=int, default=42, help='Graine aléatoire (rejeu reproductible)')
+
+    def handle(self, *args, **options):
+        machines = list(Machine.objects.filter(etat='actif').values_list(
+            'id', 'temperature_nominale', 'consommation_electrique_nominale', 'heures_fonctionnement_totales'
+        ))
+        if options['machines']:
+            machines = machines[:options['machines']]
+        if not machines:
+            raise CommandError('Aucune machine active : rien à simuler')
+
+        aleatoire = random.Random(options['graine'])
+        compteurs = {machine_id: float(heures) for machine_id, _, _, heures in machines}
+        taille = options['taille_requete']
+        intervalle = taille / options['debit']
+        envoyer = self._envoyeur_http(options['url'], options['cle']) if options['url'] else self._envoyeur_local
+
+        self.stdout.write(
+            f"Test de charge : {options['debit']} mesures/s visées, {len(machines)} machine(s), "
+            f"requêtes de {taille} mesures, {'HTTP' if options['url'] else 'en processus'}"
+        )
+
+        latences = []
+        envoyees = rejetees = 0
+        debut = time.perf_counter()
+        prochaine = debut
+
+        while time.perf_counter() - debut < options['duree']:
+            contenu = self._generer_lot(aleatoire, machines, compteurs, taille)
+
+            t0 = time.perf_counter()
+            acceptees, refusees = envoyer(contenu)
+            latences.append(time.perf_counter() - t0)
+            envoyees += acceptees
+            rejetees += refusees
+
+            # Cadence fixe : on ne rattrape pas un retard par une rafale
+            prochaine = max(prochaine + intervalle, time.perf_counter() - intervalle)
+            attente = prochaine - time.perf_counter()
+            if attente > 0:
+                time.sleep(attente)
+
+        t0 = time.perf_counter()
+        if not options['url']:
+            tampon_ingestion().vider()
+        vidage = time.perf_counter() - t0
+        duree = time.perf_counter() - debut
+
+        latences.sort()
+        p50 = latences[len(latences) // 2] * 1000
+        p95 = latences[int(len(latences) * 0.95)] * 1000
+        self.stdout.write(f'  requêtes : {len(latences)} (p50 {p50:.1f} ms, p95 {p95:.1f} ms)')
+        if not options['url']:
+            statistiques = tampon_ingestion().statistiques
+            self.stdout.write(
+                f"  tampon : {statistiques['lots']} écriture(s), {statistiques['ecrites']} mesure(s) écrite(s), "
+                f"{statistiques['ignorees']} ignorée(s) ; vidage final {vidage:.2f}s"
+            )
+
+        debit = envoyees / duree if duree else 0
+        style = self.style.SUCCESS if debit >= options['debit'] * 0.95 else self.style.WARNING
+        self.stdout.write(style(
+            f'✅ {envoyees} mesure(s) ingérée(s) en {duree:.2f}s, soit {debit:.0f} mesures/s '
+            f'({rejetees} rejetée(s))'
+        ))
+
+    def _generer_lot(self, aleatoire, machines, compteurs, taille):
+        """Lot JSON lines : le décodage fait partie du coût mesuré"""
+        horodatage = timezone.now().isoformat()
+        lignes = []
+        for _ in range(taille):
+            machine_id, temperature, consommation, _heures = aleatoire.choice(machines)
+            compteurs[machine_id] += 0.01
+            lignes.append(json.dumps({
+                'machine_id': machine_id,
+                'horodatage': horodatage,
+                'temperature': round(float(temperature) * aleatoire.uniform(0.9, 1.2), 2),
+                'consommation_kwh': round(float(consommation) * aleatoire.uniform(0.9, 1.25), 2),
+                'heures_fonctionnement': round(compteurs[machine_id], 2),
+            }))
+        return '\n'.join(lignes).encode('utf-8')
+
+    def _envoyeur_local(self, contenu):
+        rapport = ingerer_mesures(contenu)
+        return rapport['acceptees'], rapport['rejetees']
+
+    def _envoyeur_http(self, url, cle):
+        def envoyer(contenu):
+            requete = urllib.request.Request(
+                url, data=contenu, method='POST',
+                headers={'Content-Type': 'application/x-ndjson', 'X-Cle-Telemetrie': cle},
+            )
+            with urllib.request.urlopen(requete) as reponse:
+                rapport = json.loads(reponse.read())
+            return rapport['acceptees'], rapport['rejetees']
+        return envoyer
@@ -0,0 +1,202 @@
+# sofemci/middleware.py
+# Instrumentation des requêtes HTTP : requêtes SQL, temps base / application, alertes
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('sofemci.performance')
+
+
+def _parametre(nom, defaut):
+    return settings.SOFEMCI_CONFIG.get(nom, defaut)
+
+
+class CompteurRequetesSQL:
+    """
+    execute_wrapper de la connexion pour une requête HTTP : nombre de requêtes,
+    temps cumulé, requêtes lentes et répétitions d'un même SQL (N+1).
+
+    Le SQL reçu est paramétré (%s) : une boucle qui interroge la base ligne
+    par ligne produit donc le même texte à chaque tour.
+    """
+
+    def __init__(self, seuil_lent_ms):
+        self.seuil_lent_ms = seuil_lent_ms
+        self.nombre = 0
+        self.duree_ms = 0.0
+        self.lentes = []
+        self.textes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duree = (time.perf_counter() - debut) * 1000
+            self.nombre += 1
+            self.duree_ms += duree
+            self.textes[sql] += 1
+            if duree >= self.seuil_lent_ms:
+                self.lentes.append((round(duree, 1), sql[:300]))
+
+    def repetitions(self, seuil):
+        """(nombre, SQL) des requêtes exécutées au moins seuil fois"""
+        return [(nombre, sql[:300]) for sql, nombre in self.textes.most_common(3) if nombre >= seuil]
+
+
+class MetriquesRequetes:
+    """
+    Statistiques cumulées par vue, propres au processus (chaque worker
+    gunicorn a les siennes) : appels, requêtes SQL, temps base et application,
+    nombre de requêtes HTTP signalées. Les derniers signalements sont gardés.
+    """
+
+    def __init__(self, taille_historique=50):
+        self._verrou = threading.Lock()
+        self._vues = {}
+        self.signalements = deque(maxlen=taille_historique)
+        self.depuis = time.time()
+
+    def enregistrer(self, vue, requetes_sql, duree_sql_ms, duree_totale_ms, statut, signalements):
+        with self._verrou:
+            stats = self._vues.get(vue)
+            if stats is None:
+                stats = self._vues[vue] = {
+                    'appels': 0, 'erreurs': 0, 'requetes_sql': 0, 'requetes_sql_max': 0,
+                    'duree_sql_ms': 0.0, 'duree_totale_ms': 0.0, 'duree_totale_max_ms': 0.0,
+                    'signalees': 0,
+                }
+            stats['appels'] += 1
+            stats['erreurs'] += statut >= 500
+            stats['requetes_sql'] += requetes_sql
+            stats['requetes_sql_max'] = max(stats['requetes_sql_max'], requetes_sql)
+            stats['duree_sql_ms'] += duree_sql_ms
+            stats['duree_totale_ms'] += duree_totale_ms
+            stats['duree_totale_max_ms'] = max(stats['duree_totale_max_ms'], duree_totale_ms)
+            if signalements:
+                stats['signalees'] += 1
+                self.signalements.append({
+                    'horodatage': time.time(), 'vue': vue, 'requetes_sql': requetes_sql,
+                    'duree_totale_ms': round(duree_totale_ms, 1), 'motifs': signalements,
+                })
+
+    def instantane(self):
+        """Copie des statistiques avec moyennes, triée par temps total décroissant"""
+        with self._verrou:
+            vues = {vue: dict(stats) for vue, stats in self._vues.items()}
+            signalements = list(self.signalements)
+
+        for stats in vues.values():
+            appels = stats['appels']
+            stats['requetes_sql_moyenne'] = round(stats['requetes_sql'] / appels, 1)
+            stats['duree_sql_moyenne_ms'] = round(stats['duree_sql_ms'] / appels, 1)
+            stats['duree_totale_moyenne_ms'] = round(stats['duree_totale_ms'] / appels, 1)
+            stats['duree_sql_ms'] = round(stats['duree_sql_ms'], 1)
+            stats['duree_totale_ms'] = round(stats['duree_totale_ms'], 1)
+            stats['duree_totale_max_ms'] = round(stats['duree_totale_max_ms'], 1)
+
+        return {
+            'depuis': self.depuis,
+            'vues': dict(sorted(vues.items(), key=lambda item: -item[1]['duree_totale_ms'])),
+            'signalements': signalements,
+        }
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._vues.clear()
+            self.signalements.clear()
+            self.depuis = time.time()
+
+
+metriques_requetes = MetriquesRequetes()
+
+
+class InstrumentationRequetesMiddleware:
+    """
+    Mesure chaque requête HTTP : nombre de requêtes SQL, temps passé en base,
+    temps total et temps applicatif (vue + rendu du gabarit = total - base).
+
+    Coût constant par requête SQL (un compteur et un perf_counter) : peut
+    rester actif en production. Les dépassements de seuil (METRIQUES_SEUIL_*)
+    sont journalisés dans le logger sofemci.performance et conservés pour
+    /metriques/. Ajoute un en-tête Server-Timing lisible dans le navigateur.
+
+    Une réponse en flux (StreamingHttpResponse, exports CSV) exécute son SQL
+    pendant l'envoi du corps : son itérateur est enveloppé pour que ces
+    requêtes soient comptées, et la mesure est enregistrée à la fin de
+    l'envoi (sans Server-Timing, les en-têtes étant déjà partis). Le corps
+    d'un flux asynchrone n'est pas mesuré.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.actif = _parametre('METRIQUES_ACTIVES', True)
+        self.seuil_requetes = _parametre('METRIQUES_SEUIL_REQUETES', 50)
+        self.seuil_sql_lent_ms = _parametre('METRIQUES_SEUIL_SQL_LENT_MS', 200)
+        self.seuil_n_plus_un = _parametre('METRIQUES_SEUIL_N_PLUS_UN', 10)
+        self.seuil_requete_lente_ms = _parametre('METRIQUES_SEUIL_REQUETE_LENTE_MS', 1000)
+
+    def __call__(self, request):
+        if not self.actif:
+            return self.get_response(request)
+
+        compteur = CompteurRequetesSQL(self.seuil_sql_lent_ms)
+        debut = time.perf_counter()
+        with connection.execute_wrapper(compteur):
+            response = self.get_response(request)
+
+        if response.streaming and not getattr(response, 'is_async', False):
+            response.streaming_content = self._mesurer_flux(
+                response.streaming_content, request, response, compteur, debut
+            )
+            return response
+
+        duree_totale = self._enregistrer(request, response, compteur, debut)
+        response['Server-Timing'] = (
+            f'db;dur={compteur.duree_ms:.1f};desc="{compteur.nombre} requetes SQL", '
+            f'app;dur={duree_totale - compteur.duree_ms:.1f}'
+        )
+        return response
+
+    def _mesurer_flux(self, contenu, request, response, compteur, debut):
+        """Itère le corps d'une réponse en flux en comptant son SQL, puis enregistre la mesure"""
+        try:
+            with connection.execute_wrapper(compteur):
+                yield from contenu
+        finally:
+            self._enregistrer(request, response, compteur, debut)
+
+    def _enregistrer(self, request, response, compteur, debut):
+        """Enregistre la mesure de la requête et journalise les dépassements ; retourne la durée totale"""
+        duree_totale = (time.perf_counter() - debut) * 1000
+
+        correspondance = getattr(request, 'resolver_match', None)
+        vue = correspondance.view_name if correspondance else 'non_resolue'
+        signalements = self._signalements(compteur, duree_totale)
+
+        metriques_requetes.enregistrer(
+            vue, compteur.nombre, compteur.duree_ms, duree_totale, response.status_code, signalements
+        )
+        if signalements:
+            logger.warning(
+                f'{request.method} {request.path} ({vue}) : {compteur.nombre} requête(s) SQL, '
+                f'{compteur.duree_ms:.0f} ms en base, {duree_totale:.0f} ms au total - '
+                + ' ; '.join(signalements)
+            )
+        return duree_totale
+
+    def _signalements(self, compteur, duree_totale):
+        motifs = []
+        if compteur.nombre > self.seuil_requetes:
+            motifs.append(f'{compteur.nombre} requêtes SQL (seuil {self.seuil_requetes})')
+        for nombre, sql in compteur.repetitions(self.seuil_n_plus_un):
+            motifs.append(f'N+1 probable : {nombre} x {sql}')
+        for duree, sql in compteur.lentes[:3]:
+            motifs.append(f'requête lente {duree} ms : {sql}')
+        if duree_totale > self.seuil_requete_lente_ms:
+            motifs.append(f'réponse lente {duree_totale:.0f} ms (seuil {self.seuil_requete_lente_ms})')
+        return motifs
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:00
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0004_productionsoudure_production_sac_emballage_kg'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeProductionJour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_production', models.DateField()),
+                ('section', models.CharField(choices=[('extrusion', 'Extrusion'), ('imprimerie', 'Imprimerie'), ('soudure', 'Soudure'), ('recyclage', 'Recyclage')], max_length=20)),
+                ('nombre_productions', models.PositiveIntegerField(default=0)),
+                ('nombre_validees', models.PositiveIntegerField(default=0)),
+                ('total_production_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('total_production_validee_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('dechets_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('matiere_premiere_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('production_broyage_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('production_bache_noir_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('somme_rendement_pourcentage', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('nombre_rendements', models.PositiveIntegerField(default=0)),
+                ('somme_machines_actives', models.PositiveIntegerField(default=0, help_text='Machines actives (moulinex pour le recyclage)')),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+                ('equipe', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resumes_production', to='sofemci.equipe')),
+                ('zone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resumes_production', to='sofemci.zoneextrusion')),
+            ],
+            options={
+                'verbose_name': 'Résumé de production journalier',
+                'verbose_name_plural': 'Résumés de production journaliers',
+                'ordering': ['-date_production', 'section'],
+                'indexes': [models.Index(fields=['section', 'date_production'], name='resume_section_date_idx')],
+                'unique_together': {('date_production', 'section', 'zone', 'equipe')},
+            },
+        ),
+    ]
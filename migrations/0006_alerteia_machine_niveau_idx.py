@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0005_resumeproductionjour'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alerteia',
+            index=models.Index(fields=['machine', 'niveau', 'statut'], name='alerteia_machine_niveau_idx'),
+        ),
+    ]
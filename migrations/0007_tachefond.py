@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0006_alerteia_machine_niveau_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TacheFond',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_tache', models.CharField(choices=[('analyse_ia', 'Analyse IA complète')], max_length=30)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echouee', 'Échouée')], default='en_attente', max_length=15)),
+                ('progression', models.PositiveSmallIntegerField(default=0, verbose_name='Progression (%)')),
+                ('message', models.CharField(blank=True, max_length=200)),
+                ('parametres', models.JSONField(blank=True, default=dict)),
+                ('resultat', models.JSONField(blank=True, default=dict)),
+                ('erreur', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_debut', models.DateTimeField(blank=True, null=True)),
+                ('date_fin', models.DateTimeField(blank=True, null=True)),
+                ('duree_secondes', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Durée (s)')),
+                ('demandee_par', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='taches_fond', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-date_creation'],
+                'indexes': [models.Index(fields=['statut', 'date_creation'], name='tache_statut_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0007_tachefond'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machine',
+            name='analyse_ia_requise',
+            field=models.BooleanField(db_index=True, default=True, help_text='Données modifiées depuis la dernière analyse (analyse incrémentale)', verbose_name='Analyse IA requise'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0008_machine_analyse_ia_requise'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MesureCapteur',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('horodatage', models.DateTimeField()),
+                ('temperature', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('consommation_kwh', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('heures_fonctionnement', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('machine', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='mesures_capteurs', to='sofemci.machine')),
+            ],
+            options={
+                'verbose_name': 'Mesure capteur',
+                'verbose_name_plural': 'Mesures capteurs',
+                'indexes': [
+                    models.Index(fields=['machine', 'horodatage'], name='mesure_machine_horo_idx'),
+                    models.Index(fields=['horodatage'], name='mesure_horodatage_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='AgregatCapteur',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('heure', 'Heure'), ('jour', 'Jour')], max_length=10)),
+                ('debut', models.DateTimeField(verbose_name='Début de période')),
+                ('nombre_mesures', models.PositiveIntegerField(default=0)),
+                ('temperature_somme', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('temperature_nombre', models.PositiveIntegerField(default=0)),
+                ('temperature_min', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('temperature_max', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('consommation_somme', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('consommation_nombre', models.PositiveIntegerField(default=0)),
+                ('consommation_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('heures_fonctionnement', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Compteur horaire en fin de période')),
+                ('machine', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='agregats_capteurs', to='sofemci.machine')),
+            ],
+            options={
+                'verbose_name': 'Agrégat capteur',
+                'verbose_name_plural': 'Agrégats capteurs',
+                'unique_together': {('machine', 'resolution', 'debut')},
+                'indexes': [models.Index(fields=['resolution', 'debut'], name='agregat_resolution_debut_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0009_telemetrie_capteurs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tachefond',
+            name='type_tache',
+            field=models.CharField(choices=[('analyse_ia', 'Analyse IA complète'), ('rapport', 'Génération de rapport')], max_length=30),
+        ),
+        migrations.CreateModel(
+            name='RapportGenere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=64, unique=True)),
+                ('type_rapport', models.CharField(max_length=50)),
+                ('modele', models.CharField(max_length=50, verbose_name='Modèle source')),
+                ('format', models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel')], max_length=5)),
+                ('date_debut', models.DateField(blank=True, null=True)),
+                ('date_fin', models.DateField(blank=True, null=True)),
+                ('hash_filtre', models.CharField(max_length=64, verbose_name='Empreinte de la sélection')),
+                ('version_donnees', models.CharField(max_length=64)),
+                ('chemin', models.CharField(max_length=255, verbose_name='Fichier (relatif au dossier des rapports)')),
+                ('nom_fichier', models.CharField(max_length=150)),
+                ('taille_octets', models.PositiveBigIntegerField(default=0)),
+                ('nombre_lignes', models.PositiveIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('dernier_acces', models.DateTimeField(blank=True, null=True)),
+                ('nombre_telechargements', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Rapport généré',
+                'verbose_name_plural': 'Rapports générés',
+                'ordering': ['-date_creation'],
+                'indexes': [models.Index(fields=['modele', 'date_debut', 'date_fin'], name='rapport_modele_periode_idx')],
+            },
+        ),
+    ]
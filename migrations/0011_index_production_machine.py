@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0010_rapportgenere'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productionextrusion',
+            index=models.Index(fields=['date_production'], name='extrusion_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionextrusion',
+            index=models.Index(fields=['zone', 'date_production'], name='extrusion_zone_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionextrusion',
+            index=models.Index(fields=['equipe', 'date_production'], name='extrusion_equipe_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionextrusion',
+            index=models.Index(fields=['valide', 'date_production'], name='extrusion_valide_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionimprimerie',
+            index=models.Index(fields=['date_production'], name='imprimerie_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionimprimerie',
+            index=models.Index(fields=['valide', 'date_production'], name='imprimerie_valide_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionsoudure',
+            index=models.Index(fields=['date_production'], name='soudure_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionsoudure',
+            index=models.Index(fields=['valide', 'date_production'], name='soudure_valide_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionrecyclage',
+            index=models.Index(fields=['date_production'], name='recyclage_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionrecyclage',
+            index=models.Index(fields=['equipe', 'date_production'], name='recyclage_equipe_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productionrecyclage',
+            index=models.Index(fields=['valide', 'date_production'], name='recyclage_valide_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='machine',
+            index=models.Index(fields=['etat', 'probabilite_panne_7_jours'], name='machine_etat_proba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='machine',
+            index=models.Index(fields=['section', 'etat'], name='machine_section_etat_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:00
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0011_index_production_machine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicateursDirectionMois',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mois', models.DateField(help_text='Premier jour du mois', unique=True)),
+                ('chiffre_affaires', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18)),
+                ('production_totale_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('cout_production_kg', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12)),
+                ('rendement_global', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=6)),
+                ('taux_dechet', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=6)),
+                ('jours_production', models.PositiveSmallIntegerField(default=0)),
+                ('sections', models.JSONField(default=dict, verbose_name='Indicateurs par section')),
+                ('parametres', models.JSONField(default=dict, verbose_name='Prix et coûts appliqués')),
+                ('date_calcul', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Indicateurs direction mensuels',
+                'verbose_name_plural': 'Indicateurs direction mensuels',
+                'ordering': ['-mois'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:00
+
+from decimal import Decimal
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0012_indicateursdirectionmois'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObjectifProduction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(choices=[('extrusion', 'Extrusion'), ('imprimerie', 'Imprimerie'), ('soudure', 'Soudure'), ('recyclage', 'Recyclage')], max_length=20)),
+                ('objectif_kg', models.DecimalField(decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0'))], verbose_name='Objectif journalier (kg)')),
+                ('date_debut', models.DateField(verbose_name='Valable à partir du')),
+                ('date_fin', models.DateField(blank=True, null=True, verbose_name="Valable jusqu'au")),
+                ('date_modification', models.DateTimeField(auto_now=True)),
+                ('equipe', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='objectifs_production', to='sofemci.equipe')),
+                ('zone', models.ForeignKey(blank=True, help_text='Extrusion uniquement', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='objectifs_production', to='sofemci.zoneextrusion')),
+            ],
+            options={
+                'verbose_name': 'Objectif de production',
+                'verbose_name_plural': 'Objectifs de production',
+                'ordering': ['section', 'zone__numero', 'equipe__nom', '-date_debut'],
+                'indexes': [models.Index(fields=['section', 'date_debut'], name='objectif_section_debut_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:00
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+def supprimer_doublons(apps, schema_editor):
+    """
+    Garde un seul résumé par regroupement (le plus récent) : l'ancienne
+    contrainte laissait passer des doublons quand zone ou équipe est NULL.
+    rebuild_resume_production --check signale ensuite les écarts restants.
+    """
+    ResumeProductionJour = apps.get_model('sofemci', 'ResumeProductionJour')
+    vus = set()
+    a_supprimer = []
+    lignes = ResumeProductionJour.objects.order_by('-id').values_list(
+        'id', 'date_production', 'section', 'zone_id', 'equipe_id'
+    )
+    for identifiant, *cle in lignes.iterator():
+        cle = tuple(cle)
+        if cle in vus:
+            a_supprimer.append(identifiant)
+        else:
+            vus.add(cle)
+    for debut in range(0, len(a_supprimer), 500):
+        ResumeProductionJour.objects.filter(id__in=a_supprimer[debut:debut + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0013_objectifproduction'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='resumeproductionjour',
+            unique_together=set(),
+        ),
+        migrations.RunPython(supprimer_doublons, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resumeproductionjour',
+            constraint=models.UniqueConstraint(
+                django.db.models.expressions.F('date_production'),
+                django.db.models.expressions.F('section'),
+                django.db.models.functions.comparison.Coalesce('zone', 0),
+                django.db.models.functions.comparison.Coalesce('equipe', 0),
+                name='resume_production_cle_unique',
+            ),
+        ),
+    ]
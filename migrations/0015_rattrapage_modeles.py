@@ -0,0 +1,150 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sofemci', '0014_resume_production_cle_unique'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='rapportmensuel',
+            unique_together=None,
+        ),
+        migrations.RemoveField(
+            model_name='rapportmensuel',
+            name='genere_par',
+        ),
+        migrations.AlterModelOptions(
+            name='alerteia',
+            options={'ordering': ['-date_creation'], 'verbose_name': 'Alerte IA', 'verbose_name_plural': 'Alertes IA'},
+        ),
+        migrations.AlterUniqueTogether(
+            name='alerteia',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productionextrusion',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productionimprimerie',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productionrecyclage',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productionsoudure',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='machine',
+            name='est_nouvelle',
+            field=models.BooleanField(default=True, help_text="Indique si la machine était neuve lors de l'installation", verbose_name='Machine neuve'),
+        ),
+        migrations.AddField(
+            model_name='machine',
+            name='provenance',
+            field=models.CharField(choices=[('chine', 'Chine'), ('allemagne', 'Allemagne'), ('italie', 'Italie'), ('france', 'France'), ('usa', 'États-Unis'), ('japon', 'Japon'), ('autre', 'Autre')], default='autre', help_text="Pays d'origine de la machine", max_length=20, verbose_name='Provenance'),
+        ),
+        migrations.AlterField(
+            model_name='productionextrusion',
+            name='nombre_machines_actives',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Nombre moyen de machines actives'),
+        ),
+        migrations.AlterField(
+            model_name='productionextrusion',
+            name='rendement_pourcentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='productionextrusion',
+            name='taux_dechet_pourcentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='productionimprimerie',
+            name='nombre_machines_actives',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Nombre moyen de machines actives'),
+        ),
+        migrations.AlterField(
+            model_name='productionimprimerie',
+            name='taux_dechet_pourcentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='productionrecyclage',
+            name='nombre_moulinex',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Nombre de moulinex'),
+        ),
+        migrations.AlterField(
+            model_name='productionrecyclage',
+            name='taux_transformation_pourcentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='productionsoudure',
+            name='nombre_machines_actives',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Nombre moyen de machines actives'),
+        ),
+        migrations.AlterField(
+            model_name='productionsoudure',
+            name='taux_dechet_pourcentage',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Taux de déchets (%)'),
+        ),
+        migrations.AlterField(
+            model_name='productionsoudure',
+            name='total_production_kg',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Total production globale'),
+        ),
+        migrations.AlterField(
+            model_name='productionsoudure',
+            name='total_production_specifique_kg',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Total production spécifique (Bretelle+Rema+Batta+Sac)'),
+        ),
+        migrations.DeleteModel(
+            name='RapportMensuel',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='capacite_horaire',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='date_installation',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='derniere_maintenance',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='etat',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='numero',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='observations',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='section',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='type_machine',
+        ),
+        migrations.RemoveField(
+            model_name='alerteia',
+            name='zone_extrusion',
+        ),
+    ]
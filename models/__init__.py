@@ -1,8 +1,16 @@
 from .users import CustomUser
 from .base import Equipe, ZoneExtrusion
 from .machines import Machine, HistoriqueMachine
-from .production import ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage
+from .production import (
+    ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage,
+    ResumeProductionJour,
+)
 from .alerts import Alerte, AlerteIA
+from .taches import TacheFond
+from .telemetrie import MesureCapteur, AgregatCapteur
+from .rapports import RapportGenere
+from .direction import IndicateursDirectionMois
+from .objectifs import ObjectifProduction
 
 __all__ = [
     'CustomUser',
@@ -14,6 +22,13 @@ __all__ = [
     'ProductionImprimerie', 
     'ProductionSoudure',
     'ProductionRecyclage',
+    'ResumeProductionJour',
     'Alerte',
     'AlerteIA',
+    'TacheFond',
+    'MesureCapteur',
+    'AgregatCapteur',
+    'RapportGenere',
+    'IndicateursDirectionMois',
+    'ObjectifProduction',
 ]
\ No newline at end of file
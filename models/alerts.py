@@ -112,6 +112,10 @@ class AlerteIA(models.Model):
         ordering = ['-date_creation']
         verbose_name = "Alerte IA"
         verbose_name_plural = "Alertes IA"
+        indexes = [
+            # Recherche des alertes ouvertes d'une machine par niveau (dédoublonnage IA)
+            models.Index(fields=['machine', 'niveau', 'statut'], name='alerteia_machine_niveau_idx'),
+        ]
     
     def __str__(self):
         return f"{self.machine.numero} - {self.titre} ({self.get_niveau_display()})"
@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+from django.db import models
+
+
+class IndicateursDirectionMois(models.Model):
+    """
+    Indicateurs direction figés d'un mois écoulé : chiffre d'affaires, coût
+    de production, rendement et performances par section.
+
+    Calculés une fois depuis les résumés journaliers avec les prix et coûts
+    en vigueur (conservés dans parametres), puis relus tels quels. Une saisie
+    enregistrée sur un mois figé supprime son instantané (voir
+    ResumeProductionMixin), recalculé à la consultation suivante.
+    """
+    mois = models.DateField(unique=True, help_text="Premier jour du mois")
+
+    chiffre_affaires = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'))
+    production_totale_kg = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    cout_production_kg = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0'))
+    rendement_global = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal('0'))
+    taux_dechet = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal('0'))
+    jours_production = models.PositiveSmallIntegerField(default=0)
+
+    sections = models.JSONField(default=dict, verbose_name="Indicateurs par section")
+    parametres = models.JSONField(default=dict, verbose_name="Prix et coûts appliqués")
+
+    date_calcul = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-mois']
+        verbose_name = "Indicateurs direction mensuels"
+        verbose_name_plural = "Indicateurs direction mensuels"
+
+    def __str__(self):
+        return f"Indicateurs direction {self.mois:%m/%Y}"
+
+    @classmethod
+    def invalider(cls, dates):
+        """Supprime les instantanés des mois contenant l'une des dates"""
+        mois = {date.replace(day=1) for date in dates if date}
+        if not mois:
+            return 0
+        return cls.objects.filter(mois__in=mois).delete()[0]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
 
 class Machine(models.Model):
@@ -192,17 +193,93 @@ class Machine(models.Model):
         verbose_name="Dernière analyse IA"
     )
     
+    analyse_ia_requise = models.BooleanField(
+        default=True,
+        db_index=True,
+        verbose_name="Analyse IA requise",
+        help_text="Données modifiées depuis la dernière analyse (analyse incrémentale)"
+    )
+    
     # Métadonnées
     derniere_mise_a_jour_donnees = models.DateTimeField(
         auto_now=True,
         verbose_name="Dernière mise à jour données"
     )
     
+    # Entrées du scoring IA : leur modification rend la machine « à analyser »
+    CHAMPS_SUIVIS_IA = (
+        'etat', 'section', 'zone_extrusion_id', 'date_installation', 'derniere_maintenance',
+        'heures_fonctionnement_totales', 'heures_depuis_derniere_maintenance',
+        'frequence_maintenance_jours', 'nombre_pannes_totales',
+        'nombre_pannes_6_derniers_mois', 'nombre_pannes_1_dernier_mois', 'date_derniere_panne',
+        'consommation_electrique_kwh', 'consommation_electrique_nominale',
+        'temperature_actuelle', 'temperature_nominale', 'temperature_max_autorisee',
+    )
+    
+    # Fenêtre des productions lues par l'analyse IA (voir ContexteAnalyseParc)
+    FENETRE_PRODUCTION_IA_JOURS = 7
+    
     class Meta:
         unique_together = ['numero', 'section']
         ordering = ['section', 'numero']
         verbose_name = "Machine"
         verbose_name_plural = "Machines"
+        indexes = [
+            # Machines à risque d'un état donné, triées par probabilité de panne
+            models.Index(fields=['etat', 'probabilite_panne_7_jours'], name='machine_etat_proba_idx'),
+            models.Index(fields=['section', 'etat'], name='machine_section_etat_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._valeurs_suivies_ia = instance._valeurs_ia()
+        return instance
+    
+    def _valeurs_ia(self):
+        return {champ: self.__dict__.get(champ) for champ in self.CHAMPS_SUIVIS_IA}
+    
+    def save(self, *args, **kwargs):
+        initiales = getattr(self, '_valeurs_suivies_ia', None)
+        valeurs = self._valeurs_ia()
+        modifies = [
+            champ for champ in self.CHAMPS_SUIVIS_IA
+            if initiales is None or initiales[champ] != valeurs[champ]
+        ]
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            modifies = [
+                champ for champ in modifies
+                if champ in update_fields or champ[:-3] in update_fields
+            ]
+        
+        if modifies:
+            self.analyse_ia_requise = True
+            if update_fields is not None and 'analyse_ia_requise' not in update_fields:
+                kwargs['update_fields'] = update_fields + ['analyse_ia_requise']
+        
+        super().save(*args, **kwargs)
+        self._valeurs_suivies_ia = valeurs
+    
+    @classmethod
+    def marquer_a_analyser(cls, section, zone_id=None, date_production=None):
+        """
+        Marque les machines touchées par une saisie de production : celles de la
+        zone en extrusion, toute la section sinon. Sans effet si la saisie sort
+        de la fenêtre lue par l'analyse IA.
+        """
+        limite = timezone.now().date() - timedelta(days=cls.FENETRE_PRODUCTION_IA_JOURS)
+        if date_production and date_production < limite:
+            return 0
+        
+        machines = cls.objects.filter(section=section, analyse_ia_requise=False)
+        if section == 'extrusion':
+            if not zone_id:
+                return 0
+            machines = machines.filter(zone_extrusion_id=zone_id)
+        return machines.update(analyse_ia_requise=True)
     
     def __str__(self):
         return f"{self.section.title()} - Machine {self.numero}"
@@ -0,0 +1,66 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models
+from decimal import Decimal
+
+from .base import Equipe, ZoneExtrusion
+
+
+class ObjectifProduction(models.Model):
+    """
+    Objectif de production journalier (kg) d'une section, éventuellement
+    restreint à une zone d'extrusion et / ou à une équipe, valable sur une
+    période (date_fin vide : jusqu'à nouvel ordre).
+
+    Lu via le cache de processus de objectifs_utils : la table est chargée
+    une fois, puis rechargée après chaque enregistrement (voir signals.py).
+    """
+    SECTIONS_CHOICES = [
+        ('extrusion', 'Extrusion'),
+        ('imprimerie', 'Imprimerie'),
+        ('soudure', 'Soudure'),
+        ('recyclage', 'Recyclage'),
+    ]
+
+    section = models.CharField(max_length=20, choices=SECTIONS_CHOICES)
+    zone = models.ForeignKey(
+        ZoneExtrusion, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='objectifs_production', help_text="Extrusion uniquement"
+    )
+    equipe = models.ForeignKey(
+        Equipe, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='objectifs_production'
+    )
+    objectif_kg = models.DecimalField(
+        max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0'))],
+        verbose_name="Objectif journalier (kg)"
+    )
+    date_debut = models.DateField(verbose_name="Valable à partir du")
+    date_fin = models.DateField(null=True, blank=True, verbose_name="Valable jusqu'au")
+
+    date_modification = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Objectif de production"
+        verbose_name_plural = "Objectifs de production"
+        ordering = ['section', 'zone__numero', 'equipe__nom', '-date_debut']
+        indexes = [
+            models.Index(fields=['section', 'date_debut'], name='objectif_section_debut_idx'),
+        ]
+
+    def __str__(self):
+        portee = self.get_section_display()
+        if self.zone_id:
+            portee += f" - {self.zone}"
+        if self.equipe_id:
+            portee += f" - {self.equipe}"
+        return f"{portee} : {self.objectif_kg} kg/jour"
+
+    def clean(self):
+        if self.zone_id and self.section != 'extrusion':
+            raise ValidationError({'zone': "Seule l'extrusion a des objectifs par zone."})
+        if self.date_fin and self.date_fin < self.date_debut:
+            raise ValidationError({'date_fin': "La fin de validité précède le début."})
+
+    def couvre(self, date):
+        return self.date_debut <= date and (self.date_fin is None or date <= self.date_fin)
@@ -0,0 +1,85 @@
+import os
+
+from django.conf import settings
+from django.db import models
+
+
+def dossier_rapports():
+    """Dossier des fichiers de rapports générés (hors MEDIA_ROOT : non servi publiquement)"""
+    return settings.SOFEMCI_CONFIG.get(
+        'RAPPORTS_DOSSIER', os.path.join(settings.BASE_DIR, 'rapports_generes')
+    )
+
+
+class RapportGenere(models.Model):
+    """
+    Rapport PDF / Excel déjà généré, conservé sur disque.
+
+    La clé combine le type de rapport, la période, l'empreinte de la sélection
+    et la version des données : tant que les saisies de la période sont
+    inchangées, un nouveau téléchargement réutilise le fichier.
+    """
+    FORMATS = [
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+    ]
+
+    cle = models.CharField(max_length=64, unique=True)
+    type_rapport = models.CharField(max_length=50)
+    modele = models.CharField(max_length=50, verbose_name="Modèle source")
+    format = models.CharField(max_length=5, choices=FORMATS)
+    date_debut = models.DateField(null=True, blank=True)
+    date_fin = models.DateField(null=True, blank=True)
+    hash_filtre = models.CharField(max_length=64, verbose_name="Empreinte de la sélection")
+    version_donnees = models.CharField(max_length=64)
+
+    chemin = models.CharField(max_length=255, verbose_name="Fichier (relatif au dossier des rapports)")
+    nom_fichier = models.CharField(max_length=150)
+    taille_octets = models.PositiveBigIntegerField(default=0)
+    nombre_lignes = models.PositiveIntegerField(default=0)
+
+    date_creation = models.DateTimeField(auto_now_add=True)
+    dernier_acces = models.DateTimeField(null=True, blank=True)
+    nombre_telechargements = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date_creation']
+        verbose_name = "Rapport généré"
+        verbose_name_plural = "Rapports générés"
+        indexes = [
+            models.Index(fields=['modele', 'date_debut', 'date_fin'], name='rapport_modele_periode_idx'),
+        ]
+
+    def __str__(self):
+        return self.nom_fichier
+
+    @property
+    def chemin_absolu(self):
+        return os.path.join(dossier_rapports(), self.chemin)
+
+    def fichier_disponible(self):
+        return os.path.exists(self.chemin_absolu)
+
+    @classmethod
+    def supprimer(cls, queryset):
+        """Supprime les fichiers puis les entrées (queryset.delete() seul laisserait les fichiers)"""
+        rapports = list(queryset.values_list('pk', 'chemin'))
+        for _, chemin in rapports:
+            try:
+                os.remove(os.path.join(dossier_rapports(), chemin))
+            except FileNotFoundError:
+                pass
+        return cls.objects.filter(pk__in=[pk for pk, _ in rapports]).delete()[0]
+
+    @classmethod
+    def invalider(cls, modele, dates):
+        """Supprime les rapports d'un modèle dont la période couvre l'une des dates"""
+        dates = [date for date in dates if date]
+        if not dates:
+            return 0
+        rapports = cls.objects.filter(
+            modele=modele,
+            date_debut__lte=max(dates),
+            date_fin__gte=min(dates),
+        )
+        return cls.supprimer(rapports)
@@ -0,0 +1,189 @@
+import os
+import socket
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class TacheFond(models.Model):
+    """
+    File de tâches de fond stockée en base.
+
+    Les vues soumettent une tâche et répondent immédiatement ; un processus
+    séparé (python manage.py executer_taches) la réserve, l'exécute et
+    enregistre statut, progression et durée, consultables par l'interface.
+    """
+
+    TYPES_TACHE = [
+        ('analyse_ia', 'Analyse IA complète'),
+        ('rapport', 'Génération de rapport'),
+    ]
+
+    STATUTS = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('terminee', 'Terminée'),
+        ('echouee', 'Échouée'),
+    ]
+
+    STATUTS_ACTIFS = ['en_attente', 'en_cours']
+
+    # Une tâche « en cours » sans nouvelles depuis ce délai est considérée interrompue
+    DELAI_BLOCAGE = timedelta(hours=2)
+
+    type_tache = models.CharField(max_length=30, choices=TYPES_TACHE)
+    statut = models.CharField(max_length=15, choices=STATUTS, default='en_attente')
+    progression = models.PositiveSmallIntegerField(default=0, verbose_name="Progression (%)")
+    message = models.CharField(max_length=200, blank=True)
+
+    parametres = models.JSONField(default=dict, blank=True)
+    resultat = models.JSONField(default=dict, blank=True)
+    erreur = models.TextField(blank=True)
+
+    demandee_par = models.ForeignKey(
+        'CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='taches_fond'
+    )
+    worker = models.CharField(max_length=100, blank=True)
+
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_debut = models.DateTimeField(null=True, blank=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+    duree_secondes = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Durée (s)"
+    )
+
+    class Meta:
+        ordering = ['-date_creation']
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        indexes = [
+            models.Index(fields=['statut', 'date_creation'], name='tache_statut_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_type_tache_display()} #{self.pk} ({self.get_statut_display()})"
+
+    @property
+    def est_active(self):
+        return self.statut in self.STATUTS_ACTIFS
+
+    @property
+    def duree_courante(self):
+        """Durée finale, ou temps écoulé depuis le début si la tâche tourne encore"""
+        if self.duree_secondes is not None:
+            return float(self.duree_secondes)
+        if self.date_debut:
+            return round((timezone.now() - self.date_debut).total_seconds(), 2)
+        return None
+
+    @classmethod
+    def soumettre(cls, type_tache, utilisateur=None, **parametres):
+        """
+        Ajoute une tâche à la file. Si une tâche identique est déjà en attente
+        ou en cours, elle est retournée au lieu d'en créer une seconde.
+        """
+        limite = timezone.now() - cls.DELAI_BLOCAGE
+        existante = cls.objects.filter(
+            type_tache=type_tache,
+            parametres=parametres,
+            statut__in=cls.STATUTS_ACTIFS,
+            date_creation__gte=limite
+        ).order_by('date_creation').first()
+        if existante:
+            return existante
+
+        return cls.objects.create(
+            type_tache=type_tache,
+            parametres=parametres,
+            demandee_par=utilisateur if utilisateur and utilisateur.is_authenticated else None
+        )
+
+    @classmethod
+    def derniere_active(cls, type_tache):
+        """Tâche en attente ou en cours la plus récente d'un type (ou None)"""
+        return cls.objects.filter(
+            type_tache=type_tache,
+            statut__in=cls.STATUTS_ACTIFS,
+            date_creation__gte=timezone.now() - cls.DELAI_BLOCAGE
+        ).first()
+
+    @classmethod
+    def reserver_suivante(cls, types=None):
+        """
+        Réserve la plus ancienne tâche en attente pour le worker courant.
+        select_for_update(skip_locked) permet plusieurs workers sans double exécution.
+        """
+        with transaction.atomic():
+            taches = cls.objects.select_for_update(skip_locked=True).filter(statut='en_attente')
+            if types:
+                taches = taches.filter(type_tache__in=types)
+            tache = taches.order_by('date_creation').first()
+            if tache is None:
+                return None
+
+            tache.statut = 'en_cours'
+            tache.date_debut = timezone.now()
+            tache.worker = f"{socket.gethostname()}:{os.getpid()}"[:100]
+            tache.save(update_fields=['statut', 'date_debut', 'worker'])
+        return tache
+
+    @classmethod
+    def marquer_interrompues(cls):
+        """Marque en échec les tâches restées en cours au-delà du délai de blocage"""
+        return cls.objects.filter(
+            statut='en_cours',
+            date_debut__lt=timezone.now() - cls.DELAI_BLOCAGE
+        ).update(
+            statut='echouee',
+            erreur='Tâche interrompue (worker arrêté pendant l\'exécution)',
+            date_fin=timezone.now()
+        )
+
+    def mettre_a_jour_progression(self, progression, message=''):
+        """Enregistre l'avancement sans réécrire les autres champs"""
+        self.progression = max(0, min(int(progression), 100))
+        self.message = message[:200]
+        TacheFond.objects.filter(pk=self.pk).update(
+            progression=self.progression, message=self.message
+        )
+
+    def _finir(self, statut, **champs):
+        self.statut = statut
+        self.date_fin = timezone.now()
+        if self.date_debut:
+            duree = (self.date_fin - self.date_debut).total_seconds()
+            self.duree_secondes = Decimal(str(round(duree, 2)))
+        for champ, valeur in champs.items():
+            setattr(self, champ, valeur)
+        self.save(update_fields=['statut', 'date_fin', 'duree_secondes', *champs])
+
+    def terminer(self, resultat=None):
+        self._finir('terminee', progression=100, resultat=resultat or {}, message='Terminée')
+
+    def echouer(self, erreur):
+        self._finir('echouee', erreur=str(erreur), message='Échec')
+
+    def statut_json(self):
+        """Représentation légère pour l'endpoint de suivi"""
+        return {
+            'id': self.pk,
+            'type': self.type_tache,
+            'statut': self.statut,
+            'statut_display': self.get_statut_display(),
+            'progression': self.progression,
+            'message': self.message,
+            'duree_secondes': self.duree_courante,
+            'resultat': self.resultat if self.statut == 'terminee' else None,
+            'erreur': self.erreur if self.statut == 'echouee' else '',
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+        }
@@ -0,0 +1,96 @@
+from django.db import models
+
+
+class MesureCapteur(models.Model):
+    """
+    Mesure brute de capteur, en ajout seul.
+
+    Table volumineuse : pas de tri par défaut, un seul index composite
+    (machine, horodatage) pour les séries et un index horodatage pour la
+    purge. Les séries longues se lisent dans AgregatCapteur.
+    """
+    id = models.BigAutoField(primary_key=True)
+    machine = models.ForeignKey(
+        'Machine',
+        on_delete=models.CASCADE,
+        related_name='mesures_capteurs',
+        db_index=False
+    )
+    horodatage = models.DateTimeField()
+    temperature = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    consommation_kwh = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    heures_fonctionnement = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Mesure capteur"
+        verbose_name_plural = "Mesures capteurs"
+        indexes = [
+            models.Index(fields=['machine', 'horodatage'], name='mesure_machine_horo_idx'),
+            models.Index(fields=['horodatage'], name='mesure_horodatage_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.machine_id} @ {self.horodatage:%d/%m/%Y %H:%M:%S}"
+
+
+class AgregatCapteur(models.Model):
+    """
+    Agrégat de mesures par machine sur une période (minute, heure, jour).
+
+    Sommes et effectifs sont conservés plutôt que les moyennes : chaque niveau
+    se recalcule exactement depuis le niveau inférieur, même après la purge
+    des mesures brutes.
+    """
+    RESOLUTIONS = [
+        ('minute', 'Minute'),
+        ('heure', 'Heure'),
+        ('jour', 'Jour'),
+    ]
+
+    machine = models.ForeignKey(
+        'Machine',
+        on_delete=models.CASCADE,
+        related_name='agregats_capteurs',
+        db_index=False
+    )
+    resolution = models.CharField(max_length=10, choices=RESOLUTIONS)
+    debut = models.DateTimeField(verbose_name="Début de période")
+
+    nombre_mesures = models.PositiveIntegerField(default=0)
+    temperature_somme = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    temperature_nombre = models.PositiveIntegerField(default=0)
+    temperature_min = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    temperature_max = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    consommation_somme = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    consommation_nombre = models.PositiveIntegerField(default=0)
+    consommation_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    heures_fonctionnement = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Compteur horaire en fin de période"
+    )
+
+    class Meta:
+        verbose_name = "Agrégat capteur"
+        verbose_name_plural = "Agrégats capteurs"
+        unique_together = ['machine', 'resolution', 'debut']
+        indexes = [
+            models.Index(fields=['resolution', 'debut'], name='agregat_resolution_debut_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.machine_id} {self.resolution} {self.debut:%d/%m/%Y %H:%M}"
+
+    @property
+    def temperature_moyenne(self):
+        if not self.temperature_nombre:
+            return None
+        return self.temperature_somme / self.temperature_nombre
+
+    @property
+    def consommation_moyenne(self):
+        if not self.consommation_nombre:
+            return None
+        return self.consommation_somme / self.consommation_nombre
@@ -0,0 +1,242 @@
+# sofemci/rapports.py
+# Rapports PDF / Excel générés en tâche de fond et conservés sur disque
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.db import IntegrityError
+from django.db.models import Count, F, Max, Min, Q
+from django.http import FileResponse
+from django.utils import timezone
+
+from .models import RapportGenere, TacheFond
+from .models.rapports import dossier_rapports
+
+logger = logging.getLogger('sofemci')
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def registre_rapports():
+    """
+    type_rapport -> {'modele', 'format', 'nom', 'rendu'} ; rendu(queryset)
+    retourne une HttpResponse ou un fichier. Les rendus sont ceux de l'admin.
+    """
+    from .admin import RAPPORTS_ADMIN
+    return RAPPORTS_ADMIN
+
+
+def _parametre(nom, defaut):
+    return settings.SOFEMCI_CONFIG.get(nom, defaut)
+
+
+# ========================================
+# Identification d'un rapport
+# ========================================
+
+# Paramètres de la liste admin sans effet sur les lignes sélectionnées
+PARAMETRES_SANS_FILTRE = {'o', 'p', 'e', 'all', '_popup', '_to_field', '_changelist_filters'}
+
+
+def filtres_selection(request):
+    """
+    Sélection d'une action admin décrite par ses filtres : paramètres de la
+    liste (filtres latéraux, hiérarchie de dates, recherche 'q') et, sauf
+    « tout sélectionner », les lignes cochées (au plus une page)
+    """
+    filtres = {
+        cle: valeur for cle, valeur in request.GET.items()
+        if cle not in PARAMETRES_SANS_FILTRE
+    }
+    coches = None
+    if request.POST.get('select_across') != '1':
+        coches = sorted(int(pk) for pk in request.POST.getlist(helpers.ACTION_CHECKBOX_NAME))
+    return {'filtres': filtres, 'coches': coches}
+
+
+def queryset_selection(type_rapport, selection):
+    """Reconstruit le queryset d'une sélection décrite par filtres_selection (tâche de fond)"""
+    modele = registre_rapports()[type_rapport]['modele']
+    lookups = dict(selection['filtres'])
+    recherche = lookups.pop('q', '')
+
+    queryset = modele.objects.filter(**lookups)
+    if recherche:
+        queryset, doublons = admin.site._registry[modele].get_search_results(None, queryset, recherche)
+        if doublons:
+            queryset = queryset.distinct()
+    if selection['coches'] is not None:
+        queryset = queryset.filter(pk__in=selection['coches'])
+    return queryset
+
+
+def decrire_selection(type_rapport, queryset, selection):
+    """
+    Clé de cache d'une sélection : (modèle, période, empreinte des filtres,
+    version des données), agrégées en une requête sur le queryset de
+    l'action. La version change dès qu'une saisie de la sélection est
+    ajoutée, supprimée, modifiée ou (in)validée.
+    """
+    spec = registre_rapports()[type_rapport]
+    etat = queryset.aggregate(
+        date_debut=Min('date_production'),
+        date_fin=Max('date_production'),
+        nombre=Count('id'),
+        validees=Count('id', filter=Q(valide=True)),
+        derniere_modification=Max('date_modification'),
+    )
+
+    hash_filtre = hashlib.sha256(json.dumps(selection, sort_keys=True).encode()).hexdigest()
+    version = hashlib.sha256(
+        f"{etat['nombre']}|{etat['validees']}|{etat['derniere_modification']}".encode()
+    ).hexdigest()
+    modele = spec['modele']._meta.model_name
+    cle = hashlib.sha256(
+        f"{modele}|{type_rapport}|{etat['date_debut']}|{etat['date_fin']}|{hash_filtre}|{version}".encode()
+    ).hexdigest()
+
+    return {
+        'cle': cle,
+        'selection': selection,
+        'modele': modele,
+        'hash_filtre': hash_filtre,
+        'version_donnees': version,
+        'date_debut': etat['date_debut'],
+        'date_fin': etat['date_fin'],
+        'nombre': etat['nombre'],
+    }
+
+
+def rapport_en_cache(cle):
+    rapport = RapportGenere.objects.filter(cle=cle).first()
+    if rapport and rapport.fichier_disponible():
+        return rapport
+    return None
+
+
+# ========================================
+# Génération
+# ========================================
+
+def _ecrire_rendu(rendu, destination):
+    """HttpResponse (PDF) ou fichier (Excel) -> fichier sur disque ; retourne la taille"""
+    with open(destination, 'wb') as sortie:
+        if hasattr(rendu, 'read'):
+            shutil.copyfileobj(rendu, sortie)
+            rendu.close()
+        else:
+            sortie.write(rendu.content)
+    return os.path.getsize(destination)
+
+
+def generer_rapport(type_rapport, selection, queryset=None, description=None):
+    """
+    Génère (ou retrouve) le rapport d'une sélection (voir filtres_selection)
+    et l'enregistre sur disque. Les versions précédentes de la même sélection
+    sont supprimées.
+    """
+    spec = registre_rapports()[type_rapport]
+    if queryset is None:
+        queryset = queryset_selection(type_rapport, selection)
+    if description is None:
+        description = decrire_selection(type_rapport, queryset, selection)
+
+    existant = rapport_en_cache(description['cle'])
+    if existant:
+        return existant
+
+    dossier = dossier_rapports()
+    os.makedirs(dossier, exist_ok=True)
+    chemin = f"{description['cle']}.{spec['format']}"
+    temporaire = os.path.join(dossier, f'.{uuid.uuid4().hex}.tmp')
+
+    try:
+        taille = _ecrire_rendu(spec['rendu'](queryset), temporaire)
+        # Renommage atomique : un fichier visible est toujours complet
+        os.replace(temporaire, os.path.join(dossier, chemin))
+    finally:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+    RapportGenere.supprimer(RapportGenere.objects.filter(
+        type_rapport=type_rapport, hash_filtre=description['hash_filtre']
+    ).exclude(cle=description['cle']))
+
+    horodatage = timezone.localtime().strftime('%Y%m%d_%H%M')
+    try:
+        rapport, _ = RapportGenere.objects.update_or_create(
+            cle=description['cle'],
+            defaults={
+                'type_rapport': type_rapport,
+                'modele': description['modele'],
+                'format': spec['format'],
+                'date_debut': description['date_debut'],
+                'date_fin': description['date_fin'],
+                'hash_filtre': description['hash_filtre'],
+                'version_donnees': description['version_donnees'],
+                'chemin': chemin,
+                'nom_fichier': f"{spec['nom']}_{horodatage}.{spec['format']}",
+                'taille_octets': taille,
+                'nombre_lignes': description['nombre'],
+            }
+        )
+    except IntegrityError:
+        # Même rapport enregistré en parallèle par un autre worker
+        rapport = RapportGenere.objects.get(cle=description['cle'])
+
+    logger.info(f"Rapport {type_rapport} généré : {description['nombre']} ligne(s), {taille} octets")
+    purger_rapports()
+    return rapport
+
+
+def purger_rapports(maintenant=None):
+    """Supprime les rapports non téléchargés depuis RAPPORTS_RETENTION_JOURS"""
+    maintenant = maintenant or timezone.now()
+    limite = maintenant - timedelta(days=_parametre('RAPPORTS_RETENTION_JOURS', 7))
+    return RapportGenere.supprimer(RapportGenere.objects.filter(
+        Q(dernier_acces__lt=limite) | Q(dernier_acces__isnull=True, date_creation__lt=limite)
+    ))
+
+
+def demander_rapport(type_rapport, queryset, selection, utilisateur=None):
+    """
+    Point d'entrée des exports : retourne (rapport, None) si le fichier est
+    disponible (cache, ou petite sélection générée immédiatement), sinon
+    (None, tache) avec la tâche de fond qui le produira. selection : filtres
+    de l'action (filtres_selection), seuls transmis à la tâche.
+    """
+    description = decrire_selection(type_rapport, queryset, selection)
+
+    rapport = rapport_en_cache(description['cle'])
+    if rapport:
+        return rapport, None
+
+    if description['nombre'] <= _parametre('RAPPORTS_SEUIL_SYNCHRONE', 200):
+        return generer_rapport(type_rapport, selection, queryset, description), None
+
+    tache = TacheFond.soumettre('rapport', utilisateur, type_rapport=type_rapport, selection=selection)
+    return None, tache
+
+
+def reponse_rapport(rapport):
+    """Téléchargement du fichier en cache"""
+    RapportGenere.objects.filter(pk=rapport.pk).update(
+        dernier_acces=timezone.now(),
+        nombre_telechargements=F('nombre_telechargements') + 1,
+    )
+    return FileResponse(
+        open(rapport.chemin_absolu, 'rb'),
+        as_attachment=True,
+        filename=rapport.nom_fichier,
+        content_type=CONTENT_TYPES[rapport.format],
+    )
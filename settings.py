@@ -44,6 +44,7 @@ AUTH_USER_MODEL = 'sofemci.CustomUser'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sofemci.middleware.InstrumentationRequetesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -273,6 +274,37 @@ SOFEMCI_CONFIG = {
     'EQUIPES': ['A', 'B', 'C'],
     'IA_ENABLED': True,
     'MAINTENANCE_PREDICTIVE': True,
+    # Analyse IA parallèle : nombre de processus (1 = mode mono-processus)
+    'IA_ANALYSE_WORKERS': config('IA_ANALYSE_WORKERS', default=4, cast=int),
+    # En dessous de ce nombre de machines, le pool de processus ne vaut pas son coût
+    'IA_ANALYSE_SEUIL_PARALLELE': 200,
+    # Analyse incrémentale : délai maximal avant de réanalyser une machine inchangée
+    'IA_ANALYSE_DELAI_MAX_HEURES': 24,
+    # Rétention de la télémétrie capteurs en jours (None = illimitée)
+    'TELEMETRIE_RETENTION_JOURS': {'brut': 7, 'minute': 30, 'heure': 365, 'jour': None},
+    # Ingestion capteurs : clé partagée des équipements (en-tête X-Cle-Telemetrie)
+    'TELEMETRIE_CLE_INGESTION': config('TELEMETRIE_CLE_INGESTION', default=''),
+    # Micro-lots : écriture en base tous les N mesures ou toutes les N secondes
+    'TELEMETRIE_TAMPON_TAILLE': 5000,
+    'TELEMETRIE_TAMPON_DELAI_SECONDES': 1.0,
+    # Rapports PDF / Excel : cache disque, génération en tâche de fond au-delà du seuil (lignes)
+    'RAPPORTS_DOSSIER': config('RAPPORTS_DOSSIER', default=str(BASE_DIR / 'rapports_generes')),
+    'RAPPORTS_SEUIL_SYNCHRONE': 200,
+    'RAPPORTS_RETENTION_JOURS': 7,
+    # Instrumentation des requêtes HTTP (middleware.py) et endpoint /metriques/
+    'METRIQUES_ACTIVES': config('METRIQUES_ACTIVES', default=True, cast=bool),
+    'METRIQUES_CLE': config('METRIQUES_CLE', default=''),
+    'METRIQUES_SEUIL_REQUETES': 50,
+    'METRIQUES_SEUIL_N_PLUS_UN': 10,
+    'METRIQUES_SEUIL_SQL_LENT_MS': 200,
+    'METRIQUES_SEUIL_REQUETE_LENTE_MS': 1000,
+    # Dashboard direction : prix de vente et coûts (FCFA / kg), objectifs mensuels
+    'DIRECTION_PRIX_VENTE_KG': {'extrusion': 320, 'imprimerie': 320, 'soudure': 320, 'recyclage': 320},
+    'DIRECTION_COUT_MATIERE_KG': config('DIRECTION_COUT_MATIERE_KG', default=600, cast=int),
+    'DIRECTION_COUT_TRANSFORMATION_KG': {'extrusion': 0, 'imprimerie': 0, 'soudure': 0, 'recyclage': 0},
+    'DIRECTION_OBJECTIFS_MENSUELS': {
+        'chiffre_affaires': 50000000, 'production_kg': 150000, 'rendement': 85, 'cout_kg': 850,
+    },
 }
 
 # ==========================================
@@ -309,15 +341,30 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@sofemci.ci')
 # ==========================================
 # CACHE CONFIGURATION
 # ==========================================
+# Cache time to live is 15 minutes for production data
+CACHE_TTL = 60 * 15
+
+# Cache partagé par tous les workers sans service externe : fichiers sur
+# disque par défaut ; un backend sur socket local (Memcached / Redis via
+# unix:/chemin.sock) peut être choisi par CACHE_BACKEND et CACHE_LOCATION.
+# Les jetons de version (voir utils/cache_utils.py) n'expirent pas : le
+# nettoyage (MAX_ENTRIES) peut en supprimer, ce qui ne fait que périmer les
+# entrées qui en dépendent.
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache')
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'sofemci-cache',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+        'TIMEOUT': CACHE_TTL,
+        'KEY_PREFIX': 'sofemci',
     }
 }
-
-# Cache time to live is 15 minutes for production data
-CACHE_TTL = 60 * 15
+if CACHE_BACKEND.endswith('FileBasedCache'):
+    # Options propres au cache disque (les clients Memcached / Redis les refusent)
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', cast=int, default=10000),
+        'CULL_FREQUENCY': 4,
+    }
 
 # ==========================================
 
@@ -0,0 +1,62 @@
+# sofemci/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    Alerte, AlerteIA, Machine, ObjectifProduction, ProductionExtrusion, ProductionImprimerie,
+    ProductionSoudure, ProductionRecyclage, ResumeProductionJour
+)
+from .utils.cache_utils import invalider_alertes
+from .utils.machine_utils import CHAMPS_STATS_PARC, invalider_stats_parc
+from .utils.objectifs_utils import invalider_objectifs_production
+
+
+@receiver(post_delete, sender=ProductionExtrusion)
+@receiver(post_delete, sender=ProductionImprimerie)
+@receiver(post_delete, sender=ProductionSoudure)
+@receiver(post_delete, sender=ProductionRecyclage)
+def rafraichir_resume_apres_suppression(sender, instance, **kwargs):
+    """
+    Recalcule le résumé journalier après suppression d'une saisie, marque
+    les machines concernées à réanalyser et invalide les rapports en cache.
+
+    post_delete est émis dans la transaction du Collector, y compris pour
+    les suppressions en masse (queryset.delete()).
+    """
+    ResumeProductionJour.recalculer(sender.SECTION_RESUME, *instance.cle_resume())
+    sender.marquer_machines_a_analyser(instance.cle_resume())
+    sender.invalider_rapports([instance.cle_resume()])
+
+
+@receiver(post_save, sender=Machine)
+@receiver(post_delete, sender=Machine)
+def invalider_stats_parc_machine(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalide les statistiques du parc en cache quand l'état, la section ou
+    les indicateurs de risque d'une machine changent. Un save(update_fields=...)
+    limité à d'autres champs (compteurs horaires de la télémétrie) est ignoré.
+
+    Les mises à jour en masse (UPDATE groupés de l'analyse vectorisée) n'émettent
+    pas de signal : l'appelant invalide lui-même.
+    """
+    if update_fields is not None and CHAMPS_STATS_PARC.isdisjoint(update_fields):
+        return
+    transaction.on_commit(invalider_stats_parc)
+
+
+@receiver(post_save, sender=ObjectifProduction)
+@receiver(post_delete, sender=ObjectifProduction)
+def invalider_cache_objectifs(sender, instance, **kwargs):
+    """Recharge les objectifs en cache (ce processus, puis les autres via le jeton de version)"""
+    transaction.on_commit(invalider_objectifs_production)
+
+
+@receiver(post_save, sender=Alerte)
+@receiver(post_delete, sender=Alerte)
+@receiver(post_save, sender=AlerteIA)
+@receiver(post_delete, sender=AlerteIA)
+def invalider_cache_alertes(sender, instance, **kwargs):
+    """Périme les listes d'alertes des dashboards (tous les processus via le jeton de version)"""
+    transaction.on_commit(invalider_alertes)
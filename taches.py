@@ -0,0 +1,87 @@
+# sofemci/taches.py
+# Exécuteurs des tâches de fond (file TacheFond, traitée par manage.py executer_taches)
+import logging
+
+from django.db import close_old_connections
+
+logger = logging.getLogger('sofemci')
+
+
+def executer_analyse_ia(tache):
+    """Analyse IA complète du parc, avec suivi de progression lot par lot"""
+    from .ia_parallele import analyser_parc_parallele
+
+    def progression(lots_termines, total_lots, cle):
+        type_lot, valeur = cle
+        tache.mettre_a_jour_progression(
+            lots_termines * 100 // total_lots,
+            f'{type_lot} {valeur} analysée ({lots_termines}/{total_lots})'
+        )
+
+    tache.mettre_a_jour_progression(0, 'Chargement du parc machines')
+    rapport = analyser_parc_parallele(
+        mode_batch=tache.parametres.get('mode_batch', False),
+        workers=tache.parametres.get('workers'),
+        progression=progression,
+        incremental=tache.parametres.get('incremental', False)
+    )
+    resultats = rapport['resultats']
+
+    return {
+        'machines': len(resultats),
+        'anomalies': sum(1 for r in resultats if r['resultat']['anomalies']),
+        'risque_critique': sum(1 for r in resultats if r['resultat']['niveau_risque'] == 'critique'),
+        'alertes_creees': rapport['alertes_creees'],
+        'alertes_mises_a_jour': rapport['alertes_mises_a_jour'],
+        'mode': rapport['mode'],
+        'workers': rapport['workers'],
+        'lots': len(rapport['lots']),
+    }
+
+
+def executer_rapport(tache):
+    """Génère un rapport PDF / Excel et le conserve dans le cache disque"""
+    from django.urls import reverse
+    from .rapports import generer_rapport
+
+    tache.mettre_a_jour_progression(10, 'Génération du rapport')
+    rapport = generer_rapport(tache.parametres['type_rapport'], tache.parametres['selection'])
+
+    return {
+        'rapport_id': rapport.pk,
+        'nom_fichier': rapport.nom_fichier,
+        'taille_octets': rapport.taille_octets,
+        'lignes': rapport.nombre_lignes,
+        'url': reverse('telecharger_rapport', args=[rapport.pk]),
+    }
+
+
+# type_tache -> fonction(tache) retournant le résultat JSON de la tâche
+EXECUTEURS = {
+    'analyse_ia': executer_analyse_ia,
+    'rapport': executer_rapport,
+}
+
+
+def executer_tache(tache):
+    """
+    Exécute une tâche réservée et enregistre son issue.
+    Retourne True si la tâche s'est terminée sans erreur.
+    """
+    executeur = EXECUTEURS.get(tache.type_tache)
+    if executeur is None:
+        tache.echouer(f'Type de tâche inconnu : {tache.type_tache}')
+        return False
+
+    try:
+        resultat = executeur(tache)
+    except Exception as e:
+        logger.exception(f'Échec de la tâche {tache}')
+        # La connexion a pu être invalidée par l'erreur : on repart d'une connexion saine
+        close_old_connections()
+        tache.echouer(e)
+        return False
+
+    tache.terminer(resultat)
+    logger.info(f'{tache} terminée en {tache.duree_secondes}s')
+    return True
@@ -0,0 +1,14 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from sofemci.models import CustomUser
+
+
+class ListeAlertesIATests(TestCase):
+    """Rendu de la liste des alertes IA (statistiques par niveau comprises)"""
+
+    def test_rendu(self):
+        self.client.force_login(CustomUser.objects.create_user('superviseur', password='x', role='superviseur'))
+        reponse = self.client.get(reverse('liste_alertes_ia'))
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTemplateUsed(reponse, 'liste_alertes_ia.html')
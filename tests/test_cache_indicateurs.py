@@ -0,0 +1,54 @@
+from datetime import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from sofemci.models import CustomUser, Equipe, ObjectifProduction, ProductionRecyclage
+from sofemci.utils import get_kpis_analytics, indicateurs_direction, obtenir_series_production
+
+
+class CacheIndicateursTests(TestCase):
+    """Indicateurs en cache, périmés par une saisie ou un objectif"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.utilisateur = CustomUser.objects.create_user('chef', password='x', role='superviseur')
+        cls.equipe = Equipe.objects.create(nom='A', heure_debut=time(6), heure_fin=time(14))
+
+    def setUp(self):
+        cache.clear()
+        # Le mois en cours : les mois écoulés des indicateurs direction sont figés, pas mis en cache
+        self.jour = timezone.localdate()
+
+    def _saisie(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductionRecyclage.objects.create(
+                date_production=self.jour, equipe=self.equipe, cree_par=self.utilisateur, nombre_moulinex=2,
+                production_broyage_kg=Decimal('600'), production_bache_noir_kg=Decimal('400'),
+            )
+
+    def test_series_perimees_par_une_saisie(self):
+        self._saisie()
+        avant = obtenir_series_production('jour', self.jour, self.jour)
+        self._saisie()
+        self.assertNotEqual(obtenir_series_production('jour', self.jour, self.jour), avant)
+
+    def _objectif(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ObjectifProduction.objects.create(
+                section='recyclage', objectif_kg=Decimal('100000'), date_debut=self.jour.replace(day=1),
+            )
+
+    def test_kpis_perimes_par_un_objectif(self):
+        self._saisie()
+        avant = get_kpis_analytics(self.jour)['sections']['recyclage']
+        self._objectif()
+        self.assertNotEqual(get_kpis_analytics(self.jour)['sections']['recyclage'], avant)
+
+    def test_direction_perimee_par_un_objectif(self):
+        self._saisie()
+        avant = indicateurs_direction(self.jour)
+        self._objectif()
+        self.assertNotEqual(indicateurs_direction(self.jour), avant)
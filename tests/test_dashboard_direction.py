@@ -0,0 +1,31 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from sofemci.models import CustomUser
+
+
+class DashboardDirectionTests(TestCase):
+    """Rendu du dashboard direction, mois en cours et mois écoulé sans saisie"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.utilisateur = CustomUser.objects.create_user('direction', password='x', role='direction')
+
+    def setUp(self):
+        self.client.force_login(self.utilisateur)
+
+    def test_mois_en_cours(self):
+        reponse = self.client.get(reverse('dashboard_direction'))
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(len(reponse.context['performances_sections']), 4)
+        self.assertContains(reponse, f"{reverse('export_mensuel')}?mois=")
+
+    def test_mois_ecoule_vide(self):
+        reponse = self.client.get(reverse('dashboard_direction'), {'mois': '2020-01'})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(reponse.context['mois_fige'])
+        self.assertEqual(reponse.context['production_mensuelle'], 0)
+
+    def test_lien_details_section(self):
+        reponse = self.client.get(reverse('export_mensuel'), {'mois': '2020-01', 'section': 'soudure'})
+        self.assertEqual(reponse.status_code, 200)
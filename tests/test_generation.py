@@ -0,0 +1,27 @@
+from datetime import date, time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from sofemci.models import CustomUser, Equipe, ProductionExtrusion, ResumeProductionJour
+
+
+class GenererDonneesChargeTests(TestCase):
+    """Génération de bout en bout sur quelques jours, résumés reconstruits compris"""
+
+    @classmethod
+    def setUpTestData(cls):
+        CustomUser.objects.create_user('admin', password='x', role='admin')
+        for nom, debut, fin in (('A', 6, 14), ('B', 14, 22), ('C', 22, 6)):
+            Equipe.objects.create(nom=nom, heure_debut=time(debut), heure_fin=time(fin))
+
+    def test_generation_trois_jours(self):
+        call_command(
+            'generer_donnees_charge', jours=3, fin='2026-03-03', zones=2, machines=6,
+            jours_telemetrie=1, mesures_par_jour=2, stdout=StringIO(),
+        )
+        debut, fin = date(2026, 3, 1), date(2026, 3, 3)
+        self.assertTrue(ProductionExtrusion.objects.filter(date_production__range=(debut, fin)).exists())
+        self.assertTrue(ResumeProductionJour.objects.filter(date_production__range=(debut, fin)).exists())
+        self.assertEqual(ResumeProductionJour.verifier_derive(date_debut=debut, date_fin=fin), [])
@@ -0,0 +1,78 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from sofemci.ia_predictive import analyser_toutes_machines, machines_a_analyser
+from sofemci.ia_vectorise import CHAMPS_SCORES_IA
+from sofemci.models import AlerteIA, CustomUser, Equipe, Machine, ZoneExtrusion
+
+
+class AnalyseIncrementaleTests(TestCase):
+    """L'analyse incrémentale ne reprend que les machines modifiées"""
+
+    @classmethod
+    def setUpTestData(cls):
+        zone = ZoneExtrusion.objects.create(numero=1, nom='Zone 1')
+        for numero, etat in (('EX-01', 'actif'), ('EX-02', 'maintenance'), ('EX-03', 'panne'), ('EX-04', 'arret')):
+            Machine.objects.create(
+                numero=numero, type_machine='extrudeuse', section='extrusion', zone_extrusion=zone, etat=etat,
+            )
+        Machine.objects.create(numero='IM-01', type_machine='imprimante', section='imprimerie', etat='arret')
+
+    def test_second_passage_sans_changement(self):
+        self.assertEqual(machines_a_analyser(incremental=True).count(), 2)
+        analyser_toutes_machines(incremental=True)
+        self.assertEqual(machines_a_analyser(incremental=True).count(), 0)
+
+    def test_machine_modifiee_reprend_sa_zone(self):
+        analyser_toutes_machines(incremental=True)
+        Machine.objects.filter(numero='EX-03').update(analyse_ia_requise=True)
+        self.assertEqual(
+            set(machines_a_analyser(incremental=True).values_list('numero', flat=True)), {'EX-01', 'EX-02'}
+        )
+        self.assertEqual(machines_a_analyser(incremental=True).count(), 0)
+
+
+class AnalyseBatchTests(TestCase):
+    """Le mode batch écrit les mêmes résultats et alertes que l'analyse machine par machine"""
+
+    @classmethod
+    def setUpTestData(cls):
+        CustomUser.objects.create_user('admin', password='x', role='admin')
+        for nom, debut, fin in (('A', 6, 14), ('B', 14, 22), ('C', 22, 6)):
+            Equipe.objects.create(nom=nom, heure_debut=time(debut), heure_fin=time(fin))
+        call_command(
+            'generer_donnees_charge', jours=10, fin=f'{timezone.localdate():%Y-%m-%d}', zones=2, machines=12,
+            jours_telemetrie=1, mesures_par_jour=2, stdout=StringIO(),
+        )
+        # Quelques machines à risque, pour que les deux modes lèvent des alertes
+        for machine in Machine.objects.filter(etat='actif').order_by('id')[:4]:
+            machine.date_installation = timezone.localdate() - timedelta(days=9 * 365)
+            machine.heures_depuis_derniere_maintenance = 5000
+            machine.temperature_actuelle = machine.temperature_max_autorisee
+            machine.save()
+
+    def _resultats(self):
+        machines = list(Machine.objects.order_by('id').values_list('id', *CHAMPS_SCORES_IA))
+        alertes = sorted(AlerteIA.objects.values_list(
+            'machine_id', 'niveau', 'titre', 'message', 'probabilite_panne', 'delai_estime_jours',
+        ))
+        return machines, alertes
+
+    def test_batch_equivalent_machine_par_machine(self):
+        initial = list(Machine.objects.values())
+
+        analyser_toutes_machines()
+        attendu = self._resultats()
+        self.assertTrue(attendu[1])
+
+        AlerteIA.objects.all().delete()
+        for ligne in initial:
+            Machine.objects.filter(pk=ligne['id']).update(**ligne)
+
+        analyser_toutes_machines(mode_batch=True)
+        self.assertEqual(self._resultats(), attendu)
+        self.assertFalse(Machine.objects.filter(etat__in=['actif', 'maintenance'], analyse_ia_requise=True).exists())
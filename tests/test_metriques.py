@@ -0,0 +1,42 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from sofemci.middleware import metriques_requetes
+from sofemci.models import CustomUser
+
+
+class MetriquesRequetesTests(TestCase):
+    """SQL des réponses en flux compté, réinitialisation des métriques par POST seulement"""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user('admin', password='x', role='admin', is_staff=True)
+        self.client.force_login(self.admin)
+        metriques_requetes.reinitialiser()
+
+    def test_sql_export_csv_compte(self):
+        reponse = self.client.get(reverse('export_global'))
+        # Rien n'est enregistré avant l'envoi du corps
+        self.assertNotIn('export_global', metriques_requetes.instantane()['vues'])
+
+        self.assertTrue(b''.join(reponse.streaming_content))
+        reponse.close()
+        stats = metriques_requetes.instantane()['vues']['export_global']
+        self.assertEqual(stats['appels'], 1)
+        self.assertGreater(stats['requetes_sql'], 0)
+
+    def test_reinitialisation_par_post(self):
+        self.client.get(reverse('export_global'))
+        url = reverse('metriques')
+
+        self.client.get(url + '?reinitialiser=1')
+        self.assertIn('metriques', metriques_requetes.instantane()['vues'])
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.admin)
+        self.assertEqual(client.post(url).status_code, 403)
+
+        self.assertEqual(self.client.post(url).status_code, 200)
+        # Seul le POST de réinitialisation, mesuré après coup, subsiste
+        vues = metriques_requetes.instantane()['vues']
+        self.assertEqual(list(vues), ['metriques'])
+        self.assertEqual(vues['metriques']['appels'], 1)
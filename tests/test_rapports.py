@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+from datetime import date, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from sofemci.models import CustomUser, Equipe, ProductionExtrusion, RapportGenere, TacheFond, ZoneExtrusion
+from sofemci.taches import executer_tache
+
+
+class ExportRapportTests(TestCase):
+    """Une grosse sélection admin part en tâche de fond décrite par ses filtres, pas par ses ids"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser('direction', password='x', role='admin')
+        equipe = Equipe.objects.create(nom='A', heure_debut=time(6), heure_fin=time(14))
+        cls.zones = [ZoneExtrusion.objects.create(numero=numero, nom=f'Zone {numero}') for numero in (1, 2)]
+        for zone in cls.zones:
+            ProductionExtrusion.objects.create(
+                date_production=date(2026, 3, 2), zone=zone, equipe=equipe, cree_par=cls.admin,
+                chef_zone='Chef', heure_debut=time(6), heure_fin=time(14),
+                matiere_premiere_kg=Decimal('1200'), nombre_machines_actives=3, nombre_machinistes=4,
+                nombre_bobines_kg=Decimal('0'), production_finis_kg=Decimal('700'),
+                production_semi_finis_kg=Decimal('300'), dechets_kg=Decimal('50'),
+            )
+
+    def test_tout_selectionner_filtre(self):
+        dossier = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dossier)
+        config = dict(settings.SOFEMCI_CONFIG, RAPPORTS_SEUIL_SYNCHRONE=0, RAPPORTS_DOSSIER=dossier)
+        zone = self.zones[0]
+        self.client.force_login(self.admin)
+
+        with override_settings(SOFEMCI_CONFIG=config):
+            self.client.post(
+                reverse('admin:sofemci_productionextrusion_changelist') + f'?zone__id__exact={zone.pk}',
+                {
+                    'action': 'export_excel_fiche_production',
+                    'select_across': '1',
+                    '_selected_action': [ProductionExtrusion.objects.get(zone=zone).pk],
+                },
+            )
+            tache = TacheFond.objects.get(type_tache='rapport')
+            self.assertEqual(
+                tache.parametres['selection'],
+                {'filtres': {'zone__id__exact': str(zone.pk)}, 'coches': None},
+            )
+            self.assertTrue(executer_tache(tache))
+
+        self.assertEqual(RapportGenere.objects.get().nombre_lignes, 1)
+
+
+class StatutTacheTests(TestCase):
+    """Le suivi d'une tâche est réservé à son demandeur et aux superviseurs"""
+
+    def test_acces_statut_tache(self):
+        chef = CustomUser.objects.create_user('chef', password='x', role='chef_extrusion')
+        autre = CustomUser.objects.create_user('autre', password='x', role='chef_soudure')
+        superviseur = CustomUser.objects.create_user('superviseur', password='x', role='superviseur')
+        tache = TacheFond.objects.create(type_tache='rapport', parametres={}, demandee_par=chef)
+        url = reverse('statut_tache', args=[tache.pk])
+
+        for utilisateur, statut in ((chef, 200), (autre, 403), (superviseur, 200)):
+            self.client.force_login(utilisateur)
+            self.assertEqual(self.client.get(url).status_code, statut, utilisateur.username)
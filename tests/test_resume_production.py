@@ -0,0 +1,93 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from sofemci.models import (
+    CustomUser, Equipe, ProductionExtrusion, ProductionImprimerie, ProductionRecyclage,
+    ProductionSoudure, ResumeProductionJour, ZoneExtrusion,
+)
+
+JOUR = date(2026, 3, 2)
+
+
+class ResumeProductionJourTests(TestCase):
+    """Le résumé journalier suit la saisie, la validation et la suppression de chaque section"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.utilisateur = CustomUser.objects.create_user('chef', password='x', role='superviseur')
+        cls.equipe = Equipe.objects.create(nom='A', heure_debut=time(6), heure_fin=time(14))
+        cls.zone = ZoneExtrusion.objects.create(numero=1, nom='Zone 1')
+
+    def _saisie(self, section):
+        commun = {'date_production': JOUR, 'cree_par': self.utilisateur}
+        horaires = {'heure_debut': time(6), 'heure_fin': time(14)}
+        if section == 'extrusion':
+            return ProductionExtrusion.objects.create(
+                zone=self.zone, equipe=self.equipe, chef_zone='Chef', matiere_premiere_kg=Decimal('1200'),
+                nombre_machines_actives=3, nombre_machinistes=4, nombre_bobines_kg=Decimal('0'),
+                production_finis_kg=Decimal('700'), production_semi_finis_kg=Decimal('300'),
+                dechets_kg=Decimal('50'), **horaires, **commun,
+            )
+        if section == 'imprimerie':
+            return ProductionImprimerie.objects.create(
+                nombre_machines_actives=2, production_bobines_finies_kg=Decimal('600'),
+                production_bobines_semi_finies_kg=Decimal('400'), dechets_kg=Decimal('50'),
+                **horaires, **commun,
+            )
+        if section == 'soudure':
+            return ProductionSoudure.objects.create(
+                nombre_machines_actives=2, production_bobines_finies_kg=Decimal('500'),
+                production_bretelles_kg=Decimal('200'), production_rema_kg=Decimal('100'),
+                production_batta_kg=Decimal('100'), production_sac_emballage_kg=Decimal('100'),
+                dechets_kg=Decimal('50'), **horaires, **commun,
+            )
+        return ProductionRecyclage.objects.create(
+            equipe=self.equipe, nombre_moulinex=2, production_broyage_kg=Decimal('600'),
+            production_bache_noir_kg=Decimal('400'), **commun,
+        )
+
+    def _resume(self, section):
+        return ResumeProductionJour.objects.filter(date_production=JOUR, section=section).first()
+
+    def test_saisie_validation_suppression(self):
+        for section in ('extrusion', 'imprimerie', 'soudure', 'recyclage'):
+            with self.subTest(section=section):
+                saisie = self._saisie(section)
+                modele = type(saisie)
+
+                resume = self._resume(section)
+                self.assertIsNotNone(resume)
+                self.assertEqual(resume.nombre_productions, 1)
+                self.assertEqual(resume.nombre_validees, 0)
+                self.assertEqual(resume.total_production_kg, Decimal('1000'))
+                self.assertEqual(resume.total_production_validee_kg, Decimal('0'))
+                if section != 'recyclage':
+                    self.assertEqual(resume.dechets_kg, Decimal('50'))
+                if section == 'extrusion':
+                    self.assertEqual(resume.zone_id, self.zone.id)
+                    self.assertEqual(resume.matiere_premiere_kg, Decimal('1200'))
+                    self.assertEqual(resume.nombre_rendements, 1)
+
+                modele.changer_validation(modele.objects.filter(pk=saisie.pk), True)
+                resume = self._resume(section)
+                self.assertEqual(resume.nombre_validees, 1)
+                self.assertEqual(resume.total_production_validee_kg, Decimal('1000'))
+
+                saisie.delete()
+                self.assertIsNone(self._resume(section))
+
+    def test_reconstruction_sans_derive(self):
+        for section in ('extrusion', 'imprimerie', 'soudure', 'recyclage'):
+            self._saisie(section)
+        self.assertEqual(ResumeProductionJour.reconstruire(date_debut=JOUR, date_fin=JOUR), 4)
+        self.assertEqual(ResumeProductionJour.verifier_derive(date_debut=JOUR, date_fin=JOUR), [])
+
+    def test_regroupement_unique_sans_zone(self):
+        """Zone et équipe NULL (imprimerie) : un second résumé de la même clé est refusé"""
+        ResumeProductionJour.objects.create(date_production=JOUR, section='imprimerie')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ResumeProductionJour.objects.create(date_production=JOUR, section='imprimerie')
+        ResumeProductionJour.objects.create(date_production=JOUR, section='soudure')
@@ -0,0 +1,109 @@
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from sofemci.models import AgregatCapteur, CustomUser, Machine, MesureCapteur
+from sofemci.utils.ingestion_utils import TamponMesures
+from sofemci.utils.telemetrie_utils import appliquer_retention, maintenir_telemetrie
+
+CONFIG = {'TELEMETRIE_CLE_INGESTION': 'cle-test'}
+
+
+@override_settings(SOFEMCI_CONFIG=CONFIG)
+class IngestionMesuresTests(TestCase):
+    """Authentification de l'ingestion télémétrie et validation des valeurs"""
+
+    def setUp(self):
+        self.machine = Machine.objects.create(numero='EX-01', type_machine='extrudeuse', section='extrusion')
+        self.url = reverse('ingestion_mesures') + '?synchrone=1'
+
+    def _lot(self, *mesures):
+        return '\n'.join(json.dumps(dict(mesure, machine_id=self.machine.id)) for mesure in mesures)
+
+    def test_cle_equipement_acceptee(self):
+        reponse = self.client.post(
+            self.url, self._lot({'temperature': 61.5}),
+            content_type='application/x-ndjson', HTTP_X_CLE_TELEMETRIE='cle-test',
+        )
+        self.assertEqual(reponse.status_code, 202)
+        self.assertEqual(MesureCapteur.objects.count(), 1)
+
+    def test_session_admin_sans_jeton_csrf_refusee(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(CustomUser.objects.create_user('admin', password='x', role='admin'))
+        reponse = client.post(self.url, self._lot({'temperature': 61.5}), content_type='application/x-ndjson')
+        self.assertEqual(reponse.status_code, 403)
+        self.assertFalse(MesureCapteur.objects.exists())
+
+    def test_valeur_hors_limites_rejetee_sans_faire_echouer_le_lot(self):
+        reponse = self.client.post(
+            self.url, self._lot({'temperature': 61.5}, {'temperature': 123456}, {'temperature': 'nan'}),
+            content_type='application/x-ndjson', HTTP_X_CLE_TELEMETRIE='cle-test',
+        )
+        self.assertEqual(reponse.status_code, 202)
+        self.assertEqual(reponse.json()['acceptees'], 1)
+        self.assertEqual(reponse.json()['rejetees'], 2)
+        self.assertEqual(MesureCapteur.objects.count(), 1)
+
+
+RETENTION_COURTE = {'brut': 1, 'minute': 3, 'heure': 10, 'jour': None}
+
+
+class RecalculHistoriqueTests(TestCase):
+    """Un recalcul depuis une date ne détruit pas les agrégats dont la source est purgée"""
+
+    def _comptes(self):
+        return {
+            resolution: AgregatCapteur.objects.filter(resolution=resolution).count()
+            for resolution in ('minute', 'heure', 'jour')
+        }
+
+    def test_depuis_apres_retention(self):
+        machine = Machine.objects.create(numero='EX-01', type_machine='extrudeuse', section='extrusion')
+        maintenant = timezone.now()
+        depuis = maintenant - timedelta(days=20)
+        MesureCapteur.objects.bulk_create([
+            MesureCapteur(machine=machine, horodatage=maintenant - timedelta(days=jours, hours=1), temperature=60)
+            for jours in range(20)
+        ])
+
+        # Historique construit au fil de l'eau, puis purgé par la rétention
+        with override_settings(SOFEMCI_CONFIG={'TELEMETRIE_RETENTION_JOURS': dict.fromkeys(RETENTION_COURTE)}):
+            maintenir_telemetrie(maintenant, depuis=depuis, retention=False)
+        with override_settings(SOFEMCI_CONFIG={'TELEMETRIE_RETENTION_JOURS': RETENTION_COURTE}):
+            appliquer_retention(maintenant)
+            comptes = self._comptes()
+            self.assertEqual(comptes, {'minute': 3, 'heure': 10, 'jour': 20})
+
+            maintenir_telemetrie(maintenant, depuis=depuis)
+            self.assertEqual(self._comptes(), comptes)
+
+            call_command('maintenir_telemetrie', depuis=f'{depuis:%Y-%m-%d}', stdout=io.StringIO())
+            self.assertEqual(self._comptes(), comptes)
+
+
+class TamponMesuresTests(TestCase):
+    """Un échec d'écriture du tampon ne perd pas le lot et ne remonte pas à la requête"""
+
+    def test_lot_remis_en_tampon_apres_echec(self):
+        machine = Machine.objects.create(numero='EX-01', type_machine='extrudeuse', section='extrusion')
+        tampon = TamponMesures(taille_max=2, delai_max=60, taille_reprise=3)
+        mesures = [{'machine_id': machine.id, 'temperature': 60 + i} for i in range(4)]
+
+        with mock.patch('sofemci.utils.ingestion_utils.enregistrer_mesures', side_effect=DatabaseError):
+            self.assertEqual(tampon.ajouter(mesures[:2]), 2)
+            self.assertEqual(len(tampon), 2)
+            tampon.ajouter(mesures[2:])
+        # Reprise bornée : la plus ancienne mesure est abandonnée
+        self.assertEqual(len(tampon), 3)
+        self.assertEqual(tampon.statistiques['perdues'], 1)
+
+        self.assertEqual(tampon.vider(), 3)
+        self.assertEqual(MesureCapteur.objects.count(), 3)
@@ -9,7 +9,7 @@ from django.views.generic import RedirectView
 
 # Import des vues depuis les nouveaux modules
 from .views.auth import login_view, logout_view
-from .views.dashboard import dashboard_view, dashboard_ia_view, dashboard_direction_view
+from .views.dashboard import dashboard_view, dashboard_ia_view, dashboard_direction_view, chart_data_api
 from .views.production import (
     saisie_extrusion_view, saisie_sections_view, 
     saisie_imprimerie_ajax, saisie_soudure_ajax, saisie_recyclage_ajax,
@@ -24,6 +24,14 @@ from .views.machines import (
 from .views.alerts import (
     liste_alertes_ia, traiter_alerte_ia, lancer_analyse_complete
 )
+from .views.taches import statut_tache_view
+from .views.telemetrie import ingestion_mesures_view
+from .views.rapports import telecharger_rapport_view, rapport_tache_view
+from .views.metriques import metriques_view
+from .views.exports import (
+    export_journalier, export_hebdomadaire, export_mensuel, export_periode_personnalisee,
+    export_comparatif_periodes, export_global_toutes_sections, api_previsualisation_export
+)
 
 urlpatterns = [
     # ==========================================
@@ -76,6 +84,8 @@ urlpatterns = [
     path('ia/dashboard/', dashboard_ia_view, name='dashboard_ia'),
     path('ia/machine/<int:machine_id>/', machine_detail_ia_view, name='machine_detail_ia'),
     path('ia/analyser/', lancer_analyse_complete, name='lancer_analyse_complete'),
+    path('api/taches/<int:tache_id>/', statut_tache_view, name='statut_tache'),
+    path('api/telemetrie/mesures/', ingestion_mesures_view, name='ingestion_mesures'),
     
     # Gestion maintenances et pannes
     path('ia/machine/<int:machine_id>/maintenance/', enregistrer_maintenance_view, name='enregistrer_maintenance'),
@@ -86,11 +96,26 @@ urlpatterns = [
     path('ia/alertes/', liste_alertes_ia, name='liste_alertes_ia'),
     path('ia/alerte/<int:alerte_id>/traiter/', traiter_alerte_ia, name='traiter_alerte_ia'),
     
+    # ==========================================
+    # EXPORTS CSV (générés en flux)
+    # ==========================================
+    path('exports/journalier/', export_journalier, name='export_journalier'),
+    path('exports/hebdomadaire/', export_hebdomadaire, name='export_hebdomadaire'),
+    path('exports/mensuel/', export_mensuel, name='export_mensuel'),
+    path('exports/periode/', export_periode_personnalisee, name='export_periode_personnalisee'),
+    path('exports/comparatif/', export_comparatif_periodes, name='export_comparatif_periodes'),
+    path('exports/global/', export_global_toutes_sections, name='export_global'),
+    path('api/exports/previsualisation/', api_previsualisation_export, name='api_previsualisation_export'),
+    path('rapports/<int:rapport_id>/', telecharger_rapport_view, name='telecharger_rapport'),
+    path('rapports/tache/<int:tache_id>/', rapport_tache_view, name='rapport_tache'),
+    path('metriques/', metriques_view, name='metriques'),
+    
     # ==========================================
     # API POUR CALCULS TEMPS RÉEL (FONCTIONS SIMPLIFIÉES)
     # ==========================================
     path('api/calculs/', dashboard_view, name='api_calculs'),  # Redirigé vers dashboard
     path('api/dashboard/', dashboard_view, name='api_dashboard'),  # Redirigé vers dashboard
+    path('api/graphiques/', chart_data_api, name='api_chart_data'),
     
     # APIs IA (fonctions simplifiées)
     path('api/ia/machines-status/', dashboard_ia_view, name='api_machines_status'),  # Redirigé vers dashboard IA
@@ -1,22 +1,71 @@
+from .agregats_utils import *
 from .production_utils import *
+from .objectifs_utils import *
+from .cache_utils import *
 from .machine_utils import *
 from .dashboard_utils import *
 from .analytics_utils import *
+from .telemetrie_utils import *
+from .ingestion_utils import *
+from .export_utils import *
+from .excel_utils import *
+from .pdf_utils import *
+from .generation_utils import *
+from .series_utils import *
+from .kpi_utils import *
+from .direction_utils import *
 
 __all__ = [
+    # Agrégats journaliers
+    'AgregatsProductionJour', 'calculer_agregats_jour', 'obtenir_agregats_jour',
+    
     # Production utils
     'get_production_totale_jour', 'get_production_section_jour', 'get_dechets_totaux_jour',
     'get_efficacite_moyenne_jour', 'get_extrusion_details_jour', 'get_imprimerie_details_jour',
     'get_soudure_details_jour', 'get_recyclage_details_jour', 'get_productions_filtrees',
     'calculer_pourcentage_production', 'calculer_pourcentage_section', 'get_objectif_section',
     
+    # Objectifs de production
+    'get_objectifs_jour', 'get_objectif', 'get_objectifs_zones', 'calculer_pourcentages_objectifs',
+    'invalider_objectifs_production',
+    
+    # Cache partagé : clés par date / section / zone et jetons de version
+    'cle_cache', 'jetons_cache', 'versions_cache', 'version_cache', 'changer_version',
+    'invalider_alertes', 'obtenir_en_cache', 'duree_cache',
+    
     # Machine utils
     'get_machines_stats', 'get_zones_performance', 'get_zones_utilisateur',
+    'get_stats_parc', 'calculer_stats_parc', 'invalider_stats_parc', 'get_machines_par_section',
     
     # Dashboard utils
     'get_chart_data_for_dashboard', 'get_analytics_kpis', 'get_analytics_table_data',
+    'versions_dashboard', 'calculer_donnees_dashboard', 'get_donnees_dashboard',
+    'get_machines_dashboard_ia', 'get_alertes_dashboard_ia',
+    
+    # KPIs par période
+    'calculer_kpis_periodes', 'calculer_kpis_analytics', 'get_kpis_analytics', 'bornes_periodes_mois',
+    
+    # Indicateurs direction mensuels
+    'calculer_indicateurs_direction', 'indicateurs_direction', 'performances_sections_direction',
+    'parametres_direction', 'objectifs_direction',
+    
+    # Séries de production par période
+    'calculer_series_production', 'obtenir_series_production', 'periodes_series',
     
     # Analytics utils
     'get_extrusion_details_jour_complet', 'get_imprimerie_details_jour_complet',
     'get_soudure_details_jour_complet', 'get_recyclage_details_jour_complet',
+    
+    # Télémétrie capteurs
+    'enregistrer_mesures', 'enregistrer_mesure_machine', 'agreger_mesures',
+    'appliquer_retention', 'maintenir_telemetrie', 'serie_capteurs',
+    'lire_mesures', 'TamponMesures', 'tampon_ingestion', 'ingerer_mesures',
+    
+    # Exports CSV / Excel / PDF
+    'parcourir_par_cle', 'parcourir_production', 'lignes_section', 'lignes_multi_sections',
+    'lignes_comparatif', 'totaux_section', 'ColonneExcel', 'ecrire_classeur_excel',
+    'export_excel_queryset', 'reponse_excel', 'TableauPagine', 'parcourir_lignes_pdf',
+    
+    # Données de charge
+    'ParametresGeneration', 'preparer_referentiel', 'generer_donnees_charge',
 ]
\ No newline at end of file
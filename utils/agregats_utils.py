@@ -0,0 +1,185 @@
+from dataclasses import dataclass, field
+from datetime import date as date_type
+from decimal import Decimal
+
+from django.db.models import Sum, Count
+from ..models import (
+    ProductionExtrusion, ProductionSoudure, ProductionImprimerie,
+    ProductionRecyclage, Machine, ZoneExtrusion
+)
+
+ZERO = Decimal('0')
+
+SECTIONS_PRODUCTION = ('extrusion', 'imprimerie', 'soudure', 'recyclage')
+
+
+@dataclass
+class AgregatsProductionJour:
+    """
+    Agrégats de production d'une journée, calculés en une seule passe.
+
+    Chaque table de production est interrogée une seule fois (groupée par zone
+    pour l'extrusion) ; tous les helpers du dashboard lisent ensuite ce résultat
+    au lieu de relancer leurs propres requêtes.
+    """
+    date: date_type
+    extrusion: dict = field(default_factory=dict)
+    imprimerie: dict = field(default_factory=dict)
+    soudure: dict = field(default_factory=dict)
+    recyclage: dict = field(default_factory=dict)
+    zones: dict = field(default_factory=dict)
+    zones_actives: list = field(default_factory=list)
+    machines_par_section: dict = field(default_factory=dict)
+
+    def section(self, section):
+        """Agrégats d'une section (dict vide si section inconnue)"""
+        if section not in SECTIONS_PRODUCTION:
+            return {}
+        return getattr(self, section)
+
+    def production_section(self, section):
+        """Production totale d'une section"""
+        return self.section(section).get('total', ZERO)
+
+    def machines_section(self, section):
+        """Nombre de machines enregistrées dans une section"""
+        return self.machines_par_section.get(section, 0)
+
+    def zone(self, zone_id):
+        """Agrégats extrusion d'une zone (valeurs nulles si aucune saisie)"""
+        return self.zones.get(zone_id) or _agregats_vides(CHAMPS_EXTRUSION)
+
+    @property
+    def production_totale(self):
+        return sum((self.production_section(s) for s in SECTIONS_PRODUCTION), ZERO)
+
+    @property
+    def dechets_totaux(self):
+        # Le recyclage n'a pas de déchets
+        return sum(
+            (self.section(s).get('dechets', ZERO) for s in ('extrusion', 'imprimerie', 'soudure')),
+            ZERO
+        )
+
+    @property
+    def efficacite_moyenne(self):
+        """Rendement moyen extrusion (équivalent Avg) ou None si aucune saisie"""
+        nombre = self.extrusion.get('nombre_rendements', 0)
+        if not nombre:
+            return None
+        return self.extrusion['rendement'] / nombre
+
+
+# Champs agrégés par section : clé du résultat -> (fonction, champ du modèle)
+CHAMPS_EXTRUSION = {
+    'nombre': (Count, 'id'),
+    'total': (Sum, 'total_production_kg'),
+    'dechets': (Sum, 'dechets_kg'),
+    'matiere_premiere': (Sum, 'matiere_premiere_kg'),
+    'prod_finis': (Sum, 'production_finis_kg'),
+    'prod_semi_finis': (Sum, 'production_semi_finis_kg'),
+    'machinistes': (Sum, 'nombre_machinistes'),
+    'machines': (Sum, 'nombre_machines_actives'),
+    'rendement': (Sum, 'rendement_pourcentage'),
+    'nombre_rendements': (Count, 'rendement_pourcentage'),
+}
+
+CHAMPS_IMPRIMERIE = {
+    'nombre': (Count, 'id'),
+    'total': (Sum, 'total_production_kg'),
+    'dechets': (Sum, 'dechets_kg'),
+    'machines': (Sum, 'nombre_machines_actives'),
+    'bobines_finies': (Sum, 'production_bobines_finies_kg'),
+    'bobines_semi_finies': (Sum, 'production_bobines_semi_finies_kg'),
+}
+
+CHAMPS_SOUDURE = {
+    'nombre': (Count, 'id'),
+    'total': (Sum, 'total_production_kg'),
+    'dechets': (Sum, 'dechets_kg'),
+    'machines': (Sum, 'nombre_machines_actives'),
+    'bretelles': (Sum, 'production_bretelles_kg'),
+    'rema': (Sum, 'production_rema_kg'),
+    'batta': (Sum, 'production_batta_kg'),
+}
+
+CHAMPS_RECYCLAGE = {
+    'nombre': (Count, 'id'),
+    'total': (Sum, 'total_production_kg'),
+    'moulinex': (Sum, 'nombre_moulinex'),
+    'broyage': (Sum, 'production_broyage_kg'),
+    'bache': (Sum, 'production_bache_noir_kg'),
+}
+
+
+def _expressions(champs):
+    return {cle: fonction(champ) for cle, (fonction, champ) in champs.items()}
+
+
+def _agregats_vides(champs):
+    return {cle: (0 if fonction is Count else ZERO) for cle, (fonction, _) in champs.items()}
+
+
+def _normaliser(ligne, champs):
+    """Remplace les None des agrégats par des zéros du bon type"""
+    resultat = _agregats_vides(champs)
+    for cle in champs:
+        if ligne.get(cle) is not None:
+            resultat[cle] = ligne[cle]
+    return resultat
+
+
+def calculer_agregats_jour(date):
+    """
+    Calcule tous les agrégats de production d'une journée.
+
+    Une requête groupée par table de production, plus une pour le parc machines
+    et une pour les zones actives : le coût ne dépend plus du nombre de helpers.
+    """
+    agregats = AgregatsProductionJour(date=date)
+
+    # Extrusion : une seule requête groupée par zone, le total section en découle
+    extrusion = _agregats_vides(CHAMPS_EXTRUSION)
+    lignes_zones = (
+        ProductionExtrusion.objects.filter(date_production=date)
+        .values('zone')
+        .order_by()
+        .annotate(**_expressions(CHAMPS_EXTRUSION))
+    )
+    for ligne in lignes_zones:
+        zone_agregats = _normaliser(ligne, CHAMPS_EXTRUSION)
+        agregats.zones[ligne['zone']] = zone_agregats
+        for cle, valeur in zone_agregats.items():
+            extrusion[cle] += valeur
+    agregats.extrusion = extrusion
+
+    agregats.imprimerie = _normaliser(
+        ProductionImprimerie.objects.filter(date_production=date).aggregate(
+            **_expressions(CHAMPS_IMPRIMERIE)),
+        CHAMPS_IMPRIMERIE
+    )
+    agregats.soudure = _normaliser(
+        ProductionSoudure.objects.filter(date_production=date).aggregate(
+            **_expressions(CHAMPS_SOUDURE)),
+        CHAMPS_SOUDURE
+    )
+    agregats.recyclage = _normaliser(
+        ProductionRecyclage.objects.filter(date_production=date).aggregate(
+            **_expressions(CHAMPS_RECYCLAGE)),
+        CHAMPS_RECYCLAGE
+    )
+
+    agregats.machines_par_section = dict(
+        Machine.objects.values('section').order_by()
+        .annotate(total=Count('id')).values_list('section', 'total')
+    )
+    agregats.zones_actives = list(ZoneExtrusion.objects.filter(active=True))
+
+    return agregats
+
+
+def obtenir_agregats_jour(date, agregats=None):
+    """Retourne les agrégats fournis s'ils couvrent la date, sinon les calcule"""
+    if agregats is not None and agregats.date == date:
+        return agregats
+    return calculer_agregats_jour(date)
@@ -1,4 +1,5 @@
 from django.db.models import Sum, Avg
+from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
 from ..models import ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage
@@ -132,13 +133,14 @@ def get_soudure_details_jour_complet(date):
         'total_dechets': aggregats['dechets'] or 0,
     }
 
-def get_recyclage_details_jour():
-    """Détails production recyclage aujourd'hui"""
+def get_recyclage_details_jour_complet(date=None):
+    """Détails complets recyclage du jour (aujourd'hui par défaut)"""
     try:
-        today = timezone.now().date()
+        if date is None:
+            date = timezone.now().date()
         
         # Récupérer les données
-        productions = ProductionRecyclage.objects.filter(date_production=today)
+        productions = ProductionRecyclage.objects.filter(date_production=date)
         
         if not productions.exists():
             return {
@@ -183,7 +185,7 @@ def get_recyclage_details_jour():
         }
         
     except Exception as e:
-        print(f"Erreur dans get_recyclage_details_jour: {e}")
+        print(f"Erreur dans get_recyclage_details_jour_complet: {e}")
         return {
             'total_production_kg': Decimal('0.00'),
             'production_par_moulinex': Decimal('0.00'),
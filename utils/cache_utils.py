@@ -0,0 +1,92 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import ResumeProductionJour
+from .objectifs_utils import CLE_VERSION_OBJECTIFS
+
+# Jetons de version des espaces de cache hors production, changés par les
+# signaux (voir signals.py). Les résumés de production ont leurs propres
+# jetons, par mois et par section (ResumeProductionJour.version_cache).
+JETONS_ESPACES = {
+    'machines': 'sofemci:version:machines',
+    'alertes': 'sofemci:version:alertes',
+    'objectifs': CLE_VERSION_OBJECTIFS,
+}
+
+
+def duree_cache():
+    """Durée de vie des entrées et fragments de template (settings.CACHE_TTL)"""
+    return getattr(settings, 'CACHE_TTL', 60 * 15)
+
+
+def cle_cache(domaine, date=None, section=None, zone=None, version=None):
+    """
+    Clé 'sofemci:<domaine>:<date>:<section>:<zone>[:<version>]' : les entrées
+    d'une même date, section ou zone partagent un préfixe lisible, '*' pour
+    une dimension sans objet
+    """
+    parties = [
+        'sofemci', domaine,
+        date.isoformat() if date else '*',
+        section or '*',
+        str(zone) if zone else '*',
+    ]
+    if version:
+        parties.append(version)
+    return ':'.join(parties)
+
+
+def jetons_cache(*espaces, debut=None, fin=None, sections=None):
+    """
+    Clés des jetons dont dépend une entrée : ceux des espaces nommés, et ceux
+    des résumés de production de [debut, fin] (éventuellement par section)
+    """
+    cles = [JETONS_ESPACES[espace] for espace in espaces]
+    if debut is not None:
+        cles += ResumeProductionJour.cles_version_cache(debut, fin or debut, sections)
+    return cles
+
+
+def versions_cache(**blocs):
+    """
+    {nom: version} de chaque bloc {nom: clés de jetons}, en une lecture du
+    cache ; un jeton absent (jamais posé ou supprimé) est créé
+    """
+    cles = sorted({cle for cles_bloc in blocs.values() for cle in cles_bloc})
+    jetons = cache.get_many(cles)
+    manquants = {cle: time.time_ns() for cle in cles if cle not in jetons}
+    if manquants:
+        cache.set_many(manquants, None)
+        jetons.update(manquants)
+    return {
+        nom: hashlib.md5(' '.join(str(jetons[cle]) for cle in cles_bloc).encode()).hexdigest()[:12]
+        for nom, cles_bloc in blocs.items()
+    }
+
+
+def version_cache(*espaces, debut=None, fin=None, sections=None):
+    """Version d'une seule entrée (voir jetons_cache)"""
+    return versions_cache(entree=jetons_cache(*espaces, debut=debut, fin=fin, sections=sections))['entree']
+
+
+def changer_version(*espaces):
+    """Périme toutes les entrées et fragments qui dépendent des espaces donnés"""
+    jeton = time.time_ns()
+    cache.set_many({JETONS_ESPACES[espace]: jeton for espace in espaces}, None)
+
+
+def invalider_alertes():
+    """Périme les listes d'alertes en cache (signaux d'Alerte et AlerteIA, analyse IA en masse)"""
+    changer_version('alertes')
+
+
+def obtenir_en_cache(cle, calcul, duree=None):
+    """Valeur en cache sous cle, sinon calcul() mis en cache"""
+    valeur = cache.get(cle)
+    if valeur is None:
+        valeur = calcul()
+        cache.set(cle, valeur, duree or duree_cache())
+    return valeur
@@ -1,53 +1,125 @@
 import json
+from datetime import timedelta
 from decimal import Decimal
 
-def get_chart_data_for_dashboard():
-    """Données simplifiées pour graphiques"""
-    return json.dumps({
-        'months': ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim'],
-        'extrusion': [100, 120, 130, 110, 140, 125, 135],
-        'soudure': [80, 90, 85, 95, 100, 88, 92],
-        'dechets': [5, 6, 4, 7, 5, 6, 5],
-        'bache_noir': [60, 65, 70, 63, 68, 66, 69],
-    })
-
-def get_analytics_kpis():
-    """KPIs simplifiés pour Analytics"""
-    return {
-        'production_totale_mois': 15000,
-        'croissance_production': 12.5,
-        'taux_dechet_mois': 3.2,
-        'reduction_dechets': 2.3,
-        'efficacite_moyenne': 87.5,
-        'amélioration_efficacite': 3.2,
-        'taux_transformation': 78.5,
-        'amélioration_transformation': 5.1,
+from django.utils import timezone
+
+from ..models import AlerteIA, Machine
+from .agregats_utils import SECTIONS_PRODUCTION, calculer_agregats_jour
+from .cache_utils import cle_cache, jetons_cache, obtenir_en_cache, version_cache, versions_cache
+from .kpi_utils import bornes_periodes_mois, get_kpis_analytics
+from .machine_utils import get_zones_performance
+from .objectifs_utils import calculer_pourcentages_objectifs, get_objectifs_jour
+from .production_utils import (
+    get_dechets_totaux_jour, get_efficacite_moyenne_jour, get_extrusion_details_jour,
+    get_imprimerie_details_jour, get_production_section_jour, get_production_totale_jour,
+    get_recyclage_details_jour, get_soudure_details_jour,
+)
+from .series_utils import obtenir_series_production
+
+DETAILS_SECTIONS = {
+    'extrusion': get_extrusion_details_jour,
+    'imprimerie': get_imprimerie_details_jour,
+    'soudure': get_soudure_details_jour,
+    'recyclage': get_recyclage_details_jour,
+}
+
+def get_chart_data_for_dashboard(jours=7):
+    """Séries journalières des derniers jours pour le graphique du dashboard (JSON)"""
+    fin = timezone.localdate()
+    series = obtenir_series_production('jour', fin - timedelta(days=jours - 1), fin)
+    return json.dumps(dict(series, months=series['labels']))
+
+def get_analytics_kpis(reference=None):
+    """KPIs du mois en cours et écarts avec le mois précédent (voir kpi_utils)"""
+    return get_kpis_analytics(reference)
+
+def get_analytics_table_data(reference=None):
+    """Indicateurs par section du mois en cours"""
+    return get_kpis_analytics(reference)['sections']
+
+def versions_dashboard(date):
+    """
+    Versions des blocs du dashboard principal pour la date, en une lecture
+    du cache : 'jour' (métriques : résumés du mois, machines, objectifs),
+    une par section (ses seuls résumés) et 'analytics' (les deux mois des KPIs).
+    Servent de clés aux fragments {% cache %} de dashboard.html.
+    """
+    debut_kpis = bornes_periodes_mois(date)[2]
+    blocs = {
+        'jour': jetons_cache('machines', 'objectifs', debut=date),
+        'analytics': jetons_cache('objectifs', debut=debut_kpis, fin=date),
+    }
+    for section in SECTIONS_PRODUCTION:
+        blocs[section] = jetons_cache('machines', 'objectifs', debut=date, sections=(section,))
+    return versions_cache(**blocs)
+
+def calculer_donnees_dashboard(date):
+    """Indicateurs du jour du dashboard principal, en une passe sur les agrégats du jour"""
+    agregats = calculer_agregats_jour(date)
+
+    productions = {
+        section: get_production_section_jour(section, date, agregats) for section in SECTIONS_PRODUCTION
+    }
+    productions['total'] = get_production_totale_jour(date, agregats)
+    objectifs = get_objectifs_jour(date)
+    pourcentages = calculer_pourcentages_objectifs(productions, date)
+
+    donnees = {
+        'production_totale': productions['total'],
+        'pourcentage_production_totale': pourcentages['total'],
+        'objectif_total': objectifs['total'],
+        'total_dechets': get_dechets_totaux_jour(date, agregats),
+        'efficacite_moyenne': get_efficacite_moyenne_jour(date, agregats),
+        'zones_performance': get_zones_performance(date, agregats),
     }
+    for section in SECTIONS_PRODUCTION:
+        donnees[f'production_{section}'] = productions[section]
+        donnees[f'pourcentage_{section}'] = pourcentages[section]
+        donnees[f'objectif_{section}'] = objectifs[section]
+        donnees[f'{section}_stats'] = DETAILS_SECTIONS[section](date, agregats)
+    return donnees
 
-def get_analytics_table_data():
-    """Données tableau Analytics simplifiées"""
+def get_donnees_dashboard(date, version=None):
+    """
+    Indicateurs du jour mis en cache par date ; version : celle du bloc
+    'jour' de versions_dashboard(date), recalculée si absente
+    """
+    version = version or version_cache('machines', 'objectifs', debut=date)
+    return obtenir_en_cache(
+        cle_cache('dashboard', date=date, version=version),
+        lambda: calculer_donnees_dashboard(date),
+    )
+
+def _machine_dashboard_ia(machine):
     return {
-        'extrusion': {
-            'production': 8000,
-            'dechets': 224,
-            'taux_dechet': 2.8,
-            'efficacite': 89.2,
-        },
-        'imprimerie': {
-            'production': 3500,
-            'dechets': 108.5,
-            'taux_dechet': 3.1,
-            'efficacite': 91.5,
-        },
-        'soudure': {
-            'production': 2500,
-            'dechets': 95,
-            'taux_dechet': 3.8,
-            'efficacite': 85.3,
-        },
-        'recyclage': {
-            'production': 1000,
-            'taux_transformation': 78.2,
-            'rendement': 82.5,
-        },
-    }
\ No newline at end of file
+        'id': machine.id,
+        'numero': machine.numero,
+        'section': machine.section,
+        'get_section_display': machine.get_section_display(),
+        'probabilite_panne_7_jours': machine.probabilite_panne_7_jours or 0,
+        'score_sante_global': machine.score_sante_global or 0,
+    }
+
+def get_machines_dashboard_ia(version=None):
+    """
+    Machines affichées par le dashboard IA (5 critiques, 10 actives), mises
+    en cache jusqu'à la prochaine modification du parc
+    """
+    version = version or version_cache('machines')
+
+    def calculer():
+        machines = [_machine_dashboard_ia(machine) for machine in Machine.objects.filter(etat='actif')[:10]]
+        return {'machines_critiques': machines[:5], 'machines_actives': machines}
+
+    return obtenir_en_cache(cle_cache('dashboard_ia', version=version), calculer)
+
+def get_alertes_dashboard_ia(limite=5):
+    """Alertes IA ouvertes les plus prioritaires, en cache jusqu'au prochain enregistrement d'alerte"""
+    return obtenir_en_cache(
+        cle_cache('alertes_ia', version=version_cache('alertes', 'machines')),
+        lambda: list(
+            AlerteIA.objects.filter(statut__in=['nouvelle', 'vue', 'en_traitement'])
+            .select_related('machine').order_by('-priorite', '-date_creation')[:limite]
+        ),
+    )
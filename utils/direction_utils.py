@@ -0,0 +1,192 @@
+import hashlib
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models import IndicateursDirectionMois, ResumeProductionJour
+from .agregats_utils import SECTIONS_PRODUCTION, ZERO
+from .cache_utils import cle_cache, obtenir_en_cache, version_cache
+from .kpi_utils import CUMULS_KPI, cumuls_vides, indicateurs_section
+from .production_utils import get_objectif_section
+
+# Prix, coûts (FCFA / kg) et objectifs mensuels par défaut,
+# surchargeables par SOFEMCI_CONFIG['DIRECTION_*']
+PRIX_VENTE_KG_DEFAUT = {section: 320 for section in SECTIONS_PRODUCTION}
+COUT_MATIERE_KG_DEFAUT = 600
+COUT_TRANSFORMATION_KG_DEFAUT = {section: 0 for section in SECTIONS_PRODUCTION}
+OBJECTIFS_MENSUELS_DEFAUT = {
+    'chiffre_affaires': 50000000,
+    'production_kg': 150000,
+    'rendement': 85,
+    'cout_kg': 850,
+}
+
+NOMS_SECTIONS = {code: nom for code, nom in ResumeProductionJour.SECTIONS_CHOICES}
+
+CENTIEME = Decimal('0.01')
+
+
+def _decimal(valeur):
+    return Decimal(str(valeur))
+
+
+def parametres_direction():
+    """Prix de vente et coûts en vigueur (chaînes décimales, conservées dans les instantanés)"""
+    config = settings.SOFEMCI_CONFIG
+    prix = dict(PRIX_VENTE_KG_DEFAUT, **config.get('DIRECTION_PRIX_VENTE_KG', {}))
+    transformation = dict(COUT_TRANSFORMATION_KG_DEFAUT, **config.get('DIRECTION_COUT_TRANSFORMATION_KG', {}))
+    return {
+        'prix_vente_kg': {section: str(_decimal(prix[section])) for section in SECTIONS_PRODUCTION},
+        'cout_matiere_kg': str(_decimal(config.get('DIRECTION_COUT_MATIERE_KG', COUT_MATIERE_KG_DEFAUT))),
+        'cout_transformation_kg': {
+            section: str(_decimal(transformation[section])) for section in SECTIONS_PRODUCTION
+        },
+    }
+
+
+def objectifs_direction():
+    objectifs = dict(OBJECTIFS_MENSUELS_DEFAUT, **settings.SOFEMCI_CONFIG.get('DIRECTION_OBJECTIFS_MENSUELS', {}))
+    return {cle: _decimal(valeur) for cle, valeur in objectifs.items()}
+
+
+def _fin_mois(mois):
+    return (mois + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def _ratio(numerateur, denominateur, facteur=1):
+    if not denominateur:
+        return ZERO
+    return Decimal(numerateur) / Decimal(denominateur) * facteur
+
+
+def calculer_indicateurs_direction(mois, parametres=None):
+    """
+    Indicateurs direction d'un mois en une requête groupée par section sur
+    les résumés journaliers. Retourne les valeurs des champs de
+    IndicateursDirectionMois.
+
+    Chiffre d'affaires : production de chaque section x son prix de vente.
+    Coût : matière première extrusion x coût matière, plus le coût de
+    transformation par kg de chaque section, rapporté à la production totale.
+    Performance d'une section : production / objectif journalier x jours produits.
+    """
+    parametres = parametres or parametres_direction()
+    debut = mois.replace(day=1)
+    fin = _fin_mois(debut)
+
+    cumuls = {section: dict(cumuls_vides(), matiere_premiere=ZERO) for section in SECTIONS_PRODUCTION}
+    lignes = (
+        ResumeProductionJour.objects
+        .filter(date_production__range=(debut, fin))
+        .values('section')
+        .order_by()
+        .annotate(matiere_premiere=Sum('matiere_premiere_kg'), **CUMULS_KPI)
+    )
+    for ligne in lignes:
+        for cle, valeur in ligne.items():
+            if cle != 'section' and valeur is not None:
+                cumuls[ligne['section']][cle] = valeur
+
+    jours_production = max(valeurs['jours'] for valeurs in cumuls.values())
+    cout_matiere = _decimal(parametres['cout_matiere_kg'])
+
+    sections = {}
+    chiffre_affaires = cout_total = production_totale = ZERO
+    dechets = production_avec_dechets = ZERO
+    for section, valeurs in cumuls.items():
+        indicateurs = indicateurs_section(section, valeurs, fin)
+        production = valeurs['production']
+
+        cout = production * _decimal(parametres['cout_transformation_kg'][section])
+        if section == 'extrusion':
+            cout += valeurs['matiere_premiere'] * cout_matiere
+        ca = production * _decimal(parametres['prix_vente_kg'][section])
+
+        chiffre_affaires += ca
+        cout_total += cout
+        production_totale += production
+        if section != 'recyclage':
+            dechets += valeurs['dechets']
+            production_avec_dechets += production + valeurs['dechets']
+
+        rendement = indicateurs['taux_transformation'] if section == 'recyclage' else indicateurs['efficacite']
+        sections[section] = {
+            'production': float(production),
+            'dechets': float(valeurs['dechets']),
+            'taux_dechet': round(float(indicateurs['taux_dechet']), 1),
+            'rendement': round(float(rendement), 1),
+            'chiffre_affaires': float(ca),
+            'cout_kg': round(float(_ratio(cout, production)), 0),
+            'performance': round(float(_ratio(
+                production, get_objectif_section(section, fin) * valeurs['jours'], 100
+            )), 1),
+        }
+
+    extrusion = cumuls['extrusion']
+    return {
+        'chiffre_affaires': chiffre_affaires.quantize(CENTIEME),
+        'production_totale_kg': production_totale.quantize(CENTIEME),
+        'cout_production_kg': _ratio(cout_total, production_totale).quantize(CENTIEME),
+        'rendement_global': _ratio(extrusion['somme_rendements'], extrusion['nombre_rendements']).quantize(CENTIEME),
+        'taux_dechet': _ratio(dechets, production_avec_dechets, 100).quantize(CENTIEME),
+        'jours_production': jours_production,
+        'sections': sections,
+        'parametres': parametres,
+    }
+
+
+def indicateurs_direction(mois=None, recalculer=False):
+    """
+    Indicateurs direction d'un mois (mois en cours par défaut).
+
+    Mois écoulé : lu dans IndicateursDirectionMois, calculé et figé au
+    premier accès (recalculer=True force le calcul avec les prix actuels).
+    Mois en cours : calculé et mis en cache, clé liée à la version des
+    résumés du mois et des objectifs, et aux paramètres de prix.
+    """
+    mois_courant = timezone.localdate().replace(day=1)
+    mois = (mois or mois_courant).replace(day=1)
+
+    if mois >= mois_courant:
+        parametres = parametres_direction()
+        empreinte = hashlib.md5(json.dumps(parametres, sort_keys=True).encode()).hexdigest()[:8]
+        version = version_cache('objectifs', debut=mois, fin=_fin_mois(mois))
+        valeurs = obtenir_en_cache(
+            cle_cache('direction', date=mois, version=f'{empreinte}:{version}'),
+            lambda: calculer_indicateurs_direction(mois, parametres),
+        )
+        return dict(valeurs, mois=mois, fige=False)
+
+    if not recalculer:
+        instantane = IndicateursDirectionMois.objects.filter(mois=mois).first()
+        if instantane is not None:
+            valeurs = {
+                champ.name: getattr(instantane, champ.name)
+                for champ in IndicateursDirectionMois._meta.concrete_fields
+                if champ.name not in ('id', 'mois', 'date_calcul')
+            }
+            return dict(valeurs, mois=mois, fige=True)
+
+    valeurs = calculer_indicateurs_direction(mois)
+    IndicateursDirectionMois.objects.update_or_create(mois=mois, defaults=valeurs)
+    return dict(valeurs, mois=mois, fige=True)
+
+
+def performances_sections_direction(indicateurs):
+    """Lignes du tableau des sections du dashboard direction"""
+    return [
+        {
+            'code': section,
+            'nom': NOMS_SECTIONS[section],
+            'production': valeurs['production'],
+            'rendement': valeurs['rendement'],
+            'dechets': valeurs['taux_dechet'],
+            'cout': valeurs['cout_kg'],
+            'performance': valeurs['performance'],
+        }
+        for section, valeurs in indicateurs['sections'].items()
+    ]
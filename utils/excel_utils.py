@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from tempfile import SpooledTemporaryFile
+
+from django.http import FileResponse
+
+from .export_utils import parcourir_par_cle
+
+CONTENT_TYPE_EXCEL = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Au-delà, le classeur en cours d'écriture passe de la mémoire à un fichier temporaire
+TAILLE_MAX_MEMOIRE_EXCEL = 10 * 1024 * 1024
+
+FORMAT_DATE = 'DD/MM/YYYY'
+FORMAT_ENTIER = '#,##0'
+FORMAT_DECIMAL = '#,##0.00'
+FORMAT_POURCENTAGE = '0.00%'
+
+
+@dataclass(frozen=True)
+class ColonneExcel:
+    """Colonne d'un export : champ values_list(), en-tête, largeur et format fixés d'avance"""
+    champ: str
+    en_tete: str
+    largeur: int = 12
+    format: str = None
+    # Conversion de la valeur brute (ex. booléen -> libellé)
+    conversion: object = None
+
+
+def statut_validation(valide):
+    return 'Validé' if valide else 'En attente'
+
+
+def heure_courte(heure):
+    return heure.strftime('%H:%M') if heure else ''
+
+
+def pourcentage(valeur):
+    """Pourcentage stocké 0-100 -> fraction, pour le format Excel 0.00%"""
+    return float(valeur) / 100 if valeur is not None else 0
+
+
+def _valeur_cellule(valeur):
+    if isinstance(valeur, Decimal):
+        return float(valeur)
+    return valeur
+
+
+def ecrire_classeur_excel(colonnes, lignes, titre, nom_feuille='Export', couleur='1A4B8C'):
+    """
+    Écrit un classeur openpyxl en mode write-only et le retourne sous forme de
+    fichier temporaire rembobiné.
+
+    Les lignes sont écrites au fil de l'itération (aucune cellule conservée en
+    mémoire) ; largeurs et formats sont posés une fois par colonne au lieu
+    d'une seconde passe cellule par cellule. lignes : itérable de tuples dans
+    l'ordre des colonnes.
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(nom_feuille[:31])
+
+    for index, colonne in enumerate(colonnes, 1):
+        ws.column_dimensions[get_column_letter(index)].width = colonne.largeur
+    ws.freeze_panes = 'A5'
+
+    # Un style nommé par format : les cellules ne portent qu'une référence
+    styles = {}
+    for colonne in colonnes:
+        if colonne.format and colonne.format not in styles:
+            style = NamedStyle(name=f'sofemci_{len(styles)}', number_format=colonne.format)
+            wb.add_named_style(style)
+            styles[colonne.format] = style.name
+
+    titre_cell = WriteOnlyCell(ws, value=f'SOFEM-CI - {titre}')
+    titre_cell.font = Font(bold=True, size=16, color=couleur)
+    date_cell = WriteOnlyCell(ws, value=f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    date_cell.font = Font(size=11, color='666666')
+    ws.append([titre_cell])
+    ws.append([date_cell])
+    ws.append([])
+
+    police_en_tete = Font(bold=True, color='FFFFFF', size=12)
+    fond_en_tete = PatternFill(start_color=couleur, end_color=couleur, fill_type='solid')
+    centre = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    en_tetes = []
+    for colonne in colonnes:
+        cell = WriteOnlyCell(ws, value=colonne.en_tete)
+        cell.font = police_en_tete
+        cell.fill = fond_en_tete
+        cell.alignment = centre
+        en_tetes.append(cell)
+    ws.append(en_tetes)
+
+    formats = [
+        (colonne.conversion, styles.get(colonne.format))
+        for colonne in colonnes
+    ]
+    for ligne in lignes:
+        cellules = []
+        for valeur, (conversion, style) in zip(ligne, formats):
+            if conversion is not None:
+                valeur = conversion(valeur)
+            valeur = _valeur_cellule(valeur)
+            if style is not None and valeur is not None:
+                cell = WriteOnlyCell(ws, value=valeur)
+                cell.style = style
+                cellules.append(cell)
+            else:
+                cellules.append(valeur)
+        ws.append(cellules)
+
+    fichier = SpooledTemporaryFile(max_size=TAILLE_MAX_MEMOIRE_EXCEL)
+    wb.save(fichier)
+    fichier.seek(0)
+    return fichier
+
+
+def export_excel_queryset(queryset, colonnes, titre, nom_feuille='Export', couleur='1A4B8C',
+                          ordre=('date_production', 'id')):
+    """Classeur d'un queryset, lu par pages de values_list() (mémoire constante)"""
+    lignes = parcourir_par_cle(queryset, [colonne.champ for colonne in colonnes], ordre)
+    return ecrire_classeur_excel(colonnes, lignes, titre, nom_feuille, couleur)
+
+
+def reponse_excel(fichier, nom_fichier):
+    """Réponse de téléchargement lue par blocs depuis le fichier temporaire"""
+    return FileResponse(
+        fichier,
+        as_attachment=True,
+        filename=f'{nom_fichier}.xlsx',
+        content_type=CONTENT_TYPE_EXCEL,
+    )
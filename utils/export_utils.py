@@ -0,0 +1,226 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+
+from ..models import ResumeProductionJour
+
+SECTIONS_EXPORT = ['extrusion', 'imprimerie', 'soudure', 'recyclage']
+
+# Lignes lues par requête : la mémoire reste constante quelle que soit la période
+TAILLE_PAGE_EXPORT = 2000
+
+# Export détaillé d'une section : (champ ou chemin de relation, en-tête)
+CHAMPS_EXPORT = {
+    'extrusion': [
+        ('date_production', 'Date'),
+        ('zone__numero', 'Zone'),
+        ('equipe__nom', 'Équipe'),
+        ('heure_debut', 'Début'),
+        ('heure_fin', 'Fin'),
+        ('chef_zone', 'Chef de zone'),
+        ('matiere_premiere_kg', 'Matière première (kg)'),
+        ('nombre_machines_actives', 'Machines actives'),
+        ('nombre_machinistes', 'Machinistes'),
+        ('nombre_bobines_kg', 'Bobines (kg)'),
+        ('production_finis_kg', 'Produits finis (kg)'),
+        ('production_semi_finis_kg', 'Produits semi-finis (kg)'),
+        ('dechets_kg', 'Déchets (kg)'),
+        ('total_production_kg', 'Total production (kg)'),
+        ('rendement_pourcentage', 'Rendement (%)'),
+        ('taux_dechet_pourcentage', 'Taux de déchet (%)'),
+        ('valide', 'Validée'),
+    ],
+    'imprimerie': [
+        ('date_production', 'Date'),
+        ('heure_debut', 'Début'),
+        ('heure_fin', 'Fin'),
+        ('nombre_machines_actives', 'Machines actives'),
+        ('production_bobines_finies_kg', 'Bobines finies (kg)'),
+        ('production_bobines_semi_finies_kg', 'Bobines semi-finies (kg)'),
+        ('dechets_kg', 'Déchets (kg)'),
+        ('total_production_kg', 'Total production (kg)'),
+        ('taux_dechet_pourcentage', 'Taux de déchet (%)'),
+        ('valide', 'Validée'),
+    ],
+    'soudure': [
+        ('date_production', 'Date'),
+        ('heure_debut', 'Début'),
+        ('heure_fin', 'Fin'),
+        ('nombre_machines_actives', 'Machines actives'),
+        ('production_bobines_finies_kg', 'Bobines finies (kg)'),
+        ('production_bretelles_kg', 'Bretelles (kg)'),
+        ('production_rema_kg', 'Rema (kg)'),
+        ('production_batta_kg', 'Batta (kg)'),
+        ('production_sac_emballage_kg', 'Sacs d\'emballage (kg)'),
+        ('dechets_kg', 'Déchets (kg)'),
+        ('total_production_specifique_kg', 'Production spécifique (kg)'),
+        ('total_production_kg', 'Total production (kg)'),
+        ('taux_dechet_pourcentage', 'Taux de déchet (%)'),
+        ('valide', 'Validée'),
+    ],
+    'recyclage': [
+        ('date_production', 'Date'),
+        ('equipe__nom', 'Équipe'),
+        ('nombre_moulinex', 'Moulinex'),
+        ('production_broyage_kg', 'Broyage (kg)'),
+        ('production_bache_noir_kg', 'Bâche noire (kg)'),
+        ('total_production_kg', 'Total production (kg)'),
+        ('production_par_moulinex', 'Production par moulinex (kg)'),
+        ('taux_transformation_pourcentage', 'Taux de transformation (%)'),
+        ('valide', 'Validée'),
+    ],
+}
+
+# Export multi-sections : colonnes communes (None = sans objet pour la section)
+EN_TETES_COMMUNS = [
+    'Section', 'Date', 'Zone', 'Équipe', 'Total production (kg)',
+    'Déchets (kg)', 'Machines actives', 'Validée',
+]
+CHAMPS_COMMUNS = {
+    'extrusion': ['date_production', 'zone__numero', 'equipe__nom', 'total_production_kg',
+                  'dechets_kg', 'nombre_machines_actives', 'valide'],
+    'imprimerie': ['date_production', None, None, 'total_production_kg',
+                   'dechets_kg', 'nombre_machines_actives', 'valide'],
+    'soudure': ['date_production', None, None, 'total_production_kg',
+                'dechets_kg', 'nombre_machines_actives', 'valide'],
+    'recyclage': ['date_production', None, 'equipe__nom', 'total_production_kg',
+                  None, 'nombre_moulinex', 'valide'],
+}
+
+EN_TETES_COMPARATIF = [
+    'Section', 'Période', 'Début', 'Fin', 'Productions', 'Productions validées',
+    'Total production (kg)', 'Déchets (kg)', 'Taux de déchet (%)',
+]
+
+
+def formater_valeur(valeur):
+    """Valeur de base -> cellule texte (dates ISO, décimaux sans notation exponentielle)"""
+    if valeur is None:
+        return ''
+    if isinstance(valeur, bool):
+        return 'Oui' if valeur else 'Non'
+    if isinstance(valeur, Decimal):
+        return f'{valeur:f}'
+    if isinstance(valeur, (date, datetime, time)):
+        return valeur.isoformat()
+    return valeur
+
+
+def _apres(ordre, valeurs):
+    """Filtre « strictement après » la clé valeurs dans l'ordre lexicographique ordre"""
+    condition = Q()
+    for index, champ in enumerate(ordre):
+        egalites = {ordre[i]: valeurs[i] for i in range(index)}
+        condition |= Q(**egalites, **{f'{champ}__gt': valeurs[index]})
+    return condition
+
+
+def parcourir_par_cle(queryset, champs, ordre=('date_production', 'id'), taille_page=TAILLE_PAGE_EXPORT):
+    """
+    Génère les tuples values_list(*champs) d'un queryset trié selon ordre,
+    page par page (ordre doit se terminer par une clé unique, sans NULL).
+
+    Pagination par clé plutôt que .iterator() : le pilote MySQL charge tout
+    le résultat d'une requête en mémoire côté client, alors que chaque page
+    ici est une requête bornée à taille_page lignes.
+    """
+    base = queryset.order_by(*ordre)
+
+    # Champs de la clé ajoutés en fin de tuple s'ils ne sont pas demandés
+    nombre = len(champs)
+    colonnes = list(champs) + [champ for champ in ordre if champ not in champs]
+    index_cle = [colonnes.index(champ) for champ in ordre]
+    derniere = None
+
+    while True:
+        page = base if derniere is None else base.filter(_apres(ordre, derniere))
+        lignes = list(page.values_list(*colonnes)[:taille_page])
+        if not lignes:
+            return
+        for ligne in lignes:
+            yield ligne[:nombre]
+        derniere = [lignes[-1][index] for index in index_cle]
+        if len(lignes) < taille_page:
+            return
+
+
+def parcourir_production(section, debut, fin, champs, taille_page=TAILLE_PAGE_EXPORT):
+    """Saisies d'une section sur [debut, fin], par date puis id"""
+    modele = ResumeProductionJour.modele_section(section)
+    return parcourir_par_cle(
+        modele.objects.filter(date_production__range=(debut, fin)),
+        champs,
+        taille_page=taille_page
+    )
+
+
+def lignes_section(section, debut, fin):
+    """Export détaillé d'une section : en-tête puis une ligne par saisie"""
+    champs, en_tetes = zip(*CHAMPS_EXPORT[section])
+    yield list(en_tetes)
+    for ligne in parcourir_production(section, debut, fin, champs):
+        yield [formater_valeur(valeur) for valeur in ligne]
+
+
+def lignes_multi_sections(sections, debut, fin):
+    """Export multi-sections : en-tête commun puis les saisies section par section"""
+    yield EN_TETES_COMMUNS
+    for section in sections:
+        colonnes = CHAMPS_COMMUNS[section]
+        champs = [champ for champ in colonnes if champ]
+        libelle = section.capitalize()
+        for ligne in parcourir_production(section, debut, fin, champs):
+            valeurs = iter(ligne)
+            yield [libelle] + [
+                formater_valeur(next(valeurs)) if champ else ''
+                for champ in colonnes
+            ]
+
+
+def totaux_section(section, debut, fin):
+    """Totaux d'une section sur une période, en une requête"""
+    modele = ResumeProductionJour.modele_section(section)
+    expressions = {
+        'productions': Count('id'),
+        'validees': Count('id', filter=Q(valide=True)),
+        'total': Sum('total_production_kg'),
+    }
+    if section != 'recyclage':
+        expressions['dechets'] = Sum('dechets_kg')
+    totaux = modele.objects.filter(date_production__range=(debut, fin)).aggregate(**expressions)
+
+    total = totaux['total'] or Decimal('0')
+    dechets = totaux.get('dechets') or Decimal('0')
+    taux = dechets / (total + dechets) * 100 if total + dechets > 0 else Decimal('0')
+    return {
+        'productions': totaux['productions'],
+        'validees': totaux['validees'],
+        'total': total,
+        'dechets': dechets if section != 'recyclage' else None,
+        'taux_dechet': round(taux, 2) if section != 'recyclage' else None,
+    }
+
+
+def lignes_comparatif(periodes, sections):
+    """Comparatif : une ligne de totaux par section et par période (libellé, debut, fin)"""
+    yield EN_TETES_COMPARATIF
+    for section in sections:
+        for libelle, debut, fin in periodes:
+            totaux = totaux_section(section, debut, fin)
+            yield [formater_valeur(valeur) for valeur in (
+                section.capitalize(), libelle, debut, fin,
+                totaux['productions'], totaux['validees'], totaux['total'],
+                totaux['dechets'], totaux['taux_dechet'],
+            )]
+
+
+def bornes_semaine(jour):
+    debut = jour - timedelta(days=jour.weekday())
+    return debut, debut + timedelta(days=6)
+
+
+def bornes_mois(annee, mois):
+    debut = date(annee, mois, 1)
+    suivant = date(annee + 1, 1, 1) if mois == 12 else date(annee, mois + 1, 1)
+    return debut, suivant - timedelta(days=1)
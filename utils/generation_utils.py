@@ -0,0 +1,423 @@
+import logging
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ..models import (
+    AlerteIA, Equipe, HistoriqueMachine, Machine, MesureCapteur, ProductionExtrusion,
+    ProductionImprimerie, ProductionRecyclage, ProductionSoudure, ResumeProductionJour,
+    ZoneExtrusion,
+)
+from .export_utils import bornes_mois
+
+logger = logging.getLogger('sofemci')
+
+TAILLE_LOT_GENERATION = 5000
+
+# Préfixe des numéros de machines générées (unique avec la section)
+PREFIXE_MACHINE_CHARGE = 'CHG'
+OBSERVATION_CHARGE = 'Données de charge'
+
+# section -> (part du parc, type de machine)
+REPARTITION_MACHINES = {
+    'extrusion': (0.60, 'extrudeuse'),
+    'imprimerie': (0.15, 'imprimante'),
+    'soudure': (0.15, 'soudeuse'),
+    'recyclage': (0.10, 'moulinex'),
+}
+ETATS_MACHINES = [('actif', 85), ('maintenance', 7), ('arret', 5), ('panne', 3)]
+
+# Créneaux des sections sans équipe en base (imprimerie, soudure)
+CRENEAUX = [(time(6, 0), time(14, 0)), (time(14, 0), time(22, 0)), (time(22, 0), time(6, 0))]
+
+
+@dataclass(frozen=True)
+class ParametresGeneration:
+    """Paramètres transmis tels quels aux processus de génération (sérialisables)"""
+    graine: int
+    debut: date
+    fin: date
+    zones: tuple            # ids des zones d'extrusion
+    equipes: tuple          # (id, heure_debut, heure_fin)
+    machines: tuple         # (id, section)
+    utilisateur_id: int
+    jours_telemetrie: int = 30
+    mesures_par_jour: int = 24
+    taille_lot: int = TAILLE_LOT_GENERATION
+
+
+def generateur_aleatoire(graine, *unite):
+    """
+    Générateur propre à une unité de travail : le résultat ne dépend que de
+    la graine et de l'unité, pas du nombre de processus ni de leur ordre.
+    """
+    return random.Random(':'.join(map(str, (graine,) + unite)))
+
+
+def _kg(centiemes):
+    """Entier en centièmes -> Decimal à 2 décimales (sans passer par float)"""
+    return Decimal(int(centiemes)).scaleb(-2)
+
+
+def _ratio(numerateur, denominateur, facteur=1):
+    """numerateur / denominateur * facteur arrondi à 2 décimales (0 si dénominateur nul)"""
+    if not denominateur:
+        return Decimal('0.00')
+    return _kg(round(numerateur * facteur * 100 / denominateur))
+
+
+def _creer_par_lots(modele, objets, taille_lot):
+    for debut in range(0, len(objets), taille_lot):
+        modele.objects.bulk_create(objets[debut:debut + taille_lot], batch_size=taille_lot)
+    return len(objets)
+
+
+# ========================================
+# Référentiel (processus principal)
+# ========================================
+
+def preparer_referentiel(nombre_zones, nombre_machines, graine):
+    """
+    Crée les zones et machines manquantes et retourne (zones, machines) sous
+    forme d'identifiants. Relancer avec les mêmes paramètres ne duplique rien.
+    """
+    ZoneExtrusion.objects.bulk_create([
+        ZoneExtrusion(numero=numero, nom=f'Zone {numero}', nombre_machines_max=8)
+        for numero in range(1, nombre_zones + 1)
+    ], ignore_conflicts=True)
+    zones = tuple(
+        ZoneExtrusion.objects.filter(numero__lte=nombre_zones).order_by('numero').values_list('id', flat=True)
+    )
+
+    rng = generateur_aleatoire(graine, 'machines')
+    etats, poids = zip(*ETATS_MACHINES)
+    aujourd_hui = timezone.localdate()
+    machines = []
+    numero = 0
+    for section, (part, type_machine) in REPARTITION_MACHINES.items():
+        for rang in range(max(1, round(nombre_machines * part))):
+            numero += 1
+            temperature_nominale = rng.randint(6000, 9000)
+            consommation_nominale = rng.randint(2000, 8000)
+            probabilite_7 = rng.betavariate(1.2, 8) * 10000
+            machines.append(Machine(
+                numero=f'{PREFIXE_MACHINE_CHARGE}{numero:04d}',
+                type_machine=type_machine,
+                section=section,
+                zone_extrusion_id=zones[rang % len(zones)] if section == 'extrusion' and zones else None,
+                etat=rng.choices(etats, poids)[0],
+                date_installation=aujourd_hui - timedelta(days=rng.randint(365, 365 * 12)),
+                derniere_maintenance=aujourd_hui - timedelta(days=rng.randint(1, 120)),
+                provenance=rng.choice([code for code, _ in Machine.PROVENANCE_CHOICES]),
+                est_nouvelle=rng.random() < 0.7,
+                heures_fonctionnement_totales=_kg(rng.randint(500000, 6000000)),
+                heures_depuis_derniere_maintenance=_kg(rng.randint(0, 250000)),
+                frequence_maintenance_jours=rng.choice([30, 60, 90]),
+                nombre_pannes_totales=rng.randint(0, 40),
+                nombre_pannes_6_derniers_mois=rng.randint(0, 5),
+                nombre_pannes_1_dernier_mois=rng.randint(0, 2),
+                consommation_electrique_nominale=_kg(consommation_nominale),
+                consommation_electrique_kwh=_kg(consommation_nominale * rng.randint(85, 125) // 100),
+                temperature_nominale=_kg(temperature_nominale),
+                temperature_max_autorisee=_kg(temperature_nominale + 2000),
+                temperature_actuelle=_kg(temperature_nominale + rng.randint(-500, 2500)),
+                probabilite_panne_7_jours=_kg(probabilite_7),
+                probabilite_panne_30_jours=_kg(min(9999, probabilite_7 * 2)),
+                score_sante_global=_kg(10000 - probabilite_7),
+                observations=OBSERVATION_CHARGE,
+            ))
+    Machine.objects.bulk_create(machines, batch_size=TAILLE_LOT_GENERATION, ignore_conflicts=True)
+
+    machines = tuple(
+        Machine.objects.filter(numero__startswith=PREFIXE_MACHINE_CHARGE)
+        .order_by('id').values_list('id', 'section')
+    )
+    return zones, machines
+
+
+def equipes_disponibles():
+    return tuple(Equipe.objects.order_by('nom').values_list('id', 'heure_debut', 'heure_fin'))
+
+
+# ========================================
+# Unités de travail (exécutables en parallèle)
+# ========================================
+
+def _jours(debut, fin):
+    jour = debut
+    while jour <= fin:
+        yield jour
+        jour += timedelta(days=1)
+
+
+def _productions_jour(params, jour, rng, recente):
+    """Saisies des quatre sections pour un jour, champs calculés inclus (save() non appelé)"""
+    taux_validation = 0.3 if recente else 0.95
+    communs = {
+        'date_production': jour,
+        'cree_par_id': params.utilisateur_id,
+        'observations': OBSERVATION_CHARGE,
+    }
+    extrusion, imprimerie, soudure, recyclage = [], [], [], []
+
+    for zone_id in params.zones:
+        for equipe_id, heure_debut, heure_fin in params.equipes:
+            if rng.random() > 0.85:
+                continue
+            matiere = rng.randint(80000, 150000)
+            finis = matiere * rng.randint(65, 75) // 100
+            semi_finis = matiere * rng.randint(15, 25) // 100
+            dechets = matiere * rng.randint(2, 5) // 100
+            total = finis + semi_finis
+            machines = rng.randint(2, 4)
+            extrusion.append(ProductionExtrusion(
+                zone_id=zone_id, equipe_id=equipe_id, heure_debut=heure_debut, heure_fin=heure_fin,
+                chef_zone=f'Chef zone {zone_id}',
+                matiere_premiere_kg=_kg(matiere), nombre_machines_actives=machines,
+                nombre_machinistes=rng.randint(3, 6), nombre_bobines_kg=_kg(total),
+                production_finis_kg=_kg(finis), production_semi_finis_kg=_kg(semi_finis),
+                dechets_kg=_kg(dechets), total_production_kg=_kg(total),
+                rendement_pourcentage=_ratio(total, matiere, 100),
+                taux_dechet_pourcentage=_ratio(dechets, total + dechets, 100),
+                production_par_machine=_ratio(total, machines * 100),
+                valide=rng.random() < taux_validation, **communs
+            ))
+
+    for heure_debut, heure_fin in CRENEAUX:
+        finies = rng.randint(40000, 90000)
+        semi_finies = rng.randint(5000, 20000)
+        dechets = rng.randint(1000, 5000)
+        total = finies + semi_finies
+        imprimerie.append(ProductionImprimerie(
+            heure_debut=heure_debut, heure_fin=heure_fin, nombre_machines_actives=rng.randint(1, 3),
+            production_bobines_finies_kg=_kg(finies), production_bobines_semi_finies_kg=_kg(semi_finies),
+            dechets_kg=_kg(dechets), total_production_kg=_kg(total),
+            taux_dechet_pourcentage=_ratio(dechets, total + dechets, 100),
+            valide=rng.random() < taux_validation, **communs
+        ))
+
+        bobines = rng.randint(30000, 60000)
+        specifiques = [rng.randint(5000, 20000) for _ in range(4)]
+        dechets = rng.randint(1000, 4000)
+        total_specifique = sum(specifiques)
+        total = bobines + total_specifique
+        soudure.append(ProductionSoudure(
+            heure_debut=heure_debut, heure_fin=heure_fin, nombre_machines_actives=rng.randint(2, 5),
+            production_bobines_finies_kg=_kg(bobines),
+            production_bretelles_kg=_kg(specifiques[0]), production_rema_kg=_kg(specifiques[1]),
+            production_batta_kg=_kg(specifiques[2]), production_sac_emballage_kg=_kg(specifiques[3]),
+            dechets_kg=_kg(dechets), total_production_specifique_kg=_kg(total_specifique),
+            total_production_kg=_kg(total),
+            taux_dechet_pourcentage=_ratio(dechets, total + dechets, 100),
+            valide=rng.random() < taux_validation, **communs
+        ))
+
+    for equipe_id, _, _ in params.equipes:
+        broyage = rng.randint(20000, 60000)
+        bache = broyage * rng.randint(40, 80) // 100
+        moulinex = rng.randint(1, 4)
+        total = broyage + bache
+        recyclage.append(ProductionRecyclage(
+            equipe_id=equipe_id, nombre_moulinex=moulinex,
+            production_broyage_kg=_kg(broyage), production_bache_noir_kg=_kg(bache),
+            total_production_kg=_kg(total), production_par_moulinex=_ratio(total, moulinex * 100),
+            taux_transformation_pourcentage=_ratio(bache, broyage, 100),
+            valide=rng.random() < taux_validation, **communs
+        ))
+
+    return extrusion, imprimerie, soudure, recyclage
+
+
+def generer_productions(params, debut, fin):
+    """Productions des quatre sections sur [debut, fin]"""
+    limite_recente = params.fin - timedelta(days=7)
+    lots = ([], [], [], [])
+    for jour in _jours(debut, fin):
+        rng = generateur_aleatoire(params.graine, 'production', jour.isoformat())
+        for lot, lignes in zip(lots, _productions_jour(params, jour, rng, jour > limite_recente)):
+            lot.extend(lignes)
+
+    modeles = (ProductionExtrusion, ProductionImprimerie, ProductionSoudure, ProductionRecyclage)
+    return {
+        modele._meta.model_name: _creer_par_lots(modele, lot, params.taille_lot)
+        for modele, lot in zip(modeles, lots)
+    }
+
+
+def generer_historique(params, debut, fin):
+    """Maintenances, pannes/réparations et relevés hebdomadaires des machines sur [debut, fin]"""
+    evenements = []
+    nombre_jours = (fin - debut).days + 1
+    for machine_id, _ in params.machines:
+        rng = generateur_aleatoire(params.graine, 'historique', machine_id, debut.isoformat())
+
+        def instant(jour_index, heure=None):
+            moment = datetime.combine(
+                debut + timedelta(days=jour_index),
+                time(heure if heure is not None else rng.randint(0, 23), rng.randint(0, 59))
+            )
+            return timezone.make_aware(moment)
+
+        def evenement(type_evenement, moment, **valeurs):
+            evenements.append(HistoriqueMachine(
+                machine_id=machine_id, type_evenement=type_evenement, date_evenement=moment,
+                description=OBSERVATION_CHARGE, **valeurs
+            ))
+
+        for jour_index in range(0, nombre_jours, 7):
+            evenement(
+                'mesure', instant(jour_index, 8),
+                temperature=_kg(rng.randint(6000, 9500)),
+                consommation_kwh=_kg(rng.randint(2000, 9000)),
+            )
+        if rng.random() < 0.4:
+            evenement(
+                'maintenance', instant(rng.randrange(nombre_jours)),
+                duree_arret=_kg(rng.randint(100, 800)), cout_intervention=_kg(rng.randint(5000000, 30000000)),
+                technicien='Équipe maintenance',
+            )
+        if rng.random() < 0.08:
+            jour_panne = rng.randrange(nombre_jours)
+            evenement('panne', instant(jour_panne))
+            evenement(
+                'reparation', instant(min(jour_panne + rng.randint(0, 2), nombre_jours - 1)),
+                duree_arret=_kg(rng.randint(200, 4800)), cout_intervention=_kg(rng.randint(10000000, 90000000)),
+            )
+
+    return {'historiquemachine': _creer_par_lots(HistoriqueMachine, evenements, params.taille_lot)}
+
+
+def generer_telemetrie(params, jour):
+    """Mesures capteurs brutes d'un jour, mesures_par_jour relevés par machine"""
+    pas = timedelta(days=1) / params.mesures_par_jour
+    minuit = timezone.make_aware(datetime.combine(jour, time()))
+    age_jours = (params.fin - jour).days
+    mesures = []
+    for machine_id, _ in params.machines:
+        rng = generateur_aleatoire(params.graine, 'telemetrie', machine_id, jour.isoformat())
+        temperature = rng.randint(6000, 8500)
+        consommation = rng.randint(2000, 8000)
+        # Compteur horaire croissant d'un jour à l'autre
+        compteur = (machine_id % 500) * 1000 + (params.jours_telemetrie - age_jours) * 20
+        for rang in range(params.mesures_par_jour):
+            mesures.append(MesureCapteur(
+                machine_id=machine_id,
+                horodatage=minuit + rang * pas,
+                temperature=_kg(temperature + rng.randint(-300, 300)),
+                consommation_kwh=_kg(consommation + rng.randint(-400, 400)),
+                heures_fonctionnement=_kg((compteur + rang * 20 / params.mesures_par_jour) * 100),
+            ))
+    return {'mesurecapteur': _creer_par_lots(MesureCapteur, mesures, params.taille_lot)}
+
+
+def generer_alertes(params):
+    """Alertes IA ouvertes des machines les plus à risque (état courant du parc)"""
+    rng = generateur_aleatoire(params.graine, 'alertes')
+    alertes = []
+    for machine_id, section in params.machines:
+        if rng.random() > 0.15:
+            continue
+        probabilite = rng.randint(4000, 9500)
+        niveau = 'critique' if probabilite >= 8500 else 'urgent' if probabilite >= 7000 else 'attention'
+        alertes.append(AlerteIA(
+            machine_id=machine_id, niveau=niveau,
+            statut=rng.choice(['nouvelle', 'vue', 'en_traitement']),
+            titre=f'Risque de panne {section}', message=OBSERVATION_CHARGE,
+            probabilite_panne=_kg(probabilite), delai_estime_jours=rng.randint(1, 30),
+            confiance_prediction=_kg(rng.randint(6000, 9500)), priorite=probabilite // 1000,
+        ))
+    return {'alerteia': _creer_par_lots(AlerteIA, alertes, params.taille_lot)}
+
+
+def unites_generation(params):
+    """Découpage en unités indépendantes : productions et historique par mois, télémétrie par jour"""
+    unites = []
+    annee, mois = params.debut.year, params.debut.month
+    while date(annee, mois, 1) <= params.fin:
+        debut, fin = bornes_mois(annee, mois)
+        debut, fin = max(debut, params.debut), min(fin, params.fin)
+        unites += [('productions', debut, fin), ('historique', debut, fin)]
+        annee, mois = (annee + 1, 1) if mois == 12 else (annee, mois + 1)
+
+    if params.jours_telemetrie and params.mesures_par_jour:
+        premier = max(params.debut, params.fin - timedelta(days=params.jours_telemetrie - 1))
+        unites += [('telemetrie', jour) for jour in _jours(premier, params.fin)]
+    unites.append(('alertes',))
+    return unites
+
+
+def executer_unite(params, unite):
+    """
+    Exécute une unité de travail en une transaction (une unité interrompue
+    ne laisse rien en base) ; retourne {modèle: lignes créées}
+    """
+    type_unite, *bornes = unite
+    with transaction.atomic():
+        if type_unite == 'productions':
+            return generer_productions(params, *bornes)
+        if type_unite == 'historique':
+            return generer_historique(params, *bornes)
+        if type_unite == 'telemetrie':
+            return generer_telemetrie(params, *bornes)
+        return generer_alertes(params)
+
+
+def _initialiser_worker():
+    """Prépare Django dans un processus fils (y compris en démarrage « spawn »)"""
+    import django
+    django.setup()
+
+
+def _executer_pool(params, unites, processus, cumuler):
+    """
+    Exécute les unités sur un pool de processus, résultats cumulés dans
+    l'ordre des unités. Retourne les unités restant à exécuter si le pool
+    s'interrompt (BrokenProcessPool, OSError).
+    """
+    # Chaque processus fils doit ouvrir sa propre connexion
+    connections.close_all()
+
+    restantes = list(unites)
+    try:
+        with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser_worker) as pool:
+            futures = [pool.submit(executer_unite, params, unite) for unite in unites]
+            for unite, future in zip(unites, futures):
+                cumuler(unite, future.result())
+                restantes.remove(unite)
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f'Pool de génération indisponible ({e}), repli en mono-processus')
+    return restantes
+
+
+def generer_donnees_charge(params, processus=1, progression=None):
+    """
+    Génère toutes les unités (en parallèle si processus > 1, avec repli en
+    mono-processus sur les unités restantes si le pool échoue) puis reconstruit
+    les résumés de production de la période. progression(unite, resultat)
+    est appelée après chaque unité. Retourne {modèle: lignes créées}.
+    """
+    unites = unites_generation(params)
+    totaux = {}
+
+    def cumuler(unite, resultat):
+        for modele, nombre in resultat.items():
+            totaux[modele] = totaux.get(modele, 0) + nombre
+        if progression:
+            progression(unite, resultat)
+
+    if processus > 1:
+        unites = _executer_pool(params, unites, processus, cumuler)
+    for unite in unites:
+        cumuler(unite, executer_unite(params, unite))
+
+    totaux['resumeproductionjour'] = ResumeProductionJour.reconstruire(
+        date_debut=params.debut, date_fin=params.fin
+    )
+    logger.info(f'Données de charge générées : {totaux}')
+    return totaux
@@ -0,0 +1,276 @@
+import atexit
+import csv
+import io
+import json
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Machine, MesureCapteur
+from .telemetrie_utils import enregistrer_mesures
+
+logger = logging.getLogger('sofemci')
+
+# Colonnes acceptées dans un lot (JSON lines ou CSV avec en-tête)
+COLONNES_MESURE = ['machine_id', 'horodatage', 'temperature', 'consommation_kwh', 'heures_fonctionnement']
+COLONNES_VALEURS = COLONNES_MESURE[2:]
+
+# Nombre maximal d'erreurs détaillées renvoyées au capteur
+MAX_ERREURS_DETAILLEES = 20
+
+
+# ========================================
+# Lecture des lots
+# ========================================
+
+def _dans_bornes(colonne, valeur):
+    """
+    Valeur finie et représentable par le DecimalField de MesureCapteur : une
+    seule valeur hors limites ferait échouer l'insertion de tout le micro-lot
+    """
+    champ = MesureCapteur._meta.get_field(colonne)
+    limite = 10 ** (champ.max_digits - champ.decimal_places)
+    return math.isfinite(valeur) and abs(round(valeur, champ.decimal_places)) < limite
+
+
+def _normaliser_mesure(brute):
+    """Dict brut -> mesure prête pour enregistrer_mesures (ValueError si invalide)"""
+    try:
+        machine_id = int(brute['machine_id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('machine_id manquant ou invalide')
+
+    mesure = {'machine_id': machine_id}
+    for colonne in COLONNES_VALEURS:
+        valeur = brute.get(colonne)
+        if valeur not in (None, ''):
+            try:
+                mesure[colonne] = float(valeur)
+            except (TypeError, ValueError):
+                raise ValueError(f'{colonne} invalide : {valeur!r}')
+            if not _dans_bornes(colonne, mesure[colonne]):
+                raise ValueError(f'{colonne} hors limites : {valeur!r}')
+
+    if len(mesure) == 1:
+        raise ValueError('aucune valeur capteur')
+
+    horodatage = brute.get('horodatage')
+    if horodatage:
+        instant = parse_datetime(str(horodatage))
+        if instant is None:
+            raise ValueError(f'horodatage invalide : {horodatage!r}')
+        if timezone.is_naive(instant):
+            instant = timezone.make_aware(instant)
+        mesure['horodatage'] = instant
+
+    return mesure
+
+
+def lire_mesures(contenu, format_lot='jsonl'):
+    """
+    Décode un lot de mesures ('jsonl' : un objet JSON par ligne, 'csv' :
+    en-tête puis une mesure par ligne). Les lignes invalides sont écartées
+    sans rejeter le lot. Retourne (mesures, erreurs) avec erreurs =
+    [(numéro de ligne, message)].
+    """
+    if isinstance(contenu, bytes):
+        contenu = contenu.decode('utf-8')
+
+    if format_lot == 'csv':
+        lignes = enumerate(csv.DictReader(io.StringIO(contenu)), start=2)
+    else:
+        lignes = (
+            (numero, ligne)
+            for numero, ligne in enumerate(contenu.splitlines(), start=1)
+            if ligne.strip()
+        )
+
+    mesures = []
+    erreurs = []
+    for numero, ligne in lignes:
+        try:
+            brute = json.loads(ligne) if format_lot != 'csv' else ligne
+            if not isinstance(brute, dict):
+                raise ValueError('objet JSON attendu')
+            mesures.append(_normaliser_mesure(brute))
+        except ValueError as e:
+            # json.JSONDecodeError hérite de ValueError
+            erreurs.append((numero, str(e)))
+
+    return mesures, erreurs
+
+
+# ========================================
+# Tampon d'ingestion (micro-lots)
+# ========================================
+
+class TamponMesures:
+    """
+    Tampon mémoire des mesures reçues, partagé par les threads d'un processus.
+
+    Les requêtes d'ingestion ne font qu'ajouter au tampon ; il est écrit en
+    base (bulk_create des mesures + bulk_update des colonnes capteurs de
+    Machine) dès qu'il atteint taille_max mesures ou que la plus ancienne
+    attend depuis delai_max secondes. L'écriture se fait hors verrou : les
+    autres requêtes continuent d'alimenter un nouveau tampon pendant ce temps.
+
+    Un lot dont l'écriture échoue est journalisé puis remis en tête du tampon
+    pour la prochaine écriture, dans la limite de taille_reprise mesures (les
+    plus anciennes au-delà sont abandonnées) : l'erreur ne remonte jamais à la
+    requête d'ingestion qui a déclenché l'écriture.
+
+    Les mesures encore en mémoire sont perdues si le processus est tué
+    brutalement (elles sont écrites à l'arrêt normal via atexit).
+    """
+
+    def __init__(self, taille_max=5000, delai_max=1.0, taille_reprise=None):
+        self.taille_max = taille_max
+        self.delai_max = delai_max
+        self.taille_reprise = taille_reprise or 4 * taille_max
+        self._mesures = []
+        self._premiere = None
+        self._verrou = threading.Lock()
+        self._minuteur = None
+        self.statistiques = {'recues': 0, 'ecrites': 0, 'ignorees': 0, 'lots': 0, 'echecs': 0, 'perdues': 0}
+
+    def __len__(self):
+        return len(self._mesures)
+
+    def _extraire(self):
+        """À appeler sous verrou : détache le contenu courant du tampon"""
+        lot, self._mesures, self._premiere = self._mesures, [], None
+        return lot
+
+    def _expire(self):
+        return self._premiere is not None and time.monotonic() - self._premiere >= self.delai_max
+
+    def ajouter(self, mesures):
+        """Ajoute des mesures ; écrit le tampon si un seuil est atteint"""
+        lot = None
+        with self._verrou:
+            if mesures and self._premiere is None:
+                self._premiere = time.monotonic()
+            self._mesures.extend(mesures)
+            self.statistiques['recues'] += len(mesures)
+            if len(self._mesures) >= self.taille_max or self._expire():
+                lot = self._extraire()
+
+        if lot:
+            self._ecrire(lot)
+        self._demarrer_minuteur()
+        return len(mesures)
+
+    def vider(self):
+        """Écrit immédiatement tout le contenu du tampon"""
+        with self._verrou:
+            lot = self._extraire()
+        return self._ecrire(lot) if lot else 0
+
+    def vider_si_expire(self):
+        with self._verrou:
+            lot = self._extraire() if self._expire() else None
+        return self._ecrire(lot) if lot else 0
+
+    def _remettre(self, lot):
+        """Remet en tête du tampon un lot non écrit, borné à taille_reprise mesures"""
+        with self._verrou:
+            mesures = lot + self._mesures
+            perdues = max(0, len(mesures) - self.taille_reprise)
+            self._mesures = mesures[perdues:]
+            self.statistiques['echecs'] += 1
+            self.statistiques['perdues'] += perdues
+            if self._premiere is None:
+                self._premiere = time.monotonic()
+        if perdues:
+            logger.error(f'Télémétrie : {perdues} mesure(s) abandonnée(s), tampon de reprise plein')
+
+    def _ecrire(self, lot):
+        try:
+            return self._ecrire_lot(lot)
+        except Exception:
+            logger.exception(f'Télémétrie : écriture de {len(lot)} mesure(s) impossible, lot remis en tampon')
+            self._remettre(lot)
+            return 0
+
+    def _ecrire_lot(self, lot):
+        # Une mesure d'une machine inconnue ferait échouer tout le bulk_create
+        connues = set(Machine.objects.filter(
+            id__in={mesure['machine_id'] for mesure in lot}
+        ).values_list('id', flat=True))
+        valides = [mesure for mesure in lot if mesure['machine_id'] in connues]
+
+        ignorees = len(lot) - len(valides)
+        if ignorees:
+            logger.warning(f'Télémétrie : {ignorees} mesure(s) de machines inconnues ignorée(s)')
+
+        ecrites = enregistrer_mesures(valides) if valides else 0
+        with self._verrou:
+            self.statistiques['ecrites'] += ecrites
+            self.statistiques['ignorees'] += ignorees
+            self.statistiques['lots'] += 1
+        return ecrites
+
+    def _demarrer_minuteur(self):
+        """Thread de fond qui écrit le tampon expiré même sans nouvelle requête"""
+        if self._minuteur is not None and self._minuteur.is_alive():
+            return
+        with self._verrou:
+            if self._minuteur is not None and self._minuteur.is_alive():
+                return
+            self._minuteur = threading.Thread(
+                target=self._boucle_minuteur, name='tampon-telemetrie', daemon=True
+            )
+            self._minuteur.start()
+
+    def _boucle_minuteur(self):
+        while True:
+            time.sleep(self.delai_max / 2)
+            try:
+                self.vider_si_expire()
+            except Exception:
+                logger.exception('Écriture du tampon de télémétrie impossible')
+            finally:
+                close_old_connections()
+
+
+_tampon = None
+_verrou_tampon = threading.Lock()
+
+
+def tampon_ingestion():
+    """Tampon du processus courant, configuré par SOFEMCI_CONFIG"""
+    global _tampon
+    if _tampon is None:
+        with _verrou_tampon:
+            if _tampon is None:
+                _tampon = TamponMesures(
+                    taille_max=settings.SOFEMCI_CONFIG.get('TELEMETRIE_TAMPON_TAILLE', 5000),
+                    delai_max=settings.SOFEMCI_CONFIG.get('TELEMETRIE_TAMPON_DELAI_SECONDES', 1.0),
+                )
+                atexit.register(_tampon.vider)
+    return _tampon
+
+
+def ingerer_mesures(contenu, format_lot='jsonl', synchrone=False):
+    """
+    Point d'entrée de l'ingestion : décode le lot et le confie au tampon.
+    synchrone=True écrit le tampon avant de rendre la main.
+    Retourne {'acceptees', 'rejetees', 'erreurs'}.
+    """
+    mesures, erreurs = lire_mesures(contenu, format_lot)
+    tampon = tampon_ingestion()
+    tampon.ajouter(mesures)
+    if synchrone:
+        tampon.vider()
+
+    return {
+        'acceptees': len(mesures),
+        'rejetees': len(erreurs),
+        'erreurs': [f'ligne {numero} : {message}' for numero, message in erreurs[:MAX_ERREURS_DETAILLEES]],
+    }
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
+from django.utils import timezone
+
+from ..models import ResumeProductionJour
+from .agregats_utils import SECTIONS_PRODUCTION, ZERO
+from .cache_utils import cle_cache, obtenir_en_cache, version_cache
+from .production_utils import get_objectif_section
+
+# Sections dont les déchets entrent dans le taux de déchet global
+SECTIONS_DECHETS = ('extrusion', 'imprimerie', 'soudure')
+
+CUMULS_KPI = {
+    'production': Sum('total_production_kg'),
+    'dechets': Sum('dechets_kg'),
+    'broyage': Sum('production_broyage_kg'),
+    'bache_noir': Sum('production_bache_noir_kg'),
+    'somme_rendements': Sum('somme_rendement_pourcentage'),
+    'nombre_rendements': Sum('nombre_rendements'),
+    'jours': Count('date_production', distinct=True),
+}
+
+
+def bornes_periodes_mois(reference=None):
+    """
+    Mois en cours jusqu'à la date de référence, et même nombre de jours du
+    mois précédent (borné à sa fin) : (debut, fin, debut_precedent, fin_precedent)
+    """
+    reference = reference or timezone.localdate()
+    debut = reference.replace(day=1)
+    fin_precedent_mois = debut - timedelta(days=1)
+    debut_precedent = fin_precedent_mois.replace(day=1)
+    fin_precedent = min(debut_precedent + (reference - debut), fin_precedent_mois)
+    return debut, reference, debut_precedent, fin_precedent
+
+
+def cumuls_vides():
+    return {cle: (0 if cle in ('nombre_rendements', 'jours') else ZERO) for cle in CUMULS_KPI}
+
+
+def _pourcentage(numerateur, denominateur):
+    if not denominateur:
+        return ZERO
+    return Decimal(numerateur) / Decimal(denominateur) * 100
+
+
+def indicateurs_section(section, cumuls, date_objectif=None):
+    """Indicateurs d'une section à partir de ses cumuls sur la période"""
+    production = cumuls['production']
+    dechets = cumuls['dechets']
+    indicateurs = {
+        'production': production,
+        'dechets': dechets,
+        'taux_dechet': _pourcentage(dechets, production + dechets),
+    }
+    if section == 'extrusion':
+        # Rendement moyen des saisies (production / matière première)
+        indicateurs['efficacite'] = (
+            cumuls['somme_rendements'] / cumuls['nombre_rendements']
+            if cumuls['nombre_rendements'] else ZERO
+        )
+    elif section == 'recyclage':
+        indicateurs['taux_transformation'] = _pourcentage(cumuls['bache_noir'], cumuls['broyage'])
+        # Atteinte de l'objectif journalier sur les jours avec saisie
+        indicateurs['rendement'] = _pourcentage(
+            production, get_objectif_section(section, date_objectif) * cumuls['jours']
+        )
+    else:
+        # Part de matière utile : production / (production + déchets)
+        indicateurs['efficacite'] = _pourcentage(production, production + dechets) if production else ZERO
+    return indicateurs
+
+
+def _indicateurs_globaux(par_section):
+    production = sum((par_section[s]['production'] for s in SECTIONS_PRODUCTION), ZERO)
+    dechets = sum((par_section[s]['dechets'] for s in SECTIONS_DECHETS), ZERO)
+    production_dechets = sum((par_section[s]['production'] for s in SECTIONS_DECHETS), ZERO)
+    return {
+        'production_totale': production,
+        'taux_dechet': _pourcentage(dechets, production_dechets + dechets),
+        'efficacite_moyenne': par_section['extrusion']['efficacite'],
+        'taux_transformation': par_section['recyclage']['taux_transformation'],
+    }
+
+
+def calculer_kpis_periodes(debut, fin, debut_precedent, fin_precedent):
+    """
+    Indicateurs de la période et de la période précédente, par section et
+    globaux, en une seule requête groupée (période, section) sur les résumés
+    journaliers : le coût ne dépend que du nombre de jours couverts.
+    """
+    periode = Case(
+        When(date_production__range=(debut, fin), then=Value('courante')),
+        default=Value('precedente'),
+        output_field=CharField(),
+    )
+    lignes = (
+        ResumeProductionJour.objects
+        .filter(Q(date_production__range=(debut, fin))
+                | Q(date_production__range=(debut_precedent, fin_precedent)))
+        .annotate(periode=periode)
+        .values('periode', 'section')
+        .order_by()
+        .annotate(**CUMULS_KPI)
+    )
+
+    cumuls = {
+        nom: {section: cumuls_vides() for section in SECTIONS_PRODUCTION}
+        for nom in ('courante', 'precedente')
+    }
+    for ligne in lignes:
+        cible = cumuls[ligne['periode']][ligne['section']]
+        for cle in CUMULS_KPI:
+            if ligne[cle] is not None:
+                cible[cle] = ligne[cle]
+
+    fins = {'courante': fin, 'precedente': fin_precedent}
+    resultat = {}
+    for nom, sections in cumuls.items():
+        par_section = {
+            section: indicateurs_section(section, valeurs, fins[nom]) for section, valeurs in sections.items()
+        }
+        resultat[nom] = {'sections': par_section, 'global': _indicateurs_globaux(par_section)}
+    return resultat
+
+
+def _arrondi(valeur, decimales=1):
+    return round(float(valeur), decimales)
+
+
+def get_kpis_analytics(reference=None):
+    """
+    KPIs du mois en cours comparés au même nombre de jours du mois précédent.
+
+    Résultat mis en cache par période ; la clé inclut la version des résumés
+    des deux mois, changée dès qu'une saisie de l'un d'eux est enregistrée,
+    et celle des objectifs.
+    """
+    debut, fin, debut_precedent, fin_precedent = bornes_periodes_mois(reference)
+    version = version_cache('objectifs', debut=debut_precedent, fin=fin)
+    return obtenir_en_cache(
+        cle_cache('kpis', date=debut, version=f'{fin.isoformat()}:{version}'),
+        lambda: calculer_kpis_analytics(debut, fin, debut_precedent, fin_precedent),
+    )
+
+
+def calculer_kpis_analytics(debut, fin, debut_precedent, fin_precedent):
+    """KPIs de get_kpis_analytics, sans cache"""
+    periodes = calculer_kpis_periodes(debut, fin, debut_precedent, fin_precedent)
+    courant = periodes['courante']['global']
+    precedent = periodes['precedente']['global']
+
+    croissance = ZERO
+    if precedent['production_totale']:
+        croissance = _pourcentage(
+            courant['production_totale'] - precedent['production_totale'], precedent['production_totale']
+        )
+
+    return {
+        'debut': debut,
+        'fin': fin,
+        'debut_precedent': debut_precedent,
+        'fin_precedent': fin_precedent,
+        'production_totale_mois': _arrondi(courant['production_totale'], 0),
+        'production_totale_precedente': _arrondi(precedent['production_totale'], 0),
+        'croissance_production': _arrondi(croissance),
+        'taux_dechet_mois': _arrondi(courant['taux_dechet']),
+        # Écarts en points de pourcentage (réduction des déchets : positif = mieux)
+        'reduction_dechets': _arrondi(precedent['taux_dechet'] - courant['taux_dechet']),
+        'evolution_taux_dechet': _arrondi(courant['taux_dechet'] - precedent['taux_dechet']),
+        'efficacite_moyenne': _arrondi(courant['efficacite_moyenne']),
+        'amélioration_efficacite': _arrondi(courant['efficacite_moyenne'] - precedent['efficacite_moyenne']),
+        'taux_transformation': _arrondi(courant['taux_transformation']),
+        'amélioration_transformation': _arrondi(
+            courant['taux_transformation'] - precedent['taux_transformation']
+        ),
+        'sections': {
+            section: {cle: _arrondi(valeur) for cle, valeur in indicateurs.items()}
+            for section, indicateurs in periodes['courante']['sections'].items()
+        },
+    }
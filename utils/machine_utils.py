@@ -1,36 +1,105 @@
-from django.db.models import Count
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q
+from decimal import Decimal
 from ..models import Machine, ZoneExtrusion
+from .agregats_utils import obtenir_agregats_jour
+from .cache_utils import changer_version
+from .objectifs_utils import get_objectifs_zones
+
+CLE_CACHE_STATS_PARC = 'sofemci:stats_parc_machines'
+# Filet de sécurité : les compteurs dérivés des heures de fonctionnement
+# (maintenance requise) évoluent sans signal, via la télémétrie
+DUREE_CACHE_STATS_PARC = 60 * 5
+
+# Champs de Machine dont la modification change les compteurs du parc
+CHAMPS_STATS_PARC = frozenset({
+    'etat', 'section', 'score_sante_global', 'probabilite_panne_7_jours', 'anomalie_detectee',
+    'frequence_maintenance_jours',
+})
+
+# Machines suivies par l'IA (voir statistiques_parc_machines)
+ETATS_SUIVIS_IA = ['actif', 'maintenance']
+
+
+def calculer_stats_parc():
+    """Tous les compteurs du parc en une seule requête (agrégation conditionnelle)"""
+    suivies = Q(etat__in=ETATS_SUIVIS_IA)
+    expressions = {
+        'total': Count('id'),
+        'actives': Count('id', filter=Q(etat='actif')),
+        'maintenance': Count('id', filter=Q(etat='maintenance')),
+        'pannes': Count('id', filter=Q(etat='panne')),
+        'suivies_ia': Count('id', filter=suivies),
+        'score_sante_moyen': Avg('score_sante_global', filter=suivies),
+        'risque_critique': Count('id', filter=suivies & Q(probabilite_panne_7_jours__gte=70)),
+        'risque_eleve': Count('id', filter=suivies & Q(
+            probabilite_panne_7_jours__gte=40, probabilite_panne_7_jours__lt=70
+        )),
+        'maintenance_requise': Count('id', filter=suivies & Q(
+            heures_depuis_derniere_maintenance__gte=F('frequence_maintenance_jours') * 24
+        )),
+        'anomalies': Count('id', filter=suivies & Q(anomalie_detectee=True)),
+    }
+    expressions.update({
+        f'section_{code}': Count('id', filter=Q(section=code)) for code, _ in Machine.SECTIONS
+    })
+    return Machine.objects.order_by().aggregate(**expressions)
+
+
+def get_stats_parc():
+    """Compteurs du parc depuis le cache (invalidé par les signaux de Machine)"""
+    stats = cache.get(CLE_CACHE_STATS_PARC)
+    if stats is None:
+        stats = calculer_stats_parc()
+        cache.set(CLE_CACHE_STATS_PARC, stats, DUREE_CACHE_STATS_PARC)
+    return stats
+
+
+def invalider_stats_parc():
+    """Supprime les compteurs en cache et périme les blocs des dashboards qui les affichent"""
+    cache.delete(CLE_CACHE_STATS_PARC)
+    changer_version('machines')
+
 
 def get_machines_stats():
     """Statistiques des machines"""
-    return {
-        'total': Machine.objects.count(),
-        'actives': Machine.objects.filter(etat='actif').count(),
-        'maintenance': Machine.objects.filter(etat='maintenance').count(),
-        'pannes': Machine.objects.filter(etat='panne').count(),
-    }
+    stats = get_stats_parc()
+    return {cle: stats[cle] for cle in ('total', 'actives', 'maintenance', 'pannes')}
 
-def get_zones_performance(date):
+
+def get_machines_par_section(stats=None):
+    """[{'section', 'count'}] des sections ayant au moins une machine"""
+    stats = stats or get_stats_parc()
+    return [
+        {'section': code, 'count': stats[f'section_{code}']}
+        for code, _ in Machine.SECTIONS
+        if stats[f'section_{code}']
+    ]
+
+def get_zones_performance(date, agregats=None):
     """Performance des zones d'extrusion"""
-    from django.db.models import Sum, Avg
-    from ..models import ProductionExtrusion
+    agregats = obtenir_agregats_jour(date, agregats)
+    objectifs = get_objectifs_zones(date, [zone.id for zone in agregats.zones_actives])
     
     zones_performance = []
-    for zone in ZoneExtrusion.objects.filter(active=True):
-        prod_zone = ProductionExtrusion.objects.filter(
-            date_production=date,
-            zone=zone
-        ).aggregate(
-            total=Sum('total_production_kg'),
-            machines=Avg('nombre_machines_actives'),
-            efficacite=Avg('rendement_pourcentage')
-        )
+    for zone in agregats.zones_actives:
+        prod_zone = agregats.zone(zone.id)
+        nombre = prod_zone['nombre']
+        
+        # Moyennes calculées en Decimal à partir des sommes groupées
+        machines_actives = int(round(Decimal(prod_zone['machines']) / nombre, 0)) if nombre else 0
+        nombre_rendements = prod_zone['nombre_rendements']
+        efficacite = round(prod_zone['rendement'] / nombre_rendements, 1) if nombre_rendements else 0
+        
+        objectif = objectifs[zone.id]
         
         zones_performance.append({
             'zone': zone,
-            'production': prod_zone['total'] or 0,
-            'machines_actives': int(prod_zone['machines'] or 0),
-            'efficacite': round(prod_zone['efficacite'] or 0, 1)
+            'production': prod_zone['total'],
+            'machines_actives': machines_actives,
+            'efficacite': efficacite,
+            'objectif': objectif,
+            'pourcentage_objectif': round(prod_zone['total'] / objectif * 100, 1) if objectif else 0,
         })
     
     return zones_performance
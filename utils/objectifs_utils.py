@@ -0,0 +1,170 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..models import ObjectifProduction
+from .agregats_utils import SECTIONS_PRODUCTION, ZERO
+
+# Objectifs journaliers (kg) appliqués aux sections sans objectif enregistré
+OBJECTIFS_SECTIONS_DEFAUT = {
+    'extrusion': Decimal('35000'),
+    'imprimerie': Decimal('20000'),
+    'soudure': Decimal('12000'),
+    'recyclage': Decimal('8000'),
+}
+
+# Jeton partagé changé à chaque enregistrement : les autres processus
+# rechargent leur copie au prochain accès
+CLE_VERSION_OBJECTIFS = 'sofemci:objectifs_production:version'
+
+# Relecture périodique si le cache partagé ne l'est pas entre processus (LocMem)
+DUREE_CACHE_OBJECTIFS = 60
+
+
+class CacheObjectifs:
+    """
+    Table ObjectifProduction en mémoire du processus.
+
+    Chargée en une requête au premier accès, puis servie sans requête ;
+    rechargée quand le jeton de version change (enregistrement ou
+    suppression d'un objectif) ou au plus tard après DUREE_CACHE_OBJECTIFS.
+    Les objectifs résolus d'une date sont mémorisés jusqu'au rechargement.
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._objectifs = None
+        self._version = None
+        self._charge_le = 0.0
+        self._par_jour = {}
+
+    def invalider(self):
+        with self._verrou:
+            self._objectifs = None
+            self._par_jour = {}
+        cache.set(CLE_VERSION_OBJECTIFS, time.time_ns(), None)
+
+    def _charger(self):
+        """Objectifs du plus récent au plus ancien (à appeler sous le verrou)"""
+        if (
+            self._objectifs is None
+            or time.monotonic() - self._charge_le > DUREE_CACHE_OBJECTIFS
+            or cache.get(CLE_VERSION_OBJECTIFS) != self._version
+        ):
+            self._version = cache.get_or_set(CLE_VERSION_OBJECTIFS, time.time_ns, None)
+            self._objectifs = list(ObjectifProduction.objects.order_by('-date_debut', '-id'))
+            self._charge_le = time.monotonic()
+            self._par_jour = {}
+        return self._objectifs
+
+    def objectif(self, section, date, zone_id=None, equipe_id=None, zone_exacte=False):
+        """
+        Objectif le plus précis valable à la date : zone et équipe, puis zone,
+        puis équipe, puis section. None si aucun ne s'applique.
+        zone_exacte : seuls les objectifs propres à la zone sont retenus.
+        """
+        with self._verrou:
+            objectifs = self._charger()
+        zones = (zone_id,) if zone_exacte else (None, zone_id)
+        candidats = [
+            objectif for objectif in objectifs
+            if objectif.section == section and objectif.couvre(date)
+            and objectif.zone_id in zones and objectif.equipe_id in (None, equipe_id)
+        ]
+        if not candidats:
+            return None
+        # max() garde le premier ex aequo : le plus récent, la liste étant triée
+        meilleur = max(candidats, key=lambda objectif: (objectif.zone_id is not None, objectif.equipe_id is not None))
+        return meilleur.objectif_kg
+
+    def objectifs_jour(self, date):
+        """{section: objectif kg, 'total': somme} valables à la date"""
+        with self._verrou:
+            objectifs = self._charger()
+            resultat = self._par_jour.get(date)
+        if resultat is not None:
+            return resultat
+
+        resultat = {}
+        for section in SECTIONS_PRODUCTION:
+            valables = [o for o in objectifs if o.section == section and o.couvre(date)]
+            generaux = [o for o in valables if o.zone_id is None and o.equipe_id is None]
+            par_zone = [o for o in valables if o.zone_id is not None and o.equipe_id is None]
+            par_equipe = [o for o in valables if o.zone_id is None and o.equipe_id is not None]
+            if generaux:
+                resultat[section] = generaux[0].objectif_kg
+            elif par_zone or par_equipe:
+                # Sans objectif de section : somme des objectifs détaillés (un par zone / équipe)
+                detail = {}
+                for objectif in par_zone or par_equipe:
+                    detail.setdefault((objectif.zone_id, objectif.equipe_id), objectif.objectif_kg)
+                resultat[section] = sum(detail.values(), ZERO)
+            else:
+                resultat[section] = OBJECTIFS_SECTIONS_DEFAUT[section]
+        resultat['total'] = sum((resultat[section] for section in SECTIONS_PRODUCTION), ZERO)
+
+        with self._verrou:
+            self._par_jour[date] = resultat
+        return resultat
+
+
+objectifs_production = CacheObjectifs()
+
+
+def get_objectifs_jour(date=None):
+    """Objectifs journaliers de toutes les sections (et total) à la date"""
+    return objectifs_production.objectifs_jour(date or timezone.localdate())
+
+
+def get_objectif(section, date=None, zone_id=None, equipe_id=None):
+    """Objectif journalier d'une section, d'une zone ou d'une équipe"""
+    date = date or timezone.localdate()
+    objectif = objectifs_production.objectif(section, date, zone_id, equipe_id)
+    if objectif is None:
+        objectif = get_objectifs_jour(date).get(section, ZERO)
+    return objectif
+
+
+def get_objectifs_zones(date, zone_ids):
+    """
+    {zone_id: objectif} des zones d'extrusion : objectif propre à la zone,
+    sinon part égale de ce qui reste de l'objectif extrusion
+    """
+    date = date or timezone.localdate()
+    objectifs = {}
+    for zone_id in zone_ids:
+        objectif = objectifs_production.objectif('extrusion', date, zone_id=zone_id, zone_exacte=True)
+        if objectif is not None:
+            objectifs[zone_id] = objectif
+
+    sans_objectif = [zone_id for zone_id in zone_ids if zone_id not in objectifs]
+    if sans_objectif:
+        reste = max(get_objectifs_jour(date)['extrusion'] - sum(objectifs.values(), ZERO), ZERO)
+        for zone_id in sans_objectif:
+            objectifs[zone_id] = reste / len(sans_objectif)
+    return objectifs
+
+
+def calculer_pourcentages_objectifs(productions, date=None):
+    """
+    Avancement (%) de chaque section et du total en un appel :
+    productions est un dict {section: kg}, les sections absentes valent zéro
+    """
+    objectifs = get_objectifs_jour(date)
+    productions = dict(productions)
+    productions.setdefault('total', sum(
+        (productions.get(section, ZERO) for section in SECTIONS_PRODUCTION), ZERO
+    ))
+
+    pourcentages = {}
+    for cle, objectif in objectifs.items():
+        production = productions.get(cle, ZERO)
+        pourcentages[cle] = round(Decimal(production) / objectif * 100, 1) if objectif else 0
+    return pourcentages
+
+
+def invalider_objectifs_production():
+    objectifs_production.invalider()
@@ -0,0 +1,115 @@
+from .export_utils import parcourir_par_cle
+
+# Lignes par tableau : reportlab mesure chaque tableau en entier et recommence
+# à chaque coupure de page, d'où un coût quadratique sur un tableau unique
+PDF_LIGNES_PAR_TABLEAU = 40
+
+# Au-delà, le détail est remplacé par les sous-totaux journaliers
+PDF_MAX_LIGNES_DETAIL = 2000
+
+COULEUR_SOUS_TOTAL = '#E0E0E0'
+
+
+def parcourir_lignes_pdf(queryset, champs, ordre=('date_production', 'id')):
+    """Dicts values(*champs) lus par pages (voir parcourir_par_cle), sans liste intermédiaire"""
+    for ligne in parcourir_par_cle(queryset, champs, ordre):
+        yield dict(zip(champs, ligne))
+
+
+def _nombre(valeur):
+    return f"{valeur:,.0f}"
+
+
+class TableauPagine:
+    """
+    Tableau de fiche PDF émis par blocs de lignes_par_tableau lignes, chaque
+    bloc étant un Table autonome qui répète les lignes d'en-tête.
+
+    - sommes : {index de colonne: champ} cumulés pour les sous-totaux ;
+    - par_jour : une ligne de sous-total après chaque date de production ;
+    - resume : seules les lignes de sous-total journalier sont émises
+      (sélections au-delà de PDF_MAX_LIGNES_DETAIL).
+
+    Le coût de mise en page reste linéaire et seuls les blocs déjà formés
+    sont conservés en mémoire.
+    """
+
+    def __init__(self, en_tetes, col_widths, style, formater, sommes=None,
+                 par_jour=False, resume=False, lignes_par_tableau=PDF_LIGNES_PAR_TABLEAU):
+        self.en_tetes = en_tetes
+        self.col_widths = col_widths
+        self.style = style
+        self.formater = formater
+        self.sommes = sommes or {}
+        self.par_jour = par_jour or resume
+        self.resume = resume
+        self.lignes_par_tableau = lignes_par_tableau
+
+        self.tableaux = []
+        self._bloc = []
+        self._sous_totaux = []
+        self._jour = None
+        self._cumul = {}
+
+    def flowables(self, lignes):
+        """Flowables reportlab du tableau complet pour un itérable de dicts"""
+        for ligne in lignes:
+            jour = ligne['date_production']
+            if self.par_jour and self._jour is not None and jour != self._jour:
+                self._ajouter_sous_total()
+            self._jour = jour
+            for index, champ in self.sommes.items():
+                self._cumul[index] = self._cumul.get(index, 0) + float(ligne[champ] or 0)
+            if not self.resume:
+                self._ajouter(self.formater(ligne))
+
+        if self.par_jour and self._jour is not None:
+            self._ajouter_sous_total()
+        self._fermer_bloc(vide_autorise=not self.tableaux)
+        return self.tableaux
+
+    def _ajouter_sous_total(self):
+        libelle = self._jour.strftime('%d/%m/%Y')
+        ligne = [libelle if self.resume else f'Total {libelle}']
+        ligne += [
+            _nombre(self._cumul[index]) if index in self._cumul else ''
+            for index in range(1, len(self.col_widths))
+        ]
+        self._cumul = {}
+        self._sous_totaux.append(len(self._bloc))
+        self._ajouter(ligne)
+
+    def _ajouter(self, cellules):
+        self._bloc.append(cellules)
+        if len(self._bloc) >= self.lignes_par_tableau:
+            self._fermer_bloc()
+
+    def _fermer_bloc(self, vide_autorise=False):
+        # vide_autorise : sélection vide, on garde au moins la ligne d'en-tête
+        if not self._bloc and not vide_autorise:
+            return
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        entete = len(self.en_tetes)
+        commandes = list(self.style)
+        for position in self._sous_totaux:
+            rangee = entete + position
+            commandes += [
+                ('BACKGROUND', (0, rangee), (-1, rangee), colors.HexColor(COULEUR_SOUS_TOTAL)),
+                ('FONTNAME', (0, rangee), (-1, rangee), 'Helvetica-Bold'),
+            ]
+
+        tableau = Table(self.en_tetes + self._bloc, colWidths=self.col_widths, repeatRows=entete)
+        tableau.setStyle(TableStyle(commandes))
+        self.tableaux.append(tableau)
+        self._bloc = []
+        self._sous_totaux = []
+
+
+def texte_resume_pdf(nombre):
+    return (
+        f"<i>{nombre} saisies sélectionnées : le détail est remplacé par les sous-totaux "
+        f"journaliers (au-delà de {PDF_MAX_LIGNES_DETAIL} lignes). Utilisez l'export Excel "
+        f"pour le détail ligne à ligne.</i>"
+    )
@@ -1,88 +1,38 @@
-from django.db.models import Sum, Avg, Count, Q
+from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
-from ..models import (
-    ProductionExtrusion, ProductionSoudure, ProductionImprimerie, 
-    ProductionRecyclage, Equipe, Machine, ZoneExtrusion
-)
+from ..models import Equipe, ZoneExtrusion
+from .agregats_utils import ZERO, obtenir_agregats_jour
+from .objectifs_utils import get_objectifs_jour
 
-def get_production_totale_jour(date):
+# Les helpers journaliers lisent tous les agrégats calculés en une passe
+# (voir agregats_utils). Passer `agregats` évite de les recalculer.
+
+def get_production_totale_jour(date, agregats=None):
     """Production totale d'un jour"""
-    total = Decimal('0')
-    
-    # Extrusion
-    extrusion_total = ProductionExtrusion.objects.filter(date_production=date).aggregate(
-        Sum('total_production_kg'))['total_production_kg__sum'] or Decimal('0')
-    total += extrusion_total
-    
-    # Imprimerie
-    imprimerie_total = ProductionImprimerie.objects.filter(date_production=date).aggregate(
-        Sum('total_production_kg'))['total_production_kg__sum'] or Decimal('0')
-    total += imprimerie_total
-    
-    # Soudure
-    soudure_total = ProductionSoudure.objects.filter(date_production=date).aggregate(
-        Sum('total_production_kg'))['total_production_kg__sum'] or Decimal('0')
-    total += soudure_total
-    
-    # Recyclage
-    recyclage_total = ProductionRecyclage.objects.filter(date_production=date).aggregate(
-        Sum('total_production_kg'))['total_production_kg__sum'] or Decimal('0')
-    total += recyclage_total
-    
-    return total
+    return obtenir_agregats_jour(date, agregats).production_totale
 
-def get_production_section_jour(section, date):
+def get_production_section_jour(section, date, agregats=None):
     """Production d'une section pour un jour"""
-    models_map = {
-        'extrusion': ProductionExtrusion,
-        'imprimerie': ProductionImprimerie,
-        'soudure': ProductionSoudure,
-        'recyclage': ProductionRecyclage,
-    }
-    
-    model = models_map.get(section)
-    if not model:
-        return Decimal('0')
-    
-    result = model.objects.filter(date_production=date).aggregate(
-        Sum('total_production_kg'))['total_production_kg__sum'] or Decimal('0')
-    return result
+    return obtenir_agregats_jour(date, agregats).production_section(section)
 
-def get_dechets_totaux_jour(date):
+def get_dechets_totaux_jour(date, agregats=None):
     """Total des déchets d'un jour"""
-    total = Decimal('0')
-    
-    # Extrusion
-    extrusion_dechets = ProductionExtrusion.objects.filter(date_production=date).aggregate(
-        Sum('dechets_kg'))['dechets_kg__sum'] or Decimal('0')
-    total += extrusion_dechets
-    
-    # Imprimerie
-    imprimerie_dechets = ProductionImprimerie.objects.filter(date_production=date).aggregate(
-        Sum('dechets_kg'))['dechets_kg__sum'] or Decimal('0')
-    total += imprimerie_dechets
-    
-    # Soudure
-    soudure_dechets = ProductionSoudure.objects.filter(date_production=date).aggregate(
-        Sum('dechets_kg'))['dechets_kg__sum'] or Decimal('0')
-    total += soudure_dechets
-    
-    return total
+    return obtenir_agregats_jour(date, agregats).dechets_totaux
 
-def get_efficacite_moyenne_jour(date):
+def get_efficacite_moyenne_jour(date, agregats=None):
     """Efficacité moyenne d'un jour"""
-    efficacite = ProductionExtrusion.objects.filter(date_production=date).aggregate(
-        Avg('rendement_pourcentage'))['rendement_pourcentage__avg'] or Decimal('0')
-    
-    return round(efficacite, 1) if efficacite else 0
+    efficacite = obtenir_agregats_jour(date, agregats).efficacite_moyenne
+    if efficacite is not None:
+        return round(efficacite, 1)
+    return Decimal('0')
 
-def get_extrusion_details_jour(date):
-    """Détails extrusion du jour - Version simplifiée"""
-    productions = ProductionExtrusion.objects.filter(date_production=date)
+def get_extrusion_details_jour(date, agregats=None):
+    """Détails extrusion du jour"""
+    aggregats = obtenir_agregats_jour(date, agregats).extrusion
     
-    if not productions.exists():
+    if not aggregats['nombre']:
         return {
             'temps_travail': 0,
             'machinistes_moyen': 0,
@@ -94,42 +44,37 @@ def get_extrusion_details_jour(date):
             'taux_dechet': 0,
         }
     
-    aggregats = productions.aggregate(
-        matiere_premiere=Sum('matiere_premiere_kg'),
-        prod_finis=Sum('production_finis_kg'),
-        prod_semi_finis=Sum('production_semi_finis_kg'),
-        total_prod=Sum('total_production_kg'),
-        dechets=Sum('dechets_kg'),
-        machinistes_total=Sum('nombre_machinistes'),
-        count_productions=Count('id')
-    )
+    nombre_moyen_machinistes = aggregats['machinistes'] / aggregats['nombre']
     
-    nombre_moyen_machinistes = (aggregats['machinistes_total'] / aggregats['count_productions']) if aggregats['count_productions'] > 0 else 0
+    total_prod = aggregats['total']
+    dechets = aggregats['dechets']
     
-    total_prod = aggregats['total_prod'] or 0
-    dechets = aggregats['dechets'] or 0
-    taux_dechet = (dechets / (total_prod + dechets) * 100) if (total_prod + dechets) > 0 else 0
+    # S'assurer que les calculs de taux se font entre Decimals
+    somme_total = total_prod + dechets
+    taux_dechet = (dechets / somme_total * Decimal('100')) if somme_total > 0 else 0
     
     return {
         'temps_travail': 8,
         'machinistes_moyen': round(nombre_moyen_machinistes, 0),
-        'matiere_premiere': aggregats['matiere_premiere'] or 0,
-        'production_finis': aggregats['prod_finis'] or 0,
-        'production_semi_finis': aggregats['prod_semi_finis'] or 0,
+        'matiere_premiere': aggregats['matiere_premiere'],
+        'production_finis': aggregats['prod_finis'],
+        'production_semi_finis': aggregats['prod_semi_finis'],
         'production_totale': total_prod,
         'dechets_totaux': dechets,
         'taux_dechet': round(taux_dechet, 1),
     }
 
-def get_imprimerie_details_jour(date):
-    """Détails imprimerie du jour - Version simplifiée"""
-    productions = ProductionImprimerie.objects.filter(date_production=date)
+def get_imprimerie_details_jour(date, agregats=None):
+    """Détails imprimerie du jour"""
+    agregats = obtenir_agregats_jour(date, agregats)
+    aggregats = agregats.imprimerie
+    machines_totales = agregats.machines_section('imprimerie')
     
-    if not productions.exists():
+    if not aggregats['nombre']:
         return {
             'temps_travail': 0,
             'machines_actives': 0,
-            'machines_totales': Machine.objects.filter(section='imprimerie').count(),
+            'machines_totales': machines_totales,
             'bobines_finies': 0,
             'bobines_semi_finies': 0,
             'production_totale': 0,
@@ -137,38 +82,37 @@ def get_imprimerie_details_jour(date):
             'taux_dechet': 0,
         }
     
-    aggregats = productions.aggregate(
-        machines=Avg('nombre_machines_actives'),
-        bobines_finis=Sum('production_bobines_finies_kg'),
-        bobines_semi_finis=Sum('production_bobines_semi_finies_kg'),
-        total=Sum('total_production_kg'),
-        dechets=Sum('dechets_kg')
-    )
+    machines_actives = round(Decimal(aggregats['machines']) / aggregats['nombre'], 0)
+    
+    total = aggregats['total']
+    dechets = aggregats['dechets']
     
-    total = aggregats['total'] or 0
-    dechets = aggregats['dechets'] or 0
-    taux_dechet = (dechets / (total + dechets) * 100) if (total + dechets) > 0 else 0
+    # S'assurer que les calculs de taux se font entre Decimals
+    somme_total = total + dechets
+    taux_dechet = (dechets / somme_total * Decimal('100')) if somme_total > 0 else 0
     
     return {
         'temps_travail': 8,
-        'machines_actives': round(aggregats['machines'] or 0, 0),
-        'machines_totales': Machine.objects.filter(section='imprimerie').count(),
-        'bobines_finies': aggregats['bobines_finis'] or 0,
-        'bobines_semi_finies': aggregats['bobines_semi_finis'] or 0,
+        'machines_actives': machines_actives,
+        'machines_totales': machines_totales,
+        'bobines_finies': aggregats['bobines_finies'],
+        'bobines_semi_finies': aggregats['bobines_semi_finies'],
         'production_totale': total,
         'dechets_totaux': dechets,
         'taux_dechet': round(taux_dechet, 1),
     }
 
-def get_soudure_details_jour(date):
-    """Détails soudure du jour - Version simplifiée"""
-    productions = ProductionSoudure.objects.filter(date_production=date)
+def get_soudure_details_jour(date, agregats=None):
+    """Détails soudure du jour"""
+    agregats = obtenir_agregats_jour(date, agregats)
+    aggregats = agregats.soudure
+    machines_totales = agregats.machines_section('soudure')
     
-    if not productions.exists():
+    if not aggregats['nombre']:
         return {
             'temps_travail': 0,
             'machines_actives': 0,
-            'machines_totales': Machine.objects.filter(section='soudure').count(),
+            'machines_totales': machines_totales,
             'production_bretelles': 0,
             'production_rema': 0,
             'production_batta': 0,
@@ -177,91 +121,69 @@ def get_soudure_details_jour(date):
             'taux_dechet': 0,
         }
     
-    aggregats = productions.aggregate(
-        machines=Avg('nombre_machines_actives'),
-        bretelles=Sum('production_bretelles_kg'),
-        rema=Sum('production_rema_kg'),
-        batta=Sum('production_batta_kg'),
-        total=Sum('total_production_kg'),
-        dechets=Sum('dechets_kg')
-    )
+    machines_actives = round(Decimal(aggregats['machines']) / aggregats['nombre'], 0)
     
-    total = aggregats['total'] or 0
-    dechets = aggregats['dechets'] or 0
-    taux_dechet = (dechets / (total + dechets) * 100) if (total + dechets) > 0 else 0
+    total = aggregats['total']
+    dechets = aggregats['dechets']
+    
+    # S'assurer que les calculs de taux se font entre Decimals
+    somme_total = total + dechets
+    taux_dechet = (dechets / somme_total * Decimal('100')) if somme_total > 0 else 0
     
     return {
         'temps_travail': 8,
-        'machines_actives': round(aggregats['machines'] or 0, 0),
-        'machines_totales': Machine.objects.filter(section='soudure').count(),
-        'production_bretelles': aggregats['bretelles'] or 0,
-        'production_rema': aggregats['rema'] or 0,
-        'production_batta': aggregats['batta'] or 0,
+        'machines_actives': machines_actives,
+        'machines_totales': machines_totales,
+        'production_bretelles': aggregats['bretelles'],
+        'production_rema': aggregats['rema'],
+        'production_batta': aggregats['batta'],
         'production_totale': total,
         'dechets_totaux': dechets,
         'taux_dechet': round(taux_dechet, 1),
     }
 
-def get_recyclage_details_jour(date=None):
-    """Détails recyclage du jour - Version corrigée avec Decimal"""
+def get_recyclage_details_jour(date=None, agregats=None):
+    """Détails recyclage du jour"""
     # Si pas de date fournie, utiliser aujourd'hui
     if date is None:
         date = timezone.now().date()
     
-    productions = ProductionRecyclage.objects.filter(date_production=date)
+    agregats = obtenir_agregats_jour(date, agregats)
+    aggregats = agregats.recyclage
+    moulinex_totaux = agregats.machines_section('recyclage')
     
-    if not productions.exists():
+    if not aggregats['nombre']:
         return {
             'moulinex_actifs': 0,
-            'moulinex_totaux': Machine.objects.filter(section='recyclage').count(),
-            'total_broyage': Decimal('0.00'),
-            'total_bache_noir': Decimal('0.00'),
-            'production_totale': Decimal('0.00'),
-            'taux_transformation': Decimal('0.00'),
-            'rendement': Decimal('0.00'),
-            'productivite_par_moulinex': Decimal('0.00'),
-            'temps_travail': 8,
+            'moulinex_totaux': moulinex_totaux,
+            'total_broyage': 0,
+            'total_bache_noir': 0,
+            'production_totale': 0,
+            'taux_transformation': 0,
+            'rendement': 0,
+            'productivite_par_moulinex': 0,
+            'temps_travail': 0,
         }
     
-    aggregats = productions.aggregate(
-        moulinex=Avg('nombre_moulinex'),
-        broyage=Sum('production_broyage_kg'),
-        bache=Sum('production_bache_noir_kg'),
-        total=Sum('total_production_kg')
-    )
-    
-    # Utiliser Decimal explicitement
-    broyage = Decimal(str(aggregats['broyage'] or '0'))
-    bache = Decimal(str(aggregats['bache'] or '0'))
-    total = Decimal(str(aggregats['total'] or '0'))
-    moulinex_avg = Decimal(str(aggregats['moulinex'] or '1'))
-    
-    # Calculs sécurisés avec Decimal
-    try:
-        if broyage > Decimal('0'):
-            taux_transformation = (bache / broyage) * Decimal('100')
-        else:
-            taux_transformation = Decimal('0')
-    except Exception:
-        taux_transformation = Decimal('0')
-    
-    try:
-        if moulinex_avg > Decimal('0'):
-            productivite = total / moulinex_avg
-        else:
-            productivite = Decimal('0')
-    except Exception:
-        productivite = Decimal('0')
+    broyage = aggregats['broyage']
+    bache = aggregats['bache']
+    total = aggregats['total']
+    
+    # Moyenne des moulinex en Decimal (équivalent de Avg('nombre_moulinex'))
+    moulinex_avg = Decimal(aggregats['moulinex']) / aggregats['nombre']
+    
+    taux_transformation = (bache / broyage * Decimal('100')) if broyage > 0 else 0
+    productivite = (total / moulinex_avg) if moulinex_avg > 0 else 0
     
     return {
-        'moulinex_actifs': int(round(float(moulinex_avg), 0)),
-        'moulinex_totaux': Machine.objects.filter(section='recyclage').count(),
-        'total_broyage': broyage.quantize(Decimal('0.01')),
-        'total_bache_noir': bache.quantize(Decimal('0.01')),
-        'production_totale': total.quantize(Decimal('0.01')),
-        'taux_transformation': taux_transformation.quantize(Decimal('0.01')),
-        'rendement': taux_transformation.quantize(Decimal('0.01')),
-        'productivite_par_moulinex': productivite.quantize(Decimal('0.01')),
+        'moulinex_actifs': round(moulinex_avg, 0),
+        'moulinex_totaux': moulinex_totaux,
+        'total_broyage': broyage,
+        'total_bache_noir': bache,
+        'production_totale': total,
+        'taux_transformation': round(taux_transformation, 1),
+        'rendement': round(taux_transformation, 1),
+        'productivite_par_moulinex': round(productivite, 1),
         'temps_travail': 8,
     }
 # def get_productions_filtrees(filters):
@@ -329,10 +251,10 @@ def get_recyclage_details_jour(date=None):
     
 #     return productions_data, totaux
 
-def calculer_pourcentage_production(production_actuelle, production_reference=None):
-    """Calcule le pourcentage de production"""
+def calculer_pourcentage_production(production_actuelle, production_reference=None, date=None):
+    """Calcule le pourcentage de production (référence : objectif total du jour)"""
     if production_reference is None:
-        production_reference = Decimal('75000')
+        production_reference = get_objectifs_jour(date)['total']
     
     if production_reference == 0:
         return 0
@@ -340,28 +262,15 @@ def calculer_pourcentage_production(production_actuelle, production_reference=No
     pourcentage = (production_actuelle / production_reference) * 100
     return round(pourcentage, 1)
 
-def calculer_pourcentage_section(section, production_actuelle):
+def calculer_pourcentage_section(section, production_actuelle, date=None):
     """Calcule le pourcentage pour une section spécifique"""
-    objectifs = {
-        'extrusion': Decimal('35000'),
-        'imprimerie': Decimal('20000'),
-        'soudure': Decimal('12000'),
-        'recyclage': Decimal('8000'),
-    }
-    
-    objectif = objectifs.get(section, Decimal('10000'))
+    objectif = get_objectif_section(section, date)
     
     if objectif == 0:
         return 0
     
     return round((production_actuelle / objectif) * 100, 1)
 
-def get_objectif_section(section):
-    """Retourne l'objectif journalier d'une section"""
-    objectifs = {
-        'extrusion': Decimal('35000'),
-        'imprimerie': Decimal('20000'),
-        'soudure': Decimal('12000'),
-        'recyclage': Decimal('8000'),
-    }
-    return objectifs.get(section, Decimal('10000'))
\ No newline at end of file
+def get_objectif_section(section, date=None):
+    """Retourne l'objectif journalier d'une section (voir ObjectifProduction)"""
+    return get_objectifs_jour(date).get(section, ZERO)
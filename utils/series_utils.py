@@ -0,0 +1,191 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Sum, Value, When
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from ..models import ProductionImprimerie, ProductionSoudure, ResumeProductionJour
+from .agregats_utils import SECTIONS_PRODUCTION
+from .cache_utils import cle_cache, obtenir_en_cache, version_cache
+
+# Granularité -> troncature de date_production (l'équipe regroupe par jour et par poste)
+TRONCATURES_SERIES = {
+    'equipe': None,
+    'jour': TruncDay,
+    'semaine': TruncWeek,
+    'mois': TruncMonth,
+}
+
+CODES_EQUIPES = ('A', 'B', 'C')
+
+# Nombre maximal de périodes par série (un an par jour, ~4 mois par équipe)
+MAX_PERIODES_SERIES = 400
+
+MOIS_ABREGES = ['Janv', 'Févr', 'Mars', 'Avr', 'Mai', 'Juin',
+                'Juil', 'Août', 'Sept', 'Oct', 'Nov', 'Déc']
+
+# Les saisies imprimerie et soudure n'ont pas d'équipe : le poste est déduit
+# de l'heure de début, selon les horaires de Equipe.EQUIPES_CHOICES
+POSTE_SELON_HEURE = Case(
+    When(heure_debut__gte=time(6), heure_debut__lt=time(14), then=Value('A')),
+    When(heure_debut__gte=time(14), heure_debut__lt=time(22), then=Value('B')),
+    default=Value('C'),
+    output_field=CharField(),
+)
+
+
+def _debut_periode(granularite, jour):
+    if granularite == 'semaine':
+        return jour - timedelta(days=jour.weekday())
+    if granularite == 'mois':
+        return jour.replace(day=1)
+    return jour
+
+
+def _periode_suivante(granularite, debut):
+    if granularite == 'semaine':
+        return debut + timedelta(days=7)
+    if granularite == 'mois':
+        return date(debut.year + debut.month // 12, debut.month % 12 + 1, 1)
+    return debut + timedelta(days=1)
+
+
+def periodes_series(granularite, debut, fin):
+    """Clés des périodes couvertes, dans l'ordre : dates, ou (date, équipe) par poste"""
+    jours = []
+    courant = _debut_periode(granularite, debut)
+    while courant <= fin:
+        jours.append(courant)
+        courant = _periode_suivante(granularite, courant)
+    if granularite == 'equipe':
+        return [(jour, code) for jour in jours for code in CODES_EQUIPES]
+    return jours
+
+
+def libelle_periode(granularite, cle):
+    if granularite == 'equipe':
+        jour, code = cle
+        return f"{jour.strftime('%d/%m')} {code}"
+    if granularite == 'semaine':
+        annee, semaine, _ = cle.isocalendar()
+        return f'S{semaine:02d} {annee}'
+    if granularite == 'mois':
+        return f'{MOIS_ABREGES[cle.month - 1]} {cle.year}'
+    return cle.strftime('%d/%m')
+
+
+def _lignes_resume(granularite, debut, fin):
+    """(clé de période, section, production, déchets, bâche noire) depuis les résumés journaliers"""
+    resumes = ResumeProductionJour.objects.filter(date_production__range=(debut, fin)).order_by()
+    sommes = {
+        'production': Sum('total_production_kg'),
+        'dechets': Sum('dechets_kg'),
+        'bache_noir': Sum('production_bache_noir_kg'),
+    }
+
+    if granularite == 'equipe':
+        # Seules l'extrusion et le recyclage sont résumés par équipe
+        lignes = (
+            resumes.filter(section__in=['extrusion', 'recyclage'])
+            .values('date_production', 'section', 'equipe__nom')
+            .annotate(**sommes)
+        )
+        for ligne in lignes:
+            yield ((ligne['date_production'], ligne['equipe__nom']), ligne['section'],
+                   ligne['production'], ligne['dechets'], ligne['bache_noir'])
+        return
+
+    troncature = TRONCATURES_SERIES[granularite]
+    lignes = (
+        resumes.annotate(periode=troncature('date_production'))
+        .values('periode', 'section')
+        .annotate(**sommes)
+    )
+    for ligne in lignes:
+        yield ligne['periode'], ligne['section'], ligne['production'], ligne['dechets'], ligne['bache_noir']
+
+
+def _lignes_postes(debut, fin):
+    """Imprimerie et soudure par (jour, poste), une requête groupée par table"""
+    for section, modele in (('imprimerie', ProductionImprimerie), ('soudure', ProductionSoudure)):
+        lignes = (
+            modele.objects.filter(date_production__range=(debut, fin))
+            .annotate(poste=POSTE_SELON_HEURE)
+            .values('date_production', 'poste')
+            .order_by()
+            .annotate(production=Sum('total_production_kg'), dechets=Sum('dechets_kg'))
+        )
+        for ligne in lignes:
+            yield ((ligne['date_production'], ligne['poste']), section,
+                   ligne['production'], ligne['dechets'], None)
+
+
+def calculer_series_production(granularite, debut, fin):
+    """
+    Séries de production, déchets et bâche noire par section sur [debut, fin].
+
+    Jour, semaine et mois : une requête GROUP BY sur ResumeProductionJour.
+    Équipe : les résumés extrusion / recyclage, plus une requête par table
+    pour l'imprimerie et la soudure (poste déduit de l'heure de début).
+    Les périodes sans saisie valent zéro.
+    """
+    if granularite not in TRONCATURES_SERIES:
+        raise ValueError(f'Granularité inconnue : {granularite}')
+    if debut > fin:
+        raise ValueError('La date de début doit précéder la date de fin')
+
+    periodes = periodes_series(granularite, debut, fin)
+    if len(periodes) > MAX_PERIODES_SERIES:
+        raise ValueError(
+            f'{len(periodes)} périodes demandées (maximum {MAX_PERIODES_SERIES}) : '
+            f'réduisez la plage ou choisissez une granularité plus large'
+        )
+
+    index = {cle: position for position, cle in enumerate(periodes)}
+    production = {section: [Decimal('0')] * len(periodes) for section in SECTIONS_PRODUCTION}
+    dechets = {section: [Decimal('0')] * len(periodes) for section in SECTIONS_PRODUCTION}
+    bache_noir = [Decimal('0')] * len(periodes)
+
+    lignes = _lignes_resume(granularite, debut, fin)
+    if granularite == 'equipe':
+        lignes = list(lignes) + list(_lignes_postes(debut, fin))
+
+    for cle, section, kg_production, kg_dechets, kg_bache in lignes:
+        position = index.get(cle)
+        if position is None:
+            continue
+        production[section][position] += kg_production or 0
+        dechets[section][position] += kg_dechets or 0
+        bache_noir[position] += kg_bache or 0
+
+    def arrondir(valeurs):
+        return [round(float(valeur), 1) for valeur in valeurs]
+
+    dechets_totaux = [sum(valeurs) for valeurs in zip(*dechets.values())]
+    series = {
+        'granularite': granularite,
+        'debut': debut.isoformat(),
+        'fin': fin.isoformat(),
+        'labels': [libelle_periode(granularite, cle) for cle in periodes],
+        'production_totale': arrondir(sum(valeurs) for valeurs in zip(*production.values())),
+        'dechets': arrondir(dechets_totaux),
+        'dechets_par_section': {section: arrondir(valeurs) for section, valeurs in dechets.items()},
+        'bache_noir': arrondir(bache_noir),
+    }
+    for section, valeurs in production.items():
+        series[section] = arrondir(valeurs)
+    return series
+
+
+def obtenir_series_production(granularite, debut, fin):
+    """
+    Séries de production mises en cache par (granularité, plage).
+
+    La clé inclut la version des résumés des mois couverts, changée à chaque
+    saisie enregistrée : une modification périme les séries qui la couvrent.
+    """
+    version = version_cache(debut=debut, fin=fin)
+    return obtenir_en_cache(
+        cle_cache('series', date=debut, version=f'{granularite}:{fin.isoformat()}:{version}'),
+        lambda: calculer_series_production(granularite, debut, fin),
+    )
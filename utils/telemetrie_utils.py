@@ -0,0 +1,325 @@
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMinute, TruncHour, TruncDay
+from django.utils import timezone
+
+from ..models import Machine, MesureCapteur, AgregatCapteur
+
+# Taille des lots d'insertion / de purge
+TAILLE_LOT_MESURES = 2000
+TAILLE_LOT_PURGE = 10000
+
+# Résolution -> (troncature, niveau source, durée d'une période)
+NIVEAUX_AGREGATION = {
+    'minute': (TruncMinute, None, timedelta(minutes=1)),
+    'heure': (TruncHour, 'minute', timedelta(hours=1)),
+    'jour': (TruncDay, 'heure', timedelta(days=1)),
+}
+
+# Champ de l'agrégat -> (agrégation depuis les mesures brutes, agrégation depuis le niveau inférieur)
+CHAMPS_AGREGAT = {
+    'nombre_mesures': (Count('id'), Sum('nombre_mesures')),
+    'temperature_somme': (Sum('temperature'), Sum('temperature_somme')),
+    'temperature_nombre': (Count('temperature'), Sum('temperature_nombre')),
+    'temperature_min': (Min('temperature'), Min('temperature_min')),
+    'temperature_max': (Max('temperature'), Max('temperature_max')),
+    'consommation_somme': (Sum('consommation_kwh'), Sum('consommation_somme')),
+    'consommation_nombre': (Count('consommation_kwh'), Sum('consommation_nombre')),
+    'consommation_max': (Max('consommation_kwh'), Max('consommation_max')),
+    'heures_fonctionnement': (Max('heures_fonctionnement'), Max('heures_fonctionnement')),
+}
+
+# Champs sans valeur nulle possible (sommes et effectifs)
+CHAMPS_CUMULES = {
+    'nombre_mesures', 'temperature_somme', 'temperature_nombre',
+    'consommation_somme', 'consommation_nombre',
+}
+
+# Rétention par défaut en jours (None = conservation illimitée),
+# surchargeable par SOFEMCI_CONFIG['TELEMETRIE_RETENTION_JOURS']
+RETENTION_PAR_DEFAUT = {
+    'brut': 7,
+    'minute': 30,
+    'heure': 365,
+    'jour': None,
+}
+
+# Fenêtre recalculée à chaque passage de maintenir_telemetrie()
+FENETRES_RECALCUL = {
+    'minute': timedelta(minutes=15),
+    'heure': timedelta(hours=2),
+    'jour': timedelta(days=1),
+}
+
+
+def _decimal(valeur):
+    if valeur is None or valeur == '':
+        return None
+    try:
+        return Decimal(str(valeur))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+# ========================================
+# Écriture des mesures
+# ========================================
+
+def enregistrer_mesures(mesures, mettre_a_jour_machines=True, taille_lot=TAILLE_LOT_MESURES):
+    """
+    Ajoute des mesures capteurs par lots (bulk_create).
+
+    mesures : itérable de dicts {machine_id, horodatage (optionnel),
+    temperature, consommation_kwh, heures_fonctionnement}. La mesure la plus
+    récente de chaque machine est reportée sur Machine en un seul bulk_update,
+    pour que l'IA et les écrans continuent de lire la valeur courante.
+    Retourne le nombre de mesures insérées.
+    """
+    maintenant = timezone.now()
+    lot = []
+    dernieres = {}
+    total = 0
+
+    with transaction.atomic():
+        for mesure in mesures:
+            objet = MesureCapteur(
+                machine_id=mesure['machine_id'],
+                horodatage=mesure.get('horodatage') or maintenant,
+                temperature=_decimal(mesure.get('temperature')),
+                consommation_kwh=_decimal(mesure.get('consommation_kwh')),
+                heures_fonctionnement=_decimal(mesure.get('heures_fonctionnement')),
+            )
+            lot.append(objet)
+
+            precedente = dernieres.get(objet.machine_id)
+            if precedente is None or objet.horodatage >= precedente.horodatage:
+                dernieres[objet.machine_id] = objet
+
+            if len(lot) >= taille_lot:
+                MesureCapteur.objects.bulk_create(lot)
+                total += len(lot)
+                lot = []
+
+        if lot:
+            MesureCapteur.objects.bulk_create(lot)
+            total += len(lot)
+
+        if mettre_a_jour_machines and dernieres:
+            _reporter_sur_machines(dernieres, maintenant)
+
+    return total
+
+
+def _reporter_sur_machines(dernieres, maintenant):
+    """Valeurs courantes des machines depuis leur dernière mesure (un bulk_update)"""
+    machines = list(Machine.objects.filter(id__in=dernieres.keys()).only(
+        'id', 'temperature_actuelle', 'consommation_electrique_kwh',
+        'heures_fonctionnement_totales', 'heures_depuis_derniere_maintenance',
+    ))
+    for machine in machines:
+        mesure = dernieres[machine.id]
+        if mesure.temperature is not None:
+            machine.temperature_actuelle = mesure.temperature
+        if mesure.consommation_kwh is not None:
+            machine.consommation_electrique_kwh = mesure.consommation_kwh
+        if mesure.heures_fonctionnement is not None:
+            ecart = mesure.heures_fonctionnement - machine.heures_fonctionnement_totales
+            if ecart > 0:
+                machine.heures_depuis_derniere_maintenance += ecart
+            machine.heures_fonctionnement_totales = mesure.heures_fonctionnement
+        # bulk_update ne passe pas par Machine.save() : marquage explicite
+        machine.analyse_ia_requise = True
+        machine.derniere_mise_a_jour_donnees = maintenant
+
+    Machine.objects.bulk_update(machines, [
+        'temperature_actuelle', 'consommation_electrique_kwh',
+        'heures_fonctionnement_totales', 'heures_depuis_derniere_maintenance',
+        'analyse_ia_requise', 'derniere_mise_a_jour_donnees',
+    ], batch_size=500)
+
+
+def enregistrer_mesure_machine(machine, horodatage=None):
+    """Historise les valeurs capteurs courantes d'une machine (sans la modifier)"""
+    return MesureCapteur.objects.create(
+        machine=machine,
+        horodatage=horodatage or timezone.now(),
+        temperature=machine.temperature_actuelle,
+        consommation_kwh=machine.consommation_electrique_kwh,
+        heures_fonctionnement=machine.heures_fonctionnement_totales,
+    )
+
+
+# ========================================
+# Agrégats minute / heure / jour
+# ========================================
+
+def debut_periode(resolution, instant):
+    """Début (heure locale) de la période contenant instant"""
+    local = timezone.localtime(instant)
+    if resolution == 'minute':
+        return local.replace(second=0, microsecond=0)
+    if resolution == 'heure':
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def agreger_mesures(resolution, debut, fin):
+    """
+    (Re)calcule les agrégats d'une résolution pour les périodes couvrant
+    [debut, fin[ : les minutes depuis les mesures brutes, les heures depuis
+    les minutes, les jours depuis les heures. Idempotent : les agrégats
+    recalculés remplacent les existants, une période en cours est simplement
+    recalculée au passage suivant. Un agrégat dont le niveau source a été
+    purgé par la rétention est conservé tel quel. Retourne le nombre
+    d'agrégats écrits.
+    """
+    tronquer, source, duree = NIVEAUX_AGREGATION[resolution]
+    debut = debut_periode(resolution, debut)
+    fin = debut_periode(resolution, fin) + duree
+
+    if source is None:
+        lignes = MesureCapteur.objects.filter(
+            horodatage__gte=debut, horodatage__lt=fin
+        ).annotate(periode=tronquer('horodatage'))
+        index = 0
+    else:
+        lignes = AgregatCapteur.objects.filter(
+            resolution=source, debut__gte=debut, debut__lt=fin
+        ).annotate(periode=tronquer('debut'))
+        index = 1
+
+    # Préfixe : les annotations ne peuvent pas porter le nom d'un champ du modèle
+    lignes = lignes.values('machine_id', 'periode').order_by().annotate(**{
+        f'val_{champ}': expressions[index] for champ, expressions in CHAMPS_AGREGAT.items()
+    })
+
+    agregats = []
+    for ligne in lignes:
+        valeurs = {}
+        for champ in CHAMPS_AGREGAT:
+            valeur = ligne[f'val_{champ}']
+            if valeur is None and champ in CHAMPS_CUMULES:
+                valeur = 0
+            valeurs[champ] = valeur
+        agregats.append(AgregatCapteur(
+            machine_id=ligne['machine_id'],
+            resolution=resolution,
+            debut=ligne['periode'],
+            **valeurs
+        ))
+
+    # Seules les périodes recalculées sont remplacées
+    recalculees = {(agregat.machine_id, agregat.debut) for agregat in agregats}
+    remplaces = [
+        pk for pk, machine_id, periode in AgregatCapteur.objects.filter(
+            resolution=resolution, debut__gte=debut, debut__lt=fin
+        ).values_list('pk', 'machine_id', 'debut').iterator()
+        if (machine_id, periode) in recalculees
+    ]
+
+    with transaction.atomic():
+        for i in range(0, len(remplaces), TAILLE_LOT_PURGE):
+            AgregatCapteur.objects.filter(pk__in=remplaces[i:i + TAILLE_LOT_PURGE]).delete()
+        AgregatCapteur.objects.bulk_create(agregats, batch_size=1000)
+
+    return len(agregats)
+
+
+# ========================================
+# Rétention
+# ========================================
+
+def retention_jours():
+    retention = dict(RETENTION_PAR_DEFAUT)
+    retention.update(settings.SOFEMCI_CONFIG.get('TELEMETRIE_RETENTION_JOURS', {}))
+    return retention
+
+
+def _purger(queryset):
+    """Suppression par lots de clés primaires (pas de verrou massif sur la table)"""
+    supprimes = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:TAILLE_LOT_PURGE])
+        if not ids:
+            return supprimes
+        supprimes += queryset.model.objects.filter(pk__in=ids).delete()[0]
+
+
+def appliquer_retention(maintenant=None):
+    """Purge les mesures brutes et agrégats au-delà de leur durée de rétention"""
+    maintenant = maintenant or timezone.now()
+    supprimes = {}
+
+    for niveau, jours in retention_jours().items():
+        if not jours:
+            continue
+        limite = maintenant - timedelta(days=jours)
+        if niveau == 'brut':
+            queryset = MesureCapteur.objects.filter(horodatage__lt=limite)
+        else:
+            queryset = AgregatCapteur.objects.filter(resolution=niveau, debut__lt=limite)
+        supprimes[niveau] = _purger(queryset)
+
+    return supprimes
+
+
+def maintenir_telemetrie(maintenant=None, depuis=None, retention=True):
+    """
+    Passage périodique (cron, chaque minute) : agrégats minute, heure et jour
+    des fenêtres récentes, dans cet ordre, puis rétention. depuis permet de
+    recalculer un historique (reprise, mesures arrivées en retard) : chaque
+    niveau n'est recalculé que sur les périodes entières encore couvertes
+    par la rétention de son niveau source.
+    """
+    maintenant = maintenant or timezone.now()
+    rapport = {'agregats': {}, 'supprimes': {}}
+    retention = retention_jours()
+
+    for resolution in ('minute', 'heure', 'jour'):
+        _, source, duree = NIVEAUX_AGREGATION[resolution]
+        debut = depuis or maintenant - FENETRES_RECALCUL[resolution]
+        jours_source = retention.get(source or 'brut')
+        if jours_source:
+            # Première période dont le niveau source est complet
+            limite = debut_periode(resolution, maintenant - timedelta(days=jours_source)) + duree
+            debut = max(debut, limite)
+        rapport['agregats'][resolution] = agreger_mesures(resolution, debut, maintenant)
+
+    if retention:
+        rapport['supprimes'] = appliquer_retention(maintenant)
+
+    return rapport
+
+
+# ========================================
+# Lecture des séries
+# ========================================
+
+def serie_capteurs(machine_id, resolution, debut, fin=None):
+    """
+    Série agrégée d'une machine, ordonnée dans le temps (base des tendances) :
+    [{debut, nombre_mesures, temperature_moyenne, temperature_max,
+    consommation_moyenne, consommation_max, heures_fonctionnement}]
+    """
+    agregats = AgregatCapteur.objects.filter(
+        machine_id=machine_id, resolution=resolution, debut__gte=debut
+    )
+    if fin:
+        agregats = agregats.filter(debut__lt=fin)
+
+    return [
+        {
+            'debut': agregat.debut,
+            'nombre_mesures': agregat.nombre_mesures,
+            'temperature_moyenne': agregat.temperature_moyenne,
+            'temperature_max': agregat.temperature_max,
+            'consommation_moyenne': agregat.consommation_moyenne,
+            'consommation_max': agregat.consommation_max,
+            'heures_fonctionnement': agregat.heures_fonctionnement,
+        }
+        for agregat in agregats.order_by('debut')
+    ]
@@ -14,9 +14,13 @@ from .machines import (
 from .alerts import (
     liste_alertes_ia, traiter_alerte_ia, lancer_analyse_complete
 )
+from .taches import statut_tache_view
+from .telemetrie import ingestion_mesures_view
+from .rapports import telecharger_rapport_view, rapport_tache_view
+from .metriques import metriques_view
 
-# Fonctions utilitaires
-from .dashboard import (
+# Fonctions utilitaires (définies dans utils)
+from ..utils import (
     get_production_totale_jour, get_production_section_jour, get_dechets_totaux_jour,
     get_efficacite_moyenne_jour, get_machines_stats, get_zones_performance,
     get_extrusion_details_jour, get_imprimerie_details_jour, get_soudure_details_jour,
@@ -30,4 +34,6 @@ __all__ = [
     'machines_list_view', 'machine_create_view', 'machine_edit_view',
     'machine_delete_view', 'machine_detail_view', 'machine_detail_ia_view',
     'liste_alertes_ia', 'traiter_alerte_ia', 'lancer_analyse_complete',
+    'statut_tache_view', 'ingestion_mesures_view',
+    'telecharger_rapport_view', 'rapport_tache_view', 'metriques_view',
 ]
\ No newline at end of file
@@ -1,11 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
 
-from ..models import AlerteIA, Machine
+from ..models import AlerteIA, Machine, TacheFond
 from ..utils import (
     get_production_totale_jour, get_production_section_jour, get_dechets_totaux_jour,
     get_efficacite_moyenne_jour, get_machines_stats, get_zones_performance,
@@ -65,7 +66,7 @@ def liste_alertes_ia(request):
         'section_filtre': section_filtre,
     }
     
-    return render(request, 'liste_alertes_la.html', context)
+    return render(request, 'liste_alertes_ia.html', context)
 
 @login_required
 def traiter_alerte_ia(request, alerte_id):
@@ -98,54 +99,27 @@ def traiter_alerte_ia(request, alerte_id):
 
 @login_required
 def lancer_analyse_complete(request):
-    """Lance l'analyse IA sur toutes les machines"""
+    """
+    Soumet l'analyse IA de toutes les machines à la file des tâches de fond.
+    La réponse est immédiate : le worker (manage.py executer_taches) exécute
+    l'analyse et le dashboard IA suit son avancement via statut_tache_view.
+    """
+    ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
     if request.user.role not in ['admin', 'superviseur']:
+        if ajax:
+            return JsonResponse({'success': False, 'error': 'Permission refusée.'}, status=403)
         messages.error(request, 'Permission refusée.')
         return redirect('dashboard_ia')
-    
-    # Simulation d'analyse IA complète
-    from django.utils import timezone
-    import random
-    from decimal import Decimal
-    
-    machines = Machine.objects.filter(etat='actif')
-    nouvelles_alertes = 0
-    
-    for machine in machines:
-        # Simulation d'analyse IA
-        score_sante = Decimal(str(round(random.uniform(60, 95), 2)))
-        proba_7j = Decimal(str(round(random.uniform(5, 80), 2)))
-        proba_30j = Decimal(str(round(random.uniform(10, 90), 2)))
-        
-        # Mettre à jour les scores
-        machine.score_sante_global = score_sante
-        machine.probabilite_panne_7_jours = proba_7j
-        machine.probabilite_panne_30_jours = proba_30j
-        machine.date_derniere_analyse_ia = timezone.now()
-        
-        # Générer des alertes si nécessaire
-        if proba_7j > 50:
-            niveau = 'critique' if proba_7j > 70 else 'urgent' if proba_7j > 50 else 'attention'
-            
-            AlerteIA.objects.create(
-                machine=machine,
-                niveau=niveau,
-                titre=f"Risque de panne élevé - {machine.numero}",
-                message=f"Probabilité de panne dans les 7 jours: {proba_7j}%. Score de santé: {score_sante}%.",
-                probabilite_panne=proba_7j,
-                delai_estime_jours=7,
-                confiance_prediction=Decimal('85.0'),
-                action_recommandee="Effectuer une maintenance préventive et surveiller les paramètres.",
-                priorite=8 if niveau == 'critique' else 6,
-                modele_ia_version='v1.0'
-            )
-            nouvelles_alertes += 1
-        
-        machine.save()
-    
-    if nouvelles_alertes > 0:
-        messages.success(request, f'Analyse IA terminée. {nouvelles_alertes} nouvelles alertes générées.')
-    else:
-        messages.info(request, 'Analyse IA terminée. Aucune nouvelle alerte critique détectée.')
-    
+
+    tache = TacheFond.soumettre('analyse_ia', request.user)
+
+    if ajax:
+        return JsonResponse({
+            'success': True,
+            'tache': tache.statut_json(),
+            'url_statut': reverse('statut_tache', args=[tache.id]),
+        })
+
+    messages.info(request, f'Analyse IA lancée en arrière-plan (tâche #{tache.id}).')
     return redirect('dashboard_ia')
\ No newline at end of file
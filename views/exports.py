@@ -1,10 +1,77 @@
 # sofemci/views/exports.py
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
 import csv
-import io
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from ..utils.export_utils import (
+    SECTIONS_EXPORT, lignes_section, lignes_multi_sections, lignes_comparatif,
+    totaux_section, bornes_semaine, bornes_mois,
+)
+
+
+class _Tampon:
+    """Pseudo-fichier : csv.writer retourne la ligne au lieu de l'accumuler"""
+
+    def write(self, valeur):
+        return valeur
+
+
+def _reponse_csv(lignes, nom_fichier):
+    """Réponse CSV générée ligne par ligne (mémoire constante)"""
+    writer = csv.writer(_Tampon())
+
+    def contenu():
+        # BOM : accents correctement lus à l'ouverture directe dans Excel
+        yield '\ufeff'
+        for ligne in lignes:
+            yield writer.writerow(ligne)
+
+    response = StreamingHttpResponse(contenu(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nom_fichier}.csv"'
+    return response
+
+
+def _lire_date(request, nom, defaut=None):
+    """Date AAAA-MM-JJ d'un paramètre GET (ValueError si invalide)"""
+    valeur = request.GET.get(nom)
+    if not valeur:
+        if defaut is None:
+            raise ValueError(f'Paramètre {nom} obligatoire (AAAA-MM-JJ)')
+        return defaut
+    try:
+        return datetime.strptime(valeur, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Date invalide pour {nom} : {valeur} (AAAA-MM-JJ attendu)')
+
+
+def _lire_sections(request):
+    """?section=extrusion&section=soudure ; toutes les sections par défaut"""
+    sections = request.GET.getlist('section') or SECTIONS_EXPORT
+    inconnues = [section for section in sections if section not in SECTIONS_EXPORT]
+    if inconnues:
+        raise ValueError(f'Section inconnue : {", ".join(inconnues)}')
+    return sections
+
+
+def _export_periode(request, debut, fin, nom):
+    """Une section : colonnes détaillées ; plusieurs : colonnes communes"""
+    if fin < debut:
+        return HttpResponseBadRequest('La date de fin précède la date de début')
+    try:
+        sections = _lire_sections(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    if len(sections) == 1:
+        lignes = lignes_section(sections[0], debut, fin)
+        nom = f'{nom}_{sections[0]}'
+    else:
+        lignes = lignes_multi_sections(sections, debut, fin)
+    return _reponse_csv(lignes, nom)
+
 
 # Vue principale des exports
 @login_required
@@ -15,55 +82,93 @@ def page_exports(request):
 # Exports par période
 @login_required
 def export_journalier(request):
-    """Export journalier"""
-    date_str = request.GET.get('date', datetime.now().strftime('%Y-%m-%d'))
-    
-    # Créer un fichier CSV en mémoire
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Date', 'Section', 'Quantité', 'Unité'])
-    writer.writerow([date_str, 'Extrusion', '1000', 'kg'])
-    writer.writerow([date_str, 'Imprimerie', '500', 'mètres'])
-    
-    # Retourner le fichier
-    response = HttpResponse(output.getvalue(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="export_journalier_{date_str}.csv"'
-    return response
+    """Export journalier (?date=AAAA-MM-JJ, aujourd'hui par défaut)"""
+    try:
+        jour = _lire_date(request, 'date', timezone.localdate())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return _export_periode(request, jour, jour, f'export_journalier_{jour}')
 
 @login_required
 def export_hebdomadaire(request):
-    """Export hebdomadaire"""
-    # Implémentation similaire
-    return HttpResponse("Export hebdomadaire")
+    """Export de la semaine (lundi-dimanche) contenant ?date="""
+    try:
+        jour = _lire_date(request, 'date', timezone.localdate())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    debut, fin = bornes_semaine(jour)
+    return _export_periode(request, debut, fin, f'export_hebdomadaire_{debut}')
 
 @login_required
 def export_mensuel(request):
-    """Export mensuel"""
-    return HttpResponse("Export mensuel")
+    """Export mensuel (?mois=AAAA-MM, mois courant par défaut)"""
+    mois = request.GET.get('mois') or timezone.localdate().strftime('%Y-%m')
+    try:
+        reference = datetime.strptime(mois, '%Y-%m')
+    except ValueError:
+        return HttpResponseBadRequest(f'Mois invalide : {mois} (AAAA-MM attendu)')
+    debut, fin = bornes_mois(reference.year, reference.month)
+    return _export_periode(request, debut, fin, f'export_mensuel_{mois}')
 
 @login_required
 def export_periode_personnalisee(request):
-    """Export pour période personnalisée"""
-    return HttpResponse("Export période personnalisée")
+    """Export pour période personnalisée (?debut=&fin=)"""
+    try:
+        debut = _lire_date(request, 'debut')
+        fin = _lire_date(request, 'fin')
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return _export_periode(request, debut, fin, f'export_{debut}_{fin}')
 
 @login_required
 def export_comparatif_periodes(request):
-    """Export comparatif"""
-    return HttpResponse("Export comparatif")
+    """Export comparatif des totaux de deux périodes (?debut1=&fin1=&debut2=&fin2=)"""
+    try:
+        periodes = []
+        for numero in (1, 2):
+            debut = _lire_date(request, f'debut{numero}')
+            fin = _lire_date(request, f'fin{numero}')
+            if fin < debut:
+                raise ValueError(f'Période {numero} : la date de fin précède la date de début')
+            periodes.append((f'Période {numero}', debut, fin))
+        sections = _lire_sections(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    return _reponse_csv(
+        lignes_comparatif(periodes, sections),
+        f'export_comparatif_{periodes[0][1]}_{periodes[1][1]}'
+    )
 
 @login_required
 def export_global_toutes_sections(request):
-    """Export global"""
-    return HttpResponse("Export global")
+    """Export global de toutes les saisies (bornes ?debut= / ?fin= facultatives)"""
+    try:
+        debut = _lire_date(request, 'debut', datetime.min.date())
+        fin = _lire_date(request, 'fin', timezone.localdate())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    if fin < debut:
+        return HttpResponseBadRequest('La date de fin précède la date de début')
+    return _reponse_csv(lignes_multi_sections(SECTIONS_EXPORT, debut, fin), 'export_global')
 
 @login_required
 def api_previsualisation_export(request):
-    """API pour prévisualisation des exports"""
+    """API pour prévisualisation des exports : volume et totaux par section"""
+    try:
+        fin = _lire_date(request, 'fin', timezone.localdate())
+        debut = _lire_date(request, 'debut', fin)
+        sections = _lire_sections(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    totaux = {section: totaux_section(section, debut, fin) for section in sections}
     return JsonResponse({
         'success': True,
         'data': {
-            'periodes': ['2024-01-01', '2024-01-02', '2024-01-03'],
-            'sections': ['Extrusion', 'Imprimerie', 'Soudure'],
-            'totaux': [1000, 500, 300]
+            'periodes': [debut.isoformat(), fin.isoformat()],
+            'sections': [section.capitalize() for section in sections],
+            'lignes': [totaux[section]['productions'] for section in sections],
+            'totaux': [float(totaux[section]['total']) for section in sections],
         }
-    })
\ No newline at end of file
+    })
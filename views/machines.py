@@ -4,7 +4,6 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Count 
 from ..models import Machine, ZoneExtrusion
 from ..forms import MachineForm
 
@@ -14,7 +13,7 @@ from ..utils import (
     get_extrusion_details_jour, get_imprimerie_details_jour, get_soudure_details_jour,
     get_recyclage_details_jour, get_chart_data_for_dashboard, get_analytics_kpis,
     get_analytics_table_data, calculer_pourcentage_production, calculer_pourcentage_section,
-    get_objectif_section,
+    get_objectif_section, enregistrer_mesure_machine, get_stats_parc, get_machines_par_section,
 )
 
 
@@ -44,14 +43,10 @@ def machines_list_view(request):
     page_number = request.GET.get('page')
     machines_page = paginator.get_page(page_number)
     
-    # Statistiques
-    stats = {
-        'total': Machine.objects.count(),
-        'actives': Machine.objects.filter(etat='actif').count(),
-        'maintenance': Machine.objects.filter(etat='maintenance').count(),
-        'pannes': Machine.objects.filter(etat='panne').count(),
-        'par_section': Machine.objects.values('section').annotate(count=Count('id')),
-    }
+    # Statistiques (une requête agrégée, mise en cache)
+    stats_parc = get_stats_parc()
+    stats = get_machines_stats()
+    stats['par_section'] = get_machines_par_section(stats_parc)
     
     context = {
         'machines': machines_page,
@@ -309,6 +304,7 @@ def simuler_capteurs_view(request, machine_id):
         
         machine.date_derniere_analyse_ia = timezone.now()
         machine.save()
+        enregistrer_mesure_machine(machine)
         
         messages.success(request, f'Données des capteurs simulées pour la machine {machine.numero}!')
         return redirect('machine_detail_ia', machine_id=machine_id)
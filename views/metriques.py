@@ -0,0 +1,70 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from ..middleware import metriques_requetes
+
+
+def _lecteur_autorise(request):
+    """
+    Clé partagée du collecteur de métriques, ou session staff / administrateur :
+    la vue est exemptée de CSRF pour le collecteur, le contrôle CSRF est donc
+    rejoué ici pour une réinitialisation (POST) authentifiée par session
+    """
+    cle_attendue = settings.SOFEMCI_CONFIG.get('METRIQUES_CLE')
+    cle = request.headers.get('X-Cle-Metriques', '')
+    if cle_attendue and cle and hmac.compare_digest(cle, cle_attendue):
+        return True
+    utilisateur = request.user
+    if not (utilisateur.is_authenticated and (utilisateur.is_staff or utilisateur.role == 'admin')):
+        return False
+    return request.method != 'POST' or CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {}) is None
+
+
+def _format_prometheus(instantane):
+    """Exposition texte Prometheus : une série par vue et par mesure cumulée"""
+    series = [
+        ('sofemci_requetes_http_total', 'appels', 'counter', 'Requêtes HTTP traitées'),
+        ('sofemci_requetes_http_erreurs_total', 'erreurs', 'counter', 'Réponses 5xx'),
+        ('sofemci_requetes_sql_total', 'requetes_sql', 'counter', 'Requêtes SQL exécutées'),
+        ('sofemci_duree_sql_ms_total', 'duree_sql_ms', 'counter', 'Temps passé en base (ms)'),
+        ('sofemci_duree_totale_ms_total', 'duree_totale_ms', 'counter', 'Temps de traitement (ms)'),
+        ('sofemci_requetes_signalees_total', 'signalees', 'counter', 'Requêtes au-delà des seuils'),
+        ('sofemci_requetes_sql_max', 'requetes_sql_max', 'gauge', 'Maximum de requêtes SQL par appel'),
+    ]
+    pid = os.getpid()
+    lignes = []
+    for nom, cle, type_serie, aide in series:
+        lignes.append(f'# HELP {nom} {aide}')
+        lignes.append(f'# TYPE {nom} {type_serie}')
+        for vue, stats in instantane['vues'].items():
+            lignes.append(f'{nom}{{vue="{vue}",pid="{pid}"}} {stats[cle]}')
+    return '\n'.join(lignes) + '\n'
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def metriques_view(request):
+    """
+    Métriques d'instrumentation du processus courant (voir middleware.py).
+    JSON par défaut, ?format=prometheus pour un collecteur. Un POST renvoie
+    les métriques puis repart de zéro. Chaque worker a ses propres compteurs
+    (champ pid).
+    """
+    if not _lecteur_autorise(request):
+        return JsonResponse({'error': 'Accès refusé'}, status=403)
+
+    instantane = metriques_requetes.instantane()
+    if request.method == 'POST':
+        metriques_requetes.reinitialiser()
+
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(_format_prometheus(instantane), content_type='text/plain; version=0.0.4')
+
+    instantane['pid'] = os.getpid()
+    return JsonResponse(instantane)
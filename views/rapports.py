@@ -0,0 +1,50 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_GET
+
+from ..models import RapportGenere, TacheFond
+from ..rapports import reponse_rapport
+
+
+def _acces_rapports(user):
+    return user.is_staff or user.role in ['admin', 'superviseur']
+
+
+@login_required
+@require_GET
+def telecharger_rapport_view(request, rapport_id):
+    """Téléchargement d'un rapport déjà généré (servi depuis le cache disque)"""
+    if not _acces_rapports(request.user):
+        return HttpResponseForbidden('Accès refusé')
+    rapport = get_object_or_404(RapportGenere, pk=rapport_id)
+    if not rapport.fichier_disponible():
+        raise Http404('Rapport expiré : relancez l\'export')
+    return reponse_rapport(rapport)
+
+
+@login_required
+@require_GET
+def rapport_tache_view(request, tache_id):
+    """
+    Lien donné à l'utilisateur quand un rapport part en tâche de fond :
+    redirige vers le fichier dès qu'il est prêt, sinon se recharge seul.
+    """
+    if not _acces_rapports(request.user):
+        return HttpResponseForbidden('Accès refusé')
+    tache = get_object_or_404(TacheFond, pk=tache_id, type_tache='rapport')
+
+    if tache.statut == 'terminee':
+        return redirect('telecharger_rapport', rapport_id=tache.resultat['rapport_id'])
+    if tache.statut == 'echouee':
+        return HttpResponse(f'Échec de la génération du rapport : {tache.erreur}', status=500,
+                            content_type='text/plain; charset=utf-8')
+
+    response = HttpResponse(
+        f'Rapport en cours de génération ({tache.get_statut_display()}, {tache.progression}%). '
+        'Le téléchargement démarrera automatiquement.',
+        status=202,
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Refresh'] = '3'
+    return response
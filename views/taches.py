@@ -0,0 +1,22 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ..models import TacheFond
+
+
+def _acces_tache(user, tache):
+    """Le demandeur de la tâche, ou un superviseur / administrateur"""
+    return tache.demandee_par_id == user.pk or user.is_staff or user.role in ['admin', 'superviseur']
+
+
+@login_required
+@require_GET
+def statut_tache_view(request, tache_id):
+    """Endpoint léger de suivi d'une tâche de fond (interrogé par le navigateur)"""
+    tache = TacheFond.objects.filter(pk=tache_id).defer('parametres').first()
+    if tache is None:
+        return JsonResponse({'error': 'Tâche introuvable'}, status=404)
+    if not _acces_tache(request.user, tache):
+        return JsonResponse({'error': 'Accès refusé'}, status=403)
+    return JsonResponse(tache.statut_json())
@@ -0,0 +1,52 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from ..utils import ingerer_mesures
+
+
+def _equipement_autorise(request):
+    """
+    Clé partagée des équipements, ou session d'un administrateur : la vue est
+    exemptée de CSRF pour les équipements, le contrôle CSRF est donc rejoué
+    ici pour les appels authentifiés par session
+    """
+    cle_attendue = settings.SOFEMCI_CONFIG.get('TELEMETRIE_CLE_INGESTION')
+    cle = request.headers.get('X-Cle-Telemetrie', '')
+    if cle_attendue and cle and hmac.compare_digest(cle, cle_attendue):
+        return True
+    if not (request.user.is_authenticated and request.user.role == 'admin'):
+        return False
+    return CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {}) is None
+
+
+@csrf_exempt
+@require_POST
+def ingestion_mesures_view(request):
+    """
+    Réception en masse des mesures capteurs (JSON lines ou CSV).
+
+    Les mesures sont mises en tampon puis écrites par micro-lots : la réponse
+    202 confirme la prise en compte, pas l'écriture (?synchrone=1 pour attendre).
+    """
+    if not _equipement_autorise(request):
+        return JsonResponse({'error': 'Accès refusé'}, status=403)
+
+    format_lot = 'csv' if request.content_type in ('text/csv', 'application/csv') else 'jsonl'
+    try:
+        contenu = request.body
+    except RequestDataTooBig:
+        return JsonResponse({'error': 'Lot trop volumineux, à découper'}, status=413)
+
+    try:
+        rapport = ingerer_mesures(contenu, format_lot, synchrone=request.GET.get('synchrone') == '1')
+    except UnicodeDecodeError:
+        return JsonResponse({'error': 'Encodage UTF-8 attendu'}, status=400)
+
+    statut = 202 if rapport['acceptees'] else 400
+    return JsonResponse(rapport, status=statut)